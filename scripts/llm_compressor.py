@@ -2,23 +2,12 @@ import os
 import sys
 import json
 import time
+import random
+import hashlib
 import argparse
-from typing import Dict, Any
-
-try:
-    from dotenv import load_dotenv
-except ImportError:
-    print("Error: 'python-dotenv' is not installed.", flush=True)
-    print("Please run: pip install python-dotenv", flush=True)
-    sys.exit(1)
-
-try:
-    from google import genai
-    from google.genai import types
-except ImportError:
-    print("Error: 'google-genai' is not installed.", flush=True)
-    print("Please run: pip install google-genai", flush=True)
-    sys.exit(1)
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 
 SYSTEM_PROMPT = """You are an Expert Systems Architect. Your task is to perform "Context Compression" on a single source code file. 
@@ -41,6 +30,12 @@ COMPRESSION RULES (CRITICAL):
 4. MISSING DATA: If a file has no exports or dependencies, write "None" for that section. Do not omit the section entirely.
 """
 
+JOURNAL_FILENAME = "compression_journal.jsonl"
+
+# Summaries are short; reserved per request on top of the prompt's estimate
+EXPECTED_OUTPUT_TOKENS = 512
+
+
 def _load_json(path: str) -> Dict[str, Any]:
     if not os.path.exists(path):
         return {}
@@ -48,94 +43,359 @@ def _load_json(path: str) -> Dict[str, Any]:
         return json.load(f)
 
 def _save_json(path: str, data: Dict[str, Any]):
-    with open(path, "w", encoding="utf-8") as f:
+    # Write-then-rename so a crash never leaves a truncated state file
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
         json.dump(data, f, indent=2)
+    os.replace(tmp_path, path)
 
-def main():
-    parser = argparse.ArgumentParser(description="LLM Context Compressor Orchestrator")
-    parser.add_argument("--repo-root", required=True, help="Path to the repository root")
-    parser.add_argument("--state-dir", required=True, help="Directory containing state JSON files")
-    parser.add_argument("--model", default="gemini-3.1-pro-preview", help="Gemini model to use")
-    parser.add_argument("--delay", type=float, default=2.0, help="Delay between API calls (seconds) to prevent rate limits")
-    args = parser.parse_args()
+def _estimate_tokens(text: str) -> int:
+    # chars / 4, as the flatten exporter estimates
+    return (len(SYSTEM_PROMPT) + len(text)) // 4 + EXPECTED_OUTPUT_TOKENS
 
-    # Load environment variables from .env file
-    load_dotenv(os.path.join(args.repo_root, ".env"))
 
-    api_key = os.environ.get("GEMINI_API_KEY")
-    if not api_key:
-        print("Error: GEMINI_API_KEY environment variable is not set in your .env file.", flush=True)
-        sys.exit(1)
+class TokenBucket:
+    """
+    Thread-safe token bucket refilled at `per_minute` per minute, holding at
+    most one minute's worth. acquire() blocks until the amount is available.
+    """
 
-    # Initialize the new SDK client
-    client = genai.Client(api_key=api_key)
+    def __init__(
+        self,
+        per_minute: float,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep
+    ):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.level = self.capacity
+        self._clock = clock
+        self._sleep = sleep
+        self._updated = clock()
+        self._lock = threading.Lock()
 
-    bool_path = os.path.join(args.state_dir, "file_changed_bool.json")
-    master_path = os.path.join(args.state_dir, "master_compressed_context.json")
+    def acquire(self, amount: float = 1.0) -> None:
+        # A request larger than the bucket would wait forever; let it drain the bucket instead
+        amount = min(amount, self.capacity)
+        while True:
+            with self._lock:
+                now = self._clock()
+                self.level = min(self.capacity, self.level + (now - self._updated) * self.rate)
+                self._updated = now
+                if self.level >= amount:
+                    self.level -= amount
+                    return
+                wait = (amount - self.level) / self.rate
+            self._sleep(wait)
 
-    changed_bool = _load_json(bool_path)
-    master_context = _load_json(master_path)
 
-    pending_files = [k for k, v in changed_bool.items() if v == 1]
-    total = len(pending_files)
+class RateLimiter:
+    """Requests/min and tokens/min limits shared by all workers; a limit of 0 disables it."""
 
-    if total == 0:
-        print("No files pending compression. Exiting.", flush=True)
-        sys.exit(0)
+    def __init__(
+        self,
+        requests_per_minute: float = 0,
+        tokens_per_minute: float = 0,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep
+    ):
+        self.requests = TokenBucket(requests_per_minute, clock, sleep) if requests_per_minute > 0 else None
+        self.tokens = TokenBucket(tokens_per_minute, clock, sleep) if tokens_per_minute > 0 else None
+
+    def acquire(self, tokens: int) -> None:
+        if self.requests is not None:
+            self.requests.acquire(1)
+        if self.tokens is not None:
+            self.tokens.acquire(tokens)
 
-    print(f"Found {total} files pending compression.", flush=True)
 
-    for i, stable_id in enumerate(pending_files, 1):
-        # The flush=True is CRITICAL here so the GUI reads it instantly
-        print(f"[{i}/{total}] Processing: {stable_id}...", flush=True)
-        
-        # stable_id format is "file:src/path/to/file.py"
-        rel_path = stable_id.replace("file:", "", 1)
-        abs_path = os.path.join(args.repo_root, rel_path)
+def _transport_errors() -> Tuple[type, ...]:
+    # Connection failures and timeouts (ConnectionError and TimeoutError are
+    # OSErrors); the SDK makes its requests with httpx when it is installed
+    errors: List[type] = [OSError]
+    try:
+        import httpx
+        errors.append(httpx.TransportError)
+    except ImportError:
+        pass
+    return tuple(errors)
 
-        if not os.path.exists(abs_path):
-            print(f"  -> Warning: File not found on disk: {abs_path}. Skipping.", flush=True)
-            continue
+TRANSPORT_ERRORS = _transport_errors()
 
+def _is_retryable(exc: Exception) -> bool:
+    # SDK errors carry an HTTP code: retry rate limits and server errors only.
+    # Without one, only connection failures and timeouts are retried; anything
+    # else (bad arguments, SDK misuse) fails at once.
+    code = getattr(exc, "code", None) or getattr(exc, "status_code", None)
+    if isinstance(code, int):
+        return code == 429 or code >= 500
+    return isinstance(exc, TRANSPORT_ERRORS)
+
+def call_with_retries(
+    fn: Callable[[], Any],
+    retries: int = 4,
+    base_delay: float = 1.0,
+    max_delay: float = 30.0,
+    sleep: Optional[Callable[[float], None]] = None,
+    rng: Callable[[], float] = random.random
+) -> Any:
+    """
+    Calls fn(), retrying rate limits, server errors and connection failures
+    with exponential backoff and full jitter (a random wait up to
+    base_delay * 2^attempt, capped). Other errors are raised at once.
+    """
+    for attempt in range(retries + 1):
         try:
-            with open(abs_path, "r", encoding="utf-8") as f:
-                code_content = f.read()
+            return fn()
         except Exception as e:
-            print(f"  -> Error reading {abs_path}: {e}", flush=True)
-            continue
+            if attempt == retries or not _is_retryable(e):
+                raise
+            (sleep or time.sleep)(rng() * min(max_delay, base_delay * 2 ** attempt))
 
-        user_prompt = f"Please compress the following file:\n\nFile Path: {rel_path}\n\n```\n{code_content}\n```"
 
-        try:
-            # Call Gemini using the new SDK syntax
-            response = client.models.generate_content(
-                model=args.model,
-                contents=user_prompt,
-                config=types.GenerateContentConfig(
-                    system_instruction=SYSTEM_PROMPT,
-                )
-            )
-            
-            # Transactional Update
-            master_context[stable_id] = response.text.strip()
+class CompressionJournal:
+    """
+    Append-only JSONL log of finished summaries ({stable_id, sha256, summary}).
+    Workers' results are appended as they arrive instead of rewriting both
+    state files per file; compact() folds them into the state files once.
+    A journal left by an interrupted run is replayed on the next start.
+    """
+
+    def __init__(self, state_dir: str):
+        self.path = os.path.join(state_dir, JOURNAL_FILENAME)
+        self._file = None
+
+    def append(self, record: Dict[str, Any]) -> None:
+        if self._file is None:
+            self._file = open(self.path, "a", encoding="utf-8")
+        self._file.write(json.dumps(record) + "\n")
+        self._file.flush()
+
+    def records(self) -> List[Dict[str, Any]]:
+        if not os.path.exists(self.path):
+            return []
+        records = []
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except json.JSONDecodeError:
+                    # Torn last line of a killed run
+                    break
+        return records
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def compact(
+        self,
+        master_path: str,
+        bool_path: str,
+        repo_root: Optional[str] = None
+    ) -> int:
+        """
+        Applies the journal to the state files, writes each once and removes
+        the journal. With repo_root (replaying an earlier run), records whose
+        file changed on disk since it was summarized are dropped.
+        Returns the number of records applied.
+        """
+        self.close()
+        records = self.records()
+        if not records:
+            if os.path.exists(self.path):
+                os.remove(self.path)
+            return 0
+
+        master_context = _load_json(master_path)
+        changed_bool = _load_json(bool_path)
+        applied = 0
+        for record in records:
+            stable_id = record["stable_id"]
+            if repo_root is not None and _file_sha256(repo_root, stable_id) != record["sha256"]:
+                continue
+            master_context[stable_id] = record["summary"]
             changed_bool[stable_id] = 0
-            
-            # Save immediately to prevent data loss on subsequent crashes
-            _save_json(master_path, master_context)
-            _save_json(bool_path, changed_bool)
-            
-            print("  -> Success.", flush=True)
-            
-            # Respect rate limits
-            if i < total:
-                time.sleep(args.delay)
+            applied += 1
 
-        except Exception as e:
-            print(f"  -> API Request Failed: {e}", flush=True)
-            print("  -> Leaving flag as 1 to retry on next run.", flush=True)
-            # Do not exit immediately, attempt the next file or allow user to ctrl+c
+        _save_json(master_path, master_context)
+        _save_json(bool_path, changed_bool)
+        os.remove(self.path)
+        return applied
+
+
+def _file_path(repo_root: str, stable_id: str) -> str:
+    # stable_id format is "file:src/path/to/file.py"
+    return os.path.join(repo_root, stable_id.replace("file:", "", 1))
+
+def _file_sha256(repo_root: str, stable_id: str) -> Optional[str]:
+    try:
+        with open(_file_path(repo_root, stable_id), "rb") as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    except OSError:
+        return None
+
+def compress_file(
+    client: Any,
+    model: str,
+    config: Any,
+    repo_root: str,
+    stable_id: str,
+    limiter: RateLimiter,
+    retries: int
+) -> Dict[str, Any]:
+    """Summarizes one file (run on a worker thread); returns its journal record."""
+    with open(_file_path(repo_root, stable_id), "rb") as f:
+        raw = f.read()
+    code_content = raw.decode("utf-8")
+    rel_path = stable_id.replace("file:", "", 1)
+    user_prompt = f"Please compress the following file:\n\nFile Path: {rel_path}\n\n```\n{code_content}\n```"
+    tokens = _estimate_tokens(user_prompt)
+
+    def request():
+        # Every attempt, retries included, is paid for against the limits
+        limiter.acquire(tokens)
+        return client.models.generate_content(model=model, contents=user_prompt, config=config)
+
+    response = call_with_retries(request, retries=retries)
+    return {
+        "stable_id": stable_id,
+        "sha256": hashlib.sha256(raw).hexdigest(),
+        "summary": response.text.strip(),
+    }
+
+def run_compression(
+    client: Any,
+    model: str,
+    config: Any,
+    repo_root: str,
+    state_dir: str,
+    workers: int = 8,
+    limiter: Optional[RateLimiter] = None,
+    retries: int = 4
+) -> Dict[str, int]:
+    """
+    Compresses every file flagged 1 in file_changed_bool.json on a pool of
+    `workers` threads. Failed files keep their flag for the next run.
+    """
+    bool_path = os.path.join(state_dir, "file_changed_bool.json")
+    master_path = os.path.join(state_dir, "master_compressed_context.json")
+    journal = CompressionJournal(state_dir)
+    limiter = limiter or RateLimiter()
+
+    recovered = journal.compact(master_path, bool_path, repo_root=repo_root)
+    if recovered:
+        print(f"Recovered {recovered} summaries from an interrupted run.", flush=True)
+
+    changed_bool = _load_json(bool_path)
+    pending_files = [k for k, v in changed_bool.items() if v == 1]
+    total = len(pending_files)
+    stats = {"total": total, "succeeded": 0, "failed": 0, "recovered": recovered}
+
+    if total == 0:
+        print("No files pending compression.", flush=True)
+        return stats
+
+    print(f"Found {total} files pending compression ({workers} workers).", flush=True)
+
+    pool = ThreadPoolExecutor(max_workers=max(1, workers))
+    futures = {}
+    handled = set()
+    try:
+        for stable_id in pending_files:
+            if not os.path.exists(_file_path(repo_root, stable_id)):
+                print(f"  -> Warning: File not found on disk: {_file_path(repo_root, stable_id)}. Skipping.", flush=True)
+                stats["failed"] += 1
+                continue
+            future = pool.submit(compress_file, client, model, config, repo_root, stable_id, limiter, retries)
+            futures[future] = stable_id
+
+        # Results are journaled on this thread as they complete
+        # (the flush=True is CRITICAL so the GUI reads progress instantly)
+        for done, future in enumerate(as_completed(futures), 1):
+            stable_id = futures[future]
+            handled.add(future)
+            try:
+                journal.append(future.result())
+                stats["succeeded"] += 1
+                print(f"[{done}/{len(futures)}] {stable_id} -> Success.", flush=True)
+            except Exception as e:
+                stats["failed"] += 1
+                print(f"[{done}/{len(futures)}] {stable_id} -> Failed: {e}", flush=True)
+                print("  -> Leaving flag as 1 to retry on next run.", flush=True)
+    finally:
+        # On Ctrl+C queued files are dropped. Requests already in flight are
+        # waited for and, being paid for, journaled with everything else.
+        pool.shutdown(wait=True, cancel_futures=True)
+        for future in futures:
+            if future not in handled and not future.cancelled() and future.exception() is None:
+                journal.append(future.result())
+                stats["succeeded"] += 1
+        journal.compact(master_path, bool_path)
+
+    return stats
+
+def _requests_per_minute(rpm: Optional[float], delay: Optional[float]) -> float:
+    """--rpm wins; the deprecated --delay maps to 60 / delay, with 0 meaning unlimited as for --rpm."""
+    if rpm is not None:
+        return rpm
+    if delay is None:
+        return 60.0
+    return 60.0 / delay if delay > 0 else 0
+
+def main():
+    parser = argparse.ArgumentParser(description="LLM Context Compressor Orchestrator")
+    parser.add_argument("--repo-root", required=True, help="Path to the repository root")
+    parser.add_argument("--state-dir", required=True, help="Directory containing state JSON files")
+    parser.add_argument("--model", default="gemini-3.1-pro-preview", help="Gemini model to use")
+    parser.add_argument("--workers", type=int, default=8, help="Concurrent API requests")
+    parser.add_argument("--rpm", type=float, default=None, help="Requests per minute across all workers (default: 60, 0 = unlimited)")
+    parser.add_argument("--tpm", type=float, default=1_000_000, help="Estimated tokens per minute across all workers (0 = unlimited)")
+    parser.add_argument("--retries", type=int, default=4, help="Retries per file on rate limits and server errors")
+    parser.add_argument("--delay", type=float, default=None, help="Deprecated: use --rpm (sets it to 60 / delay, 0 = unlimited)")
+    args = parser.parse_args()
+
+    try:
+        from dotenv import load_dotenv
+    except ImportError:
+        print("Error: 'python-dotenv' is not installed.", flush=True)
+        print("Please run: pip install python-dotenv", flush=True)
+        sys.exit(1)
+
+    try:
+        from google import genai
+        from google.genai import types
+    except ImportError:
+        print("Error: 'google-genai' is not installed.", flush=True)
+        print("Please run: pip install google-genai", flush=True)
+        sys.exit(1)
+
+    # Load environment variables from .env file
+    load_dotenv(os.path.join(args.repo_root, ".env"))
+
+    api_key = os.environ.get("GEMINI_API_KEY")
+    if not api_key:
+        print("Error: GEMINI_API_KEY environment variable is not set in your .env file.", flush=True)
+        sys.exit(1)
+
+    rpm = _requests_per_minute(args.rpm, args.delay)
+
+    # Initialize the new SDK client
+    client = genai.Client(api_key=api_key)
+    config = types.GenerateContentConfig(system_instruction=SYSTEM_PROMPT)
 
+    run_compression(
+        client,
+        args.model,
+        config,
+        args.repo_root,
+        args.state_dir,
+        workers=args.workers,
+        limiter=RateLimiter(rpm, args.tpm),
+        retries=args.retries
+    )
     print("Compression sync complete.", flush=True)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
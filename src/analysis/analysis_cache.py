@@ -0,0 +1,193 @@
+import os
+import json
+import sqlite3
+import time
+from typing import Dict, List, Optional, Tuple, Any
+
+
+class AnalysisCache:
+    """
+    Content-addressed store of import/symbol analysis results.
+    Keyed by (sha256, language, analyzer version), so identical file contents are
+    parsed once no matter which snapshot, repo or process encounters them.
+
+    Backed by SQLite under `{output_root}/.cache/analysis.sqlite`. Lookups are
+    read-only and safe from pool workers; writes are buffered and flushed by the
+    owning process in a single transaction, followed by LRU eviction down to
+    `max_bytes`.
+    """
+
+    CACHE_DIRNAME = ".cache"
+    CACHE_FILENAME = "analysis.sqlite"
+
+    # Bump whenever ImportScanner output changes for the same input bytes
+    ANALYZER_VERSION = "1"
+
+    DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+    # Approximate per-row overhead (key, index entry, page slack) used for eviction accounting
+    _ROW_OVERHEAD = 128
+
+    _SCHEMA = """
+        CREATE TABLE IF NOT EXISTS analysis (
+            sha256 TEXT NOT NULL,
+            language TEXT NOT NULL,
+            analyzer_version TEXT NOT NULL,
+            imports TEXT NOT NULL,
+            symbols TEXT NOT NULL,
+            size_bytes INTEGER NOT NULL,
+            last_used REAL NOT NULL,
+            PRIMARY KEY (sha256, language, analyzer_version)
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS analysis_last_used ON analysis (last_used);
+    """
+
+    # Read-only connections keyed by (pid, path): reused across lookups within a
+    # process, never shared across a fork
+    _readers: Dict[Tuple[int, str], sqlite3.Connection] = {}
+
+    def __init__(self, output_root: str, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.path = self.path_for(output_root)
+        self.max_bytes = max_bytes
+        self._pending: Dict[Tuple[str, str], Dict[str, List[str]]] = {}
+        self._touched: Dict[Tuple[str, str], None] = {}
+
+    @staticmethod
+    def path_for(output_root: str) -> str:
+        return os.path.join(output_root, AnalysisCache.CACHE_DIRNAME, AnalysisCache.CACHE_FILENAME)
+
+    @staticmethod
+    def _reader(path: str) -> Optional[sqlite3.Connection]:
+        key = (os.getpid(), path)
+        conn = AnalysisCache._readers.get(key)
+        if conn is None:
+            # Not memoized on failure: the store may be created by a later flush()
+            if not os.path.isfile(path):
+                return None
+            try:
+                conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True, timeout=5.0)
+            except sqlite3.Error:
+                return None
+            AnalysisCache._readers[key] = conn
+        return conn
+
+    @staticmethod
+    def reset_readers() -> None:
+        """Closes cached read-only connections (e.g. after the store was rewritten)."""
+        for (pid, _), conn in AnalysisCache._readers.items():
+            if pid == os.getpid():
+                conn.close()
+        AnalysisCache._readers.clear()
+
+    @staticmethod
+    def lookup(path: str, sha256: str, language: str) -> Optional[Dict[str, List[str]]]:
+        """
+        Read-only lookup usable from any process. Returns {"imports", "symbols"}
+        or None on a miss. A missing, locked or corrupt store is treated as a miss.
+        """
+        conn = AnalysisCache._reader(path)
+        if conn is None:
+            return None
+        try:
+            row = conn.execute(
+                "SELECT imports, symbols FROM analysis "
+                "WHERE sha256 = ? AND language = ? AND analyzer_version = ?",
+                (sha256, language, AnalysisCache.ANALYZER_VERSION)
+            ).fetchone()
+        except sqlite3.Error:
+            return None
+        if row is None:
+            return None
+        return {"imports": json.loads(row[0]), "symbols": json.loads(row[1])}
+
+    def record(self, sha256: str, language: str, imports: List[str], symbols: List[str], hit: bool) -> None:
+        """
+        Buffers the outcome of one analysis. Fresh results are inserted on flush();
+        hits only refresh their LRU timestamp.
+        """
+        key = (sha256, language)
+        if hit:
+            self._touched[key] = None
+        else:
+            self._pending[key] = {"imports": imports, "symbols": symbols}
+
+    def flush(self) -> None:
+        """Writes buffered results in one transaction, then evicts least recently used rows."""
+        if not self._pending and not self._touched:
+            return
+
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        now = time.time()
+        try:
+            self._write(now)
+        except sqlite3.Error:
+            # The store is an accelerator only; a locked or corrupt file must not fail the run
+            pass
+
+        self._pending.clear()
+        self._touched.clear()
+
+    def _write(self, now: float) -> None:
+        version = self.ANALYZER_VERSION
+        conn = sqlite3.connect(self.path, timeout=30.0)
+        try:
+            conn.executescript(self._SCHEMA)
+            with conn:
+                rows = []
+                for (sha256, language), result in self._pending.items():
+                    imports = json.dumps(result["imports"], separators=(",", ":"))
+                    symbols = json.dumps(result["symbols"], separators=(",", ":"))
+                    size = len(imports) + len(symbols) + self._ROW_OVERHEAD
+                    rows.append((sha256, language, version, imports, symbols, size, now))
+                conn.executemany(
+                    "INSERT OR REPLACE INTO analysis "
+                    "(sha256, language, analyzer_version, imports, symbols, size_bytes, last_used) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    rows
+                )
+                conn.executemany(
+                    "UPDATE analysis SET last_used = ? "
+                    "WHERE sha256 = ? AND language = ? AND analyzer_version = ?",
+                    [(now, sha256, language, version) for sha256, language in self._touched]
+                )
+                self._evict(conn)
+        finally:
+            conn.close()
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        (total,) = conn.execute("SELECT COALESCE(SUM(size_bytes), 0) FROM analysis").fetchone()
+        excess = total - self.max_bytes
+        if excess <= 0:
+            return
+
+        # Stale analyzer versions go first, then oldest by last use
+        victims = []
+        for sha256, language, version, size in conn.execute(
+            "SELECT sha256, language, analyzer_version, size_bytes FROM analysis "
+            "ORDER BY analyzer_version = ?, last_used",
+            (self.ANALYZER_VERSION,)
+        ):
+            victims.append((sha256, language, version))
+            excess -= size
+            if excess <= 0:
+                break
+
+        conn.executemany(
+            "DELETE FROM analysis WHERE sha256 = ? AND language = ? AND analyzer_version = ?",
+            victims
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        """Row count and accounted size of the on-disk store."""
+        if not os.path.isfile(self.path):
+            return {"entries": 0, "bytes": 0}
+        conn = sqlite3.connect(self.path)
+        try:
+            count, total = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size_bytes), 0) FROM analysis"
+            ).fetchone()
+        except sqlite3.Error:
+            return {"entries": 0, "bytes": 0}
+        finally:
+            conn.close()
+        return {"entries": count, "bytes": total}
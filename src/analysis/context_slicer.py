@@ -1,163 +1,636 @@
-from typing import Dict, Any, Union, Set, List, Optional
-from collections import defaultdict
+from typing import Dict, Any, Union, Set, List, Optional, Callable, Iterable, Tuple, TypeVar
+from collections import deque
+from array import array
+import hashlib
+import heapq
 import logging
+import math
+import threading
 from src.observability.token_telemetry import TokenTelemetry
+from src.snapshot.centrality_file import CentralityFile
+from src.snapshot.compact_snapshot import CompactSnapshot
+from src.snapshot.symbol_index import SymbolIndex
 
 # Configure a module-level logger
 logger = logging.getLogger(__name__)
 
+NodeT = TypeVar("NodeT")
+FocusT = Union[str, List[str]]
+
+# Edge direction is importer -> imported. "upstream" follows imports (what
+# the focus depends on), "downstream" follows importers (what depends on it).
+DIRECTIONS = ("both", "upstream", "downstream")
+# "bfs" spends the budget in breadth-first order; "weighted" fills it
+# greedily by value per token.
+STRATEGIES = ("bfs", "weighted")
+
 class ContextSlicer:
     """
     Deterministically prunes repository manifests based on graph topology.
     Used to compress LLM context windows by isolating a target file and its
     N-degree upstream/downstream dependencies.
     """
-    
+
+    # Value of a candidate in weighted slices:
+    #   (1 + IN_DEGREE_WEIGHT * in_degree_score + CENTRALITY_WEIGHT * centrality_score) / (1 + distance)
+    # with both scores normalized to [0, 1] over the snapshot. Candidates are
+    # taken in order of value per token.
+    IN_DEGREE_WEIGHT = 1.0
+    CENTRALITY_WEIGHT = 1.0
+
+    @staticmethod
+    def build_index(
+        manifest: Union[Dict, Any],
+        graph: Union[Dict, Any],
+        snapshot_dir: Optional[str] = None
+    ) -> "SliceIndex":
+        """
+        Precomputes the per-snapshot structures slice_manifest() needs (files
+        map, CSR adjacency, token costs, cycle membership, symbol owners).
+        Build once and pass it as `index=` to serve many slices of the same
+        snapshot. With `snapshot_dir`, weighted slices load the snapshot's
+        centrality.bin (and write it on first use).
+        """
+        graph_dict = graph.model_dump() if hasattr(graph, 'model_dump') else graph
+        manifest_dict = manifest.model_dump() if hasattr(manifest, 'model_dump') else manifest
+        return SliceIndex(manifest_dict, graph_dict, snapshot_dir)
+
     @staticmethod
     def slice_manifest(
-        manifest: Union[Dict, Any], 
-        graph: Union[Dict, Any], 
-        focus_id: str, 
+        manifest: Union[Dict, Any],
+        graph: Union[Dict, Any],
+        focus_id: FocusT,
         radius: int = 1,
-        max_tokens: Optional[int] = None
+        max_tokens: Optional[int] = None,
+        index: Optional["SliceIndex"] = None,
+        symbol_index: Optional[SymbolIndex] = None,
+        direction: str = "both",
+        strategy: str = "bfs"
     ) -> Dict[str, Any]:
         """
         Filters a manifest to only include files within `radius` edges of `focus_id`.
-        
+
         Args:
             manifest: The full repository manifest (dict or Pydantic model)
             graph: The dependency graph (dict or Pydantic model)
-            focus_id: The stable_id of the file (or a `symbol:{name}`) to center the slice on
+            focus_id: The stable_id of the file (or a `symbol:{name}`) to center the slice on.
+                      A list of them slices around all of them at once (e.g. every
+                      file in a diff); unresolvable entries are skipped and reported
+                      in telemetry as `unresolved_ids`.
             radius: Distance in hops to include
             max_tokens: Soft limit on context size. If exceeded, expansion stops.
-                        The focus file is always included even if it exceeds the limit.
+                        The focus files are always included even if they exceed the limit.
+            index: Prebuilt ContextSlicer.build_index() result; when given,
+                   `manifest` and `graph` are ignored. File records in the
+                   result are shared with the index and must not be mutated.
+            symbol_index: The snapshot's SymbolIndex (symbols.idx); when given,
+                          `symbol:` foci are resolved through it instead of
+                          the manifest's per-file symbol lists.
+            direction: "both" (default), "upstream" (follow imports: what the
+                       focus depends on) or "downstream" (follow importers:
+                       what depends on the focus).
+            strategy: "bfs" (default) fills the budget in breadth-first order.
+                      "weighted" takes candidates within `radius` greedily by
+                      value per token, where value grows with closeness,
+                      in-degree and PageRank centrality; a large hub near the
+                      focus no longer crowds out several small relevant files.
+                      Without `max_tokens` both select the same files.
         """
+        ContextSlicer._check_mode(direction, strategy)
+
         # 1. Normalize inputs
-        graph_dict = graph.model_dump() if hasattr(graph, 'model_dump') else graph
-        manifest_dict = manifest.model_dump() if hasattr(manifest, 'model_dump') else manifest
+        if index is None:
+            index = ContextSlicer.build_index(manifest, graph)
+        manifest_dict = index.manifest
+        files_map = index.files_map
 
-        files_map = {f["stable_id"]: f for f in manifest_dict.get("files", [])}
-        
-        # 1.5 Semantic Resolution: Resolve symbol to file
-        resolved_focus_id = focus_id
-        if focus_id.startswith("symbol:"):
-            symbol_name = focus_id.split(":", 1)[1]
-            found_file = None
-            for file_entry in manifest_dict.get("files", []):
-                if symbol_name in file_entry.get("symbols", []):
-                    found_file = file_entry["stable_id"]
-                    break
-            
-            if found_file:
-                logger.info(f"Resolved {focus_id} to {found_file}")
-                resolved_focus_id = found_file
-            else:
-                logger.warning(f"Symbol not found in manifest: {focus_id}")
-                # If symbol isn't found, we can't slice. Return empty.
-                sliced_manifest = manifest_dict.copy()
-                sliced_manifest["files"] = []
-                sliced_manifest["stats"] = sliced_manifest.get("stats", {}).copy()
-                sliced_manifest["stats"]["file_count"] = 0
-                sliced_manifest["stats"]["estimated_tokens"] = 0
-                sliced_manifest["stats"]["cycles_included"] = 0
-                return sliced_manifest
-        
-        # Ensure focus file exists in manifest, otherwise we can't slice
-        if resolved_focus_id not in files_map:
-            logger.warning(f"Focus ID not found in manifest graph: {resolved_focus_id}")
-            sliced_manifest = manifest_dict.copy()
-            sliced_manifest["files"] = []
-            sliced_manifest["stats"] = sliced_manifest.get("stats", {}).copy()
-            sliced_manifest["stats"]["file_count"] = 0
-            sliced_manifest["stats"]["estimated_tokens"] = 0
-            sliced_manifest["stats"]["cycles_included"] = 0
-            return sliced_manifest
-
-        # 2. Build Adjacency List (Bidirectional)
-        adj = defaultdict(list)
-        for edge in graph_dict.get("edges", []):
-            src = edge["source"]
-            tgt = edge["target"]
-            adj[src].append(tgt)
-            adj[tgt].append(src)
-
-        # 3. BFS with Token Budgeting
-        visited: Set[str] = set()
-        queue = [(resolved_focus_id, 0)]
-        current_tokens = 0
+        # 1.5 Semantic Resolution: Resolve symbols to files
+        def resolve(requested: str) -> Optional[str]:
+            if requested.startswith("symbol:"):
+                symbol_name = requested.split(":", 1)[1]
+                if symbol_index is not None:
+                    return symbol_index.resolve(symbol_name)
+                return index.symbol_owners.get(symbol_name)
+            return requested
 
-        while queue:
-            node_id, dist = queue.pop(0)
-            
-            if node_id in visited:
+        resolved, unresolved = ContextSlicer._resolve_foci(focus_id, resolve, lambda f: f in files_map)
+        if not resolved:
+            return ContextSlicer._empty_slice(manifest_dict)
+
+        # 2. Expansion with Token Budgeting over the index's CSR adjacency
+        offsets, targets = index.adjacency(direction)
+        costs = index.costs
+        foci = [index.node_index[f] for f in resolved]
+
+        def neighbors(node: int):
+            return targets[offsets[node]:offsets[node + 1]]
+
+        if strategy == "weighted":
+            visited, current_tokens = ContextSlicer._weighted(
+                foci, radius, max_tokens, neighbors, costs.__getitem__, index.density.__getitem__
+            )
+        else:
+            visited, current_tokens = ContextSlicer._bfs(
+                foci, radius, max_tokens, neighbors, costs.__getitem__
+            )
+
+        # 3. Filter Files (manifest order)
+        positions = index.positions
+        files = manifest_dict.get("files", [])
+        filtered_files = [files[p] for p in sorted(positions[n] for n in visited if positions[n] >= 0)]
+        cycles_in_slice = index.count_cycles(n for n in visited if positions[n] >= 0)
+
+        return ContextSlicer._build_slice(
+            manifest_dict, filtered_files, cycles_in_slice,
+            current_tokens, focus_id, resolved, unresolved, radius, max_tokens,
+            direction, strategy
+        )
+
+    @staticmethod
+    def slice_compact(
+        snapshot: CompactSnapshot,
+        focus_id: FocusT,
+        radius: int = 1,
+        max_tokens: Optional[int] = None,
+        symbol_index: Optional[SymbolIndex] = None,
+        direction: str = "both"
+    ) -> Dict[str, Any]:
+        """
+        slice_manifest() over a compact snapshot (snapshot.rrc). Produces the
+        same result, but only the focus neighborhood is decoded: file records
+        and adjacency are looked up by index instead of materializing the
+        manifest and graph. Only the "bfs" strategy is available here, since
+        weighted slices need whole-graph centrality (use a SliceIndex).
+        """
+        ContextSlicer._check_mode(direction, "bfs")
+
+        def resolve(requested: str) -> Optional[str]:
+            if not requested.startswith("symbol:"):
+                return requested
+            symbol_name = requested.split(":", 1)[1]
+            if symbol_index is not None:
+                return symbol_index.resolve(symbol_name)
+            symbol_idx = snapshot.string_index(symbol_name)
+            if symbol_idx is not None:
+                for i in range(snapshot.file_count):
+                    if snapshot.file_has_symbol(i, symbol_idx):
+                        return snapshot.file_stable_id(i)
+            return None
+
+        resolved, unresolved = ContextSlicer._resolve_foci(
+            focus_id, resolve, lambda f: snapshot.find_file(f) is not None
+        )
+        if not resolved:
+            return ContextSlicer._empty_slice(snapshot.manifest_header())
+
+        file_indexes: Dict[str, Optional[int]] = {}
+
+        def node_cost(node_id: str) -> Optional[int]:
+            if node_id not in file_indexes:
+                file_indexes[node_id] = snapshot.find_file(node_id)
+            i = file_indexes[node_id]
+            if i is None:
+                return None
+            return TokenTelemetry.estimate_tokens(snapshot.file_size(i), snapshot.file_language(i))
+
+        def neighbors(node_id: str) -> List[str]:
+            node = snapshot.find_node(node_id)
+            if node is None:
+                return []
+            ids = [snapshot.node_id(n) for n in snapshot.neighbors(node, direction)]
+            # Files expand in sorted order, other nodes in edge order (as SliceIndex)
+            return sorted(ids) if node_cost(node_id) is not None else ids
+
+        visited, current_tokens = ContextSlicer._bfs(resolved, radius, max_tokens, neighbors, node_cost)
+
+        # Manifest order is file index order
+        included = [node_id for node_id in visited if file_indexes.get(node_id) is not None]
+        filtered_files = [snapshot.file_entry(i) for i in sorted(file_indexes[node_id] for node_id in included)]
+
+        included_ids = set(included)
+        cycles_in_slice = sum(
+            1 for cycle in snapshot.cycles if any(node_id in included_ids for node_id in cycle)
+        )
+
+        return ContextSlicer._build_slice(
+            snapshot.manifest_header(), filtered_files, cycles_in_slice,
+            current_tokens, focus_id, resolved, unresolved, radius, max_tokens,
+            direction, "bfs"
+        )
+
+    @staticmethod
+    def union_slices(index: "SliceIndex", focus_ids: List[FocusT], slices: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Merges slices of the snapshot behind `index` (`slices[i]` computed
+        for `focus_ids[i]`) into one: the de-duplicated union of their files
+        in manifest order, with tokens and cycles counted over the union.
+        """
+        nodes: Set[int] = set()
+        requested: List[str] = []
+        resolved: List[str] = []
+        unresolved: List[str] = []
+        for focus_id, sliced in zip(focus_ids, slices):
+            requested.extend([focus_id] if isinstance(focus_id, str) else focus_id)
+            nodes.update(index.node_index[f["stable_id"]] for f in sliced["files"])
+            telemetry = sliced.get("telemetry")
+            if telemetry is None:
+                # Empty slice: nothing resolved
+                unresolved.extend([focus_id] if isinstance(focus_id, str) else focus_id)
                 continue
+            value = telemetry["resolved_id"]
+            resolved.extend([value] if isinstance(value, str) else value)
+            unresolved.extend(telemetry.get("unresolved_ids", []))
 
-            # Calculate cost
-            file_entry = files_map.get(node_id)
-            if not file_entry:
-                # Node might be external or missing; skip token counting for it
-                visited.add(node_id)
-                if dist < radius:
-                    for neighbor in adj[node_id]:
-                        if neighbor not in visited:
-                            queue.append((neighbor, dist + 1))
+        files = index.manifest.get("files", [])
+        positions = index.positions
+        filtered_files = [files[p] for p in sorted(positions[n] for n in nodes)]
+        tokens = sum(index.costs[n] for n in nodes)
+        radius = max((s["telemetry"]["radius"] for s in slices if "telemetry" in s), default=0)
+
+        union = ContextSlicer._build_slice(
+            index.manifest, filtered_files, index.count_cycles(nodes), tokens,
+            list(dict.fromkeys(requested)), list(dict.fromkeys(resolved)), list(dict.fromkeys(unresolved)),
+            radius, None
+        )
+        union["telemetry"]["direction"] = None
+        union["telemetry"]["strategy"] = None
+        return union
+
+    @staticmethod
+    def _check_mode(direction: str, strategy: str) -> None:
+        if direction not in DIRECTIONS:
+            raise ValueError(f"Unknown slice direction: {direction} (expected one of {', '.join(DIRECTIONS)})")
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Unknown slice strategy: {strategy} (expected one of {', '.join(STRATEGIES)})")
+
+    @staticmethod
+    def _resolve_foci(
+        focus_id: FocusT,
+        resolve: Callable[[str], Optional[str]],
+        is_file: Callable[[str], bool]
+    ) -> Tuple[List[str], List[str]]:
+        """
+        Resolves the requested foci to file stable_ids.
+        Returns (resolved ids, de-duplicated in request order; unresolved requests).
+        """
+        requested = [focus_id] if isinstance(focus_id, str) else list(focus_id)
+        resolved: List[str] = []
+        unresolved: List[str] = []
+        for requested_id in requested:
+            found_file = resolve(requested_id)
+            if not found_file:
+                logger.warning(f"Symbol not found in manifest: {requested_id}")
+                unresolved.append(requested_id)
+                continue
+            if found_file != requested_id:
+                logger.info(f"Resolved {requested_id} to {found_file}")
+            # Ensure focus file exists in manifest, otherwise we can't slice
+            if not is_file(found_file):
+                logger.warning(f"Focus ID not found in manifest graph: {found_file}")
+                unresolved.append(requested_id)
                 continue
+            if found_file not in resolved:
+                resolved.append(found_file)
+        return resolved, unresolved
 
-            # NEW: Language-aware token estimation
-            node_cost = TokenTelemetry.estimate_tokens(
-                file_entry.get("size_bytes", 0), 
-                file_entry.get("language", "unknown")
-            )
+    @staticmethod
+    def _bfs(
+        foci: List[NodeT],
+        radius: int,
+        max_tokens: Optional[int],
+        neighbors: Callable[[NodeT], Iterable[NodeT]],
+        node_cost: Callable[[NodeT], Optional[int]]
+    ) -> Tuple[Set[NodeT], int]:
+        """
+        Breadth-first expansion from every focus at once with token budgeting,
+        O(V + E). `neighbors` yields a node's neighbors in expansion order.
+        `node_cost` returns None for nodes that are not files (external or
+        missing); those are traversed but cost nothing.
+        Returns (visited nodes, tokens used).
+        """
+        focus_set = set(foci)
+        visited: Set[NodeT] = set()
+        # Each node is queued once; re-queuing could never change the outcome
+        # because a node rejected by the budget stays rejected (spend only grows).
+        discovered: Set[NodeT] = set(focus_set)
+        queue = deque((focus, 0) for focus in dict.fromkeys(foci))
+        current_tokens = 0
 
-            # Budget Check
-            # Always include the resolved_focus_id regardless of size
-            if max_tokens is not None:
-                if current_tokens + node_cost > max_tokens and node_id != resolved_focus_id:
-                    # Budget exhausted, stop this branch
-                    continue
+        while queue:
+            node, dist = queue.popleft()
 
-            # Commit to slice
-            visited.add(node_id)
-            current_tokens += node_cost
+            # Calculate cost
+            cost = node_cost(node)
+            if cost is not None:
+                # Budget Check
+                # Always include the foci regardless of size
+                if max_tokens is not None:
+                    if current_tokens + cost > max_tokens and node not in focus_set:
+                        # Budget exhausted, stop this branch
+                        continue
+                current_tokens += cost
+
+            # Commit to slice (external/missing nodes are traversed for free)
+            visited.add(node)
 
             # Expand
             if dist < radius:
-                # Sort neighbors for deterministic queueing
-                neighbors = sorted(adj[node_id])
-                for neighbor in neighbors:
-                    if neighbor not in visited:
+                for neighbor in neighbors(node):
+                    if neighbor not in discovered:
+                        discovered.add(neighbor)
                         queue.append((neighbor, dist + 1))
 
-        # 4. Filter Files
-        filtered_files = [
-            f for f in manifest_dict.get("files", []) 
-            if f["stable_id"] in visited
-        ]
-
-        # 5. Cycle Detection Stats
-        included_ids = set(f["stable_id"] for f in filtered_files)
-        cycles_in_slice = 0
-        
-        all_cycles = graph_dict.get("cycles", [])
-        for cycle in all_cycles:
-            if any(node_id in included_ids for node_id in cycle):
-                cycles_in_slice += 1
-
-        # 6. Construct Pruned Manifest
+        return visited, current_tokens
+
+    @staticmethod
+    def _weighted(
+        foci: List[NodeT],
+        radius: int,
+        max_tokens: Optional[int],
+        neighbors: Callable[[NodeT], Iterable[NodeT]],
+        node_cost: Callable[[NodeT], Optional[int]],
+        node_density: Callable[[NodeT], float]
+    ) -> Tuple[Set[NodeT], int]:
+        """
+        Greedy knapsack fill: the foci are always taken, then candidates
+        within `radius` of the current slice are taken best value-per-token
+        first (ties: closer, then lower node). `node_density` is a node's
+        value per token at distance 0; at distance d it is divided by 1 + d.
+        A file that does not fit the remaining budget is dropped and not
+        expanded, as in _bfs. Non-file nodes are traversed for free.
+        Returns (visited nodes, tokens used).
+        """
+        visited: Set[NodeT] = set()
+        best_dist: Dict[NodeT, int] = {}
+        heap: List[Tuple[float, int, NodeT]] = []
+        budget = math.inf if max_tokens is None else max_tokens
+        current_tokens = 0
+
+        def expand(node: NodeT, dist: int) -> None:
+            next_dist = dist + 1
+            remaining = budget - current_tokens
+            for neighbor in neighbors(node):
+                if best_dist.get(neighbor, next_dist + 1) <= next_dist:
+                    continue
+                cost = node_cost(neighbor)
+                if cost is not None and cost > remaining:
+                    # Spend only grows, so this file can never fit
+                    continue
+                best_dist[neighbor] = next_dist
+                heapq.heappush(heap, (-node_density(neighbor) / (1 + next_dist), next_dist, neighbor))
+
+        foci = list(dict.fromkeys(foci))
+        for focus in foci:
+            best_dist[focus] = 0
+            visited.add(focus)
+            current_tokens += node_cost(focus) or 0
+        if radius > 0:
+            for focus in foci:
+                expand(focus, 0)
+
+        while heap:
+            _, dist, node = heapq.heappop(heap)
+            if dist != best_dist[node]:
+                continue  # superseded by a shorter path
+
+            if node not in visited:
+                cost = node_cost(node)
+                if cost is not None:
+                    if current_tokens + cost > budget:
+                        continue
+                    current_tokens += cost
+                visited.add(node)
+
+            # (Re-)expand; an already taken node found closer reaches further
+            if dist < radius:
+                expand(node, dist)
+
+        return visited, current_tokens
+
+    @staticmethod
+    def _empty_slice(manifest_dict: Dict[str, Any]) -> Dict[str, Any]:
+        sliced_manifest = manifest_dict.copy()
+        sliced_manifest["files"] = []
+        sliced_manifest["stats"] = sliced_manifest.get("stats", {}).copy()
+        sliced_manifest["stats"]["file_count"] = 0
+        sliced_manifest["stats"]["estimated_tokens"] = 0
+        sliced_manifest["stats"]["cycles_included"] = 0
+        return sliced_manifest
+
+    @staticmethod
+    def _build_slice(
+        manifest_dict: Dict[str, Any],
+        filtered_files: List[Dict[str, Any]],
+        cycles_in_slice: int,
+        current_tokens: int,
+        focus_id: FocusT,
+        resolved: List[str],
+        unresolved: List[str],
+        radius: int,
+        max_tokens: Optional[int],
+        direction: str = "both",
+        strategy: str = "bfs"
+    ) -> Dict[str, Any]:
+        # Construct Pruned Manifest
         sliced_manifest = manifest_dict.copy()
         sliced_manifest["files"] = filtered_files
-        
+
         sliced_manifest["stats"] = sliced_manifest.get("stats", {}).copy()
         sliced_manifest["stats"]["file_count"] = len(filtered_files)
         sliced_manifest["stats"]["estimated_tokens"] = current_tokens
         sliced_manifest["stats"]["cycles_included"] = cycles_in_slice
-        
+
         sliced_manifest["telemetry"] = {
             "focus_id": focus_id, # Original requested focus
-            "resolved_id": resolved_focus_id, # What we actually centered on
+            "resolved_id": resolved[0] if isinstance(focus_id, str) else resolved, # What we actually centered on
             "radius": radius,
+            "direction": direction,
+            "strategy": strategy,
             "max_tokens": max_tokens,
             "budget_used_pct": (current_tokens / max_tokens * 100) if max_tokens else 0
         }
+        if not isinstance(focus_id, str):
+            sliced_manifest["telemetry"]["unresolved_ids"] = unresolved
+
+        return sliced_manifest
+
+
+class SliceIndex:
+    """
+    Lookup structures for slicing one snapshot, built once by
+    ContextSlicer.build_index() and read-only afterwards (safe to share
+    between threads).
+
+    Graph nodes get integer ids in sorted stable_id order, so sorting ids
+    sorts names. Adjacency is CSR (`offsets`/`targets`), bidirectional and
+    de-duplicated: a file's neighbors are stored sorted, any other node's in
+    edge order, which is the order the slicer expands them in. Directed
+    copies (imports / importers) follow the same rule.
+    """
+
+    PAGERANK_DAMPING = 0.85
+    PAGERANK_ITERATIONS = 20
+
+    def __init__(self, manifest_dict: Dict[str, Any], graph_dict: Dict[str, Any], snapshot_dir: Optional[str] = None):
+        files = manifest_dict.get("files", [])
+        edges = graph_dict.get("edges", [])
+        self.manifest = manifest_dict
+        self.files_map: Dict[str, Dict[str, Any]] = {f["stable_id"]: f for f in files}
+
+        # First file (manifest order) defining each symbol, as the linear scan found it
+        self.symbol_owners: Dict[str, str] = {}
+        for file_entry in files:
+            for symbol in file_entry.get("symbols", []):
+                self.symbol_owners.setdefault(symbol, file_entry["stable_id"])
+
+        names = set(self.files_map)
+        for edge in edges:
+            names.add(edge["source"])
+            names.add(edge["target"])
+        self.node_ids: List[str] = sorted(names)
+        self.node_index: Dict[str, int] = {node_id: i for i, node_id in enumerate(self.node_ids)}
+        node_index = self.node_index
+
+        # Per node: manifest position (-1 if not a file) and token cost (None if not a file)
+        self.positions: List[int] = [-1] * len(self.node_ids)
+        self.costs: List[Optional[int]] = [None] * len(self.node_ids)
+        for position, file_entry in enumerate(files):
+            node = node_index[file_entry["stable_id"]]
+            self.positions[node] = position
+            self.costs[node] = TokenTelemetry.estimate_tokens(
+                file_entry.get("size_bytes", 0),
+                file_entry.get("language", "unknown")
+            )
+
+        neighbor_lists: List[List[int]] = [[] for _ in self.node_ids]
+        import_lists: List[List[int]] = [[] for _ in self.node_ids]
+        importer_lists: List[List[int]] = [[] for _ in self.node_ids]
+        for edge in edges:
+            src = node_index[edge["source"]]
+            tgt = node_index[edge["target"]]
+            neighbor_lists[src].append(tgt)
+            neighbor_lists[tgt].append(src)
+            import_lists[src].append(tgt)
+            importer_lists[tgt].append(src)
+
+        self.offsets, self.targets = self._csr(neighbor_lists)
+        self.out_offsets, self.out_targets = self._csr(import_lists)
+        self.in_offsets, self.in_targets = self._csr(importer_lists)
+        in_offsets = self.in_offsets
+        self.in_degree: List[int] = [in_offsets[n + 1] - in_offsets[n] for n in range(len(self.node_ids))]
+        self._max_in_degree_log = math.log1p(max(self.in_degree, default=0))
+        self._snapshot_dir = snapshot_dir
+        self._centrality: Optional[List[float]] = None
+        self._density: Optional[List[float]] = None
+        self._weights_lock = threading.Lock()
+
+        self.cycles: List[List[str]] = graph_dict.get("cycles", [])
+        self.node_cycles: Dict[int, List[int]] = {}
+        for cycle_number, cycle in enumerate(self.cycles):
+            for node_id in set(cycle):
+                node = node_index.get(node_id)
+                if node is not None:
+                    self.node_cycles.setdefault(node, []).append(cycle_number)
+
+    def _csr(self, lists: List[List[int]]) -> Tuple[array, array]:
+        offsets = array("I", [0])
+        targets = array("I")
+        for node, neighbor_list in enumerate(lists):
+            unique = list(dict.fromkeys(neighbor_list))
+            if self.positions[node] >= 0:
+                unique.sort()
+            targets.extend(unique)
+            offsets.append(len(targets))
+        return offsets, targets
+
+    def adjacency(self, direction: str = "both") -> Tuple[array, array]:
+        """(offsets, targets) CSR arrays for a slice direction."""
+        if direction == "upstream":
+            return self.out_offsets, self.out_targets
+        if direction == "downstream":
+            return self.in_offsets, self.in_targets
+        return self.offsets, self.targets
+
+    @property
+    def centrality(self) -> List[float]:
+        """
+        PageRank over import edges, scaled so the top node scores 1.0.
+        Computed on first use (weighted slices only) and kept; with a
+        snapshot dir, read from (or saved to) its centrality.bin.
+        """
+        if self._centrality is None:
+            with self._weights_lock:
+                if self._centrality is None:
+                    self._centrality = self._load_or_compute_centrality()
+        return self._centrality
+
+    def _load_or_compute_centrality(self) -> List[float]:
+        if self._snapshot_dir is None:
+            return self._pagerank()
+        params = (self.PAGERANK_DAMPING, self.PAGERANK_ITERATIONS)
+        digest = self._graph_digest()
+        ranks = CentralityFile.load(self._snapshot_dir, len(self.node_ids), digest, *params)
+        if ranks is None:
+            ranks = self._pagerank()
+            try:
+                CentralityFile.write(self._snapshot_dir, digest, ranks, *params)
+            except OSError:
+                # Read-only snapshot dir: recompute next time
+                pass
+        return ranks
+
+    @property
+    def density(self) -> List[float]:
+        """Per node: node_value() at distance 0 per token (non-files count as one token)."""
+        if self._density is None:
+            density = [
+                self.node_value(node, 0) / max(cost or 1, 1) for node, cost in enumerate(self.costs)
+            ]
+            with self._weights_lock:
+                self._density = density
+        return self._density
+
+    def _graph_digest(self) -> str:
+        """sha256 of the node ids and import adjacency PageRank is computed from."""
+        digest = hashlib.sha256("\n".join(self.node_ids).encode("utf-8"))
+        digest.update(self.out_offsets.tobytes())
+        digest.update(self.out_targets.tobytes())
+        return digest.hexdigest()
+
+    def _pagerank(self) -> List[float]:
+        n = len(self.node_ids)
+        if n == 0:
+            return []
+        damping = self.PAGERANK_DAMPING
+        out_offsets, in_offsets, in_targets = self.out_offsets, self.in_offsets, self.in_targets
+        out_degree = [out_offsets[u + 1] - out_offsets[u] for u in range(n)]
+        dangling = [u for u in range(n) if out_degree[u] == 0]
+        ranks = [1.0 / n] * n
+        for _ in range(self.PAGERANK_ITERATIONS):
+            share = [ranks[u] / out_degree[u] if out_degree[u] else 0.0 for u in range(n)]
+            base = (1.0 - damping) / n + damping * sum(ranks[u] for u in dangling) / n
+            ranks = [
+                base + damping * sum(map(share.__getitem__, in_targets[in_offsets[v]:in_offsets[v + 1]]))
+                for v in range(n)
+            ]
+        top = max(ranks)
+        return [r / top for r in ranks]
+
+    def node_value(self, node: int, dist: int) -> float:
+        """Relevance of `node` at `dist` hops from the foci, for weighted slices."""
+        in_degree_score = (
+            math.log1p(self.in_degree[node]) / self._max_in_degree_log if self._max_in_degree_log else 0.0
+        )
+        score = (
+            1.0
+            + ContextSlicer.IN_DEGREE_WEIGHT * in_degree_score
+            + ContextSlicer.CENTRALITY_WEIGHT * self.centrality[node]
+        )
+        return score / (1 + dist)
 
-        return sliced_manifest
\ No newline at end of file
+    def count_cycles(self, nodes: Iterable[int]) -> int:
+        """Number of cycles touching at least one of `nodes`."""
+        touched: Set[int] = set()
+        for node in nodes:
+            touched.update(self.node_cycles.get(node, ()))
+        return len(touched)
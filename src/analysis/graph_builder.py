@@ -1,8 +1,25 @@
 import os
-from typing import List, Dict, Set, Optional
+import heapq
+from typing import List, Dict, Set, Optional, Iterable, Tuple
 from src.core.types import FileEntry, GraphStructure, GraphNode, GraphEdge, UnresolvedReference
+from src.analysis.graph_cycles import GraphCycles
 
 class GraphBuilder:
+    def __init__(self, enumerate_cycles: bool = False, max_cycles: int = 1000):
+        """
+        By default `cycles` holds one representative set of cycles per cyclic
+        component. `enumerate_cycles` lists every elementary cycle instead
+        (Johnson), stopping after `max_cycles`.
+        """
+        self.enumerate_cycles = enumerate_cycles
+        self.max_cycles = max_cycles
+
+        # Reverse index for update(): lowercased candidate path -> sources whose
+        # import resolution depends on whether that path exists.
+        self._dependents: Dict[str, Set[str]] = {}
+        self._candidates_by_source: Dict[str, Set[str]] = {}
+        self._indexed_graph: Optional[GraphStructure] = None
+
     def build(self, files: List[FileEntry]) -> GraphStructure:
         """
         Constructs a dependency graph from a list of FileEntries.
@@ -24,43 +41,7 @@ class GraphBuilder:
 
         # 2. Iterate and Resolve Imports
         for f in files:
-            source_id = f.stable_id
-            source_path = f.path
-            source_dir = os.path.dirname(source_path)
-            lang = f.language
-
-            for raw_import in f.imports:
-                target_id = self._resolve_import(raw_import, source_dir, lang, path_map)
-                
-                if target_id:
-                    edges.append(GraphEdge(
-                        source=source_id,
-                        target=target_id,
-                        relation="imports"
-                    ))
-                else:
-                    # Fallback to External Resolution
-                    pkg_name = self._resolve_external(raw_import, lang)
-                    if pkg_name:
-                        # Enforce stable ID format: external:package_name (lowercase)
-                        ext_id = f"external:{pkg_name}"
-                        
-                        if ext_id not in external_ids:
-                            external_ids.add(ext_id)
-                            nodes.append(GraphNode(id=ext_id, type="external"))
-                        
-                        edges.append(GraphEdge(
-                            source=source_id,
-                            target=ext_id,
-                            relation="imports"
-                        ))
-                    else:
-                        # Resolution Failed: It's neither a file nor a valid external.
-                        # Likely a broken relative import or file excluded by ignore rules.
-                        unresolved.append(UnresolvedReference(
-                            source=source_id,
-                            import_ref=raw_import
-                        ))
+            self._resolve_file(f, path_map, edges, unresolved, external_ids, nodes)
 
         # 3. Enforce Determinism 
         # Sort nodes and edges before graph analysis to ensure stable cycle detection
@@ -70,17 +51,197 @@ class GraphBuilder:
 
         # 4. Cycle Detection
         adjacency = self._build_adjacency(nodes, edges)
-        cycles = self._detect_cycles(adjacency, nodes)
-        has_cycles = len(cycles) > 0
+        components = GraphCycles.cyclic_components(adjacency, [n.id for n in nodes])
+        cycles, truncated = self._cycles_for(adjacency, components, {})
+        has_cycles = len(components) > 0
 
         return GraphStructure(
             nodes=nodes, 
             edges=edges, 
             cycles=cycles, 
             has_cycles=has_cycles,
+            components=components,
+            cycles_truncated=truncated,
             unresolved_references=unresolved
         )
 
+    def _resolve_file(
+        self,
+        f: FileEntry,
+        path_map: Dict[str, str],
+        edges: List[GraphEdge],
+        unresolved: List[UnresolvedReference],
+        external_ids: Set[str],
+        nodes: Optional[List[GraphNode]] = None
+    ) -> None:
+        """Resolves every import of `f`, appending edges/unresolved refs (and new external nodes)."""
+        source_id = f.stable_id
+        source_path = f.path
+        source_dir = os.path.dirname(source_path)
+        lang = f.language
+
+        for raw_import in f.imports:
+            target_id = self._resolve_import(raw_import, source_dir, lang, path_map)
+            
+            if target_id:
+                edges.append(GraphEdge(
+                    source=source_id,
+                    target=target_id,
+                    relation="imports"
+                ))
+            else:
+                # Fallback to External Resolution
+                pkg_name = self._resolve_external(raw_import, lang)
+                if pkg_name:
+                    # Enforce stable ID format: external:package_name (lowercase)
+                    ext_id = f"external:{pkg_name}"
+                    
+                    if ext_id not in external_ids:
+                        external_ids.add(ext_id)
+                        if nodes is not None:
+                            nodes.append(GraphNode(id=ext_id, type="external"))
+                    
+                    edges.append(GraphEdge(
+                        source=source_id,
+                        target=ext_id,
+                        relation="imports"
+                    ))
+                else:
+                    # Resolution Failed: It's neither a file nor a valid external.
+                    # Likely a broken relative import or file excluded by ignore rules.
+                    unresolved.append(UnresolvedReference(
+                        source=source_id,
+                        import_ref=raw_import
+                    ))
+
+    def update(
+        self,
+        previous: GraphStructure,
+        files: List[FileEntry],
+        added: Iterable[FileEntry] = (),
+        removed: Iterable[FileEntry] = (),
+        modified: Iterable[FileEntry] = ()
+    ) -> GraphStructure:
+        """
+        Patches `previous` (built from the prior file set) for a change set and
+        returns a graph equal to `build(files)`, where `files` is the full
+        current file list.
+
+        Only outgoing edges of added/modified files are recomputed, plus those of
+        files whose imports could resolve differently because a candidate target
+        path appeared or disappeared. Components are recomputed in O(V + E); cycle
+        lists are recomputed only for components whose members or edges changed.
+        """
+        added = list(added)
+        removed = list(removed)
+        modified = list(modified)
+
+        path_map: Dict[str, str] = {f.path.lower(): f.stable_id for f in files}
+        self._sync_index(previous, files, added, removed, modified)
+
+        removed_ids = {f.stable_id for f in removed}
+        affected: Set[str] = {f.stable_id for f in added} | {f.stable_id for f in modified}
+
+        # Imports elsewhere whose resolution may flip
+        for f in added + removed:
+            affected.update(self._dependents.get(f.path.lower(), ()))
+        affected -= removed_ids
+
+        stale = affected | removed_ids
+        kept_edges = [e for e in previous.edges if e.source not in stale]
+        kept_unresolved = [u for u in previous.unresolved_references if u.source not in stale]
+
+        new_edges: List[GraphEdge] = []
+        new_unresolved: List[UnresolvedReference] = []
+        by_id = {f.stable_id: f for f in files}
+        for source_id in sorted(affected):
+            f = by_id.get(source_id)
+            if f is not None:
+                self._resolve_file(f, path_map, new_edges, new_unresolved, set())
+
+        new_edges.sort(key=lambda e: (e.source, e.target, e.relation))
+        new_unresolved.sort(key=lambda u: (u.source, u.import_ref))
+        edges = list(heapq.merge(kept_edges, new_edges, key=lambda e: (e.source, e.target, e.relation)))
+        unresolved = list(heapq.merge(kept_unresolved, new_unresolved, key=lambda u: (u.source, u.import_ref)))
+
+        external_ids = {e.target for e in edges if e.target.startswith("external:")}
+        nodes = [GraphNode(id=f.stable_id, type="file") for f in files]
+        nodes.extend(GraphNode(id=ext_id, type="external") for ext_id in external_ids)
+        nodes.sort(key=lambda n: n.id)
+
+        adjacency = self._build_adjacency(nodes, edges)
+        components = GraphCycles.cyclic_components(adjacency, [n.id for n in nodes])
+
+        # Reuse cycles of components that kept the same members and whose members'
+        # outgoing edges were not touched (their internal edges are then unchanged)
+        reusable: Dict[Tuple[str, ...], List[List[str]]] = {}
+        if not previous.cycles_truncated and (previous.components or not previous.has_cycles):
+            component_of = {n: tuple(c) for c in previous.components for n in c}
+            for c in previous.components:
+                if not stale.intersection(c):
+                    reusable[tuple(c)] = []
+            for cycle in previous.cycles:
+                key = component_of.get(cycle[0])
+                if key in reusable:
+                    reusable[key].append(list(cycle))
+
+        cycles, truncated = self._cycles_for(adjacency, components, reusable)
+        if truncated and reusable:
+            # Which cycles survive the cap depends on every component; start over
+            cycles, truncated = self._cycles_for(adjacency, components, {})
+
+        result = GraphStructure(
+            nodes=nodes,
+            edges=edges,
+            cycles=cycles,
+            has_cycles=len(components) > 0,
+            components=components,
+            cycles_truncated=truncated,
+            unresolved_references=unresolved
+        )
+        self._indexed_graph = result
+        return result
+
+    def _sync_index(
+        self,
+        previous: GraphStructure,
+        files: List[FileEntry],
+        added: List[FileEntry],
+        removed: List[FileEntry],
+        modified: List[FileEntry]
+    ) -> None:
+        """
+        Brings the candidate-path reverse index up to date. It is patched in place
+        when `previous` is the graph this builder last produced, and otherwise
+        rebuilt from `files` (unchanged files contribute the same candidates
+        before and after the change).
+        """
+        if previous is not self._indexed_graph:
+            self._dependents = {}
+            self._candidates_by_source = {}
+            for f in files:
+                self._index_source(f)
+            return
+
+        for f in removed + modified:
+            for candidate in self._candidates_by_source.pop(f.stable_id, ()):
+                dependents = self._dependents.get(candidate)
+                if dependents is not None:
+                    dependents.discard(f.stable_id)
+                    if not dependents:
+                        del self._dependents[candidate]
+        for f in added + modified:
+            self._index_source(f)
+
+    def _index_source(self, f: FileEntry) -> None:
+        source_dir = os.path.dirname(f.path)
+        candidates: Set[str] = set()
+        for raw_import in f.imports:
+            candidates.update(self._import_candidates(raw_import, source_dir, f.language))
+        self._candidates_by_source[f.stable_id] = candidates
+        for candidate in candidates:
+            self._dependents.setdefault(candidate, set()).add(f.stable_id)
+
     def _build_adjacency(self, nodes: List[GraphNode], edges: List[GraphEdge]) -> Dict[str, List[str]]:
         adj: Dict[str, List[str]] = {n.id:[] for n in nodes}
         for edge in edges:
@@ -93,66 +254,35 @@ class GraphBuilder:
             
         return adj
 
-    def _detect_cycles(self, adj: Dict[str, List[str]], nodes: List[GraphNode]) -> List[List[str]]:
+    def _cycles_for(
+        self,
+        adj: Dict[str, List[str]],
+        components: List[List[str]],
+        reusable: Dict[Tuple[str, ...], List[List[str]]]
+    ) -> Tuple[List[List[str]], bool]:
         """
-        Detects elementary cycles using DFS.
-        Returns a list of cycles, where each cycle is a list of node IDs.
+        Cycle lists for each cyclic component (reusing precomputed ones where
+        given), merged and sorted. Returns (cycles, truncated).
         """
-        visited: Set[str] = set()
-        visiting: Set[str] = set()
-        stack: List[str] = []
-        cycles: List[List[str]] =[]
-
-        def dfs(node_id: str):
-            visited.add(node_id)
-            visiting.add(node_id)
-            stack.append(node_id)
-
-            if node_id in adj:
-                for neighbor in adj[node_id]:
-                    if neighbor in visiting:
-                        # Cycle found!
-                        # Extract the cycle portion from the current stack
-                        try:
-                            start_index = stack.index(neighbor)
-                            cycle_path = stack[start_index:]
-                            cycles.append(cycle_path)
-                        except ValueError:
-                            pass # Should not happen given logic
-                    elif neighbor not in visited:
-                        dfs(neighbor)
-            
-            stack.pop()
-            visiting.remove(node_id)
-
-        # Iterate through nodes in deterministic order (already sorted in build)
-        for node in nodes:
-            if node.id not in visited:
-                dfs(node.id)
-
-        # Post-process cycles for deterministic output
-        # 1. Normalize rotation (smallest element first)
-        # 2. Sort the list of cycles
-        normalized_cycles =[]
-        for cycle in cycles:
-            # Rotate cycle so the smallest string is first
-            min_idx = cycle.index(min(cycle))
-            rotated = cycle[min_idx:] + cycle[:min_idx]
-            normalized_cycles.append(rotated)
-        
-        # Remove duplicates (possible if reachable from multiple paths)
-        unique_cycles =[]
-        seen_cycles = set()
-        for c in normalized_cycles:
-            c_tuple = tuple(c)
-            if c_tuple not in seen_cycles:
-                seen_cycles.add(c_tuple)
-                unique_cycles.append(c)
+        cycles: List[List[str]] = []
+        truncated = False
+        for component in components:
+            cached = reusable.get(tuple(component))
+            if cached is not None:
+                cycles.extend(cached)
+            elif self.enumerate_cycles:
+                remaining = max(self.max_cycles - len(cycles), 0)
+                found, hit_cap = GraphCycles.elementary_cycles(adj, component, limit=remaining)
+                cycles.extend(found)
+                truncated = truncated or hit_cap
+            else:
+                cycles.extend(GraphCycles.representative_cycles(adj, component))
 
-        # Sort lexicographically
-        unique_cycles.sort()
-
-        return unique_cycles
+        cycles.sort()
+        if self.enumerate_cycles and len(cycles) > self.max_cycles:
+            cycles = cycles[:self.max_cycles]
+            truncated = True
+        return cycles, truncated
 
     def _resolve_import(
         self, 
@@ -199,6 +329,9 @@ class GraphBuilder:
         return None
 
     def _resolve_python(self, import_str: str, source_dir: str, path_map: Dict[str, str]) -> Optional[str]:
+        return self._first_match(self._python_candidates(import_str, source_dir), path_map)
+
+    def _python_candidates(self, import_str: str, source_dir: str) -> List[str]:
         candidates =[]
         
         if import_str.startswith("."):
@@ -229,29 +362,37 @@ class GraphBuilder:
             rel_base = os.path.join(source_dir, base_path).replace("\\", "/")
             candidates.append(f"{rel_base}.py")
             candidates.append(f"{rel_base}/__init__.py")
-        
-        for c in candidates:
-            c_lower = c.lower()
-            if c_lower in path_map:
-                return path_map[c_lower]
-        return None
+
+        return [c.lower() for c in candidates]
 
     def _resolve_js(self, import_str: str, source_dir: str, path_map: Dict[str, str]) -> Optional[str]:
+        return self._first_match(self._js_candidates(import_str, source_dir), path_map)
+
+    def _js_candidates(self, import_str: str, source_dir: str) -> List[str]:
         try:
             joined = os.path.join(source_dir, import_str)
             normalized = os.path.normpath(joined).replace("\\", "/")
         except ValueError:
-            return None
+            return []
 
         extensions =["", ".ts", ".tsx", ".js", ".jsx", ".d.ts", ".json"]
-        for ext in extensions:
-            candidate = f"{normalized}{ext}"
-            if candidate.lower() in path_map:
-                return path_map[candidate.lower()]
-                
+        candidates = [f"{normalized}{ext}" for ext in extensions]
+
         index_extensions = [".ts", ".tsx", ".js", ".jsx"]
-        for ext in index_extensions:
-            candidate = f"{normalized}/index{ext}"
-            if candidate.lower() in path_map:
-                return path_map[candidate.lower()]
+        candidates.extend(f"{normalized}/index{ext}" for ext in index_extensions)
+        return [c.lower() for c in candidates]
+
+    def _import_candidates(self, import_str: str, source_dir: str, language: str) -> List[str]:
+        """Lowercased paths that `import_str` would resolve to, in priority order."""
+        if language == "python":
+            return self._python_candidates(import_str, source_dir)
+        elif language in ("javascript", "typescript"):
+            return self._js_candidates(import_str, source_dir)
+        return []
+
+    @staticmethod
+    def _first_match(candidates: List[str], path_map: Dict[str, str]) -> Optional[str]:
+        for c in candidates:
+            if c in path_map:
+                return path_map[c]
         return None
\ No newline at end of file
@@ -0,0 +1,238 @@
+from collections import defaultdict
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from src.core.types import GraphStructure
+
+
+class GraphCycles:
+    """
+    Cycle analysis for dependency graphs, fully iterative (no recursion limits).
+
+    - strongly_connected_components: Tarjan, O(V + E).
+    - representative_cycles: one back-edge DFS per cyclic component, the default
+      `cycles` report. Each component is analyzed on its own, so results for a
+      component depend only on that component.
+    - elementary_cycles: Johnson's algorithm, enumerating every elementary cycle
+      (opt-in; the count can be exponential, hence the cap).
+    """
+
+    @staticmethod
+    def strongly_connected_components(adj: Dict[str, List[str]], order: Iterable[str]) -> List[List[str]]:
+        """
+        Tarjan's algorithm over `adj` (neighbors outside `adj` are treated as sinks).
+        Returns components in reverse topological order, each as discovered.
+        """
+        index: Dict[str, int] = {}
+        low: Dict[str, int] = {}
+        on_stack: Set[str] = set()
+        stack: List[str] = []
+        components: List[List[str]] = []
+        counter = 0
+
+        for root in order:
+            if root in index:
+                continue
+
+            index[root] = low[root] = counter
+            counter += 1
+            stack.append(root)
+            on_stack.add(root)
+            work = [(root, iter(adj.get(root, ())))]
+
+            while work:
+                node, neighbors = work[-1]
+                descended = False
+                for neighbor in neighbors:
+                    if neighbor not in index:
+                        index[neighbor] = low[neighbor] = counter
+                        counter += 1
+                        stack.append(neighbor)
+                        on_stack.add(neighbor)
+                        work.append((neighbor, iter(adj.get(neighbor, ()))))
+                        descended = True
+                        break
+                    if neighbor in on_stack and index[neighbor] < low[node]:
+                        low[node] = index[neighbor]
+                if descended:
+                    continue
+
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    if low[node] < low[parent]:
+                        low[parent] = low[node]
+
+                if low[node] == index[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == node:
+                            break
+                    components.append(component)
+
+        return components
+
+    @staticmethod
+    def cyclic_components(adj: Dict[str, List[str]], order: Iterable[str]) -> List[List[str]]:
+        """
+        Components that contain at least one cycle (2+ members, or a self-import),
+        each sorted, sorted overall.
+        """
+        cyclic = []
+        for component in GraphCycles.strongly_connected_components(adj, order):
+            if len(component) > 1 or component[0] in adj.get(component[0], ()):
+                cyclic.append(sorted(component))
+        cyclic.sort()
+        return cyclic
+
+    @staticmethod
+    def representative_cycles(adj: Dict[str, List[str]], component: List[str]) -> List[List[str]]:
+        """
+        Back-edge cycles found by a DFS confined to `component` (sorted), starting
+        at its smallest node and following sorted neighbors. Returns normalized cycles.
+        """
+        members = set(component)
+        cycles: List[List[str]] = []
+        visited: Set[str] = set()
+        path: List[str] = []
+        position: Dict[str, int] = {}  # node -> index in path (O(1) cycle extraction)
+
+        for root in component:
+            if root in visited:
+                continue
+            visited.add(root)
+            position[root] = len(path)
+            path.append(root)
+            work = [iter(adj.get(root, ()))]
+
+            while work:
+                descended = False
+                for neighbor in work[-1]:
+                    if neighbor not in members:
+                        continue
+                    if neighbor in position:
+                        cycles.append(path[position[neighbor]:])
+                    elif neighbor not in visited:
+                        visited.add(neighbor)
+                        position[neighbor] = len(path)
+                        path.append(neighbor)
+                        work.append(iter(adj.get(neighbor, ())))
+                        descended = True
+                        break
+                if not descended:
+                    work.pop()
+                    del position[path.pop()]
+
+        return GraphCycles.normalize(cycles)
+
+    @staticmethod
+    def elementary_cycles(adj: Dict[str, List[str]], component: List[str],
+                          limit: Optional[int] = None) -> Tuple[List[List[str]], bool]:
+        """
+        Johnson's algorithm restricted to `component`. Returns (normalized cycles,
+        truncated) where truncated is True if enumeration stopped at `limit`.
+        """
+        found: List[List[str]] = []
+        for cycle in GraphCycles._johnson(adj, component):
+            if limit is not None and len(found) >= limit:
+                return GraphCycles.normalize(found), True
+            found.append(cycle)
+        return GraphCycles.normalize(found), False
+
+    @staticmethod
+    def _johnson(adj: Dict[str, List[str]], component: List[str]) -> Iterator[List[str]]:
+        members = set(component)
+        sub = {v: sorted(set(w for w in adj.get(v, ()) if w in members)) for v in component}
+
+        for v in sorted(component):
+            if v in sub[v]:
+                yield [v]
+
+        # Drop self-loops; they are reported above
+        sub = {v: [w for w in ws if w != v] for v, ws in sub.items()}
+        pending = [c for c in GraphCycles.strongly_connected_components(sub, sorted(sub)) if len(c) > 1]
+
+        while pending:
+            scc = set(pending.pop())
+            scc_adj = {v: [w for w in sub[v] if w in scc] for v in scc}
+            start = min(scc)
+
+            path = [start]
+            blocked = {start}
+            closed: Set[str] = set()
+            blocked_by: Dict[str, Set[str]] = defaultdict(set)
+            stack = [(start, list(reversed(scc_adj[start])))]
+
+            while stack:
+                node, neighbors = stack[-1]
+                if neighbors:
+                    nxt = neighbors.pop()
+                    if nxt == start:
+                        yield list(path)
+                        closed.update(path)
+                    elif nxt not in blocked:
+                        path.append(nxt)
+                        stack.append((nxt, list(reversed(scc_adj[nxt]))))
+                        closed.discard(nxt)
+                        blocked.add(nxt)
+                        continue
+                if not neighbors:
+                    if node in closed:
+                        GraphCycles._unblock(node, blocked, blocked_by)
+                    else:
+                        for neighbor in scc_adj[node]:
+                            blocked_by[neighbor].add(node)
+                    stack.pop()
+                    path.pop()
+
+            scc.discard(start)
+            remaining = {v: [w for w in sub[v] if w in scc] for v in scc}
+            pending.extend(
+                c for c in GraphCycles.strongly_connected_components(remaining, sorted(remaining))
+                if len(c) > 1
+            )
+
+    @staticmethod
+    def _unblock(node: str, blocked: Set[str], blocked_by: Dict[str, Set[str]]) -> None:
+        work = {node}
+        while work:
+            current = work.pop()
+            if current in blocked:
+                blocked.discard(current)
+                work.update(blocked_by[current])
+                blocked_by[current].clear()
+
+    @staticmethod
+    def normalize(cycles: Iterable[List[str]]) -> List[List[str]]:
+        """Rotates each cycle to start at its smallest node, dedupes and sorts."""
+        unique = set()
+        for cycle in cycles:
+            min_idx = cycle.index(min(cycle))
+            unique.add(tuple(cycle[min_idx:] + cycle[:min_idx]))
+        return [list(c) for c in sorted(unique)]
+
+    @staticmethod
+    def cycle_lookup(graph: GraphStructure) -> Tuple[Set[str], Callable[[str, str], bool]]:
+        """
+        Returns (nodes on a cycle, O(1) edge predicate) for exporters.
+        Uses `components` when present; graphs written before schema 1.2 fall
+        back to adjacency within their cycle lists.
+        """
+        if graph.components:
+            component_of = {node: i for i, component in enumerate(graph.components) for node in component}
+
+            def in_same_component(source: str, target: str) -> bool:
+                index = component_of.get(source)
+                return index is not None and component_of.get(target) == index
+
+            return set(component_of), in_same_component
+
+        cycle_edges = {
+            (cycle[i], cycle[(i + 1) % len(cycle)])
+            for cycle in graph.cycles
+            for i in range(len(cycle))
+        }
+        cycle_nodes = {node for cycle in graph.cycles for node in cycle}
+        return cycle_nodes, lambda source, target: (source, target) in cycle_edges
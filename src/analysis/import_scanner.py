@@ -2,7 +2,14 @@ import re
 import ast
 from typing import List, Set, Dict
 
+from src.fingerprint.file_reader import FileReader
+
 class ImportScanner:
+    SUPPORTED_LANGUAGES = ("python", "javascript", "typescript")
+
+    # Limit read to 250K characters to prevent OOM on massive bundles
+    MAX_SCAN_CHARS = 250_000
+
     # --- JavaScript / TypeScript Patterns (Regex) ---
     
     # Imports 
@@ -38,16 +45,31 @@ class ImportScanner:
         Scans a file for import statements and defined symbols based on language.
         Returns a dictionary with 'imports' and 'symbols' lists.
         """
-        result = {"imports": [], "symbols": []}
-        
-        if language not in ("python", "javascript", "typescript"):
-            return result
+        if language not in ImportScanner.SUPPORTED_LANGUAGES:
+            return {"imports": [], "symbols": []}
 
         try:
-            with open(path, 'r', encoding='utf-8-sig', errors='ignore') as f:
-                # Limit read to 250KB to prevent OOM on massive bundles
-                content = f.read(250_000)
+            with FileReader.read(path) as content:
+                text = ImportScanner.decode(content)
         except OSError:
+            return {"imports": [], "symbols": []}
+
+        return ImportScanner.scan_text(text, language)
+
+    @staticmethod
+    def decode(content) -> str:
+        """Decodes a FileContent exactly as the scanner expects its input text."""
+        return content.text(encoding="utf-8-sig", errors="ignore", limit=ImportScanner.MAX_SCAN_CHARS)
+
+    @staticmethod
+    def scan_text(content: str, language: str) -> Dict[str, List[str]]:
+        """
+        Scans already-decoded source text. Used by the single-read pipeline so
+        the file is never reopened after fingerprinting.
+        """
+        result = {"imports": [], "symbols": []}
+        
+        if language not in ImportScanner.SUPPORTED_LANGUAGES:
             return result
 
         imports: Set[str] = set()
@@ -1,93 +1,572 @@
-from typing import Dict, Tuple, Set, Optional
+import os
+import json
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple, Union
+
 from src.core.types import Manifest, GraphStructure, SnapshotDiffReport, FileDiff, EdgeDiff
+from src.snapshot.compact_snapshot import CompactSnapshot
+from src.snapshot.snapshot_tree import SnapshotTree
+
+Diff = Union[FileDiff, EdgeDiff]
+EdgeTuple = Tuple[str, str, str]
+# stable_id -> manifest entry dict (or None), for near-rename scoring
+EntryLookup = Callable[[str], Optional[Dict[str, Any]]]
+# sha256 of empty content: empty files are never paired as exact renames (as in git)
+EMPTY_SHA256 = "e3b0c44298fc1c149afbf4c8996fb92427ae41e4649b934ca495991b7852b855"
+
+
+class DiffStream:
+    """
+    A snapshot diff as it is computed: iterating yields every FileDiff, then
+    every EdgeDiff, without building a report, and keeps running counts.
+
+    Order is deterministic but not the report's (status, id) order: file
+    diffs follow stable_id order within what the comparator walks (per
+    module for Merkle trees), edge diffs (source, target, relation) order.
+    With rename detection, an exact rename whose two files share a file
+    name is yielded as soon as both are seen. Other added and removed files
+    are held until all files are compared (memory grows with them;
+    detect_renames=False streams them at once), then come the remaining
+    exact renames, near-renames, removed and added files.
+    A stream can be consumed once. Resources passed in (e.g. compact
+    snapshot handles) are closed when it is exhausted or closed.
+    """
+
+    COUNT_KEYS = (
+        "files_added", "files_removed", "files_modified", "files_renamed",
+        "edges_added", "edges_removed"
+    )
+
+    def __init__(
+        self,
+        base_snapshot_id: str,
+        target_snapshot_id: str,
+        diffs: Iterator[Diff],
+        resources: Iterable[Any] = ()
+    ):
+        self.base_snapshot_id = base_snapshot_id
+        self.target_snapshot_id = target_snapshot_id
+        self.counts: Dict[str, int] = {key: 0 for key in self.COUNT_KEYS}
+        self._diffs = diffs
+        self._resources = list(resources)
+
+    def __iter__(self) -> Iterator[Diff]:
+        try:
+            for diff in self._diffs:
+                prefix = "files_" if isinstance(diff, FileDiff) else "edges_"
+                self.counts[prefix + diff.status] += 1
+                yield diff
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        if hasattr(self._diffs, "close"):
+            self._diffs.close()
+        for resource in self._resources:
+            resource.close()
+        self._resources = []
+
+    def __enter__(self) -> "DiffStream":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def ndjson(self) -> Iterator[str]:
+        """
+        Newline-delimited JSON lines: a `header` record with the snapshot
+        ids, one `file` or `edge` record per diff, and a `summary` trailer
+        with the counts.
+        """
+        yield json.dumps({
+            "type": "header",
+            "base_snapshot_id": self.base_snapshot_id,
+            "target_snapshot_id": self.target_snapshot_id,
+        }) + "\n"
+        for diff in self:
+            record = {"type": "file" if isinstance(diff, FileDiff) else "edge"}
+            record.update(diff.model_dump())
+            yield json.dumps(record) + "\n"
+        yield json.dumps(dict({"type": "summary"}, **self.counts)) + "\n"
+
+    def report(self) -> SnapshotDiffReport:
+        """Consumes the stream into a SnapshotDiffReport (diffs sorted by status, then id)."""
+        report = SnapshotDiffReport(
+            base_snapshot_id=self.base_snapshot_id,
+            target_snapshot_id=self.target_snapshot_id
+        )
+        for diff in self:
+            if isinstance(diff, FileDiff):
+                report.file_diffs.append(diff)
+            else:
+                report.edge_diffs.append(diff)
+        for key, value in self.counts.items():
+            setattr(report, key, value)
+
+        # Sort diffs deterministically
+        report.file_diffs.sort(key=lambda x: (x.status, x.stable_id))
+        report.edge_diffs.sort(key=lambda x: (x.status, x.source, x.target))
+        return report
+
 
 class SnapshotComparator:
     """
     Deterministic Diff Engine.
-    Compares two repository snapshots to identify structural drift, 
+    Compares two repository snapshots to identify structural drift,
     file modifications (via SHA256), and dependency edge changes.
+
+    Each compare* method returns a full SnapshotDiffReport; the matching
+    stream* method returns the same diffs as a DiffStream.
+
+    With `detect_renames` (default), a removed and an added file with the
+    same sha256 are reported as one `renamed` diff (preferring the same
+    file name among the unmatched candidates seen so far). `rename_similarity` (0..1] also pairs
+    near-renames: snapshots keep no file contents, so similarity is the
+    Jaccard index of the files' symbols and imports scaled by their size
+    ratio, among files with the same extension.
     """
 
     @staticmethod
     def compare(
-        manifest_a: Manifest, 
-        manifest_b: Manifest, 
-        graph_a: Optional[GraphStructure] = None, 
-        graph_b: Optional[GraphStructure] = None
+        manifest_a: Manifest,
+        manifest_b: Manifest,
+        graph_a: Optional[GraphStructure] = None,
+        graph_b: Optional[GraphStructure] = None,
+        detect_renames: bool = True,
+        rename_similarity: Optional[float] = None
     ) -> SnapshotDiffReport:
-        
-        base_id = manifest_a.snapshot.get("snapshot_id", "unknown_base")
-        target_id = manifest_b.snapshot.get("snapshot_id", "unknown_target")
+        return SnapshotComparator.stream(
+            manifest_a, manifest_b, graph_a, graph_b, detect_renames, rename_similarity
+        ).report()
 
-        report = SnapshotDiffReport(
-            base_snapshot_id=base_id,
-            target_snapshot_id=target_id
+    @staticmethod
+    def stream(
+        manifest_a: Manifest,
+        manifest_b: Manifest,
+        graph_a: Optional[GraphStructure] = None,
+        graph_b: Optional[GraphStructure] = None,
+        detect_renames: bool = True,
+        rename_similarity: Optional[float] = None
+    ) -> DiffStream:
+        SnapshotComparator._check_similarity(rename_similarity)
+
+        def diffs() -> Iterator[Diff]:
+            # 1. Compare Files (Using stable_id and sha256)
+            files_a: Dict[str, str] = {f.stable_id: f.sha256 for f in manifest_a.files}
+            files_b: Dict[str, str] = {f.stable_id: f.sha256 for f in manifest_b.files}
+            yield from SnapshotComparator._file_diffs(files_a, files_b)
+
+            # 2. Compare Graphs (If both exist)
+            if graph_a and graph_b:
+                # Create comparable tuples from edges: (source, target, relation)
+                yield from SnapshotComparator._edge_diffs(
+                    {(e.source, e.target, e.relation) for e in graph_a.edges},
+                    {(e.source, e.target, e.relation) for e in graph_b.edges}
+                )
+
+        def lookup(manifest: Manifest) -> EntryLookup:
+            by_id: Dict[str, Any] = {}
+
+            def entry(stable_id: str) -> Optional[Dict[str, Any]]:
+                if not by_id:
+                    by_id.update((f.stable_id, f) for f in manifest.files)
+                f = by_id.get(stable_id)
+                return f.model_dump() if f is not None else None
+            return entry
+
+        return DiffStream(
+            manifest_a.snapshot.get("snapshot_id", "unknown_base"),
+            manifest_b.snapshot.get("snapshot_id", "unknown_target"),
+            SnapshotComparator._renames(
+                diffs(), detect_renames, rename_similarity, lookup(manifest_a), lookup(manifest_b)
+            )
         )
 
-        # 1. Compare Files (Using stable_id and sha256)
-        files_a: Dict[str, str] = {f.stable_id: f.sha256 for f in manifest_a.files}
-        files_b: Dict[str, str] = {f.stable_id: f.sha256 for f in manifest_b.files}
+    @staticmethod
+    def compare_compact(
+        snapshot_a: CompactSnapshot,
+        snapshot_b: CompactSnapshot,
+        detect_renames: bool = True,
+        rename_similarity: Optional[float] = None
+    ) -> SnapshotDiffReport:
+        """
+        Same report as compare(), computed directly from two compact snapshots:
+        files are merge-joined in stable_id order and compared on raw sha256
+        bytes, so unchanged entries are never decoded beyond their id.
+        """
+        return SnapshotComparator.stream_compact(
+            snapshot_a, snapshot_b, detect_renames=detect_renames, rename_similarity=rename_similarity
+        ).report()
+
+    @staticmethod
+    def stream_compact(
+        snapshot_a: CompactSnapshot,
+        snapshot_b: CompactSnapshot,
+        close_snapshots: bool = False,
+        detect_renames: bool = True,
+        rename_similarity: Optional[float] = None
+    ) -> DiffStream:
+        """DiffStream counterpart of compare_compact(); optionally closes both handles when done."""
+        SnapshotComparator._check_similarity(rename_similarity)
 
-        set_a = set(files_a.keys())
-        set_b = set(files_b.keys())
+        def diffs() -> Iterator[Diff]:
+            # 1. Compare Files (sorted merge on stable_id)
+            iter_a = snapshot_a.files_by_stable_id()
+            iter_b = snapshot_b.files_by_stable_id()
+            item_a = next(iter_a, None)
+            item_b = next(iter_b, None)
+            while item_a is not None or item_b is not None:
+                if item_b is None or (item_a is not None and item_a[0] < item_b[0]):
+                    yield FileDiff(
+                        stable_id=item_a[0],
+                        status="removed",
+                        old_sha256=snapshot_a.file_sha256(item_a[1])
+                    )
+                    item_a = next(iter_a, None)
+                elif item_a is None or item_b[0] < item_a[0]:
+                    yield FileDiff(
+                        stable_id=item_b[0],
+                        status="added",
+                        new_sha256=snapshot_b.file_sha256(item_b[1])
+                    )
+                    item_b = next(iter_b, None)
+                else:
+                    old_sha = snapshot_a.file_sha256_bytes(item_a[1])
+                    new_sha = snapshot_b.file_sha256_bytes(item_b[1])
+                    # An all-zero digest is the placeholder for non-hex sha strings; compare those as text
+                    if old_sha != new_sha or (
+                        not any(old_sha)
+                        and snapshot_a.file_sha256(item_a[1]) != snapshot_b.file_sha256(item_b[1])
+                    ):
+                        yield FileDiff(
+                            stable_id=item_a[0],
+                            status="modified",
+                            old_sha256=snapshot_a.file_sha256(item_a[1]),
+                            new_sha256=snapshot_b.file_sha256(item_b[1])
+                        )
+                    item_a = next(iter_a, None)
+                    item_b = next(iter_b, None)
 
-        # Added Files
-        for added_id in (set_b - set_a):
-            report.file_diffs.append(FileDiff(
-                stable_id=added_id, 
-                status="added", 
-                new_sha256=files_b[added_id]
-            ))
-            report.files_added += 1
-
-        # Removed Files
-        for removed_id in (set_a - set_b):
-            report.file_diffs.append(FileDiff(
-                stable_id=removed_id, 
-                status="removed", 
-                old_sha256=files_a[removed_id]
+            # 2. Compare Graphs (If both exist)
+            if snapshot_a.has_graph and snapshot_b.has_graph:
+                yield from SnapshotComparator._edge_diffs(
+                    set(snapshot_a.iter_edges()), set(snapshot_b.iter_edges())
+                )
+
+        def lookup(snapshot: CompactSnapshot) -> EntryLookup:
+            def entry(stable_id: str) -> Optional[Dict[str, Any]]:
+                i = snapshot.find_file(stable_id)
+                return snapshot.file_entry(i) if i is not None else None
+            return entry
+
+        return DiffStream(
+            snapshot_a.snapshot_id or "unknown_base",
+            snapshot_b.snapshot_id or "unknown_target",
+            SnapshotComparator._renames(
+                diffs(), detect_renames, rename_similarity, lookup(snapshot_a), lookup(snapshot_b)
+            ),
+            resources=(snapshot_a, snapshot_b) if close_snapshots else ()
+        )
+
+    @staticmethod
+    def compare_trees(
+        tree_a: SnapshotTree,
+        tree_b: SnapshotTree,
+        detect_renames: bool = True,
+        rename_similarity: Optional[float] = None
+    ) -> SnapshotDiffReport:
+        """
+        Same report as compare(), computed from the snapshots' Merkle trees:
+        only subtrees whose hashes differ are visited, so identical snapshots
+        compare in O(1) and a one-file change costs O(depth) tree reads plus
+        the two versions of its module.
+        """
+        return SnapshotComparator.stream_trees(tree_a, tree_b, detect_renames, rename_similarity).report()
+
+    @staticmethod
+    def stream_trees(
+        tree_a: SnapshotTree,
+        tree_b: SnapshotTree,
+        detect_renames: bool = True,
+        rename_similarity: Optional[float] = None
+    ) -> DiffStream:
+        """DiffStream counterpart of compare_trees(); file diffs come module by module in path order."""
+        SnapshotComparator._check_similarity(rename_similarity)
+        # Entries of the differing modules: every added or removed file is in one
+        entries_a: Dict[str, Dict[str, Any]] = {}
+        entries_b: Dict[str, Dict[str, Any]] = {}
+
+        def diffs() -> Iterator[Diff]:
+            compare_edges = tree_a.has_graph and tree_b.has_graph
+            # Edges are partitioned by the module of their source file
+            edges_by_module = compare_edges and tree_a.edges_in_modules and tree_b.edges_in_modules
+            edges_a: Set[EdgeTuple] = set()
+            edges_b: Set[EdgeTuple] = set()
+
+            pending = [("", tree_a.root, tree_b.root)]
+            while pending:
+                path, key_a, key_b = pending.pop()
+                if key_a == key_b:
+                    continue
+                node_a = tree_a.tree(key_a)
+                node_b = tree_b.tree(key_b)
+
+                if node_a["module"] != node_b["module"]:
+                    module_a = tree_a.module(path, node_a["module"])
+                    module_b = tree_b.module(path, node_b["module"])
+                    if rename_similarity is not None:
+                        entries_a.update((f["stable_id"], f) for f in module_a["files"])
+                        entries_b.update((f["stable_id"], f) for f in module_b["files"])
+                    yield from SnapshotComparator._file_diffs(
+                        {f["stable_id"]: f["sha256"] for f in module_a["files"]},
+                        {f["stable_id"]: f["sha256"] for f in module_b["files"]}
+                    )
+                    if edges_by_module:
+                        # Only differing modules are collected, and equal edges dropped
+                        old = {(e["source"], e["target"], e["relation"]) for e in module_a["edges"]}
+                        new = {(e["source"], e["target"], e["relation"]) for e in module_b["edges"]}
+                        edges_a |= old - new
+                        edges_b |= new - old
+
+                # Pushed in reverse so subtrees are visited in path order
+                dirs_a, dirs_b = node_a["dirs"], node_b["dirs"]
+                for name in sorted(set(dirs_a) | set(dirs_b), reverse=True):
+                    child = f"{path}/{name}" if path else name
+                    pending.append((child, dirs_a.get(name), dirs_b.get(name)))
+
+            if compare_edges:
+                if not edges_by_module:
+                    edges_a, edges_b = tree_a.edges(), tree_b.edges()
+                yield from SnapshotComparator._edge_diffs(edges_a, edges_b)
+
+        return DiffStream(
+            tree_a.snapshot_id or "unknown_base",
+            tree_b.snapshot_id or "unknown_target",
+            SnapshotComparator._renames(
+                diffs(), detect_renames, rename_similarity, entries_a.get, entries_b.get
+            )
+        )
+
+    @staticmethod
+    def _file_diffs(files_a: Dict[str, str], files_b: Dict[str, str]) -> Iterator[FileDiff]:
+        """Added/removed/modified FileDiffs between two {stable_id: sha256} maps, in stable_id order."""
+        for stable_id in sorted(files_a.keys() | files_b.keys()):
+            old_sha = files_a.get(stable_id)
+            new_sha = files_b.get(stable_id)
+            if old_sha is None:
+                yield FileDiff(stable_id=stable_id, status="added", new_sha256=new_sha)
+            elif new_sha is None:
+                yield FileDiff(stable_id=stable_id, status="removed", old_sha256=old_sha)
+            elif old_sha != new_sha:
+                yield FileDiff(stable_id=stable_id, status="modified", old_sha256=old_sha, new_sha256=new_sha)
+
+    @staticmethod
+    def _edge_diffs(edges_a: Set[EdgeTuple], edges_b: Set[EdgeTuple]) -> Iterator[EdgeDiff]:
+        """Added/removed EdgeDiffs between two edge sets, in (source, target, relation) order."""
+        changed: List[Tuple[EdgeTuple, str]] = [(edge, "added") for edge in edges_b - edges_a]
+        changed.extend((edge, "removed") for edge in edges_a - edges_b)
+        changed.sort()
+        for edge, status in changed:
+            yield EdgeDiff(source=edge[0], target=edge[1], relation=edge[2], status=status)
+
+    # --- Rename detection ---
+
+    @staticmethod
+    def _check_similarity(rename_similarity: Optional[float]) -> None:
+        if rename_similarity is not None and not 0 < rename_similarity <= 1:
+            raise ValueError(f"Rename similarity must be in (0, 1], got {rename_similarity}")
+
+    @staticmethod
+    def _renames(
+        diffs: Iterator[Diff],
+        detect_renames: bool,
+        rename_similarity: Optional[float],
+        lookup_a: EntryLookup,
+        lookup_b: EntryLookup
+    ) -> Iterator[Diff]:
+        """
+        Passes `diffs` through, pairing added and removed files into renames.
+        An exact rename with the same file name on both sides is yielded as
+        soon as its second side arrives; every other added or removed file is
+        held until the first edge diff, so the pairing does not depend on the
+        order files are walked in.
+        """
+        if not detect_renames:
+            yield from diffs
+            return
+
+        # Unmatched added / removed files by sha256, in arrival order
+        waiting: Dict[str, Dict[str, List[FileDiff]]] = {"added": {}, "removed": {}}
+        flushed = False
+        for diff in diffs:
+            if isinstance(diff, FileDiff) and diff.status in ("added", "removed"):
+                sha = diff.new_sha256 if diff.status == "added" else diff.old_sha256
+                if sha == EMPTY_SHA256:
+                    sha = None
+                other = waiting["removed" if diff.status == "added" else "added"]
+                candidates = other.get(sha, []) if sha else []
+                name = SnapshotComparator._file_name(diff.stable_id)
+                match = next((c for c in candidates if SnapshotComparator._file_name(c.stable_id) == name), None)
+                if match is None:
+                    waiting[diff.status].setdefault(sha or "", []).append(diff)
+                    continue
+
+                candidates.remove(match)
+                if not candidates:
+                    del other[sha]
+                old, new = (match, diff) if diff.status == "added" else (diff, match)
+                yield SnapshotComparator._renamed(old, new, 1.0)
+                continue
+            if isinstance(diff, EdgeDiff) and not flushed:
+                yield from SnapshotComparator._flush_unmatched(waiting, rename_similarity, lookup_a, lookup_b)
+                flushed = True
+            yield diff
+        if not flushed:
+            yield from SnapshotComparator._flush_unmatched(waiting, rename_similarity, lookup_a, lookup_b)
+
+    @staticmethod
+    def _flush_unmatched(
+        waiting: Dict[str, Dict[str, List[FileDiff]]],
+        rename_similarity: Optional[float],
+        lookup_a: EntryLookup,
+        lookup_b: EntryLookup
+    ) -> Iterator[FileDiff]:
+        """
+        Exact renames among the held files (same file name first, then
+        stable_id order), near-renames among the rest (with a threshold),
+        then the unmatched files in stable_id order.
+        """
+        exact: List[Tuple[FileDiff, FileDiff]] = []
+        for sha, removed_group in waiting["removed"].items():
+            added_group = waiting["added"].get(sha)
+            if not sha or not added_group:
+                continue
+            exact.extend(SnapshotComparator._pair_by_name(
+                sorted(removed_group, key=lambda d: d.stable_id),
+                sorted(added_group, key=lambda d: d.stable_id)
             ))
-            report.files_removed += 1
-
-        # Modified Files (Intersection with different hashes)
-        for common_id in (set_a & set_b):
-            if files_a[common_id] != files_b[common_id]:
-                report.file_diffs.append(FileDiff(
-                    stable_id=common_id, 
-                    status="modified", 
-                    old_sha256=files_a[common_id],
-                    new_sha256=files_b[common_id]
-                ))
-                report.files_modified += 1
-
-        # Sort file diffs deterministically
-        report.file_diffs.sort(key=lambda x: (x.status, x.stable_id))
+        exact.sort(key=lambda pair: pair[1].stable_id)
+        for old, new in exact:
+            yield SnapshotComparator._renamed(old, new, 1.0)
+
+        paired_old = {old.stable_id for old, _ in exact}
+        paired_new = {new.stable_id for _, new in exact}
+        removed = sorted(
+            (d for group in waiting["removed"].values() for d in group if d.stable_id not in paired_old),
+            key=lambda d: d.stable_id
+        )
+        added = sorted(
+            (d for group in waiting["added"].values() for d in group if d.stable_id not in paired_new),
+            key=lambda d: d.stable_id
+        )
+
+        pairs: List[Tuple[FileDiff, FileDiff, float]] = []
+        if rename_similarity is not None:
+            pairs = SnapshotComparator._near_renames(removed, added, rename_similarity, lookup_a, lookup_b)
+
+        paired_old = {old.stable_id for old, _, _ in pairs}
+        paired_new = {new.stable_id for _, new, _ in pairs}
+        pairs.sort(key=lambda pair: pair[1].stable_id)
+        for old, new, similarity in pairs:
+            yield SnapshotComparator._renamed(old, new, similarity)
+        for diff in removed:
+            if diff.stable_id not in paired_old:
+                yield diff
+        for diff in added:
+            if diff.stable_id not in paired_new:
+                yield diff
+
+    @staticmethod
+    def _pair_by_name(removed: List[FileDiff], added: List[FileDiff]) -> List[Tuple[FileDiff, FileDiff]]:
+        """Pairs identical files: same file name first, the rest in the given order."""
+        pairs: List[Tuple[FileDiff, FileDiff]] = []
+        unmatched_removed: List[FileDiff] = []
+        for old in removed:
+            name = SnapshotComparator._file_name(old.stable_id)
+            new = next((d for d in added if SnapshotComparator._file_name(d.stable_id) == name), None)
+            if new is None:
+                unmatched_removed.append(old)
+                continue
+            added = [d for d in added if d is not new]
+            pairs.append((old, new))
+        pairs.extend(zip(unmatched_removed, added))
+        return pairs
+
+    @staticmethod
+    def _renamed(old: FileDiff, new: FileDiff, similarity: float) -> FileDiff:
+        return FileDiff(
+            stable_id=new.stable_id,
+            status="renamed",
+            old_stable_id=old.stable_id,
+            old_sha256=old.old_sha256,
+            new_sha256=new.new_sha256,
+            similarity=similarity
+        )
+
+    @staticmethod
+    def _near_renames(
+        removed: List[FileDiff],
+        added: List[FileDiff],
+        threshold: float,
+        lookup_a: EntryLookup,
+        lookup_b: EntryLookup
+    ) -> List[Tuple[FileDiff, FileDiff, float]]:
+        """Best-first pairs whose similarity reaches `threshold`; each file is used once."""
+        if not removed or not added:
+            return []
+
+        old_features: Dict[str, Tuple[str, int, Set[str]]] = {}
+        by_feature: Dict[Tuple[str, str], List[FileDiff]] = {}
+        for diff in removed:
+            features = SnapshotComparator._features(lookup_a(diff.stable_id))
+            if features is None:
+                continue
+            old_features[diff.stable_id] = features
+            for feature in features[2]:
+                by_feature.setdefault((features[0], feature), []).append(diff)
 
-        # 2. Compare Graphs (If both exist)
-        if graph_a and graph_b:
-            # Create comparable tuples from edges: (source, target, relation)
-            edges_a: Set[Tuple[str, str, str]] = {
-                (e.source, e.target, e.relation) for e in graph_a.edges
-            }
-            edges_b: Set[Tuple[str, str, str]] = {
-                (e.source, e.target, e.relation) for e in graph_b.edges
-            }
-
-            # Added Edges
-            for edge in (edges_b - edges_a):
-                report.edge_diffs.append(EdgeDiff(
-                    source=edge[0], target=edge[1], relation=edge[2], status="added"
-                ))
-                report.edges_added += 1
-
-            # Removed Edges
-            for edge in (edges_a - edges_b):
-                report.edge_diffs.append(EdgeDiff(
-                    source=edge[0], target=edge[1], relation=edge[2], status="removed"
-                ))
-                report.edges_removed += 1
-
-            # Sort edge diffs deterministically
-            report.edge_diffs.sort(key=lambda x: (x.status, x.source, x.target))
-
-        return report
\ No newline at end of file
+        candidates: List[Tuple[float, str, str, FileDiff, FileDiff]] = []
+        for diff in added:
+            features = SnapshotComparator._features(lookup_b(diff.stable_id))
+            if features is None:
+                continue
+            ext, size, new_set = features
+            # Only files sharing a feature (and the extension) can score above zero
+            seen: Dict[str, FileDiff] = {}
+            for feature in new_set:
+                for old in by_feature.get((ext, feature), []):
+                    seen[old.stable_id] = old
+            for old_id, old in seen.items():
+                _, old_size, old_set = old_features[old_id]
+                jaccard = len(new_set & old_set) / len(new_set | old_set)
+                size_ratio = min(size, old_size) / max(size, old_size) if max(size, old_size) else 1.0
+                score = round(jaccard * size_ratio, 4)
+                if score >= threshold:
+                    candidates.append((-score, diff.stable_id, old_id, old, diff))
+
+        candidates.sort(key=lambda c: c[:3])
+        pairs: List[Tuple[FileDiff, FileDiff, float]] = []
+        used_old: Set[str] = set()
+        used_new: Set[str] = set()
+        for neg_score, new_id, old_id, old, new in candidates:
+            if new_id in used_new or old_id in used_old:
+                continue
+            used_new.add(new_id)
+            used_old.add(old_id)
+            pairs.append((old, new, -neg_score))
+        return pairs
+
+    @staticmethod
+    def _features(entry: Optional[Dict[str, Any]]) -> Optional[Tuple[str, int, Set[str]]]:
+        """(extension, size, symbol/import set) of a manifest entry; None if it has no symbols or imports."""
+        if entry is None:
+            return None
+        features = {f"symbol:{s}" for s in entry.get("symbols", [])}
+        features.update(f"import:{i}" for i in entry.get("imports", []))
+        if not features:
+            return None
+        ext = os.path.splitext(entry.get("path", ""))[1].lower()
+        return ext, entry.get("size_bytes", 0), features
+
+    @staticmethod
+    def _file_name(stable_id: str) -> str:
+        return stable_id.rsplit("/", 1)[-1]
@@ -0,0 +1,181 @@
+import time
+import uuid
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+
+class JobCancelled(Exception):
+    """Raised from a job's progress callback once cancellation was requested."""
+
+
+class JobQueueFull(Exception):
+    """Raised by JobManager.submit when the pending-job limit is reached."""
+
+
+class Job:
+    """
+    State of one background snapshot run. Every change bumps `version` and
+    wakes waiters on `changed`, which is what the SSE stream follows.
+    """
+
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+    TERMINAL = (SUCCEEDED, FAILED, CANCELLED)
+
+    def __init__(self, key: str, params: Dict[str, Any]):
+        self.id = uuid.uuid4().hex
+        self.key = key
+        self.params = params
+        self.status = Job.QUEUED
+        self.phase: Optional[str] = None
+        self.current = 0
+        self.total = 0
+        self.snapshot_id: Optional[str] = None
+        self.error: Optional[str] = None
+        self.created = time.time()
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+        self.version = 0
+        self.changed = threading.Condition()
+        self.cancel_requested = False
+        self.future = None
+
+    @property
+    def done(self) -> bool:
+        return self.status in Job.TERMINAL
+
+    def _update(self, **fields: Any) -> None:
+        with self.changed:
+            for name, value in fields.items():
+                setattr(self, name, value)
+            self.version += 1
+            self.changed.notify_all()
+
+    def progress(self, phase: str, current: int, total: int) -> None:
+        """progress_callback for run_snapshot; raises JobCancelled when asked to stop."""
+        if self.cancel_requested:
+            raise JobCancelled(self.id)
+        self._update(phase=phase, current=current, total=total)
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self.changed:
+            return {
+                "job_id": self.id,
+                "status": self.status,
+                "phase": self.phase,
+                "current": self.current,
+                "total": self.total,
+                "snapshot_id": self.snapshot_id,
+                "error": self.error,
+                "created": self.created,
+                "started": self.started,
+                "finished": self.finished,
+                "repo_root": self.params.get("repo_root"),
+                "output_root": self.params.get("output_root"),
+            }
+
+    def wait_for_change(self, seen_version: int, timeout: float) -> Tuple[int, Dict[str, Any]]:
+        """Blocks until `version` differs from `seen_version` (or timeout); returns (version, state)."""
+        with self.changed:
+            self.changed.wait_for(lambda: self.version != seen_version, timeout=timeout)
+            return self.version, self.to_dict()
+
+
+class JobManager:
+    """
+    Runs snapshot jobs on a bounded thread pool.
+
+    Submitting a request whose key matches a queued or running job returns
+    that job instead of starting another (coalescing). Cancellation takes
+    effect at the run's next progress callback. Finished jobs are kept for
+    inspection up to `retain` entries.
+    """
+
+    def __init__(
+        self,
+        runner: Callable[..., str],
+        max_workers: int = 2,
+        max_pending: int = 64,
+        retain: int = 500
+    ):
+        self.runner = runner
+        self.max_pending = max_pending
+        self.retain = retain
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="snapshot-job")
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._active: Dict[str, Job] = {}  # key -> queued/running job
+        self._lock = threading.Lock()
+
+    def submit(self, key: str, params: Dict[str, Any]) -> Tuple[Job, bool]:
+        """
+        Queues runner(**params). Returns (job, coalesced), where coalesced is
+        True if an identical job was already queued or running.
+        Raises JobQueueFull when `max_pending` jobs are outstanding.
+        """
+        with self._lock:
+            existing = self._active.get(key)
+            if existing is not None and not existing.done and not existing.cancel_requested:
+                return existing, True
+            if len(self._active) >= self.max_pending:
+                raise JobQueueFull(f"Too many pending snapshot jobs (limit {self.max_pending})")
+
+            job = Job(key, params)
+            self._jobs[job.id] = job
+            self._active[key] = job
+            self._prune()
+            job.future = self._executor.submit(self._run, job)
+        return job, False
+
+    def _run(self, job: Job) -> None:
+        if job.cancel_requested:
+            self._finish(job, Job.CANCELLED)
+            return
+        job._update(status=Job.RUNNING, started=time.time())
+        try:
+            snapshot_id = self.runner(progress_callback=job.progress, **job.params)
+        except JobCancelled:
+            self._finish(job, Job.CANCELLED)
+        except Exception as e:
+            self._finish(job, Job.FAILED, error=str(e))
+        else:
+            self._finish(job, Job.SUCCEEDED, snapshot_id=snapshot_id)
+
+    def _finish(self, job: Job, status: str, **fields: Any) -> None:
+        with self._lock:
+            if self._active.get(job.key) is job:
+                del self._active[job.key]
+        job._update(status=status, finished=time.time(), **fields)
+
+    def _prune(self) -> None:
+        finished = [job_id for job_id, job in self._jobs.items() if job.done]
+        for job_id in finished[:max(0, len(self._jobs) - self.retain)]:
+            del self._jobs[job_id]
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def list(self) -> Iterator[Job]:
+        with self._lock:
+            return iter(list(self._jobs.values()))
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        """Requests cancellation; queued jobs never start, running ones stop at their next progress report."""
+        job = self.get(job_id)
+        if job is None or job.done:
+            return job
+        job._update(cancel_requested=True)
+        if job.future is not None and job.future.cancel():
+            self._finish(job, Job.CANCELLED)
+        return job
+
+    def shutdown(self) -> None:
+        for job in self.list():
+            self.cancel(job.id)
+        self._executor.shutdown(wait=True)
@@ -1,16 +1,18 @@
 import os
 import json
 from fastapi import FastAPI, HTTPException
-from fastapi.responses import RedirectResponse
+from fastapi.responses import RedirectResponse, StreamingResponse
 from pydantic import BaseModel
 from typing import List, Optional, Dict, Any
 
-from src.core.controller import run_snapshot
+from src.core.controller import run_snapshot, run_compare, run_compare_stream
 from src.snapshot.snapshot_loader import SnapshotLoader
+from src.snapshot.snapshot_cache import SnapshotCache
+from src.snapshot.symbol_index import SymbolIndex
+from src.api.job_manager import Job, JobManager, JobQueueFull
 from src.analysis.context_slicer import ContextSlicer
-from src.analysis.snapshot_comparator import SnapshotComparator
 from src.observability.token_telemetry import TokenTelemetry
-from src.core.types import Manifest, GraphStructure, SnapshotDiffReport
+from src.core.types import SnapshotDiffReport
 
 app = FastAPI(
     title="Repo-Runner AI Context API",
@@ -18,6 +20,15 @@ app = FastAPI(
     version="0.2.1"
 )
 
+# Parsed snapshots shared across requests (snapshots are immutable once written)
+snapshot_cache = SnapshotCache()
+
+# Snapshot runs happen in the background; POST /snapshots only enqueues
+job_manager = JobManager(runner=run_snapshot, max_workers=2)
+
+# Seconds between SSE keep-alive comments while a job is quiet
+SSE_KEEPALIVE_SECONDS = 15.0
+
 # --- NEW: Root Redirect ---
 @app.get("/", include_in_schema=False)
 def root():
@@ -34,118 +45,285 @@ class SnapshotRequest(BaseModel):
     include_extensions: List[str] = []
     include_readme: bool = True
     skip_graph: bool = False
+    incremental: bool = False
+    jobs: int = 1
+    use_git_index: bool = False
+    include_untracked: bool = False
+    analysis_cache: bool = False
+    analysis_cache_max_mb: int = 256
+    enumerate_cycles: bool = False
+    max_cycles: int = 1000
+    compact_snapshot: bool = False
+    dedup_snapshot: bool = False
 
-class SliceRequest(BaseModel):
-    output_root: str
+class SliceSpec(BaseModel):
     focus_id: str
     radius: int = 1
     max_tokens: Optional[int] = None  # NEW FIELD
+    direction: str = "both"  # both | upstream | downstream
+    strategy: str = "bfs"    # bfs | weighted
+
+class SliceRequest(SliceSpec):
+    output_root: str
+
+class BatchSliceRequest(BaseModel):
+    output_root: str
+    slices: List[SliceSpec]
+    union: bool = False  # also return the merged, de-duplicated slice
 
 class CompareRequest(BaseModel):
     output_root: str
     base_id: str
     target_id: str
+    detect_renames: bool = True
+    rename_similarity: Optional[float] = None  # also pair near-renames scoring at least this
 
 # --- Routes ---
 
-@app.post("/snapshots", summary="Trigger a new repository snapshot")
+@app.post("/snapshots", status_code=202, summary="Queue a new repository snapshot")
 def create_snapshot(req: SnapshotRequest):
     """
-    Scans the target repository, normalizes paths, fingerprints files, 
-    and builds an AST-derived dependency graph.
+    Queues a scan of the target repository (normalize paths, fingerprint files,
+    build the dependency graph) and returns a job id immediately.
+    Poll `GET /jobs/{job_id}` or stream `GET /jobs/{job_id}/events` for progress;
+    the finished job carries the snapshot_id. An identical request for a job
+    that is still queued or running returns that job (`coalesced: true`).
     """
+    if not os.path.isdir(req.repo_root):
+        raise HTTPException(status_code=400, detail=f"Repository root does not exist: {os.path.abspath(req.repo_root)}")
+
+    params = req.model_dump()
+    params["repo_root"] = os.path.abspath(req.repo_root)
+    params["output_root"] = os.path.abspath(req.output_root)
+    key = json.dumps(params, sort_keys=True)
+    params["write_current_pointer"] = True
+
     try:
-        snap_id = run_snapshot(
-            repo_root=req.repo_root,
-            output_root=req.output_root,
-            depth=req.depth,
-            ignore=req.ignore,
-            include_extensions=req.include_extensions,
-            include_readme=req.include_readme,
-            write_current_pointer=True,
-            skip_graph=req.skip_graph
-        )
-        return {"snapshot_id": snap_id, "status": "success"}
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=str(e))
+        job, coalesced = job_manager.submit(key, params)
+    except JobQueueFull as e:
+        raise HTTPException(status_code=429, detail=str(e))
 
+    state = job.to_dict()
+    return {"job_id": job.id, "status": state["status"], "coalesced": coalesced}
 
-@app.post("/snapshots/{snapshot_id}/slice", summary="Generate a tailored LLM context slice")
-def slice_snapshot(snapshot_id: str, req: SliceRequest):
+
+@app.get("/snapshots", summary="List completed snapshots")
+def list_snapshots(output_root: str):
     """
-    Performs a Bidirectional BFS on the dependency graph to isolate a target file 
-    and its N-degree dependencies. Returns the compressed manifest and token telemetry.
+    Lists the snapshot folders under `output_root` (oldest first), flagging
+    the one current.json points at.
+    """
+    if not os.path.isdir(output_root):
+        raise HTTPException(status_code=404, detail=f"Output root not found: {output_root}")
+
+    current_id = None
+    try:
+        current_id = SnapshotLoader(output_root).resolve_snapshot_dir(None)
+        current_id = os.path.basename(current_id)
+    except (OSError, ValueError):
+        pass
+
+    snapshots = []
+    for name in sorted(os.listdir(output_root)):
+        snap_dir = os.path.join(output_root, name)
+        if not SnapshotLoader.is_snapshot(snap_dir):
+            continue
+        snapshots.append({
+            "snapshot_id": name,
+            "current": name == current_id,
+            "has_graph": SnapshotLoader.has_graph(snap_dir),
+        })
+    return {"output_root": output_root, "snapshots": snapshots}
+
+
+@app.get("/jobs", summary="List snapshot jobs")
+def list_jobs():
+    return {"jobs": [job.to_dict() for job in job_manager.list()]}
+
+
+@app.get("/jobs/{job_id}", summary="Snapshot job status and progress")
+def get_job(job_id: str):
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+    return job.to_dict()
+
+
+@app.get("/jobs/{job_id}/events", summary="Stream job progress as server-sent events")
+def stream_job(job_id: str):
+    """
+    Emits the job state as an SSE event (named after its status) whenever it
+    changes, and closes the stream once the job has finished.
     """
-    loader = SnapshotLoader(req.output_root)
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+
+    def events():
+        seen = -1
+        while True:
+            version, state = job.wait_for_change(seen, timeout=SSE_KEEPALIVE_SECONDS)
+            if version == seen:
+                yield ": keep-alive\n\n"
+                continue
+            seen = version
+            yield f"event: {state['status']}\ndata: {json.dumps(state)}\n\n"
+            if state["status"] in Job.TERMINAL:
+                return
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+
+@app.delete("/jobs/{job_id}", summary="Cancel a snapshot job")
+def cancel_job(job_id: str):
+    """Queued jobs never start; running jobs stop at their next progress report."""
+    job = job_manager.cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+    return job.to_dict()
+
+
+MAX_BATCH_SLICES = 1000
+
+
+def _cached_slice_index(output_root: str, snapshot_id: str):
+    """SliceIndex of a snapshot from the process cache; 404 if it has no graph."""
+    loader = SnapshotLoader(output_root)
     try:
         snap_dir = loader.resolve_snapshot_dir(snapshot_id)
-        manifest_dict = loader.load_manifest(snap_dir)
-        
-        graph_path = os.path.join(snap_dir, "graph.json")
-        if not os.path.exists(graph_path):
+        cached = snapshot_cache.get(output_root, snap_dir)
+        if not cached.has_graph:
             raise FileNotFoundError(f"graph.json missing in {snap_dir}")
             
-        with open(graph_path, "r") as f:
-            graph_data = json.load(f)
-            
     except Exception as e:
         raise HTTPException(status_code=404, detail=str(e))
+    return cached.slice_index
 
-    # Slice with new max_tokens parameter
-    sliced_manifest = ContextSlicer.slice_manifest(
-        manifest=manifest_dict, 
-        graph=graph_data, 
-        focus_id=req.focus_id, 
-        radius=req.radius,
-        max_tokens=req.max_tokens
-    )
+
+def _compute_slice(index, spec: SliceSpec) -> Dict[str, Any]:
+    # Slice with new max_tokens parameter, over the cached adjacency/symbol index
+    try:
+        sliced_manifest = ContextSlicer.slice_manifest(
+            manifest=None, 
+            graph=None, 
+            focus_id=spec.focus_id, 
+            radius=spec.radius,
+            max_tokens=spec.max_tokens,
+            index=index,
+            direction=spec.direction,
+            strategy=spec.strategy
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
     # Generate human-readable telemetry
     # We use the sliced manifest's internal stats for telemetry generation
     estimated = sliced_manifest.get("stats", {}).get("estimated_tokens", 0)
-    usage_str = TokenTelemetry.format_usage(estimated, req.max_tokens or 0)
+    usage_str = TokenTelemetry.format_usage(estimated, spec.max_tokens or 0)
     
     telemetry_md = f"""
 ## Context Telemetry
-- **Focus:** `{req.focus_id}`
-- **Radius:** {req.radius}
+- **Focus:** `{spec.focus_id}`
+- **Radius:** {spec.radius}
 - **Usage:** {usage_str}
 - **Cycles Included:** {sliced_manifest.get("stats", {}).get("cycles_included", 0)}
 """
     
     return {
-        "focus_id": req.focus_id,
-        "radius": req.radius,
+        "focus_id": spec.focus_id,
+        "radius": spec.radius,
         "telemetry_markdown": telemetry_md,
         "sliced_manifest": sliced_manifest
     }
 
 
+@app.post("/snapshots/{snapshot_id}/slice", summary="Generate a tailored LLM context slice")
+def slice_snapshot(snapshot_id: str, req: SliceRequest):
+    """
+    Performs a Bidirectional BFS on the dependency graph to isolate a target file 
+    and its N-degree dependencies. Returns the compressed manifest and token telemetry.
+    """
+    return _compute_slice(_cached_slice_index(req.output_root, snapshot_id), req)
+
+
+@app.post("/snapshots/{snapshot_id}/slices", summary="Generate many context slices of one snapshot")
+def slice_snapshot_batch(snapshot_id: str, req: BatchSliceRequest):
+    """
+    Computes every requested slice against one load of the snapshot and
+    returns them in request order. With `union`, also returns the merged,
+    de-duplicated slice of all of them.
+    """
+    if len(req.slices) > MAX_BATCH_SLICES:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_SLICES} slices per request")
+
+    index = _cached_slice_index(req.output_root, snapshot_id)
+    # Slicing is pure-Python CPU work, so threads would only contend for the
+    # GIL; the saving comes from sharing the loaded index.
+    results = [_compute_slice(index, spec) for spec in req.slices]
+
+    response: Dict[str, Any] = {"snapshot_id": snapshot_id, "slices": results}
+    if req.union:
+        response["union"] = ContextSlicer.union_slices(
+            index, [spec.focus_id for spec in req.slices], [r["sliced_manifest"] for r in results]
+        )
+    return response
+
+
+@app.get("/snapshots/{snapshot_id}/symbols", summary="Look up symbols and the files defining them")
+def search_symbols(snapshot_id: str, output_root: str, q: str, limit: int = 20, mode: str = "auto"):
+    """
+    Resolves a symbol name through the snapshot's memory-mapped symbol index
+    (symbols.idx, built on first use for older snapshots). `mode` is one of
+    exact, prefix, fuzzy or auto; candidates come back best first.
+    """
+    if mode not in ("auto", "exact", "prefix", "fuzzy"):
+        raise HTTPException(status_code=400, detail=f"Unknown symbol search mode: {mode}")
+    if limit < 1:
+        raise HTTPException(status_code=400, detail="limit must be positive")
+
+    loader = SnapshotLoader(output_root)
+    try:
+        snap_dir = loader.resolve_snapshot_dir(snapshot_id)
+        index = SymbolIndex.for_snapshot(snap_dir)
+    except (FileNotFoundError, ValueError) as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except OSError as e:
+        raise HTTPException(status_code=500, detail=f"Cannot read the symbol index: {e}")
+
+    return {"snapshot_id": snapshot_id, "query": q, "mode": mode, "results": index.search(q, limit=limit, mode=mode)}
+
+
 @app.post("/snapshots/compare", response_model=SnapshotDiffReport, summary="Diff two structural snapshots")
 def compare_snapshots(req: CompareRequest):
     """
     Deterministically diffs two snapshots. Identifies added/removed/modified files 
     via SHA256 hashes, and calculates the exact dependency edges that drifted.
+    Moved files are reported once as `renamed`, with `old_stable_id`.
+    Snapshots with Merkle trees are diffed by visiting only the modules
+    that differ; others fall back to the compact form, then to the JSON.
     """
-    loader = SnapshotLoader(req.output_root)
     try:
-        dir_a = loader.resolve_snapshot_dir(req.base_id)
-        dir_b = loader.resolve_snapshot_dir(req.target_id)
-        
-        manifest_a = Manifest.model_validate(loader.load_manifest(dir_a))
-        manifest_b = Manifest.model_validate(loader.load_manifest(dir_b))
-        
-        ga_path = os.path.join(dir_a, "graph.json")
-        gb_path = os.path.join(dir_b, "graph.json")
-        
-        g_a, g_b = None, None
-        if os.path.exists(ga_path):
-            with open(ga_path, "r") as f: g_a = GraphStructure.model_validate(json.load(f))
-        if os.path.exists(gb_path):
-            with open(gb_path, "r") as f: g_b = GraphStructure.model_validate(json.load(f))
-
-        report = SnapshotComparator.compare(manifest_a, manifest_b, g_a, g_b)
-        return report
+        # The process-wide cache supplies validated models for the JSON fallback
+        return run_compare(
+            req.output_root, req.base_id, req.target_id, req.detect_renames, req.rename_similarity,
+            load_models=lambda snapshot_dir: snapshot_cache.get(req.output_root, snapshot_dir).models()
+        )
 
     except Exception as e:
-        raise HTTPException(status_code=400, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=400, detail=str(e))
+
+@app.post("/snapshots/compare/stream", summary="Stream the diff of two snapshots as NDJSON")
+def stream_compare_snapshots(req: CompareRequest):
+    """
+    Same diff as `/snapshots/compare`, streamed as newline-delimited JSON while
+    it is computed: a `header` record with both snapshot ids, one `file` or
+    `edge` record per change, then a `summary` trailer with the counts.
+    Snapshots are read directly rather than through the parsed-snapshot cache.
+    """
+    try:
+        stream = run_compare_stream(
+            req.output_root, req.base_id, req.target_id, req.detect_renames, req.rename_similarity
+        )
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return StreamingResponse(stream.ndjson(), media_type="application/x-ndjson")
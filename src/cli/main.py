@@ -4,11 +4,14 @@ import sys
 from src.core.controller import (
     run_snapshot, 
     run_export_flatten, 
+    run_export_flatten_sharded,
     run_compare, 
+    run_compare_stream,
     run_export_diagram, 
     run_export_compression_state
 )
 from src.core.config_loader import ConfigLoader
+from src.core.watch_session import run_watch
 
 def _parse_args():
     parser = argparse.ArgumentParser(prog="repo-runner", description="repo-runner v0.2")
@@ -29,15 +32,50 @@ def _parse_args():
     snap.add_argument("--no-skip-graph", action="store_false", dest="skip_graph")
     snap.add_argument("--export-flatten", action="store_true", default=None)
     snap.add_argument("--no-export-flatten", action="store_false", dest="export_flatten")
+    snap.add_argument("--incremental", action="store_true", default=None, help="Reuse fingerprints of unchanged files from the output root cache")
+    snap.add_argument("--no-incremental", action="store_false", dest="incremental")
+    snap.add_argument("--jobs", "-j", type=int, default=None, help="Worker processes for fingerprinting & analysis (0 = all cores)")
+    snap.add_argument("--git-index", action="store_true", default=None, dest="use_git_index", help="Enumerate tracked files from .git/index instead of walking the tree")
+    snap.add_argument("--no-git-index", action="store_false", dest="use_git_index")
+    snap.add_argument("--include-untracked", action="store_true", default=None, help="With --git-index, also include untracked files")
+    snap.add_argument("--no-include-untracked", action="store_false", dest="include_untracked")
+    snap.add_argument("--analysis-cache", action="store_true", default=None, help="Reuse import/symbol results for identical file contents across snapshots")
+    snap.add_argument("--no-analysis-cache", action="store_false", dest="analysis_cache")
+    snap.add_argument("--analysis-cache-max-mb", type=int, default=None, help="Size cap for the analysis cache (LRU eviction)")
+    snap.add_argument("--enumerate-cycles", action="store_true", default=None, help="List every elementary import cycle in graph.json (capped by --max-cycles)")
+    snap.add_argument("--no-enumerate-cycles", action="store_false", dest="enumerate_cycles")
+    snap.add_argument("--max-cycles", type=int, default=None)
+    snap.add_argument("--compact", action="store_true", default=None, dest="compact_snapshot", help="Also write snapshot.rrc, a memory-mapped columnar copy used by diff/slice")
+    snap.add_argument("--no-compact", action="store_false", dest="compact_snapshot")
+    snap.add_argument("--dedup", action="store_true", default=None, dest="dedup_snapshot", help="Store the snapshot in the output root's content-addressed object pool (root.json only)")
+    snap.add_argument("--no-dedup", action="store_false", dest="dedup_snapshot")
+
+    # watch
+    watch = sub.add_parser("watch", help="Keep a live snapshot updated as files change")
+    watch.add_argument("repo_root", help="Repository root path")
+    watch.add_argument("--output-root", required=False, default=None, help="Output root directory")
+    watch.add_argument("--depth", type=int, default=None)
+    watch.add_argument("--ignore", nargs="*", default=None)
+    watch.add_argument("--include-extensions", nargs="*", default=None)
+    watch.add_argument("--include-readme", action="store_true", default=None)
+    watch.add_argument("--no-include-readme", action="store_false", dest="include_readme")
+    watch.add_argument("--skip-graph", action="store_true", default=None)
+    watch.add_argument("--no-skip-graph", action="store_false", dest="skip_graph")
+    watch.add_argument("--jobs", "-j", type=int, default=None, help="Worker processes for the initial full snapshot")
+    watch.add_argument("--debounce-ms", type=int, default=None, help="Quiet period before a burst of changes is applied (default: 200)")
+    watch.add_argument("--backend", choices=["auto", "inotify", "poll"], default=None, help="Change detection backend (default: auto)")
+    watch.add_argument("--poll-interval", type=float, default=None, help="Seconds between tree scans with the poll backend")
 
     # slice
     slice_cmd = sub.add_parser("slice", help="Generate a context slice (Markdown)")
     slice_cmd.add_argument("--repo-root", required=True)
     slice_cmd.add_argument("--output-root", required=False, default=None)
     slice_cmd.add_argument("--snapshot-id", required=False, default=None)
-    slice_cmd.add_argument("--focus", required=True)
+    slice_cmd.add_argument("--focus", required=True, action="append", help="Focus file or symbol:{name}; repeat to slice around several at once")
     slice_cmd.add_argument("--radius", type=int, default=1)
     slice_cmd.add_argument("--max-tokens", type=int, default=None)
+    slice_cmd.add_argument("--direction", choices=["both", "upstream", "downstream"], default="both", help="Follow imports (upstream), importers (downstream) or both")
+    slice_cmd.add_argument("--strategy", choices=["bfs", "weighted"], default="bfs", help="Budget fill order: breadth-first, or by value per token")
     slice_cmd.add_argument("--output", required=False, default=None)
 
     # diff
@@ -46,6 +84,9 @@ def _parse_args():
     diff_cmd.add_argument("--target", required=True, help="Target snapshot ID or 'current'")
     diff_cmd.add_argument("--output-root", required=False, default=None)
     diff_cmd.add_argument("--repo-root", required=False, default=".", help="Repo root to search for config")
+    diff_cmd.add_argument("--format", choices=["text", "ndjson"], default="text", help="ndjson streams one JSON record per diff, then a summary record")
+    diff_cmd.add_argument("--no-renames", action="store_false", dest="detect_renames", help="Report moved files as removed + added")
+    diff_cmd.add_argument("--rename-similarity", type=float, default=None, help="Also pair near-renames scoring at least this (0-1) on symbols, imports and size")
 
     # diagram 
     diag_cmd = sub.add_parser("diagram", help="Generate a visual architecture diagram")
@@ -71,6 +112,8 @@ def _parse_args():
     flatten.add_argument("--no-include-readme", action="store_false", dest="include_readme")
     flatten.add_argument("--scope", required=False, default="full")
     flatten.add_argument("--title", required=False, default=None)
+    flatten.add_argument("--shard-tokens", type=int, default=None, help="Split the export into files of at most this many (estimated) tokens; --output is then a directory")
+    flatten.add_argument("--jobs", "-j", type=int, default=4, help="Shards rendered in parallel (with --shard-tokens)")
 
     # export compression-state
     comp_state = exp_sub.add_parser("compression-state", help="Sync incremental context compression states")
@@ -79,6 +122,7 @@ def _parse_args():
     comp_state.add_argument("--state-dir", required=True, help="Directory to store JSON state files")
     comp_state.add_argument("--output-root", required=False, default=None)
     comp_state.add_argument("--repo-root", required=False, default=".")
+    comp_state.add_argument("--rename-similarity", type=float, default=None, help="Also carry summaries over near-renames scoring at least this (0-1)")
 
     # ui
     sub.add_parser("ui", help="Launch the graphical control panel")
@@ -119,11 +163,70 @@ def main():
             write_current_pointer=args.write_current_pointer if args.write_current_pointer is not None else True,
             skip_graph=args.skip_graph if args.skip_graph is not None else config.skip_graph,
             export_flatten=args.export_flatten if args.export_flatten is not None else config.export_flatten,
-            progress_callback=cli_progress
+            progress_callback=cli_progress,
+            incremental=args.incremental if args.incremental is not None else config.incremental,
+            jobs=args.jobs if args.jobs is not None else config.jobs,
+            use_git_index=args.use_git_index if args.use_git_index is not None else config.use_git_index,
+            include_untracked=args.include_untracked if args.include_untracked is not None else config.include_untracked,
+            analysis_cache=args.analysis_cache if args.analysis_cache is not None else config.analysis_cache,
+            analysis_cache_max_mb=args.analysis_cache_max_mb if args.analysis_cache_max_mb is not None else config.analysis_cache_max_mb,
+            enumerate_cycles=args.enumerate_cycles if args.enumerate_cycles is not None else config.enumerate_cycles,
+            max_cycles=args.max_cycles if args.max_cycles is not None else config.max_cycles,
+            compact_snapshot=args.compact_snapshot if args.compact_snapshot is not None else config.compact_snapshot,
+            dedup_snapshot=args.dedup_snapshot if args.dedup_snapshot is not None else config.dedup_snapshot
         )
         print(f"\nSnapshot created:\n  {os.path.abspath(os.path.join(output_root, snap_id))}")
         return
 
+    if args.command == "watch":
+        config = ConfigLoader.load_config(args.repo_root)
+        output_root = args.output_root if args.output_root is not None else config.output_root
+        if not output_root:
+            print("Error: --output-root must be provided via CLI flag or 'repo-runner.json'")
+            sys.exit(1)
+
+        def on_update(summary):
+            print(
+                f"\r[repo-runner] {summary['snapshot_id']}: "
+                f"+{summary['added']} -{summary['removed']} ~{summary['modified']}"
+                + (f" ({summary['elapsed_ms']} ms)" if "elapsed_ms" in summary else "")
+            )
+
+        def on_error(error):
+            print(f"\n[repo-runner] Update skipped: {error}")
+
+        if config.use_git_index:
+            # Changes are detected on the tree, so watch always walks it
+            print("Note: use_git_index does not apply to watch; scanning the file tree.")
+        print(f"Watching {os.path.abspath(args.repo_root)} (Ctrl+C to stop)")
+        try:
+            run_watch(
+                repo_root=args.repo_root,
+                output_root=output_root,
+                depth=args.depth if args.depth is not None else config.depth,
+                ignore=args.ignore if args.ignore is not None else config.ignore,
+                include_extensions=args.include_extensions if args.include_extensions is not None else config.include_extensions,
+                include_readme=args.include_readme if args.include_readme is not None else config.include_readme,
+                skip_graph=args.skip_graph if args.skip_graph is not None else config.skip_graph,
+                jobs=args.jobs if args.jobs is not None else config.jobs,
+                enumerate_cycles=config.enumerate_cycles,
+                max_cycles=config.max_cycles,
+                compact_snapshot=config.compact_snapshot,
+                dedup_snapshot=config.dedup_snapshot,
+                incremental=config.incremental,
+                analysis_cache=config.analysis_cache,
+                analysis_cache_max_mb=config.analysis_cache_max_mb,
+                debounce_ms=args.debounce_ms if args.debounce_ms is not None else config.watch_debounce_ms,
+                backend=args.backend if args.backend is not None else config.watch_backend,
+                poll_interval=args.poll_interval if args.poll_interval is not None else config.watch_poll_interval,
+                on_update=on_update,
+                on_error=on_error,
+                progress_callback=cli_progress
+            )
+        except KeyboardInterrupt:
+            print("\nStopped watching.")
+        return
+
     if args.command == "diff":
         config = ConfigLoader.load_config(args.repo_root)
         output_root = args.output_root if args.output_root is not None else config.output_root
@@ -131,15 +234,28 @@ def main():
             print("Error: --output-root must be provided via CLI flag or 'repo-runner.json'")
             sys.exit(1)
 
-        report = run_compare(output_root, args.base, args.target)
+        if args.format == "ndjson":
+            # Records are written as they are computed
+            stream = run_compare_stream(
+                output_root, args.base, args.target, args.detect_renames, args.rename_similarity
+            )
+            for line in stream.ndjson():
+                sys.stdout.write(line)
+                sys.stdout.flush()
+            return
+
+        report = run_compare(output_root, args.base, args.target, args.detect_renames, args.rename_similarity)
         
         print(f"\nStructural Diff: {report.base_snapshot_id} -> {report.target_snapshot_id}")
         print("="*60)
-        print(f"Files:  +{report.files_added}  -{report.files_removed}  ~{report.files_modified}")
+        print(f"Files:  +{report.files_added}  -{report.files_removed}  ~{report.files_modified}  >{report.files_renamed}")
         print(f"Edges:  +{report.edges_added}  -{report.edges_removed}")
         print("-"*60)
 
         for fd in report.file_diffs:
+            if fd.status == "renamed":
+                print(f"  [>] {fd.old_stable_id} -> {fd.stable_id}")
+                continue
             symbol = "  [~] " if fd.status == "modified" else "  [+] " if fd.status == "added" else "  [-] "
             print(f"{symbol}{fd.stable_id}")
             
@@ -166,11 +282,13 @@ def main():
             tree_only=False,
             include_readme=True,
             scope="full", 
-            title=f"Context Slice: {args.focus}",
-            focus_id=args.focus,
+            title=f"Context Slice: {', '.join(args.focus)}",
+            focus_id=args.focus[0] if len(args.focus) == 1 else args.focus,
             radius=args.radius,
             max_tokens=args.max_tokens,
-            print_summary=True
+            print_summary=True,
+            direction=args.direction,
+            strategy=args.strategy
         )
         print(f"Slice generated:\n  {os.path.abspath(out) if out else 'None'}")
         return
@@ -200,6 +318,22 @@ def main():
             print("Error: --output-root must be provided via CLI flag or 'repo-runner.json'")
             sys.exit(1)
 
+        if args.export_command == "flatten" and args.shard_tokens is not None:
+            index_path = run_export_flatten_sharded(
+                output_root=output_root,
+                repo_root=args.repo_root,
+                snapshot_id=args.snapshot_id,
+                output_dir=args.output,
+                tree_only=args.tree_only,
+                include_readme=args.include_readme if args.include_readme is not None else config.include_readme,
+                scope=args.scope,
+                title=args.title,
+                max_tokens_per_shard=args.shard_tokens,
+                jobs=args.jobs,
+            )
+            print(f"Wrote Sharded Export:\n  {os.path.abspath(index_path)}")
+            return
+
         if args.export_command == "flatten":
             out = run_export_flatten(
                 output_root=output_root,
@@ -219,7 +353,8 @@ def main():
                 output_root=output_root,
                 base_id=args.base,
                 target_id=args.target,
-                state_dir=args.state_dir
+                state_dir=args.state_dir,
+                rename_similarity=args.rename_similarity
             )
             print(f"Compression State Synced in {os.path.abspath(args.state_dir)}")
             print(f"  Pending LLM Compression: {stats['pending_compression']} files")
@@ -2,7 +2,8 @@ import os
 import time
 import json
 from collections import defaultdict
-from typing import List, Optional, Set, Dict, Callable, Any
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED, ALL_COMPLETED
+from typing import List, Optional, Set, Dict, Callable, Any, Iterable, Iterator, Tuple, Union
 
 from src.core.types import (
     Manifest, 
@@ -16,64 +17,47 @@ from src.core.types import (
 )
 from src.core.config_loader import ConfigLoader
 from src.analysis.import_scanner import ImportScanner
+from src.analysis.analysis_cache import AnalysisCache
 from src.analysis.graph_builder import GraphBuilder
 from src.analysis.context_slicer import ContextSlicer
-from src.analysis.snapshot_comparator import SnapshotComparator
+from src.analysis.snapshot_comparator import SnapshotComparator, DiffStream
 from src.observability.token_telemetry import TokenTelemetry
 from src.exporters.flatten_markdown_exporter import (
     FlattenMarkdownExporter,
     FlattenOptions,
 )
+from src.exporters.sharded_flatten_exporter import ShardedFlattenExporter
 from src.exporters.mermaid_exporter import MermaidExporter
 from src.exporters.drawio_exporter import DrawioExporter
 from src.fingerprint.file_fingerprint import FileFingerprint
+from src.fingerprint.fingerprint_cache import FingerprintCache
+from src.fingerprint.file_reader import FileReader
 from src.normalize.path_normalizer import PathNormalizer
 from src.scanner.filesystem_scanner import FileSystemScanner
+from src.scanner.git_index import GitRepository, GitIndexScanner
 from src.snapshot.snapshot_loader import SnapshotLoader
 from src.snapshot.snapshot_writer import SnapshotWriter
+from src.snapshot.symbol_index import SymbolIndex
+from src.snapshot.object_store import StoredSnapshot
+from src.snapshot.snapshot_tree import SnapshotTree
 from src.structure.structure_builder import StructureBuilder
 
 
-def _filter_by_extensions(abs_files: List[str], include_exts: List[str]) -> List[str]:
+def _filter_by_extensions(abs_files: Iterable[str], include_exts: List[str]) -> Iterator[str]:
     if not include_exts:
-        return abs_files
+        yield from abs_files
+        return
 
     include = set([e.lower() for e in include_exts])
-    out =[]
 
     for p in abs_files:
         ext = os.path.splitext(p)[1].lower()
         if ext in include:
-            out.append(p)
+            yield p
 
-    return out
 
-
-def run_snapshot(
-    repo_root: str,
-    output_root: str,
-    depth: int,
-    ignore: List[str],
-    include_extensions: List[str],
-    include_readme: bool,
-    write_current_pointer: bool,
-    skip_graph: bool = False,
-    explicit_file_list: Optional[List[str]] = None,
-    export_flatten: bool = False,
-    progress_callback: Optional[Callable[[str, int, int], None]] = None,
-    manual_override: bool = False 
-) -> str:
-    """
-    Creates a snapshot. Automatically ignores the output_root if it is inside the repo_root.
-    Reports progress across 3 phases: Scanning, Fingerprinting, and Analysis.
-    """
-    repo_root_abs = os.path.abspath(repo_root)
-    output_root_abs = os.path.abspath(output_root)
-
-    if not os.path.isdir(repo_root_abs):
-        raise ValueError(f"Repository root does not exist: {repo_root_abs}")
-
-    # --- Self-Ignore Logic ---
+def effective_ignore_names(repo_root_abs: str, output_root_abs: str, ignore: Iterable[str]) -> Set[str]:
+    """Adds the output root's top-level segment when it lives inside the repo."""
     effective_ignore = set(ignore)
     try:
         if os.path.commonpath([repo_root_abs, output_root_abs]) == repo_root_abs:
@@ -83,116 +67,194 @@ def run_snapshot(
                 effective_ignore.add(top_level_segment)
     except ValueError:
         pass
+    return effective_ignore
 
-    if explicit_file_list is not None:
-        absolute_files =[os.path.abspath(f) for f in explicit_file_list]
-    else:
-        def scan_cb(count: int) -> bool:
-            if progress_callback:
-                progress_callback("Scanning Filesystem", count, 0)
-            return True
-            
-        scanner = FileSystemScanner(depth=depth, ignore_names=list(effective_ignore))
-        absolute_files = scanner.scan([repo_root_abs], progress_callback=scan_cb)
-        absolute_files = _filter_by_extensions(absolute_files, include_extensions)
 
-    normalizer = PathNormalizer(repo_root_abs)
-    file_entries: List[FileEntry] =[]
-    total_bytes = 0
-    
-    # COLLISION DETECTION STATE
-    seen_ids: Dict[str, str] = {} 
+def _analyze_file(abs_path: str, skip_graph: bool, analysis_cache_path: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Fingerprints a single file and (unless skip_graph) extracts its imports and symbols.
+    The file is read once; hashing and parsing share the same buffer.
+    With `analysis_cache_path`, the content-addressed store is consulted right after
+    hashing and parsing only happens on a miss; the result then carries a
+    "cache_hit" flag for the caller to record.
+    Raises OSError if the file cannot be read.
+    """
+    cache_hit = False
+    with FileReader.read(abs_path) as content:
+        fp = FileFingerprint.fingerprint(abs_path, content)
+
+        imports = []
+        symbols = []
+        if not skip_graph and fp["language"] in ImportScanner.SUPPORTED_LANGUAGES:
+            cached = None
+            if analysis_cache_path:
+                cached = AnalysisCache.lookup(analysis_cache_path, fp["sha256"], fp["language"])
+
+            if cached is not None:
+                imports = cached["imports"]
+                symbols = cached["symbols"]
+                cache_hit = True
+            else:
+                try:
+                    scan_res = ImportScanner.scan_text(ImportScanner.decode(content), fp["language"])
+                    imports = scan_res.get("imports", [])
+                    symbols = scan_res.get("symbols", [])
+                except Exception:
+                    pass
 
-    total_files = len(absolute_files)
+    result = {
+        "sha256": fp["sha256"],
+        "size_bytes": fp["size_bytes"],
+        "language": fp["language"],
+        "imports": imports,
+        "symbols": symbols,
+    }
+    if analysis_cache_path:
+        result["cache_hit"] = cache_hit
+    return result
 
-    for i, abs_path in enumerate(absolute_files):
-        # Progress Feedback for GUI/CLI
-        if progress_callback and i % 10 == 0:
-            progress_callback("Fingerprinting & Analysis", i, total_files)
 
-        if not os.path.exists(abs_path):
-            continue
+def analyze_file_or_none(abs_path: str, skip_graph: bool, analysis_cache_path: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """Pool-safe wrapper: unreadable files yield None instead of raising."""
+    try:
+        return _analyze_file(abs_path, skip_graph, analysis_cache_path)
+    except OSError:
+        return None
 
-        normalized = normalizer.normalize(abs_path)
 
-        if explicit_file_list is None:
-            if not include_readme and os.path.basename(normalized).lower().startswith("readme"):
-                continue
+def record_analysis(content_cache: Optional[AnalysisCache], analysis: Dict[str, Any]) -> None:
+    """
+    Strips the "cache_hit" flag from a fresh analyze_file_or_none() result
+    and records it in `content_cache` (fingerprint-cache hits carry no flag).
+    """
+    if "cache_hit" not in analysis:
+        return
+    cache_hit = analysis.pop("cache_hit")
+    if content_cache is not None and analysis["language"] in ImportScanner.SUPPORTED_LANGUAGES:
+        content_cache.record(
+            analysis["sha256"], analysis["language"],
+            analysis["imports"], analysis["symbols"], hit=cache_hit
+        )
 
-        stable_id = normalizer.file_id(normalized)
 
-        # COLLISION CHECK
-        if stable_id in seen_ids:
-            conflicting_path = seen_ids[stable_id]
-            if explicit_file_list:
-                if conflicting_path == abs_path:
-                    continue
-            
-            raise ValueError(
-                f"ID Collision Detected!\n"
-                f"Stable ID: {stable_id}\n"
-                f"Source 1: {conflicting_path}\n"
-                f"Source 2: {abs_path}\n"
-                f"Repo-runner enforces lowercase IDs. "
-                f"Please rename one of these files to avoid ambiguity."
+def _analyze_batch(abs_paths: List[str], skip_graph: bool, analysis_cache_path: Optional[str] = None) -> List[Optional[Dict[str, Any]]]:
+    return [analyze_file_or_none(p, skip_graph, analysis_cache_path) for p in abs_paths]
+
+
+# Files per pool task; amortizes IPC while keeping time-to-first-result low.
+ANALYSIS_BATCH_SIZE = 32
+
+
+def _run_analysis(
+    slots: Iterable[Dict[str, Any]],
+    skip_graph: bool,
+    jobs: int,
+    on_progress: Optional[Callable[[int, int], None]] = None,
+    analysis_cache_path: Optional[str] = None
+) -> List[Dict[str, Any]]:
+    """
+    Consumes `slots` lazily and fills in each slot's "analysis" (None for
+    unreadable files) as discovery proceeds, so scanning, fingerprinting and
+    analysis overlap. Slots that already carry an analysis (cache hits) pass
+    through untouched. Returns every slot in discovery order.
+
+    jobs <= 0 uses every available core; jobs == 1 stays in-process. With a pool,
+    at most jobs * 2 batches are in flight, bounding memory regardless of repo size.
+    """
+    if jobs <= 0:
+        jobs = os.cpu_count() or 1
+
+    done: List[Dict[str, Any]] = []
+
+    if jobs == 1:
+        for slot in slots:
+            if slot["analysis"] is None:
+                slot["analysis"] = analyze_file_or_none(slot["abs_path"], skip_graph, analysis_cache_path)
+            done.append(slot)
+            if on_progress and len(done) % 10 == 0:
+                on_progress(len(done), len(done))
+        return done
+
+    completed = 0
+    batch: List[Dict[str, Any]] = []
+    in_flight: Dict[Any, List[Dict[str, Any]]] = {}
+
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+
+        def submit():
+            future = executor.submit(
+                _analyze_batch, [slot["abs_path"] for slot in batch], skip_graph, analysis_cache_path
             )
+            in_flight[future] = list(batch)
+            batch.clear()
+
+        def collect(return_when):
+            nonlocal completed
+            finished, _ = wait(list(in_flight), return_when=return_when)
+            for future in finished:
+                batch_slots = in_flight.pop(future)
+                for slot, analysis in zip(batch_slots, future.result()):
+                    slot["analysis"] = analysis
+                completed += len(batch_slots)
+            if on_progress:
+                on_progress(completed, len(done))
 
-        seen_ids[stable_id] = abs_path
-        module_path = normalizer.module_path(normalized)
-        
         try:
-            fp = FileFingerprint.fingerprint(abs_path)
-            total_bytes += fp["size_bytes"]
-            
-            # --- Analysis (Imports & Symbols) ---
-            imports =[]
-            symbols =[]
-            if not skip_graph:
-                try:
-                    scan_res = ImportScanner.scan(abs_path, fp["language"])
-                    imports = scan_res.get("imports",[])
-                    symbols = scan_res.get("symbols",[])
-                except Exception:
-                    pass
+            for slot in slots:
+                done.append(slot)
+                if slot["analysis"] is not None:
+                    completed += 1
+                    continue
 
-            entry = FileEntry(
-                stable_id=stable_id,
-                path=normalized,
-                module_path=module_path,
-                sha256=fp["sha256"],
-                size_bytes=fp["size_bytes"],
-                language=fp["language"],
-                imports=imports,
-                symbols=symbols
-            )
-            file_entries.append(entry)
-        except OSError:
-            continue
+                batch.append(slot)
+                if len(batch) >= ANALYSIS_BATCH_SIZE:
+                    submit()
+                    if len(in_flight) >= jobs * 2:
+                        collect(FIRST_COMPLETED)
 
-    if progress_callback:
-        progress_callback("Fingerprinting & Analysis", total_files, total_files)
+            if batch:
+                submit()
+            if in_flight:
+                collect(ALL_COMPLETED)
+        except BaseException:
+            # Don't keep workers busy on a run that is already failing (e.g. ID collision)
+            for future in in_flight:
+                future.cancel()
+            raise
 
-    file_entries = sorted(file_entries, key=lambda x: x.path)
+    return done
 
-    if progress_callback:
-        progress_callback("Building Graph & Structure", total_files, total_files)
+
+def write_snapshot(
+    repo_root_abs: str,
+    output_root: str,
+    file_entries: List[FileEntry],
+    graph: Optional[GraphStructure],
+    manifest_config: ManifestConfig,
+    git_repo: Optional[GitRepository],
+    write_current_pointer: bool,
+    compact_snapshot: bool = False,
+    dedup_snapshot: bool = False
+) -> Tuple[str, Manifest]:
+    """
+    Derives structure, symbol index and manifest from already-analyzed entries
+    (sorted by path) and writes them as a new snapshot.
+    Shared by one-shot snapshots and watch mode.
+    """
+    output_root_abs = os.path.abspath(output_root)
 
     structure = StructureBuilder().build(
         repo_id=PathNormalizer.repo_id(),
         files=file_entries,
     )
 
-    graph = None
-    external_deps =[]
-
-    if not skip_graph:
-        graph = GraphBuilder().build(file_entries)
-        if graph:
-            external_deps = sorted([
-                n.id.replace("external:", "") 
-                for n in graph.nodes 
-                if n.type == "external"
-            ])
+    external_deps = []
+    if graph:
+        external_deps = sorted([
+            n.id.replace("external:", "") 
+            for n in graph.nodes 
+            if n.type == "external"
+        ])
 
     symbols_index_raw = defaultdict(list)
     for entry in file_entries:
@@ -217,22 +279,14 @@ def run_snapshot(
             repo_root=repo_root_abs.replace("\\", "/"),
             roots=[repo_root_abs.replace("\\", "/")],
             git=GitMetadata(
-                is_repo=os.path.isdir(os.path.join(repo_root_abs, ".git")),
-                commit=None
+                is_repo=git_repo is not None,
+                commit=git_repo.head_commit() if git_repo is not None else None
             )
         ),
-        config=ManifestConfig(
-            depth=depth,
-            ignore_names=list(effective_ignore),
-            include_extensions=include_extensions,
-            include_readme=include_readme,
-            tree_only=False,
-            skip_graph=skip_graph,
-            manual_override=explicit_file_list is not None or manual_override
-        ),
+        config=manifest_config,
         stats=ManifestStats(
             file_count=len(file_entries),
-            total_bytes=total_bytes,
+            total_bytes=sum(e.size_bytes for e in file_entries),
             external_dependencies=external_deps
         ),
         files=file_entries
@@ -244,7 +298,274 @@ def run_snapshot(
         structure,
         graph=graph,
         symbols=symbols_index,
-        write_current_pointer=write_current_pointer
+        write_current_pointer=write_current_pointer,
+        compact=compact_snapshot,
+        dedup=dedup_snapshot
+    )
+    return snapshot_id, manifest
+
+
+def collect_entries(
+    repo_root_abs: str,
+    output_root_abs: str,
+    git_repo: Optional[GitRepository],
+    depth: int,
+    effective_ignore: Set[str],
+    include_extensions: List[str],
+    include_readme: bool,
+    skip_graph: bool,
+    explicit_file_list: Optional[List[str]],
+    progress_callback: Optional[Callable[[str, int, int], None]],
+    incremental: bool,
+    jobs: int,
+    use_git_index: bool,
+    include_untracked: bool,
+    analysis_cache: bool,
+    analysis_cache_max_mb: int
+) -> Tuple[List[FileEntry], Dict[str, str]]:
+    """
+    Scans, fingerprints and analyzes the repo (see run_snapshot for the options).
+    Returns the FileEntries sorted by path, plus each entry's absolute path
+    keyed by stable_id.
+    """
+    git_scanner: Optional[GitIndexScanner] = None
+
+    if explicit_file_list is not None:
+        candidate_paths: Iterable[str] =[os.path.abspath(f) for f in explicit_file_list]
+    elif use_git_index and git_repo is not None and os.path.isfile(git_repo.index_path):
+        def git_scan_cb(count: int) -> bool:
+            if progress_callback:
+                progress_callback("Reading Git Index", count, 0)
+            return True
+
+        git_scanner = GitIndexScanner(
+            git_repo, depth=depth, ignore_names=effective_ignore, include_untracked=include_untracked
+        )
+        candidate_paths = _filter_by_extensions(
+            git_scanner.scan_iter(progress_callback=git_scan_cb),
+            include_extensions
+        )
+    else:
+        def scan_cb(count: int) -> bool:
+            if progress_callback:
+                progress_callback("Scanning Filesystem", count, 0)
+            return True
+            
+        # Streamed: files are fingerprinted while the walk is still in progress
+        scanner = FileSystemScanner(depth=depth, ignore_names=list(effective_ignore))
+        candidate_paths = _filter_by_extensions(
+            scanner.scan_iter([repo_root_abs], progress_callback=scan_cb),
+            include_extensions
+        )
+
+    normalizer = PathNormalizer(repo_root_abs)
+    file_entries: List[FileEntry] =[]
+    
+    # COLLISION DETECTION STATE
+    seen_ids: Dict[str, str] = {} 
+
+    cache: Optional[FingerprintCache] = None
+    if incremental or git_scanner is not None:
+        cache = FingerprintCache(output_root_abs)
+        cache.load()
+
+    content_cache: Optional[AnalysisCache] = None
+    if analysis_cache and not skip_graph:
+        content_cache = AnalysisCache(output_root_abs, max_bytes=analysis_cache_max_mb * 1024 * 1024)
+
+    def discover_slots() -> Iterator[Dict[str, Any]]:
+        """Normalization, collision checks and cache lookups (serial, deterministic)."""
+        for abs_path in candidate_paths:
+            if not os.path.exists(abs_path):
+                continue
+
+            normalized = normalizer.normalize(abs_path)
+
+            if explicit_file_list is None:
+                if not include_readme and os.path.basename(normalized).lower().startswith("readme"):
+                    continue
+
+            stable_id = normalizer.file_id(normalized)
+
+            # COLLISION CHECK
+            if stable_id in seen_ids:
+                conflicting_path = seen_ids[stable_id]
+                if explicit_file_list:
+                    if conflicting_path == abs_path:
+                        continue
+                
+                raise ValueError(
+                    f"ID Collision Detected!\n"
+                    f"Stable ID: {stable_id}\n"
+                    f"Source 1: {conflicting_path}\n"
+                    f"Source 2: {abs_path}\n"
+                    f"Repo-runner enforces lowercase IDs. "
+                    f"Please rename one of these files to avoid ambiguity."
+                )
+
+            seen_ids[stable_id] = abs_path
+
+            slot = {
+                "abs_path": abs_path,
+                "stable_id": stable_id,
+                "path": normalized,
+                "module_path": normalizer.module_path(normalized),
+                "signature": None,
+                "analysis": None,
+            }
+            if cache is not None:
+                try:
+                    st = os.stat(abs_path)
+                except OSError:
+                    continue
+                blob_oid = git_scanner.clean_oid(abs_path, st) if git_scanner is not None else None
+                if blob_oid is not None:
+                    slot["signature"] = FingerprintCache.git_signature(blob_oid)
+                else:
+                    slot["signature"] = FingerprintCache.signature(st)
+                slot["analysis"] = cache.lookup(stable_id, slot["signature"], analyzed=not skip_graph)
+
+            yield slot
+
+    def analysis_progress(completed: int, discovered: int):
+        if progress_callback:
+            progress_callback("Fingerprinting & Analysis", completed, discovered)
+
+    # Scanning -> Fingerprinting -> Analysis run as one pipeline
+    slots = _run_analysis(
+        discover_slots(), skip_graph, jobs, analysis_progress,
+        analysis_cache_path=content_cache.path if content_cache is not None else None
+    )
+    total_files = len(slots)
+
+    for slot in slots:
+        analysis = slot["analysis"]
+        if analysis is None:
+            # Unreadable file (locked, permissions, vanished mid-run)
+            continue
+
+        record_analysis(content_cache, analysis)
+
+        if cache is not None:
+            cache.store(slot["stable_id"], slot["signature"], analysis, analyzed=not skip_graph)
+
+        file_entries.append(FileEntry(
+            stable_id=slot["stable_id"],
+            path=slot["path"],
+            module_path=slot["module_path"],
+            **analysis
+        ))
+
+    if progress_callback:
+        progress_callback("Fingerprinting & Analysis", total_files, total_files)
+
+    if cache is not None:
+        cache.save()
+
+    if content_cache is not None:
+        content_cache.flush()
+        AnalysisCache.reset_readers()
+
+    file_entries = sorted(file_entries, key=lambda x: x.path)
+    abs_paths = {slot["stable_id"]: slot["abs_path"] for slot in slots if slot["analysis"] is not None}
+
+    if progress_callback:
+        progress_callback("Building Graph & Structure", total_files, total_files)
+
+    return file_entries, abs_paths
+
+
+def run_snapshot(
+    repo_root: str,
+    output_root: str,
+    depth: int,
+    ignore: List[str],
+    include_extensions: List[str],
+    include_readme: bool,
+    write_current_pointer: bool,
+    skip_graph: bool = False,
+    explicit_file_list: Optional[List[str]] = None,
+    export_flatten: bool = False,
+    progress_callback: Optional[Callable[[str, int, int], None]] = None,
+    manual_override: bool = False,
+    incremental: bool = False,
+    jobs: int = 1,
+    use_git_index: bool = False,
+    include_untracked: bool = False,
+    analysis_cache: bool = False,
+    analysis_cache_max_mb: int = 256,
+    enumerate_cycles: bool = False,
+    max_cycles: int = 1000,
+    compact_snapshot: bool = False,
+    dedup_snapshot: bool = False
+) -> str:
+    """
+    Creates a snapshot. Automatically ignores the output_root if it is inside the repo_root.
+    Reports progress across 3 phases: Scanning, Fingerprinting, and Analysis.
+
+    With `incremental`, files whose (size, mtime_ns, inode) match the output root's
+    fingerprint cache reuse their previous sha256/imports/symbols instead of being
+    re-read. The resulting snapshot is identical to a full run.
+
+    `jobs` > 1 fans fingerprinting and import analysis out to a process pool
+    (jobs <= 0 uses all cores). Output ordering is unaffected.
+
+    Scanning is streamed into fingerprinting/analysis, so work starts on the
+    first discovered file rather than after the full directory walk.
+
+    `use_git_index` enumerates tracked files from `.git/index` instead of walking
+    the tree (plus untracked files with `include_untracked`), and files git
+    reports as clean reuse their cached fingerprint keyed by blob id.
+
+    `analysis_cache` consults a content-addressed store of import/symbol results
+    (`{output_root}/.cache/analysis.sqlite`, LRU-capped at `analysis_cache_max_mb`)
+    after hashing, so identical contents are never parsed twice.
+
+    `enumerate_cycles` lists every elementary import cycle in graph.json
+    (up to `max_cycles`) instead of one representative set per component.
+
+    `compact_snapshot` also writes snapshot.rrc, a memory-mapped columnar copy
+    of the manifest and graph that compare/slice read without parsing JSON.
+
+    `dedup_snapshot` stores the snapshot in `{output_root}/.objects`, a
+    content-addressed pool shared by all snapshots of the output root, and
+    writes only root.json to the snapshot dir; unchanged modules are not
+    written again. SnapshotLoader reassembles the JSON artifacts on load.
+    """
+    repo_root_abs = os.path.abspath(repo_root)
+    output_root_abs = os.path.abspath(output_root)
+
+    if not os.path.isdir(repo_root_abs):
+        raise ValueError(f"Repository root does not exist: {repo_root_abs}")
+
+    # --- Self-Ignore Logic ---
+    effective_ignore = effective_ignore_names(repo_root_abs, output_root_abs, ignore)
+
+    git_repo = GitRepository.find(repo_root_abs)
+
+    file_entries, _ = collect_entries(
+        repo_root_abs, output_root_abs, git_repo, depth, effective_ignore, include_extensions,
+        include_readme, skip_graph, explicit_file_list, progress_callback, incremental, jobs,
+        use_git_index, include_untracked, analysis_cache, analysis_cache_max_mb
+    )
+
+    graph = None
+    if not skip_graph:
+        graph = GraphBuilder(enumerate_cycles=enumerate_cycles, max_cycles=max_cycles).build(file_entries)
+
+    manifest_config = ManifestConfig(
+        depth=depth,
+        ignore_names=list(effective_ignore),
+        include_extensions=include_extensions,
+        include_readme=include_readme,
+        tree_only=False,
+        skip_graph=skip_graph,
+        manual_override=explicit_file_list is not None or manual_override
+    )
+    snapshot_id, manifest = write_snapshot(
+        repo_root_abs, output_root, file_entries, graph, manifest_config, git_repo, write_current_pointer,
+        compact_snapshot=compact_snapshot,
+        dedup_snapshot=dedup_snapshot
     )
 
     if export_flatten:
@@ -277,35 +598,61 @@ def run_export_flatten(
     include_readme: bool,
     scope: str,
     title: Optional[str],
-    focus_id: Optional[str] = None,
+    focus_id: Optional[Union[str, List[str]]] = None,
     radius: int = 1,
     max_tokens: Optional[int] = None,
-    print_summary: bool = False
+    print_summary: bool = False,
+    direction: str = "both",
+    strategy: str = "bfs"
 ) -> str:
     """
     Exports a snapshot to Markdown.
+
+    With `focus_id` (one id, or a list sliced together), only the slice
+    around it is exported; `direction` and
+    `strategy` are passed to ContextSlicer (weighted slices always read the
+    JSON graph, since they need whole-graph centrality, which is saved to
+    the snapshot's centrality.bin on first use). BFS slices look up
+    only the records they reach, through a LazySnapshot.
     """
     loader = SnapshotLoader(output_root)
     snapshot_dir = loader.resolve_snapshot_dir(snapshot_id)
-    manifest = loader.load_manifest(snapshot_dir)
 
     telemetry_md = None
 
     if focus_id:
-        graph_path = os.path.join(snapshot_dir, "graph.json")
-        if not os.path.exists(graph_path):
-            raise FileNotFoundError(f"Cannot slice context: graph.json missing in {snapshot_dir}")
-        
-        with open(graph_path, "r", encoding="utf-8") as f:
-            graph_data = json.load(f)
-            
-        sliced_manifest = ContextSlicer.slice_manifest(
-            manifest=manifest, 
-            graph=graph_data, 
-            focus_id=focus_id, 
-            radius=radius,
-            max_tokens=max_tokens
-        )
+        focus_ids = [focus_id] if isinstance(focus_id, str) else focus_id
+        focus_label = ", ".join(focus_ids)
+        symbol_index = None
+        # Stored snapshots build symbols.idx on first lookup
+        has_index = SymbolIndex.exists(snapshot_dir) or StoredSnapshot.exists(snapshot_dir)
+        if any(f.startswith("symbol:") for f in focus_ids) and has_index:
+            symbol_index = SymbolIndex.for_snapshot(snapshot_dir)
+
+        if strategy == "bfs" and loader.has_graph(snapshot_dir):
+            # snapshot.rrc is built and saved on the first slice of a snapshot without one
+            with loader.open_lazy(snapshot_id) as lazy:
+                sliced_manifest = ContextSlicer.slice_compact(
+                    lazy.compact, focus_id=focus_id, radius=radius, max_tokens=max_tokens,
+                    symbol_index=symbol_index, direction=direction
+                )
+        else:
+            manifest = loader.load_manifest(snapshot_dir)
+            graph_data = loader.load_graph(snapshot_dir)
+            if graph_data is None:
+                raise FileNotFoundError(f"Cannot slice context: graph.json missing in {snapshot_dir}")
+                
+            sliced_manifest = ContextSlicer.slice_manifest(
+                manifest=manifest, 
+                graph=graph_data, 
+                focus_id=focus_id, 
+                radius=radius,
+                max_tokens=max_tokens,
+                index=ContextSlicer.build_index(manifest, graph_data, snapshot_dir),
+                symbol_index=symbol_index,
+                direction=direction,
+                strategy=strategy
+            )
         
         estimated = sliced_manifest.get("stats", {}).get("estimated_tokens", 0)
         usage_str = TokenTelemetry.format_usage(estimated, max_tokens or 0)
@@ -313,7 +660,7 @@ def run_export_flatten(
         
         telemetry_md = f"""
 ## Context Telemetry
-- **Focus:** `{focus_id}`
+- **Focus:** `{focus_label}`
 - **Radius:** {radius}
 - **Usage:** {usage_str}
 - **Cycles Included:** {cycles}
@@ -324,16 +671,20 @@ def run_export_flatten(
             print("\n" + "="*45)
             print(" Context Slice Summary")
             print("="*45)
-            print(f" Focus:    {manifest['telemetry']['focus_id']}")
-            print(f" Resolved: {manifest['telemetry']['resolved_id']}")
+            resolved = manifest['telemetry']['resolved_id']
+            print(f" Focus:    {focus_label}")
+            print(f" Resolved: {resolved if isinstance(resolved, str) else ', '.join(resolved)}")
             print(f" Radius:   {manifest['telemetry']['radius']} hops")
+            print(f" Mode:     {direction}, {strategy}")
             print(f" Usage:    {usage_str}")
             print(f" Files:    {manifest['stats']['file_count']}")
             print(f" Cycles:   {cycles} captured")
             print("="*45 + "\n")
 
         if not title:
-            title = f"Context Slice: {focus_id} (Radius: {radius})"
+            title = f"Context Slice: {focus_label} (Radius: {radius})"
+    else:
+        manifest = loader.load_manifest(snapshot_dir)
 
     exporter = FlattenMarkdownExporter()
 
@@ -350,17 +701,49 @@ def run_export_flatten(
         output_path=output_path,
         options=options,
         title=title,
+        preamble=telemetry_md + "\n\n" if telemetry_md else None,
     )
 
-    if telemetry_md and out_path and os.path.exists(out_path):
-        with open(out_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-        with open(out_path, 'w', encoding='utf-8') as f:
-            f.write(telemetry_md + "\n\n" + content)
-
     return out_path
 
 
+def run_export_flatten_sharded(
+    output_root: str,
+    repo_root: str,
+    snapshot_id: Optional[str],
+    output_dir: Optional[str],
+    tree_only: bool,
+    include_readme: bool,
+    scope: str,
+    title: Optional[str],
+    max_tokens_per_shard: int,
+    jobs: int = 4
+) -> str:
+    """
+    Exports a snapshot to several Markdown shards of at most
+    `max_tokens_per_shard` (estimated) each, keeping structure.json modules
+    together where possible. Returns the path of the shard index.
+    """
+    loader = SnapshotLoader(output_root)
+    snapshot_dir = loader.resolve_snapshot_dir(snapshot_id)
+    manifest = loader.load_manifest(snapshot_dir)
+    try:
+        structure = loader.load_structure(snapshot_dir)
+    except FileNotFoundError:
+        structure = None
+
+    exporter = ShardedFlattenExporter(max_tokens=max_tokens_per_shard, jobs=jobs)
+    return exporter.export(
+        repo_root=os.path.abspath(repo_root),
+        snapshot_dir=snapshot_dir,
+        manifest=manifest,
+        output_dir=output_dir,
+        options=FlattenOptions(tree_only=tree_only, include_readme=include_readme, scope=scope),
+        title=title,
+        structure=structure,
+    )
+
+
 def run_export_diagram(
     output_root: str,
     repo_root: str,
@@ -375,13 +758,10 @@ def run_export_diagram(
     loader = SnapshotLoader(output_root)
     snapshot_dir = loader.resolve_snapshot_dir(snapshot_id)
     
-    graph_path = os.path.join(snapshot_dir, "graph.json")
-    if not os.path.exists(graph_path):
+    graph_data = loader.load_graph(snapshot_dir)
+    if graph_data is None:
         raise FileNotFoundError(f"graph.json not found in {snapshot_dir}. Cannot generate diagram.")
         
-    with open(graph_path, "r", encoding="utf-8") as f:
-        graph_data = json.load(f)
-        
     graph = GraphStructure.model_validate(graph_data)
     
     if format == "mermaid":
@@ -394,55 +774,141 @@ def run_export_diagram(
     return exporter.export(snapshot_dir, graph, output_path, title)
 
 
+# snapshot dir -> (Manifest, GraphStructure or None)
+ModelLoader = Callable[[str], Tuple[Manifest, Optional[GraphStructure]]]
+
+
+def _load_graph_model(loader: SnapshotLoader, snapshot_dir: str) -> Optional[GraphStructure]:
+    graph_data = loader.load_graph(snapshot_dir)
+    return GraphStructure.model_validate(graph_data) if graph_data is not None else None
+
+
 def run_compare(
     output_root: str,
     base_id: str,
-    target_id: str
+    target_id: str,
+    detect_renames: bool = True,
+    rename_similarity: Optional[float] = None,
+    load_models: Optional[ModelLoader] = None
 ) -> SnapshotDiffReport:
     """
     Loads two snapshots and performs a structural diff.
+    Moved files are reported as `renamed` unless detect_renames is False;
+    see SnapshotComparator for rename_similarity.
+    `load_models(snapshot_dir)` replaces parsing the JSON artifacts when a
+    snapshot has neither a Merkle tree nor a compact form (e.g. the API's
+    parsed-snapshot cache).
     """
     loader = SnapshotLoader(output_root)
     
     dir_a = loader.resolve_snapshot_dir(base_id)
     dir_b = loader.resolve_snapshot_dir(target_id)
+    return _compare_snapshot_dirs(loader, dir_a, dir_b, detect_renames, rename_similarity, load_models)
+
+
+def run_compare_stream(
+    output_root: str,
+    base_id: str,
+    target_id: str,
+    detect_renames: bool = True,
+    rename_similarity: Optional[float] = None
+) -> DiffStream:
+    """
+    Like run_compare, but returns the diffs as a DiffStream that computes
+    them while it is iterated (e.g. into DiffStream.ndjson()), so large
+    diffs are never held in memory. Close it if not fully consumed.
+    """
+    loader = SnapshotLoader(output_root)
     
-    manifest_a = Manifest.model_validate(loader.load_manifest(dir_a))
-    manifest_b = Manifest.model_validate(loader.load_manifest(dir_b))
+    dir_a = loader.resolve_snapshot_dir(base_id)
+    dir_b = loader.resolve_snapshot_dir(target_id)
+    return _stream_snapshot_dirs(loader, dir_a, dir_b, detect_renames, rename_similarity)
+
+
+def _compare_snapshot_dirs(
+    loader: SnapshotLoader,
+    dir_a: str,
+    dir_b: str,
+    detect_renames: bool = True,
+    rename_similarity: Optional[float] = None,
+    load_models: Optional[ModelLoader] = None
+) -> SnapshotDiffReport:
+    return _stream_snapshot_dirs(loader, dir_a, dir_b, detect_renames, rename_similarity, load_models).report()
+
+
+def _stream_snapshot_dirs(
+    loader: SnapshotLoader,
+    dir_a: str,
+    dir_b: str,
+    detect_renames: bool = True,
+    rename_similarity: Optional[float] = None,
+    load_models: Optional[ModelLoader] = None
+) -> DiffStream:
+    """Diffs two snapshot dirs through the cheapest form both of them have."""
+    # Merkle trees on both sides: only differing modules are read
+    tree_a = SnapshotTree.open(dir_a)
+    tree_b = SnapshotTree.open(dir_b) if tree_a is not None else None
+    if tree_a is not None and tree_b is not None:
+        return SnapshotComparator.stream_trees(tree_a, tree_b, detect_renames, rename_similarity)
+
+    # Compact form on both sides: diff without materializing manifests or graphs
+    compact_a = loader.load_compact(dir_a)
+    compact_b = loader.load_compact(dir_b) if compact_a is not None else None
+    if compact_a is not None and compact_b is not None:
+        return SnapshotComparator.stream_compact(
+            compact_a, compact_b, close_snapshots=True,
+            detect_renames=detect_renames, rename_similarity=rename_similarity
+        )
+    if compact_a is not None:
+        compact_a.close()
     
-    ga_path = os.path.join(dir_a, "graph.json")
-    gb_path = os.path.join(dir_b, "graph.json")
+    if load_models is not None:
+        manifest_a, g_a = load_models(dir_a)
+        manifest_b, g_b = load_models(dir_b)
+    else:
+        manifest_a = Manifest.model_validate(loader.load_manifest(dir_a))
+        manifest_b = Manifest.model_validate(loader.load_manifest(dir_b))
     
-    g_a, g_b = None, None
-    if os.path.exists(ga_path):
-        with open(ga_path, "r", encoding="utf-8") as f:
-            g_a = GraphStructure.model_validate(json.load(f))
-    if os.path.exists(gb_path):
-        with open(gb_path, "r", encoding="utf-8") as f:
-            g_b = GraphStructure.model_validate(json.load(f))
+        g_a = _load_graph_model(loader, dir_a)
+        g_b = _load_graph_model(loader, dir_b)
 
-    return SnapshotComparator.compare(manifest_a, manifest_b, g_a, g_b)
+    return SnapshotComparator.stream(manifest_a, manifest_b, g_a, g_b, detect_renames, rename_similarity)
+
+
+def _rekey_summary(summary: str, old_id: str, new_id: str) -> Optional[str]:
+    """
+    Points a compressed summary at a file's new path: its leading
+    "### `path`" header (see scripts/llm_compressor.py) is rewritten.
+    Returns None if the summary does not start with the old path's header.
+    """
+    old_path = old_id.replace("file:", "", 1)
+    new_path = new_id.replace("file:", "", 1)
+    header, sep, body = summary.lstrip().partition("\n")
+    if header.strip() != f"### `{old_path}`":
+        return None
+    return f"### `{new_path}`" + sep + body
 
 
 def run_export_compression_state(
     output_root: str,
     base_id: str,
     target_id: str,
-    state_dir: str
+    state_dir: str,
+    rename_similarity: Optional[float] = None
 ) -> Dict[str, Any]:
     """
     Synchronizes incremental context compression state files.
     Maintains `master_compressed_context.json` and `file_changed_bool.json`
     based on the deterministic diff between base and target snapshots.
     Supports base_id="empty" for initial generation.
+    Renamed files keep their summary under the new id; it is only queued
+    for recompression if the content changed (a near-rename).
     """
     loader = SnapshotLoader(output_root)
     
-    # Load Target
     dir_b = loader.resolve_snapshot_dir(target_id)
-    manifest_b = Manifest.model_validate(loader.load_manifest(dir_b))
     
-    # Load or Mock Base
+    # Calculate Diff deterministically (against an empty base for initial generation)
     if base_id.lower() == "empty":
         manifest_a = Manifest(
             tool={"name": "repo-runner", "version": "0.2.0"},
@@ -455,24 +921,11 @@ def run_export_compression_state(
             stats=ManifestStats(file_count=0, total_bytes=0),
             files=[]
         )
-        g_a = None
+        manifest_b = Manifest.model_validate(loader.load_manifest(dir_b))
+        report = SnapshotComparator.compare(manifest_a, manifest_b, None, _load_graph_model(loader, dir_b))
     else:
         dir_a = loader.resolve_snapshot_dir(base_id)
-        manifest_a = Manifest.model_validate(loader.load_manifest(dir_a))
-        ga_path = os.path.join(dir_a, "graph.json")
-        g_a = None
-        if os.path.exists(ga_path):
-            with open(ga_path, "r", encoding="utf-8") as f:
-                g_a = GraphStructure.model_validate(json.load(f))
-                
-    gb_path = os.path.join(dir_b, "graph.json")
-    g_b = None
-    if os.path.exists(gb_path):
-        with open(gb_path, "r", encoding="utf-8") as f:
-            g_b = GraphStructure.model_validate(json.load(f))
-
-    # Calculate Diff deterministically
-    report = SnapshotComparator.compare(manifest_a, manifest_b, g_a, g_b)
+        report = _compare_snapshot_dirs(loader, dir_a, dir_b, rename_similarity=rename_similarity)
 
     master_ctx_path = os.path.join(state_dir, "master_compressed_context.json")
     changed_bool_path = os.path.join(state_dir, "file_changed_bool.json")
@@ -494,6 +947,16 @@ def run_export_compression_state(
             changed_bool.pop(fd.stable_id, None)
         elif fd.status in ("added", "modified"):
             changed_bool[fd.stable_id] = 1
+        elif fd.status == "renamed":
+            pending = changed_bool.pop(fd.old_stable_id, 1)
+            summary = master_ctx.pop(fd.old_stable_id, None)
+            if summary is not None:
+                summary = _rekey_summary(summary, fd.old_stable_id, fd.stable_id)
+                if summary is None:
+                    pending = 1  # header not recognized: recompress rather than keep a stale path
+                else:
+                    master_ctx[fd.stable_id] = summary
+            changed_bool[fd.stable_id] = 1 if fd.old_sha256 != fd.new_sha256 else pending
 
     os.makedirs(state_dir, exist_ok=True)
     
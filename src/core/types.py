@@ -13,6 +13,19 @@ class RepoRunnerConfig(BaseModel):
     include_readme: bool = True
     skip_graph: bool = False
     export_flatten: bool = False
+    incremental: bool = False
+    jobs: int = 1
+    use_git_index: bool = False
+    include_untracked: bool = False
+    analysis_cache: bool = False
+    analysis_cache_max_mb: int = 256
+    enumerate_cycles: bool = False
+    max_cycles: int = 1000
+    compact_snapshot: bool = False
+    dedup_snapshot: bool = False
+    watch_debounce_ms: int = 200
+    watch_backend: str = "auto"
+    watch_poll_interval: float = 0.5
 
 class FileEntry(BaseModel):
     """
@@ -68,11 +81,17 @@ class UnresolvedReference(BaseModel):
     import_ref: str
 
 class GraphStructure(BaseModel):
-    schema_version: str = "1.1" # Bumped from 1.0 for new field
+    schema_version: str = "1.2" # 1.2: components, cycles_truncated
     nodes: List[GraphNode]
     edges: List[GraphEdge]
     cycles: List[List[str]] = Field(default_factory=list)
     has_cycles: bool = False
+
+    # New in v1.2: strongly connected components that contain a cycle (sorted
+    # member lists). An edge lies on some cycle iff both ends share a component.
+    components: List[List[str]] = Field(default_factory=list)
+    # True when cycle enumeration stopped at its cap
+    cycles_truncated: bool = False
     
     # New in v1.1: Track broken links instead of silently dropping them
     unresolved_references: List[UnresolvedReference] = Field(default_factory=list)
@@ -113,10 +132,15 @@ class Manifest(BaseModel):
 
 class FileDiff(BaseModel):
     stable_id: str
-    status: str # 'added', 'removed', 'modified'
+    status: str # 'added', 'removed', 'modified', 'renamed'
     old_sha256: Optional[str] = None
     new_sha256: Optional[str] = None
 
+    # 'renamed' only: stable_id is the new id, old_stable_id the id it was
+    # removed under; similarity is 1.0 for identical contents
+    old_stable_id: Optional[str] = None
+    similarity: Optional[float] = None
+
 class EdgeDiff(BaseModel):
     source: str
     target: str
@@ -129,6 +153,7 @@ class SnapshotDiffReport(BaseModel):
     files_added: int = 0
     files_removed: int = 0
     files_modified: int = 0
+    files_renamed: int = 0
     edges_added: int = 0
     edges_removed: int = 0
     file_diffs: List[FileDiff] = Field(default_factory=list)
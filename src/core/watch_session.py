@@ -0,0 +1,347 @@
+import os
+import time
+from typing import Callable, Dict, List, Optional, Set, Tuple, Any
+
+from src.core.types import FileEntry, GraphStructure, ManifestConfig
+from src.core.controller import (
+    analyze_file_or_none,
+    collect_entries,
+    effective_ignore_names,
+    record_analysis,
+    write_snapshot,
+)
+from src.analysis.analysis_cache import AnalysisCache
+from src.analysis.graph_builder import GraphBuilder
+from src.normalize.path_normalizer import PathNormalizer
+from src.scanner.change_watcher import ChangeWatcher, collect_changes
+from src.scanner.filesystem_scanner import FileSystemScanner
+from src.scanner.git_index import GitRepository
+
+
+class WatchSession:
+    """
+    Keeps a snapshot hot in memory: FileEntries, their absolute paths and stat
+    signatures, and the dependency graph. apply_changes() re-fingerprints only
+    the touched files and writes a new snapshot identical to a full run.
+
+    `incremental` speeds up the initial full scan as in run_snapshot; the
+    analysis cache options apply to it and to every update. `use_git_index` is rejected: changes are found
+    by watching the tree, which a git-index enumeration would not match.
+    """
+
+    def __init__(
+        self,
+        repo_root: str,
+        output_root: str,
+        depth: int,
+        ignore: List[str],
+        include_extensions: List[str],
+        include_readme: bool,
+        skip_graph: bool = False,
+        write_current_pointer: bool = True,
+        jobs: int = 1,
+        enumerate_cycles: bool = False,
+        max_cycles: int = 1000,
+        compact_snapshot: bool = False,
+        dedup_snapshot: bool = False,
+        incremental: bool = False,
+        analysis_cache: bool = False,
+        analysis_cache_max_mb: int = 256,
+        use_git_index: bool = False
+    ):
+        if use_git_index:
+            raise ValueError("Watch mode scans the file tree; use_git_index is not supported")
+
+        # Watch backends report canonical paths; normalize against the same root
+        self.repo_root = os.path.realpath(repo_root)
+        self.output_root = output_root
+        self.depth = depth
+        self.include_extensions = include_extensions
+        self.include_readme = include_readme
+        self.skip_graph = skip_graph
+        self.write_current_pointer = write_current_pointer
+        self.jobs = jobs
+        self.compact_snapshot = compact_snapshot
+        self.dedup_snapshot = dedup_snapshot
+        self.incremental = incremental
+        self.analysis_cache = analysis_cache
+        self.analysis_cache_max_mb = analysis_cache_max_mb
+
+        if not os.path.isdir(self.repo_root):
+            raise ValueError(f"Repository root does not exist: {self.repo_root}")
+
+        self.ignore = effective_ignore_names(self.repo_root, os.path.abspath(output_root), ignore)
+        self._extensions = {e.lower() for e in include_extensions}
+        self._normalizer = PathNormalizer(self.repo_root)
+        self._git_repo = GitRepository.find(self.repo_root)
+        self._content_cache: Optional[AnalysisCache] = None
+        if analysis_cache and not skip_graph:
+            self._content_cache = AnalysisCache(
+                os.path.abspath(output_root), max_bytes=analysis_cache_max_mb * 1024 * 1024
+            )
+
+        self.entries: Dict[str, FileEntry] = {}       # stable_id -> entry
+        self.abs_paths: Dict[str, str] = {}           # stable_id -> absolute path
+        self.signatures: Dict[str, Tuple[int, int, int]] = {}  # absolute path -> stat signature
+        self.graph: Optional[GraphStructure] = None
+        self._graph_builder = GraphBuilder(enumerate_cycles=enumerate_cycles, max_cycles=max_cycles)
+        self.snapshot_id: Optional[str] = None
+
+    @staticmethod
+    def _signature(st: os.stat_result) -> Tuple[int, int, int]:
+        return (st.st_size, st.st_mtime_ns, st.st_ino)
+
+    def start(self, progress_callback: Optional[Callable[[str, int, int], None]] = None) -> str:
+        """Full scan and snapshot; populates the in-memory state."""
+        entries, abs_paths = collect_entries(
+            repo_root_abs=self.repo_root,
+            output_root_abs=os.path.abspath(self.output_root),
+            git_repo=self._git_repo,
+            depth=self.depth,
+            effective_ignore=self.ignore,
+            include_extensions=self.include_extensions,
+            include_readme=self.include_readme,
+            skip_graph=self.skip_graph,
+            explicit_file_list=None,
+            progress_callback=progress_callback,
+            incremental=self.incremental,
+            jobs=self.jobs,
+            use_git_index=False,
+            include_untracked=False,
+            analysis_cache=self.analysis_cache,
+            analysis_cache_max_mb=self.analysis_cache_max_mb
+        )
+        self.entries = {e.stable_id: e for e in entries}
+        self.abs_paths = abs_paths
+        self.signatures = {}
+        for abs_path in abs_paths.values():
+            try:
+                self.signatures[abs_path] = self._signature(os.stat(abs_path))
+            except OSError:
+                pass
+
+        self.graph = self._graph_builder.build(entries) if not self.skip_graph else None
+        self.snapshot_id = self._write(entries)
+        return self.snapshot_id
+
+    def _included(self, abs_path: str) -> bool:
+        rel = os.path.relpath(abs_path, self.repo_root)
+        parts = rel.split(os.sep)
+        if parts[0] == os.pardir or any(part in self.ignore for part in parts):
+            return False
+        if self.depth >= 0 and len(parts) - 1 > self.depth:
+            return False
+        if self._extensions and os.path.splitext(abs_path)[1].lower() not in self._extensions:
+            return False
+        if not self.include_readme and parts[-1].lower().startswith("readme"):
+            return False
+        return os.path.isfile(abs_path)
+
+    def _expand(self, changed: Optional[Set[str]]) -> Set[str]:
+        """Turns watcher output into candidate file paths (directories cover their known files)."""
+        known = set(self.abs_paths.values())
+        if changed is None:
+            scanner = FileSystemScanner(depth=self.depth, ignore_names=self.ignore)
+            return set(scanner.scan_iter([self.repo_root])) | known
+
+        candidates: Set[str] = set()
+        for path in changed:
+            if path in known or os.path.isfile(path):
+                candidates.add(path)
+                continue
+            prefix = path.rstrip(os.sep) + os.sep
+            candidates.update(p for p in known if p.startswith(prefix))
+            if os.path.isdir(path):
+                scanner = FileSystemScanner(depth=-1, ignore_names=self.ignore)
+                candidates.update(scanner.scan_iter([path]))
+        return candidates
+
+    def apply_changes(self, changed: Optional[Set[str]]) -> Optional[Dict[str, Any]]:
+        """
+        Applies a batch of changed paths (None = full rescan). Returns a summary
+        with the new snapshot_id, or None if nothing relevant changed.
+        Raises ValueError on a stable ID collision, leaving the state untouched.
+        """
+        started = time.perf_counter()
+        id_by_path = {p: sid for sid, p in self.abs_paths.items()}
+
+        removed: Set[str] = set()
+        updates: Dict[str, Tuple[str, Tuple[int, int, int]]] = {}  # stable_id -> (abs_path, signature)
+
+        for abs_path in sorted(self._expand(changed)):
+            previous_id = id_by_path.get(abs_path)
+            st = None
+            if self._included(abs_path):
+                try:
+                    st = os.stat(abs_path)
+                except OSError:
+                    st = None
+
+            if st is None:
+                if previous_id is not None:
+                    removed.add(previous_id)
+                continue
+
+            signature = self._signature(st)
+            if previous_id is not None and self.signatures.get(abs_path) == signature:
+                continue
+
+            try:
+                stable_id = self._normalizer.file_id(self._normalizer.normalize(abs_path))
+            except ValueError:
+                continue
+
+            owner = updates.get(stable_id, (self.abs_paths.get(stable_id), None))[0]
+            if owner is not None and owner != abs_path and os.path.exists(owner) and stable_id not in removed:
+                raise ValueError(
+                    f"ID Collision Detected!\n"
+                    f"Stable ID: {stable_id}\n"
+                    f"Source 1: {owner}\n"
+                    f"Source 2: {abs_path}\n"
+                    f"Repo-runner enforces lowercase IDs. "
+                    f"Please rename one of these files to avoid ambiguity."
+                )
+            updates[stable_id] = (abs_path, signature)
+
+        analyzed: Dict[str, FileEntry] = {}
+        cache_path = self._content_cache.path if self._content_cache is not None else None
+        for stable_id, (abs_path, _) in updates.items():
+            analysis = analyze_file_or_none(abs_path, self.skip_graph, cache_path)
+            if analysis is None:
+                if stable_id in self.entries:
+                    removed.add(stable_id)
+                continue
+            record_analysis(self._content_cache, analysis)
+            normalized = self._normalizer.normalize(abs_path)
+            analyzed[stable_id] = FileEntry(
+                stable_id=stable_id,
+                path=normalized,
+                module_path=self._normalizer.module_path(normalized),
+                **analysis
+            )
+
+        if self._content_cache is not None:
+            self._content_cache.flush()
+
+        # An ID re-created under a new case variant is a modification, not a removal
+        removed -= analyzed.keys()
+        added = {sid for sid in analyzed if sid not in self.entries}
+        modified = {
+            sid for sid in analyzed
+            if sid in self.entries and analyzed[sid] != self.entries[sid]
+        }
+
+        removed_entries = [self.entries[sid] for sid in sorted(removed) if sid in self.entries]
+        for stable_id in removed:
+            old_path = self.abs_paths.pop(stable_id, None)
+            self.signatures.pop(old_path, None)
+            self.entries.pop(stable_id, None)
+        for stable_id, entry in analyzed.items():
+            old_path = self.abs_paths.get(stable_id)
+            if old_path is not None and old_path != updates[stable_id][0]:
+                self.signatures.pop(old_path, None)
+            abs_path, signature = updates[stable_id]
+            self.abs_paths[stable_id] = abs_path
+            self.signatures[abs_path] = signature
+            self.entries[stable_id] = entry
+
+        if not (added or removed or modified):
+            return None
+
+        entries = sorted(self.entries.values(), key=lambda e: e.path)
+        if not self.skip_graph:
+            self.graph = self._graph_builder.update(
+                self.graph,
+                entries,
+                added=[self.entries[sid] for sid in sorted(added)],
+                removed=removed_entries,
+                modified=[self.entries[sid] for sid in sorted(modified)]
+            )
+        self.snapshot_id = self._write(entries)
+
+        return {
+            "snapshot_id": self.snapshot_id,
+            "added": len(added),
+            "removed": len(removed),
+            "modified": len(modified),
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+        }
+
+    def _write(self, entries: List[FileEntry]) -> str:
+        manifest_config = ManifestConfig(
+            depth=self.depth,
+            ignore_names=list(self.ignore),
+            include_extensions=self.include_extensions,
+            include_readme=self.include_readme,
+            tree_only=False,
+            skip_graph=self.skip_graph,
+            manual_override=False
+        )
+        snapshot_id, _ = write_snapshot(
+            self.repo_root, self.output_root, entries, self.graph, manifest_config,
+            self._git_repo, self.write_current_pointer, compact_snapshot=self.compact_snapshot,
+            dedup_snapshot=self.dedup_snapshot
+        )
+        return snapshot_id
+
+
+def run_watch(
+    repo_root: str,
+    output_root: str,
+    depth: int,
+    ignore: List[str],
+    include_extensions: List[str],
+    include_readme: bool,
+    skip_graph: bool = False,
+    jobs: int = 1,
+    enumerate_cycles: bool = False,
+    max_cycles: int = 1000,
+    compact_snapshot: bool = False,
+    dedup_snapshot: bool = False,
+    incremental: bool = False,
+    analysis_cache: bool = False,
+    analysis_cache_max_mb: int = 256,
+    use_git_index: bool = False,
+    debounce_ms: int = 200,
+    backend: str = "auto",
+    poll_interval: float = 0.5,
+    on_update: Optional[Callable[[Dict[str, Any]], None]] = None,
+    on_error: Optional[Callable[[Exception], None]] = None,
+    should_stop: Optional[Callable[[], bool]] = None,
+    progress_callback: Optional[Callable[[str, int, int], None]] = None
+) -> str:
+    """
+    Takes a full snapshot, then watches the tree and writes a new snapshot
+    (and current.json) for every debounced batch of changes until
+    `should_stop` returns True. Returns the last snapshot id.
+    Raises ValueError for options WatchSession does not support.
+    """
+    session = WatchSession(
+        repo_root, output_root, depth, ignore, include_extensions, include_readme,
+        skip_graph=skip_graph, jobs=jobs, enumerate_cycles=enumerate_cycles, max_cycles=max_cycles,
+        compact_snapshot=compact_snapshot, dedup_snapshot=dedup_snapshot,
+        incremental=incremental, analysis_cache=analysis_cache,
+        analysis_cache_max_mb=analysis_cache_max_mb, use_git_index=use_git_index
+    )
+
+    # Watches are established before the initial scan so no edit falls in between
+    debounce = debounce_ms / 1000.0
+    with ChangeWatcher.create(session.repo_root, depth, session.ignore, backend, poll_interval) as watcher:
+        snapshot_id = session.start(progress_callback)
+        if on_update:
+            on_update({"snapshot_id": snapshot_id, "added": len(session.entries), "removed": 0, "modified": 0})
+
+        while not (should_stop and should_stop()):
+            changed = collect_changes(watcher, debounce, max_delay=max(debounce * 10, 2.0), timeout=0.5)
+            if changed is not None and not changed:
+                continue
+            try:
+                summary = session.apply_changes(changed)
+            except ValueError as e:
+                if on_error:
+                    on_error(e)
+                continue
+            if summary and on_update:
+                on_update(summary)
+
+    return session.snapshot_id
@@ -4,6 +4,7 @@ import io
 from collections import defaultdict
 from typing import Optional
 from src.core.types import GraphStructure
+from src.analysis.graph_cycles import GraphCycles
 
 class DrawioExporter:
     """
@@ -33,10 +34,16 @@ class DrawioExporter:
         return output_path
 
     def _generate_csv(self, graph: GraphStructure) -> str:
-        # Pre-compute outgoing edges for the 'refs' column
+        cycle_nodes, is_cycle_edge = GraphCycles.cycle_lookup(graph)
+
+        # Pre-compute outgoing edges for the 'refs' / 'cycle_refs' columns
         edges_by_source = defaultdict(list)
+        cycle_edges_by_source = defaultdict(list)
         for edge in graph.edges:
-            edges_by_source[edge.source].append(edge.target)
+            if is_cycle_edge(edge.source, edge.target):
+                cycle_edges_by_source[edge.source].append(edge.target)
+            else:
+                edges_by_source[edge.source].append(edge.target)
 
         output = io.StringIO()
         
@@ -46,6 +53,7 @@ class DrawioExporter:
         output.write("# style: %style%\n")
         output.write("# parent: %parent%\n")
         output.write("# connect: {\"from\": \"refs\", \"to\": \"id\", \"invert\": false, \"style\": \"edgeStyle=orthogonalEdgeStyle;rounded=1;html=1;strokeColor=#808080;\"}\n")
+        output.write("# connect: {\"from\": \"cycle_refs\", \"to\": \"id\", \"invert\": false, \"style\": \"edgeStyle=orthogonalEdgeStyle;rounded=1;html=1;strokeColor=#c62828;strokeWidth=2;dashed=1;\"}\n")
         output.write("# layout: horizontalflow\n")
         output.write("# nodespacing: 40\n")
         output.write("# levelspacing: 80\n")
@@ -53,7 +61,7 @@ class DrawioExporter:
         
         # CSV Data Header
         writer = csv.writer(output)
-        writer.writerow(["id", "label", "style", "refs", "parent"])
+        writer.writerow(["id", "label", "style", "refs", "cycle_refs", "parent"])
 
         # 1. Module Containers (Swimlanes)
         modules = set()
@@ -66,14 +74,13 @@ class DrawioExporter:
             mod_id = f"module_{mod}"
             # Draw.io swimlane style
             style = "shape=swimlane;fillColor=#f8f9fa;strokeColor=#ced4da;fontColor=#212529;rounded=1;startSize=25;"
-            writer.writerow([mod_id, mod, style, "", ""])
+            writer.writerow([mod_id, mod, style, "", "", ""])
 
         # 2. Nodes (Files & Externals)
-        cycle_nodes = {n for cycle in graph.cycles for n in cycle}
-
         for node in graph.nodes:
             # Comma-separated list of target IDs
             refs = ",".join(edges_by_source.get(node.id, []))
+            cycle_refs = ",".join(cycle_edges_by_source.get(node.id, []))
             
             if node.type == "external":
                 label = node.id.replace("external:", "")
@@ -89,6 +96,6 @@ class DrawioExporter:
             if node.id in cycle_nodes:
                 style += "strokeWidth=3;strokeColor=#c62828;fillColor=#ffebee;"
 
-            writer.writerow([node.id, label, style, refs, parent])
+            writer.writerow([node.id, label, style, refs, cycle_refs, parent])
 
         return output.getvalue()
\ No newline at end of file
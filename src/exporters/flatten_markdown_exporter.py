@@ -1,6 +1,9 @@
+import io
 import os
 from dataclasses import dataclass
-from typing import Dict, List, Optional
+from typing import Dict, Iterator, List, Optional, TextIO
+
+from src.fingerprint.file_reader import FileReader
 
 @dataclass(frozen=True)
 class FlattenOptions:
@@ -19,6 +22,9 @@ class FlattenMarkdownExporter:
         ".d.ts",
     }
 
+    # Output file buffer; blocks are written as they are rendered
+    WRITE_BUFFER_BYTES = 1 << 20
+
     def generate_content(
         self,
         repo_root: str,
@@ -28,9 +34,29 @@ class FlattenMarkdownExporter:
         snapshot_id: str = "PREVIEW"
     ) -> str:
         """Generates the markdown content as a string without writing to disk."""
+        buffer = io.StringIO()
+        self.write(buffer, repo_root, manifest, options, title, snapshot_id)
+        return buffer.getvalue()
+
+    def write(
+        self,
+        out: TextIO,
+        repo_root: str,
+        manifest: Dict,
+        options: FlattenOptions,
+        title: Optional[str] = None,
+        snapshot_id: str = "PREVIEW",
+        preamble: Optional[str] = None
+    ) -> int:
+        """
+        Streams the export to `out` one block at a time (one file's contents
+        in memory at most), counting characters as it goes; the stats footer
+        comes last, so nothing has to be rewritten. `preamble` is written
+        first and not counted. Returns the body's character count.
+        """
         files = self._canonical_files_from_manifest(manifest, options)
-        tree_md = self._render_tree([f["path"] for f in files])
-        content_md = "" if options.tree_only else self._render_contents(repo_root, files)
+        if preamble:
+            out.write(preamble)
 
         # Header Construction
         header_lines = [
@@ -44,12 +70,25 @@ class FlattenMarkdownExporter:
         ]
 
         # Body Construction
-        body = "\n".join(header_lines) + tree_md + ("\n" + content_md if content_md else "")
+        total_chars = 0
+
+        def emit(text: str) -> None:
+            nonlocal total_chars
+            out.write(text)
+            total_chars += len(text)
+
+        emit("\n".join(header_lines))
+        emit(self._render_tree([f["path"] for f in files]))
+        if not options.tree_only:
+            emit("\n")
+            for i, block in enumerate(self._content_blocks(repo_root, files)):
+                if i:
+                    emit("\n")
+                emit(block)
 
         # Footer Construction (Token Estimation)
         # We estimate tokens simply as chars / 4 for standard English/Code mix.
         # This is not exact (tiktoken would be better), but good enough for a rough gauge.
-        total_chars = len(body)
         est_tokens = total_chars // 4
         
         footer_lines = [
@@ -61,8 +100,8 @@ class FlattenMarkdownExporter:
             "- **Model Fit:** " + self._get_model_fit(est_tokens),
             ""
         ]
-        
-        return body + "\n".join(footer_lines)
+        out.write("\n".join(footer_lines))
+        return total_chars
 
     def _get_model_fit(self, tokens: int) -> str:
         if tokens < 8000: return "GPT-4 (8k)"
@@ -70,7 +109,7 @@ class FlattenMarkdownExporter:
         if tokens < 120000: return "GPT-4 Turbo / Claude 3 Haiku (128k)"
         if tokens < 200000: return "Claude 3.5 Sonnet (200k)"
         if tokens < 1000000: return "Gemini 1.5 Pro (1M)"
-        return "⚠️ EXCEEDS 1M (Chunking Required)"
+        return "⚠️ EXCEEDS 1M (Chunking Required: export with --shard-tokens)"
 
     def export(
         self,
@@ -80,17 +119,18 @@ class FlattenMarkdownExporter:
         output_path: Optional[str],
         options: FlattenOptions,
         title: Optional[str] = None,
+        preamble: Optional[str] = None,
     ) -> str:
+        """Writes the export to `output_path` (default: exports/flatten.md), `preamble` first."""
         snapshot_id = os.path.basename(snapshot_dir)
-        final_md = self.generate_content(repo_root, manifest, options, title, snapshot_id)
 
         if output_path is None:
             exports_dir = os.path.join(snapshot_dir, "exports")
             os.makedirs(exports_dir, exist_ok=True)
             output_path = os.path.join(exports_dir, "flatten.md")
 
-        with open(output_path, "w", encoding="utf-8", newline="\n") as f:
-            f.write(final_md)
+        with open(output_path, "w", encoding="utf-8", newline="\n", buffering=self.WRITE_BUFFER_BYTES) as f:
+            self.write(f, repo_root, manifest, options, title, snapshot_id, preamble)
 
         return output_path
 
@@ -148,36 +188,37 @@ class FlattenMarkdownExporter:
             lines.extend(self._tree_lines(node[key], child_prefix))
         return lines
 
-    def _render_contents(self, repo_root: str, files: List[Dict]) -> str:
-        blocks = ["## File Contents", ""]
+    def _content_blocks(self, repo_root: str, files: List[Dict]) -> Iterator[str]:
+        """The "## File Contents" section as lines/blocks to be joined by newlines, read lazily."""
+        yield "## File Contents"
+        yield ""
         for entry in files:
             path = entry["path"]
             abs_path = os.path.join(repo_root, path.replace("/", os.sep))
-            blocks.append(f"### `{path}`")
-            blocks.append("")
+            yield f"### `{path}`"
+            yield ""
             ext = os.path.splitext(path)[1].lower()
-            if ext not in self.TEXT_EXTENSIONS or self._sniff_binary(abs_path):
-                blocks.append(self._binary_placeholder(entry))
-                blocks.append("")
+            if ext not in self.TEXT_EXTENSIONS:
+                yield self._binary_placeholder(entry)
+                yield ""
                 continue
+            # Single read: sniff and decode from the same buffer
             try:
-                with open(abs_path, "r", encoding="utf-8", errors="replace") as f:
-                    content = f.read()
+                with FileReader.read(abs_path) as file_content:
+                    if file_content.is_binary():
+                        content = None
+                    else:
+                        content = file_content.text(encoding="utf-8", errors="replace")
             except OSError as e:
                 content = f"<<ERROR: {e}>>"
-            blocks.append(f"```")
-            blocks.append(content.rstrip("\n"))
-            blocks.append("```")
-            blocks.append("")
-        return "\n".join(blocks)
-
-    @staticmethod
-    def _sniff_binary(abs_path: str) -> bool:
-        try:
-            with open(abs_path, "rb") as f:
-                chunk = f.read(4096)
-        except OSError: return False
-        return b"\x00" in chunk
+            if content is None:
+                yield self._binary_placeholder(entry)
+                yield ""
+                continue
+            yield f"```"
+            yield content.rstrip("\n")
+            yield "```"
+            yield ""
 
     @staticmethod
     def _binary_placeholder(entry: Dict) -> str:
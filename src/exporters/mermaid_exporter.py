@@ -1,6 +1,7 @@
 import os
 from typing import Dict, List, Optional, Set
 from src.core.types import GraphStructure, GraphNode, GraphEdge
+from src.analysis.graph_cycles import GraphCycles
 
 class MermaidExporter:
     """
@@ -46,10 +47,7 @@ class MermaidExporter:
         modules: Dict[str, List[GraphNode]] = {}
         externals: List[GraphNode] = []
         
-        cycle_nodes = set()
-        for cycle in graph.cycles:
-            for node_id in cycle:
-                cycle_nodes.add(node_id)
+        cycle_nodes, is_cycle_edge = GraphCycles.cycle_lookup(graph)
 
         for node in graph.nodes:
             if node.type == "external":
@@ -100,11 +98,9 @@ class MermaidExporter:
             tgt = self._escape_id(edge.target)
             
             # Highlight edges that are part of a cycle
-            # (Simple heuristic: if both nodes are in the SAME cycle, color it)
-            is_cycle_edge = self._is_cycle_edge(edge.source, edge.target, graph.cycles)
-            
+            # (both ends in the same strongly connected component)
             arrow = "-->"
-            if is_cycle_edge:
+            if is_cycle_edge(edge.source, edge.target):
                 arrow = "-.->|CYCLE|"
                 # In mermaid, we can't easily style individual edges without ID hacks, 
                 # but the label helps.
@@ -126,17 +122,3 @@ class MermaidExporter:
             .replace("-", "_")
             .replace("@", "_")
         )
-
-    def _is_cycle_edge(self, source: str, target: str, cycles: List[List[str]]) -> bool:
-        for cycle in cycles:
-            if source in cycle and target in cycle:
-                # Check if they are adjacent in the cycle list (considering wrap-around)
-                try:
-                    src_idx = cycle.index(source)
-                    tgt_idx = cycle.index(target)
-                    
-                    if (src_idx + 1) % len(cycle) == tgt_idx:
-                        return True
-                except ValueError:
-                    continue
-        return False
\ No newline at end of file
@@ -0,0 +1,178 @@
+import os
+import json
+import bisect
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+from src.exporters.flatten_markdown_exporter import FlattenMarkdownExporter, FlattenOptions
+
+
+class ShardedFlattenExporter:
+    """
+    Splits a flatten export into several Markdown files ("shards"), each
+    estimated to stay under `max_tokens`, plus an index file mapping every
+    stable_id to its shard.
+
+    Packing keeps the modules of structure.json together where they fit:
+    modules (split in path order when a module alone exceeds the budget) are
+    packed best-fit-decreasing into shards. Without a structure, files are
+    packed individually by size. A file larger than the budget gets a shard
+    of its own. Each shard is an ordinary flatten export of its files, so it
+    carries its own tree header and stats footer.
+    """
+
+    INDEX_FILENAME = "flatten.index.json"
+
+    # Per-shard header, tree frame and footer, in characters
+    SHARD_OVERHEAD_CHARS = 512
+    # Heading, fences and tree line around each file, beyond twice its path
+    FILE_OVERHEAD_CHARS = 24
+    # Rendered size of <<BINARY_OR_SKIPPED_FILE>> blocks
+    PLACEHOLDER_CHARS = 160
+
+    def __init__(self, max_tokens: int, jobs: int = 4):
+        if max_tokens <= 0:
+            raise ValueError("Shard token budget must be positive")
+        self.max_tokens = max_tokens
+        self.jobs = max(1, jobs)
+        self.exporter = FlattenMarkdownExporter()
+
+    def estimate_tokens(self, entry: Dict, options: FlattenOptions) -> int:
+        """Tokens a file adds to a shard, from manifest data (chars / 4, as the footer counts)."""
+        path = entry["path"]
+        chars = 2 * len(path) + self.FILE_OVERHEAD_CHARS
+        if not options.tree_only:
+            ext = os.path.splitext(path)[1].lower()
+            if ext in FlattenMarkdownExporter.TEXT_EXTENSIONS:
+                chars += entry.get("size_bytes", 0)
+            else:
+                chars += self.PLACEHOLDER_CHARS
+        return chars // 4 + 1
+
+    def plan(self, manifest: Dict, options: FlattenOptions, structure: Optional[Dict] = None) -> List[List[Dict]]:
+        """Deterministic assignment of the exported files to shards (each shard in path order)."""
+        files = self.exporter._canonical_files_from_manifest(manifest, options)
+        capacity = max(1, self.max_tokens - self.SHARD_OVERHEAD_CHARS // 4)
+        costs = {entry["stable_id"]: self.estimate_tokens(entry, options) for entry in files}
+
+        # Packing items: (cost, first path, files), modules split to fit
+        items = []
+        for group in self._groups(files, structure):
+            chunk: List[Dict] = []
+            chunk_cost = 0
+            for entry in group:
+                cost = costs[entry["stable_id"]]
+                if chunk and chunk_cost + cost > capacity:
+                    items.append((chunk_cost, chunk[0]["path"], chunk))
+                    chunk, chunk_cost = [], 0
+                chunk.append(entry)
+                chunk_cost += cost
+            if chunk:
+                items.append((chunk_cost, chunk[0]["path"], chunk))
+
+        # Best fit decreasing: each item goes to the fullest shard it fits in.
+        # `free` holds (remaining capacity, shard number), sorted.
+        items.sort(key=lambda item: (-item[0], item[1]))
+        shards: List[List[Dict]] = []
+        free: List[tuple] = []
+        for cost, _, group in items:
+            slot = bisect.bisect_left(free, (cost, -1))
+            if slot < len(free):
+                remaining, number = free.pop(slot)
+                shards[number].extend(group)
+                bisect.insort(free, (remaining - cost, number))
+            else:
+                shards.append(list(group))
+                bisect.insort(free, (capacity - cost, len(shards) - 1))
+
+        for shard in shards:
+            shard.sort(key=lambda entry: entry["path"])
+        shards.sort(key=lambda shard: shard[0]["path"])
+        return shards
+
+    def _groups(self, files: List[Dict], structure: Optional[Dict]) -> List[List[Dict]]:
+        """Files grouped by structure.json module (path order), or one group per file."""
+        if not structure:
+            return [[entry] for entry in files]
+
+        by_id = {entry["stable_id"]: entry for entry in files}
+        groups: List[List[Dict]] = []
+        grouped = set()
+        modules = sorted(structure.get("repo", {}).get("modules", []), key=lambda m: m.get("path", ""))
+        for module in modules:
+            group = [by_id[stable_id] for stable_id in module.get("files", []) if stable_id in by_id]
+            group = [entry for entry in group if entry["stable_id"] not in grouped]
+            if group:
+                group.sort(key=lambda entry: entry["path"])
+                grouped.update(entry["stable_id"] for entry in group)
+                groups.append(group)
+        groups.extend([entry] for entry in files if entry["stable_id"] not in grouped)
+        return groups
+
+    def export(
+        self,
+        repo_root: str,
+        snapshot_dir: str,
+        manifest: Dict,
+        output_dir: Optional[str],
+        options: FlattenOptions,
+        title: Optional[str] = None,
+        structure: Optional[Dict] = None,
+    ) -> str:
+        """
+        Writes the shards and the index into `output_dir` (default:
+        exports/flatten-shards/ of the snapshot). Shards are rendered in
+        parallel; file names and contents depend only on the inputs.
+        Returns the index path.
+        """
+        snapshot_id = os.path.basename(snapshot_dir)
+        if output_dir is None:
+            output_dir = os.path.join(snapshot_dir, "exports", "flatten-shards")
+        os.makedirs(output_dir, exist_ok=True)
+
+        shards = self.plan(manifest, options, structure)
+        width = max(3, len(str(len(shards))))
+        names = [f"flatten-{i + 1:0{width}d}.md" for i in range(len(shards))]
+        # Files are already filtered and scoped by plan()
+        shard_options = FlattenOptions(tree_only=options.tree_only, include_readme=True, scope="full")
+        base_title = title or "repo-runner flatten export"
+
+        def render(i: int) -> int:
+            shard_manifest = dict(manifest, files=shards[i])
+            path = os.path.join(output_dir, names[i])
+            with open(path, "w", encoding="utf-8", newline="\n",
+                      buffering=FlattenMarkdownExporter.WRITE_BUFFER_BYTES) as f:
+                return self.exporter.write(
+                    f, repo_root, shard_manifest, shard_options,
+                    f"{base_title} (shard {i + 1}/{len(shards)})", snapshot_id
+                )
+
+        # File reads dominate and release the GIL
+        with ThreadPoolExecutor(max_workers=self.jobs) as executor:
+            chars = list(executor.map(render, range(len(shards))))
+
+        index: Dict[str, Any] = {
+            "schema_version": "1.0",
+            "snapshot_id": snapshot_id,
+            "max_tokens": self.max_tokens,
+            "shard_count": len(shards),
+            "shards": [
+                {
+                    "file": names[i],
+                    "file_count": len(shard),
+                    "first_path": shard[0]["path"],
+                    "last_path": shard[-1]["path"],
+                    "estimated_tokens": chars[i] // 4,
+                }
+                for i, shard in enumerate(shards)
+            ],
+            "files": {
+                entry["stable_id"]: names[i]
+                for i, shard in enumerate(shards)
+                for entry in shard
+            },
+        }
+        index_path = os.path.join(output_dir, self.INDEX_FILENAME)
+        with open(index_path, "w", encoding="utf-8") as f:
+            json.dump(index, f, indent=2, sort_keys=True)
+        return index_path
@@ -1,6 +1,7 @@
-import hashlib
 import os
-from typing import Dict
+from typing import Dict, Optional
+
+from src.fingerprint.file_reader import FileContent, FileReader
 
 
 class FileFingerprint:
@@ -23,30 +24,23 @@ class FileFingerprint:
     }
 
     @staticmethod
-    def fingerprint(path: str) -> Dict:
+    def fingerprint(path: str, content: Optional[FileContent] = None) -> Dict:
         """
         Computes the fingerprint of a file.
+        Pass an already-read `content` to hash without reopening the file.
         Raises OSError if the file cannot be opened or read (e.g. locked, permissions).
         """
-        sha = hashlib.sha256()
-        
         # We allow OSError to propagate so the caller (Controller) can decide 
         # whether to skip the file or fail the run.
-        with open(path, "rb") as f:
-            for chunk in iter(lambda: f.read(8192), b""):
-                sha.update(chunk)
-
-        try:
-            size = os.path.getsize(path)
-        except OSError:
-            # Fallback if getsize fails but read succeeded (rare race condition)
-            size = 0 
+        if content is None:
+            with FileReader.read(path) as owned:
+                return FileFingerprint.fingerprint(path, owned)
 
         ext = os.path.splitext(path)[1].lower()
         language = FileFingerprint.LANGUAGE_MAP.get(ext, "unknown")
 
         return {
-            "sha256": sha.hexdigest(),
-            "size_bytes": size,
+            "sha256": content.sha256,
+            "size_bytes": content.size,
             "language": language,
-        }
\ No newline at end of file
+        }
@@ -0,0 +1,102 @@
+import codecs
+import hashlib
+import io
+import mmap
+import os
+from typing import Optional, Union
+
+
+class FileContent:
+    """
+    The bytes of a single file, read exactly once.
+    Hashing, binary sniffing and text decoding all operate on the same buffer,
+    so callers never reopen the file.
+    """
+
+    # Decoding granularity when only a prefix of the text is needed
+    _DECODE_CHUNK = 64 * 1024
+
+    def __init__(self, path: str, data: Union[bytes, mmap.mmap], size: int):
+        self.path = path
+        self.size = size
+        self._data = data
+        self._sha256: Optional[str] = None
+
+    def __enter__(self) -> "FileContent":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if isinstance(self._data, mmap.mmap):
+            self._data.close()
+        self._data = b""
+
+    @property
+    def sha256(self) -> str:
+        if self._sha256 is None:
+            self._sha256 = hashlib.sha256(self._data).hexdigest()
+        return self._sha256
+
+    def is_binary(self, sniff_bytes: int = 4096) -> bool:
+        """Null-byte heuristic over the leading `sniff_bytes`."""
+        return self._data.find(b"\x00", 0, sniff_bytes) != -1
+
+    def text(self, encoding: str = "utf-8", errors: str = "strict", limit: Optional[int] = None) -> str:
+        """
+        Decodes the buffer with universal newline translation, matching what
+        `open(path, "r", encoding=..., errors=...).read(limit)` would return.
+        With `limit`, only as much of the buffer as needed is decoded.
+        """
+        decoder = io.IncrementalNewlineDecoder(
+            codecs.getincrementaldecoder(encoding)(errors=errors), translate=True
+        )
+
+        if limit is None:
+            return decoder.decode(self._data[:], final=True)
+
+        parts = []
+        produced = 0
+        offset = 0
+        total = len(self._data)
+        while produced < limit and offset < total:
+            chunk = self._data[offset:offset + self._DECODE_CHUNK]
+            offset += len(chunk)
+            part = decoder.decode(chunk, final=offset >= total)
+            parts.append(part)
+            produced += len(part)
+
+        return "".join(parts)[:limit]
+
+
+class FileReader:
+    """
+    Shared file-reading layer. One open + one fstat per file; files at or above
+    MMAP_THRESHOLD are memory-mapped instead of copied into the heap.
+    """
+
+    MMAP_THRESHOLD = 1024 * 1024
+
+    @staticmethod
+    def read(path: str) -> FileContent:
+        """
+        Raises OSError if the file cannot be opened or read (e.g. locked, permissions).
+        """
+        with open(path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+
+            if size >= FileReader.MMAP_THRESHOLD:
+                try:
+                    data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                except (OSError, ValueError):
+                    # Some filesystems (pipes, certain network mounts) refuse mmap
+                    data = f.read()
+            else:
+                data = f.read()
+
+        # The file changed between fstat and read; trust the bytes we actually hashed.
+        if len(data) != size:
+            size = len(data)
+
+        return FileContent(path, data, size)
@@ -0,0 +1,114 @@
+import os
+import json
+import time
+from typing import Dict, List, Optional, Any
+
+
+class FingerprintCache:
+    """
+    Per-output-root stat cache backing incremental snapshots.
+    Maps stable_id -> (stat signature, analysis payload) so that unchanged files
+    can carry their previous sha256, imports and symbols forward without being
+    re-read or re-parsed.
+    """
+
+    SCHEMA_VERSION = "1.0"
+    CACHE_DIRNAME = ".cache"
+    CACHE_FILENAME = "fingerprints.json"
+
+    # Files modified this close to the run that cached them are "racily clean":
+    # a second write inside the same mtime tick would keep an identical signature.
+    # 2s covers the coarsest common timestamp granularity (FAT).
+    RACY_WINDOW_NS = 2_000_000_000
+
+    def __init__(self, output_root: str):
+        self.path = os.path.join(output_root, self.CACHE_DIRNAME, self.CACHE_FILENAME)
+        self._previous: Dict[str, Dict[str, Any]] = {}
+        self._previous_started_ns = 0
+        self._current: Dict[str, Dict[str, Any]] = {}
+        self._started_ns = time.time_ns()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def signature(st: os.stat_result) -> List[Any]:
+        return [st.st_size, st.st_mtime_ns, st.st_ino]
+
+    @staticmethod
+    def git_signature(blob_oid: str) -> List[Any]:
+        """
+        Signature for files git reports as clean. Content-derived, so it survives
+        checkouts and touches; racy entries are already excluded by the index check.
+        """
+        return ["git", blob_oid]
+
+    @staticmethod
+    def _is_racy(signature: List[Any], started_ns: int) -> bool:
+        if signature and signature[0] == "git":
+            return False
+        return signature[1] >= started_ns - FingerprintCache.RACY_WINDOW_NS
+
+    def load(self) -> None:
+        """
+        Loads the cache written by the previous run. A missing, corrupt or
+        foreign-schema cache is treated as empty (full run).
+        """
+        if not os.path.isfile(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+
+        if data.get("schema_version") != self.SCHEMA_VERSION:
+            return
+
+        self._previous = data.get("entries", {})
+        self._previous_started_ns = data.get("started_ns", 0)
+
+    def lookup(self, stable_id: str, signature: List[Any], analyzed: bool) -> Optional[Dict[str, Any]]:
+        """
+        Returns the cached analysis payload for `stable_id` if its stat signature
+        is unchanged and the cached entry is not racily clean.
+        `analyzed` requests imports/symbols; entries cached by a skip_graph run
+        cannot satisfy it.
+        """
+        cached = self._previous.get(stable_id)
+        if (
+            cached is None
+            or cached.get("stat") != signature
+            or (analyzed and not cached.get("analyzed", False))
+            or self._is_racy(signature, self._previous_started_ns)
+        ):
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        payload = dict(cached["payload"])
+        if not analyzed:
+            payload["imports"] = []
+            payload["symbols"] = []
+        return payload
+
+    def store(self, stable_id: str, signature: List[Any], payload: Dict[str, Any], analyzed: bool) -> None:
+        self._current[stable_id] = {
+            "stat": signature,
+            "analyzed": analyzed,
+            "payload": payload,
+        }
+
+    def save(self) -> None:
+        """
+        Persists the entries stored during this run. Files that disappeared are
+        dropped implicitly since only entries seen this run are written.
+        """
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({
+                "schema_version": self.SCHEMA_VERSION,
+                "started_ns": self._started_ns,
+                "entries": self._current,
+            }, f, separators=(",", ":"))
+        os.replace(tmp_path, self.path)
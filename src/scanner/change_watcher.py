@@ -0,0 +1,296 @@
+import os
+import sys
+import time
+import struct
+import select
+import ctypes
+import ctypes.util
+from abc import ABC, abstractmethod
+from typing import Dict, Iterator, Optional, Set, Tuple
+
+from src.scanner.filesystem_scanner import FileSystemScanner
+
+
+class ChangeWatcher(ABC):
+    """
+    Reports paths under a repo root that changed since the last call to wait().
+    wait() returns a set of absolute paths (files, or directories whose whole
+    subtree changed), an empty set on timeout, or None when events were lost
+    and the caller must rescan everything.
+    """
+
+    def __init__(self, root: str, depth: int, ignore_names: Set[str]):
+        self.root = os.path.realpath(root)
+        self.depth = depth
+        self.ignore_names = set(ignore_names)
+
+    @staticmethod
+    def create(root: str, depth: int, ignore_names: Set[str], backend: str = "auto",
+               poll_interval: float = 0.5) -> "ChangeWatcher":
+        """backend: "auto" (inotify where available), "inotify" or "poll"."""
+        if backend not in ("auto", "inotify", "poll"):
+            raise ValueError(f"Unknown watch backend: {backend}")
+        if backend != "poll" and InotifyWatcher.available():
+            return InotifyWatcher(root, depth, ignore_names)
+        if backend == "inotify":
+            raise RuntimeError("inotify is not available on this platform")
+        return PollingWatcher(root, depth, ignore_names, interval=poll_interval)
+
+    @abstractmethod
+    def wait(self, timeout: float) -> Optional[Set[str]]:
+        ...
+
+    def close(self) -> None:
+        pass
+
+    def __enter__(self) -> "ChangeWatcher":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class PollingWatcher(ChangeWatcher):
+    """
+    Portable fallback: re-walks the tree every `interval` seconds and diffs
+    (size, mtime_ns, inode) per file against the previous pass.
+    """
+
+    def __init__(self, root: str, depth: int, ignore_names: Set[str], interval: float = 0.5):
+        super().__init__(root, depth, ignore_names)
+        self.interval = interval
+        self._scanner = FileSystemScanner(depth=depth, ignore_names=self.ignore_names)
+        self._stats = self._stat_tree()
+
+    def _stat_tree(self) -> Dict[str, Tuple[int, int, int]]:
+        stats = {}
+        for path in self._scanner.scan_iter([self.root]):
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            stats[path] = (st.st_size, st.st_mtime_ns, st.st_ino)
+        return stats
+
+    def wait(self, timeout: float) -> Optional[Set[str]]:
+        deadline = time.monotonic() + timeout
+        while True:
+            current = self._stat_tree()
+            changed = {
+                path for path in current.keys() | self._stats.keys()
+                if current.get(path) != self._stats.get(path)
+            }
+            self._stats = current
+            remaining = deadline - time.monotonic()
+            if changed or remaining <= 0:
+                return changed
+            time.sleep(min(self.interval, remaining))
+
+
+class InotifyWatcher(ChangeWatcher):
+    """
+    Linux inotify backend via ctypes (no third-party dependency).
+    Watches every directory within depth; directories created later are added
+    on the fly and their existing contents reported as changed.
+    """
+
+    IN_MODIFY = 0x00000002
+    IN_ATTRIB = 0x00000004
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_FROM = 0x00000040
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_DELETE = 0x00000200
+    IN_DELETE_SELF = 0x00000400
+    IN_MOVE_SELF = 0x00000800
+    IN_Q_OVERFLOW = 0x00004000
+    IN_IGNORED = 0x00008000
+    IN_ONLYDIR = 0x01000000
+    IN_ISDIR = 0x40000000
+
+    _WATCH_MASK = (
+        IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO
+        | IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR
+    )
+    _EVENT_HEADER = struct.Struct("iIII")
+
+    _libc = None
+
+    @staticmethod
+    def available() -> bool:
+        if not sys.platform.startswith("linux"):
+            return False
+        return InotifyWatcher._load_libc() is not None
+
+    @staticmethod
+    def _load_libc():
+        if InotifyWatcher._libc is None:
+            try:
+                libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+                libc.inotify_init1
+                libc.inotify_add_watch
+            except (OSError, AttributeError):
+                return None
+            libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+            libc.inotify_add_watch.restype = ctypes.c_int
+            libc.inotify_rm_watch.argtypes = [ctypes.c_int, ctypes.c_int]
+            InotifyWatcher._libc = libc
+        return InotifyWatcher._libc
+
+    def __init__(self, root: str, depth: int, ignore_names: Set[str]):
+        super().__init__(root, depth, ignore_names)
+        libc = self._load_libc()
+        if libc is None:
+            raise RuntimeError("inotify is not available on this platform")
+        self._libc = libc
+
+        self._fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, f"inotify_init1 failed: {os.strerror(err)}")
+
+        self._dirs_by_wd: Dict[int, str] = {}
+        self._wd_by_dir: Dict[str, int] = {}
+        self._overflowed = False
+        for _ in self._watch_tree(self.root):
+            pass
+
+    def _dir_depth(self, directory: str) -> int:
+        rel = os.path.relpath(directory, self.root)
+        return 0 if rel == "." else rel.count(os.sep) + 1
+
+    def _watch_tree(self, top: str) -> Iterator[str]:
+        """Adds watches for `top` and its subdirectories; yields the files found."""
+        stack = [top]
+        while stack:
+            directory = stack.pop()
+            if self.depth >= 0 and self._dir_depth(directory) > self.depth:
+                continue
+            if directory in self._wd_by_dir:
+                continue
+
+            wd = self._libc.inotify_add_watch(self._fd, os.fsencode(directory), self._WATCH_MASK)
+            if wd < 0:
+                err = ctypes.get_errno()
+                if err == 28:  # ENOSPC: fs.inotify.max_user_watches exhausted
+                    raise OSError(err, "inotify watch limit reached; raise fs.inotify.max_user_watches or use the poll backend")
+                continue  # vanished or unreadable
+            # The same directory reached twice (symlinks) shares one wd
+            if wd in self._dirs_by_wd:
+                continue
+            self._dirs_by_wd[wd] = directory
+            self._wd_by_dir[directory] = wd
+
+            try:
+                with os.scandir(directory) as it:
+                    entries = sorted(it, key=lambda e: e.name)
+            except OSError:
+                continue
+            for entry in entries:
+                if entry.name in self.ignore_names:
+                    continue
+                try:
+                    if entry.is_dir():
+                        stack.append(entry.path)
+                    elif entry.is_file():
+                        yield entry.path
+                except OSError:
+                    continue
+
+    def _read_events(self) -> Set[str]:
+        changed: Set[str] = set()
+        while True:
+            try:
+                data = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                break
+            if not data:
+                break
+
+            offset = 0
+            while offset < len(data):
+                wd, mask, _cookie, name_len = self._EVENT_HEADER.unpack_from(data, offset)
+                offset += self._EVENT_HEADER.size
+                name = os.fsdecode(data[offset:offset + name_len].rstrip(b"\0"))
+                offset += name_len
+
+                if mask & self.IN_Q_OVERFLOW:
+                    self._overflowed = True
+                    continue
+
+                directory = self._dirs_by_wd.get(wd)
+                if directory is None:
+                    continue
+
+                if mask & self.IN_IGNORED:
+                    del self._dirs_by_wd[wd]
+                    self._wd_by_dir.pop(directory, None)
+                    continue
+                if mask & (self.IN_DELETE_SELF | self.IN_MOVE_SELF):
+                    changed.add(directory)
+                    continue
+                if not name or name in self.ignore_names:
+                    continue
+
+                path = os.path.join(directory, name)
+                if mask & self.IN_ISDIR:
+                    # Whole subtree appeared or disappeared
+                    changed.add(path)
+                    if mask & (self.IN_CREATE | self.IN_MOVED_TO):
+                        changed.update(self._watch_tree(path))
+                    else:
+                        self._forget_tree(path)
+                else:
+                    changed.add(path)
+        return changed
+
+    def _forget_tree(self, top: str) -> None:
+        prefix = top + os.sep
+        for directory in [d for d in self._wd_by_dir if d == top or d.startswith(prefix)]:
+            wd = self._wd_by_dir.pop(directory)
+            self._dirs_by_wd.pop(wd, None)
+            self._libc.inotify_rm_watch(self._fd, wd)
+
+    def wait(self, timeout: float) -> Optional[Set[str]]:
+        readable, _, _ = select.select([self._fd], [], [], max(timeout, 0))
+        changed = self._read_events() if readable else set()
+        if self._overflowed:
+            self._overflowed = False
+            return None
+        return changed
+
+    def close(self) -> None:
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+
+def collect_changes(watcher: ChangeWatcher, debounce: float, max_delay: float,
+                    timeout: float) -> Optional[Set[str]]:
+    """
+    Waits up to `timeout` for a first change, then keeps absorbing events until
+    the tree has been quiet for `debounce` seconds (capped at `max_delay`), so a
+    burst such as `git checkout` produces a single update.
+    Returns None if a full rescan is required.
+    """
+    first = watcher.wait(timeout)
+    if first is None:
+        return None
+    if not first:
+        return first
+
+    changed: Set[str] = set(first)
+    rescan = False
+    deadline = time.monotonic() + max_delay
+    while True:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        more = watcher.wait(min(debounce, remaining))
+        if more is None:
+            rescan = True
+            continue
+        if not more:
+            break
+        changed.update(more)
+    return None if rescan else changed
@@ -1,5 +1,5 @@
 import os
-from typing import List, Set, Optional, Callable
+from typing import Iterator, List, Set, Optional, Callable, Tuple, Union
 
 
 class FileSystemScanner:
@@ -7,9 +7,21 @@ class FileSystemScanner:
         self.depth = depth
         self.ignore_names = ignore_names
 
-    def scan(self, root_paths: List[str], progress_callback: Optional[Callable[[int], None]] = None) -> List[str]:
-        all_files = []
-        visited_realpaths = set()
+    def scan(self, root_paths: List[str], progress_callback: Optional[Callable[[int], bool]] = None) -> List[str]:
+        """
+        Returns every discovered file as a globally sorted list.
+        If progress_callback returns False the scan is cancelled and the
+        files found so far are returned.
+        """
+        return sorted(self.scan_iter(root_paths, progress_callback=progress_callback))
+
+    def scan_iter(self, root_paths: List[str], progress_callback: Optional[Callable[[int], bool]] = None) -> Iterator[str]:
+        """
+        Yields files as they are discovered, in deterministic per-directory sorted
+        (depth-first pre-order) order. Unlike scan(), the first file is available
+        before the walk completes; callers needing a global order must sort.
+        """
+        visited_dirs: Set[Union[Tuple[int, int], str]] = set()
         count = 0
 
         for root in root_paths:
@@ -21,64 +33,86 @@ class FileSystemScanner:
 
             # Handle explicit file inputs
             if os.path.isfile(abs_root):
-                all_files.append(abs_root)
+                found = iter([abs_root])
+            elif os.path.isdir(abs_root):
+                found = self._walk(abs_root, visited_dirs)
+            else:
+                continue
+
+            for path in found:
+                yield path
                 count += 1
-                if progress_callback and count % 100 == 0:
-                     if not progress_callback(count): return all_files
+
+                # Report Progress every 50 files to avoid UI spam
+                if progress_callback and count % 50 == 0:
+                    if not progress_callback(count):
+                        # Scan was cancelled
+                        return
+
+    def _walk(self, root: str, visited: Set[Union[Tuple[int, int], str]]) -> Iterator[str]:
+        """
+        Iterative depth-first walk built on os.scandir.
+        File/dir classification uses DirEntry's cached d_type, so regular entries
+        cost no extra stat calls; only directories are stat'ed (for cycle detection).
+        """
+        root_entries = self._open_dir(root, 0, os.stat, visited)
+        if root_entries is None:
+            return
+
+        # Stack of (sorted entry iterator, depth) frames; preserves recursive pre-order.
+        stack = [(root_entries, 0)]
+
+        while stack:
+            entries, current_depth = stack[-1]
+            entry = next(entries, None)
+            if entry is None:
+                stack.pop()
+                continue
+
+            if entry.name in self.ignore_names:
                 continue
 
-            # Handle directories
-            if os.path.isdir(abs_root):
-                # We start the recursive walk
-                if not self._walk(abs_root, 0, all_files, visited_realpaths, progress_callback):
-                    # If _walk returns False, it means scan was cancelled
-                    return sorted(all_files)
+            try:
+                if entry.is_dir():
+                    child = self._open_dir(entry.path, current_depth + 1, lambda _: entry.stat(), visited)
+                    if child is not None:
+                        stack.append((child, current_depth + 1))
+                    continue
+                is_file = entry.is_file()
+            except (PermissionError, OSError):
+                continue
 
-        return sorted(all_files)
+            if is_file:
+                yield entry.path
 
-    def _walk(self, directory: str, current_depth: int, results: List[str], visited: Set[str], 
-              progress_callback: Optional[Callable[[int], bool]]) -> bool:
+    def _open_dir(self, directory: str, current_depth: int, stat_fn: Callable[[str], os.stat_result],
+                  visited: Set[Union[Tuple[int, int], str]]) -> Optional[Iterator[os.DirEntry]]:
         """
-        Returns True if walk should continue, False if cancelled.
+        Applies depth limits and symlink-cycle detection, then lists `directory`.
+        Returns an iterator over its entries sorted by name, or None to skip it.
         """
         if self.depth >= 0 and current_depth > self.depth:
-            return True
+            return None
 
-        # 1. Symlink Cycle Detection & Canonicalization
+        # 1. Symlink Cycle Detection via (st_dev, st_ino) identity
         try:
-            real_path = os.path.realpath(directory)
-            if real_path in visited:
-                return True
-            visited.add(real_path)
+            st = stat_fn(directory)
+            if not st.st_ino:
+                # DirEntry.stat() on Windows leaves st_ino/st_dev zeroed
+                st = os.stat(directory)
+            # Filesystems without stable inode numbers fall back to canonical paths
+            key = (st.st_dev, st.st_ino) if st.st_ino else os.path.realpath(directory)
+            if key in visited:
+                return None
+            visited.add(key)
         except OSError:
-            return True
+            return None
 
         # 2. List Directory (Robust)
         try:
-            entries = sorted(os.listdir(directory))
+            with os.scandir(directory) as it:
+                entries = sorted(it, key=lambda e: e.name)
         except (PermissionError, OSError):
-            return True
+            return None
 
-        for entry in entries:
-            if entry in self.ignore_names:
-                continue
-
-            full_path = os.path.join(directory, entry)
-
-            # 3. Classify and Recurse
-            try:
-                if os.path.isdir(full_path):
-                    if not self._walk(full_path, current_depth + 1, results, visited, progress_callback):
-                        return False
-                elif os.path.isfile(full_path):
-                    results.append(os.path.abspath(full_path))
-                    
-                    # Report Progress every 50 files to avoid UI spam
-                    if progress_callback and len(results) % 50 == 0:
-                        should_continue = progress_callback(len(results))
-                        if not should_continue:
-                            return False
-            except (PermissionError, OSError):
-                continue
-                
-        return True
\ No newline at end of file
+        return iter(entries)
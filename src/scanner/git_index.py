@@ -0,0 +1,263 @@
+import os
+import struct
+from typing import Dict, Iterator, NamedTuple, Optional, Set, Callable
+
+from src.scanner.filesystem_scanner import FileSystemScanner
+
+
+class GitIndexEntry(NamedTuple):
+    path: str          # repo-relative, forward-slash separated (as stored by git)
+    mtime_s: int
+    mtime_ns: int
+    ino: int
+    mode: int
+    size: int
+    oid: str           # blob object id (hex)
+
+
+class GitRepository:
+    """
+    Minimal read-only view of a git repository on disk.
+    Reads HEAD, refs and `.git/index` directly; never shells out to git.
+    """
+
+    _GITLINK_MODE = 0o160000
+
+    def __init__(self, work_tree: str, git_dir: str):
+        self.work_tree = work_tree
+        self.git_dir = git_dir
+
+        # Linked worktrees keep refs in the common dir
+        common_dir = git_dir
+        commondir_path = os.path.join(git_dir, "commondir")
+        if os.path.isfile(commondir_path):
+            with open(commondir_path, "r", encoding="utf-8") as f:
+                common_dir = os.path.normpath(os.path.join(git_dir, f.read().strip()))
+        self.common_dir = common_dir
+
+    @staticmethod
+    def find(repo_root: str) -> Optional["GitRepository"]:
+        """
+        Returns a GitRepository if `repo_root` is a git work tree root
+        (`.git` directory, or `.git` file pointing at one), else None.
+        """
+        dot_git = os.path.join(repo_root, ".git")
+        if os.path.isdir(dot_git):
+            return GitRepository(repo_root, dot_git)
+
+        if os.path.isfile(dot_git):
+            try:
+                with open(dot_git, "r", encoding="utf-8") as f:
+                    line = f.read().strip()
+            except OSError:
+                return None
+            if line.startswith("gitdir:"):
+                git_dir = os.path.normpath(os.path.join(repo_root, line.split(":", 1)[1].strip()))
+                if os.path.isdir(git_dir):
+                    return GitRepository(repo_root, git_dir)
+
+        return None
+
+    def head_commit(self) -> Optional[str]:
+        """Resolves HEAD to a commit id. Returns None for unborn branches or unreadable refs."""
+        try:
+            with open(os.path.join(self.git_dir, "HEAD"), "r", encoding="utf-8") as f:
+                head = f.read().strip()
+        except OSError:
+            return None
+
+        if not head.startswith("ref:"):
+            return head or None
+
+        return self._resolve_ref(head.split(":", 1)[1].strip())
+
+    def _resolve_ref(self, ref: str) -> Optional[str]:
+        for base in (self.git_dir, self.common_dir):
+            ref_path = os.path.join(base, *ref.split("/"))
+            if os.path.isfile(ref_path):
+                with open(ref_path, "r", encoding="utf-8") as f:
+                    return f.read().strip() or None
+
+        packed_path = os.path.join(self.common_dir, "packed-refs")
+        if os.path.isfile(packed_path):
+            with open(packed_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    parts = line.strip().split(" ")
+                    if len(parts) == 2 and parts[1] == ref:
+                        return parts[0]
+        return None
+
+    @property
+    def index_path(self) -> str:
+        return os.path.join(self.git_dir, "index")
+
+    def _hash_size(self) -> int:
+        # sha256 repositories declare `objectformat = sha256` under [extensions]
+        try:
+            with open(os.path.join(self.common_dir, "config"), "r", encoding="utf-8") as f:
+                for line in f:
+                    key, _, value = line.partition("=")
+                    if key.strip().lower() == "objectformat" and value.strip().lower() == "sha256":
+                        return 32
+        except OSError:
+            pass
+        return 20
+
+    def read_index(self) -> Dict[str, GitIndexEntry]:
+        """
+        Parses `.git/index` (versions 2-4) into stage-0 entries keyed by path.
+        Gitlinks (submodules) are skipped. Raises ValueError on a malformed index.
+        """
+        with open(self.index_path, "rb") as f:
+            data = f.read()
+
+        if len(data) < 12 or data[:4] != b"DIRC":
+            raise ValueError(f"Not a git index: {self.index_path}")
+
+        version, count = struct.unpack(">II", data[4:12])
+        if version not in (2, 3, 4):
+            raise ValueError(f"Unsupported git index version: {version}")
+
+        hash_size = self._hash_size()
+        stat_fmt = ">10I"
+        stat_size = struct.calcsize(stat_fmt)
+
+        entries: Dict[str, GitIndexEntry] = {}
+        offset = 12
+        prev_path = b""
+
+        for _ in range(count):
+            start = offset
+            (_ctime_s, _ctime_ns, mtime_s, mtime_ns, _dev, ino,
+             mode, _uid, _gid, size) = struct.unpack_from(stat_fmt, data, offset)
+            offset += stat_size
+            oid = data[offset:offset + hash_size].hex()
+            offset += hash_size
+            (flags,) = struct.unpack_from(">H", data, offset)
+            offset += 2
+            if version >= 3 and flags & 0x4000:
+                offset += 2  # extended flags
+
+            if version == 4:
+                strip, offset = self._read_varint(data, offset)
+                end = data.index(b"\x00", offset)
+                path_bytes = prev_path[:len(prev_path) - strip] + data[offset:end]
+                offset = end + 1
+            else:
+                end = data.index(b"\x00", offset)
+                path_bytes = data[offset:end]
+                # Entries are NUL-padded to a multiple of 8 bytes
+                offset = start + ((offset - start + len(path_bytes) + 8) & ~7)
+
+            prev_path = path_bytes
+            stage = (flags >> 12) & 0x3
+            if stage != 0 or mode == self._GITLINK_MODE:
+                continue
+
+            path = path_bytes.decode("utf-8", errors="surrogateescape")
+            entries[path] = GitIndexEntry(path, mtime_s, mtime_ns, ino, mode, size, oid)
+
+        return entries
+
+    @staticmethod
+    def _read_varint(data: bytes, offset: int):
+        byte = data[offset]
+        offset += 1
+        value = byte & 0x7F
+        while byte & 0x80:
+            byte = data[offset]
+            offset += 1
+            value = ((value + 1) << 7) | (byte & 0x7F)
+        return value, offset
+
+
+class GitIndexScanner:
+    """
+    Scanner backend for git work trees.
+    Enumerates tracked files straight from `.git/index` (no directory walk) and,
+    via clean_oid(), reuses the index stat data to tell which working-tree files
+    are unchanged since git last hashed them.
+    """
+
+    def __init__(self, repo: GitRepository, depth: int, ignore_names: Set[str], include_untracked: bool = False):
+        self.repo = repo
+        self.depth = depth
+        self.ignore_names = set(ignore_names)
+        self.include_untracked = include_untracked
+        self._entries: Dict[str, GitIndexEntry] = repo.read_index()
+        self._by_abs_path: Dict[str, GitIndexEntry] = {}
+        try:
+            self._index_mtime_ns = os.stat(repo.index_path).st_mtime_ns
+        except OSError:
+            self._index_mtime_ns = 0
+
+    def _included(self, rel_path: str) -> bool:
+        parts = rel_path.split("/")
+        if any(part in self.ignore_names for part in parts):
+            return False
+        # Files directly under the root sit at depth 0
+        return self.depth < 0 or len(parts) - 1 <= self.depth
+
+    def scan_iter(self, progress_callback: Optional[Callable[[int], bool]] = None) -> Iterator[str]:
+        """
+        Yields absolute paths of tracked files (git index order) that exist in the
+        work tree, then untracked files if requested. Honors depth and ignore_names.
+        """
+        count = 0
+        tracked: Set[str] = set()
+
+        for rel_path in sorted(self._entries):
+            if not self._included(rel_path):
+                continue
+            abs_path = os.path.join(self.repo.work_tree, *rel_path.split("/"))
+            tracked.add(abs_path)
+            if not os.path.isfile(abs_path):
+                continue  # deleted in the work tree but not staged
+
+            self._by_abs_path[abs_path] = self._entries[rel_path]
+            yield abs_path
+            count += 1
+            if progress_callback and count % 50 == 0:
+                if not progress_callback(count):
+                    return
+
+        if not self.include_untracked:
+            return
+
+        walker = FileSystemScanner(depth=self.depth, ignore_names=self.ignore_names | {".git"})
+        for abs_path in walker.scan_iter([self.repo.work_tree]):
+            if abs_path in tracked:
+                continue
+            yield abs_path
+            count += 1
+            if progress_callback and count % 50 == 0:
+                if not progress_callback(count):
+                    return
+
+    def clean_oid(self, abs_path: str, st: os.stat_result) -> Optional[str]:
+        """
+        Git's clean-file stat check: returns the index blob id if the working-tree
+        file's stat data still matches its index entry, else None (changed,
+        untracked, or racily clean).
+        """
+        entry = self._by_abs_path.get(abs_path)
+        if entry is None:
+            return None
+
+        # Index stat fields are truncated to 32 bits
+        mtime_s = (st.st_mtime_ns // 1_000_000_000) & 0xFFFFFFFF
+        mtime_ns = st.st_mtime_ns % 1_000_000_000
+        if (
+            entry.mtime_s != mtime_s
+            or (entry.mtime_ns and entry.mtime_ns != mtime_ns)
+            or entry.size != (st.st_size & 0xFFFFFFFF)
+            or (entry.ino and st.st_ino and entry.ino != (st.st_ino & 0xFFFFFFFF))
+        ):
+            return None
+
+        # Racily clean: modified in the same tick the index was written
+        entry_mtime_ns = entry.mtime_s * 1_000_000_000 + entry.mtime_ns
+        if entry_mtime_ns >= self._index_mtime_ns:
+            return None
+
+        return entry.oid
@@ -0,0 +1,63 @@
+import os
+import sys
+import json
+from array import array
+from typing import List, Optional
+
+from src.snapshot.section_file import SectionFile, write_section_file
+
+
+CENTRALITY_FILENAME = "centrality.bin"
+
+_MAGIC = b"RRRANK\x00\x01"
+_VERSION = 1
+
+(
+    _META,     # JSON: node count, graph digest, PageRank parameters
+    _RANKS,    # f64[n_nodes]: scaled PageRank, in sorted node id order
+) = range(2)
+_SECTION_COUNT = 2
+
+
+class CentralityFile:
+    """
+    PageRank centrality of one snapshot's graph (centrality.bin), saved next
+    to it by the first weighted slice so later slices load it instead of
+    recomputing. `digest` identifies the graph the ranks belong to
+    (SliceIndex hashes its node ids and import edges); a file whose digest
+    or PageRank parameters differ from the caller's is ignored.
+    """
+
+    @staticmethod
+    def _meta(count: int, digest: str, damping: float, iterations: int) -> dict:
+        return {"nodes": count, "digest": digest, "damping": damping, "iterations": iterations}
+
+    @staticmethod
+    def load(snapshot_dir: str, count: int, digest: str, damping: float, iterations: int) -> Optional[List[float]]:
+        path = os.path.join(snapshot_dir, CENTRALITY_FILENAME)
+        if not os.path.isfile(path):
+            return None
+        try:
+            section_file = SectionFile(path, _MAGIC, _VERSION, _SECTION_COUNT)
+        except (OSError, ValueError):
+            return None
+        try:
+            meta = json.loads(bytes(section_file.raw(_META)).decode("utf-8"))
+            if meta != CentralityFile._meta(count, digest, damping, iterations):
+                return None
+            ranks = array("d")
+            ranks.frombytes(bytes(section_file.raw(_RANKS)))
+            if sys.byteorder != "little":
+                ranks.byteswap()
+            return ranks.tolist() if len(ranks) == count else None
+        except ValueError:
+            return None
+        finally:
+            section_file.close()
+
+    @staticmethod
+    def write(snapshot_dir: str, digest: str, ranks: List[float], damping: float, iterations: int) -> str:
+        meta = json.dumps(CentralityFile._meta(len(ranks), digest, damping, iterations)).encode("utf-8")
+        return write_section_file(
+            os.path.join(snapshot_dir, CENTRALITY_FILENAME), _MAGIC, _VERSION, [meta, array("d", ranks)]
+        )
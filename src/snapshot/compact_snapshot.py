@@ -0,0 +1,457 @@
+import os
+import json
+import heapq
+from array import array
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+from src.core.types import Manifest, GraphStructure
+from src.snapshot.section_file import SectionFile, write_section_file
+
+
+COMPACT_FILENAME = "snapshot.rrc"
+
+_MAGIC = b"RRSNAP\x00\x01"
+_VERSION = 1
+_SHA_WIDTH = 32
+
+# Section order is part of the format; append new sections at the end only
+(
+    _META,            # JSON: manifest minus files, graph minus nodes/edges
+    _STR_OFFSETS,     # u32[n_strings + 1] byte offsets into _STR_BLOB
+    _STR_BLOB,        # utf-8, strings sorted and unique
+    _FILE_STRS,       # u32[n_files * 4]: path, stable_id, module_path, language
+    _FILE_SIZES,      # u64[n_files]
+    _FILE_SHAS,       # 32 bytes per file
+    _FILE_BY_ID,      # u32[n_files]: file indexes ordered by stable_id
+    _IMPORT_OFFSETS,  # u32[n_files + 1] into _IMPORT_REFS
+    _IMPORT_REFS,     # u32 string indexes
+    _SYMBOL_OFFSETS,  # u32[n_files + 1] into _SYMBOL_REFS
+    _SYMBOL_REFS,     # u32 string indexes
+    _NODE_STRS,       # u32[n_nodes * 2]: id, type
+    _NODE_BY_ID,      # u32[n_nodes]: node indexes ordered by id
+    _EDGES,           # u32[n_edges * 3]: source node, target node, relation string
+    _OUT_OFFSETS,     # u32[n_nodes + 1] into _OUT_EDGES (CSR, outgoing)
+    _OUT_EDGES,       # u32 edge indexes, ascending per node
+    _IN_OFFSETS,      # u32[n_nodes + 1] into _IN_EDGES (CSR, incoming)
+    _IN_EDGES,        # u32 edge indexes, ascending per node
+    _FILE_BY_PATH,    # u32[n_files]: file indexes ordered by path
+) = range(19)
+_SECTION_COUNT = 19
+
+def _u32(values) -> array:
+    return array("I", values)
+
+
+def _u64(values) -> array:
+    return array("Q", values)
+
+
+class CompactSnapshotWriter:
+    """
+    Writes `snapshot.rrc`, a memory-mappable columnar encoding of a snapshot's
+    manifest and graph. All strings (paths, ids, imports, symbols) are interned
+    in one sorted table, so string order equals index order; sha256 values are
+    stored as raw 32-byte digests and edges as node-index triples with CSR
+    adjacency in both directions.
+    """
+
+    @staticmethod
+    def write(
+        path: str,
+        manifest: Union[Manifest, Dict[str, Any]],
+        graph: Optional[Union[GraphStructure, Dict[str, Any]]] = None
+    ) -> str:
+        manifest_dict = manifest.model_dump(mode="json") if hasattr(manifest, "model_dump") else manifest
+        graph_dict = graph.model_dump(mode="json") if hasattr(graph, "model_dump") else graph
+
+        files = manifest_dict.get("files", [])
+        nodes = graph_dict.get("nodes", []) if graph_dict else []
+        edges = graph_dict.get("edges", []) if graph_dict else []
+
+        strings = set()
+        for f in files:
+            strings.update((f["path"], f["stable_id"], f["module_path"], f.get("language", "unknown")))
+            strings.update(f.get("imports", []))
+            strings.update(f.get("symbols", []))
+        for n in nodes:
+            strings.update((n["id"], n["type"]))
+        for e in edges:
+            strings.add(e.get("relation", "imports"))
+
+        table = sorted(strings)
+        index = {s: i for i, s in enumerate(table)}
+
+        blob = bytearray()
+        str_offsets = [0]
+        for s in table:
+            blob += s.encode("utf-8")
+            str_offsets.append(len(blob))
+
+        file_strs: List[int] = []
+        sizes: List[int] = []
+        shas = bytearray()
+        sha_overrides: Dict[str, str] = {}
+        import_offsets, import_refs = [0], []
+        symbol_offsets, symbol_refs = [0], []
+        for i, f in enumerate(files):
+            file_strs.extend((
+                index[f["path"]], index[f["stable_id"]],
+                index[f["module_path"]], index[f.get("language", "unknown")]
+            ))
+            sizes.append(f["size_bytes"])
+            try:
+                digest = bytes.fromhex(f["sha256"])
+            except ValueError:
+                digest = b""
+            if len(digest) != _SHA_WIDTH:
+                # Not a sha256 hex digest (hand-built manifests); kept verbatim in meta
+                sha_overrides[str(i)] = f["sha256"]
+                digest = bytes(_SHA_WIDTH)
+            shas += digest
+            import_refs.extend(index[s] for s in f.get("imports", []))
+            import_offsets.append(len(import_refs))
+            symbol_refs.extend(index[s] for s in f.get("symbols", []))
+            symbol_offsets.append(len(symbol_refs))
+
+        file_by_id = sorted(range(len(files)), key=lambda i: file_strs[i * 4 + 1])
+        file_by_path = sorted(range(len(files)), key=lambda i: file_strs[i * 4])
+
+        node_index: Dict[str, int] = {}
+        node_strs: List[int] = []
+        node_metadata: Dict[str, Any] = {}
+        for i, n in enumerate(nodes):
+            node_index[n["id"]] = i
+            node_strs.extend((index[n["id"]], index[n["type"]]))
+            if n.get("metadata") is not None:
+                node_metadata[str(i)] = n["metadata"]
+        node_by_id = sorted(range(len(nodes)), key=lambda i: node_strs[i * 2])
+
+        edge_cols: List[int] = []
+        out_lists: List[List[int]] = [[] for _ in nodes]
+        in_lists: List[List[int]] = [[] for _ in nodes]
+        for i, e in enumerate(edges):
+            try:
+                src, tgt = node_index[e["source"]], node_index[e["target"]]
+            except KeyError as missing:
+                raise ValueError(f"Graph edge references unknown node: {missing.args[0]}")
+            edge_cols.extend((src, tgt, index[e.get("relation", "imports")]))
+            out_lists[src].append(i)
+            in_lists[tgt].append(i)
+
+        def csr(lists: List[List[int]]) -> Tuple[List[int], List[int]]:
+            offsets, flat = [0], []
+            for items in lists:
+                flat.extend(items)
+                offsets.append(len(flat))
+            return offsets, flat
+
+        out_offsets, out_edges = csr(out_lists)
+        in_offsets, in_edges = csr(in_lists)
+
+        meta = {
+            "manifest": {k: v for k, v in manifest_dict.items() if k != "files"},
+            "graph": (
+                {k: v for k, v in graph_dict.items() if k not in ("nodes", "edges")}
+                if graph_dict is not None else None
+            ),
+            "counts": {"strings": len(table), "files": len(files), "nodes": len(nodes), "edges": len(edges)},
+            "sha_overrides": sha_overrides,
+            "node_metadata": node_metadata,
+        }
+
+        sections = [None] * _SECTION_COUNT
+        sections[_META] = json.dumps(meta, separators=(",", ":")).encode("utf-8")
+        sections[_STR_OFFSETS] = _u32(str_offsets)
+        sections[_STR_BLOB] = bytes(blob)
+        sections[_FILE_STRS] = _u32(file_strs)
+        sections[_FILE_SIZES] = _u64(sizes)
+        sections[_FILE_SHAS] = bytes(shas)
+        sections[_FILE_BY_ID] = _u32(file_by_id)
+        sections[_IMPORT_OFFSETS] = _u32(import_offsets)
+        sections[_IMPORT_REFS] = _u32(import_refs)
+        sections[_SYMBOL_OFFSETS] = _u32(symbol_offsets)
+        sections[_SYMBOL_REFS] = _u32(symbol_refs)
+        sections[_NODE_STRS] = _u32(node_strs)
+        sections[_NODE_BY_ID] = _u32(node_by_id)
+        sections[_EDGES] = _u32(edge_cols)
+        sections[_OUT_OFFSETS] = _u32(out_offsets)
+        sections[_OUT_EDGES] = _u32(out_edges)
+        sections[_IN_OFFSETS] = _u32(in_offsets)
+        sections[_IN_EDGES] = _u32(in_edges)
+        sections[_FILE_BY_PATH] = _u32(file_by_path)
+
+        return write_section_file(path, _MAGIC, _VERSION, sections)
+
+
+class CompactSnapshot:
+    """
+    Read-only view over a `snapshot.rrc` file. The file is memory-mapped and
+    decoded on access: nothing is parsed up front beyond the small JSON meta
+    block, and no Pydantic models are built. Files and nodes are addressed by
+    integer index; find_file/find_node resolve ids by binary search.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = SectionFile(path, _MAGIC, _VERSION, _SECTION_COUNT)
+        try:
+            self.meta: Dict[str, Any] = json.loads(bytes(self._file.raw(_META)).decode("utf-8"))
+        except ValueError:
+            self._file.close()
+            raise
+
+        counts = self.meta["counts"]
+        self.file_count: int = counts["files"]
+        self.node_count: int = counts["nodes"]
+        self.edge_count: int = counts["edges"]
+        self.string_count: int = counts["strings"]
+
+        self._str_offsets = self._ints(_STR_OFFSETS, "I")
+        self._str_blob = self._raw(_STR_BLOB)
+        self._file_strs = self._ints(_FILE_STRS, "I")
+        self._file_sizes = self._ints(_FILE_SIZES, "Q")
+        self._file_shas = self._raw(_FILE_SHAS)
+        self._file_by_id = self._ints(_FILE_BY_ID, "I")
+        self._import_offsets = self._ints(_IMPORT_OFFSETS, "I")
+        self._import_refs = self._ints(_IMPORT_REFS, "I")
+        self._symbol_offsets = self._ints(_SYMBOL_OFFSETS, "I")
+        self._symbol_refs = self._ints(_SYMBOL_REFS, "I")
+        self._node_strs = self._ints(_NODE_STRS, "I")
+        self._node_by_id = self._ints(_NODE_BY_ID, "I")
+        self._edges = self._ints(_EDGES, "I")
+        self._out_offsets = self._ints(_OUT_OFFSETS, "I")
+        self._out_edges = self._ints(_OUT_EDGES, "I")
+        self._in_offsets = self._ints(_IN_OFFSETS, "I")
+        self._in_edges = self._ints(_IN_EDGES, "I")
+        self._file_by_path = self._ints(_FILE_BY_PATH, "I")
+
+        self._sha_overrides: Dict[str, str] = self.meta.get("sha_overrides", {})
+
+    @staticmethod
+    def open(snapshot_dir: str) -> "CompactSnapshot":
+        return CompactSnapshot(os.path.join(snapshot_dir, COMPACT_FILENAME))
+
+    @staticmethod
+    def exists(snapshot_dir: str) -> bool:
+        return os.path.isfile(os.path.join(snapshot_dir, COMPACT_FILENAME))
+
+    def _raw(self, section: int) -> memoryview:
+        return self._file.raw(section)
+
+    def _ints(self, section: int, typecode: str):
+        return self._file.ints(section, typecode)
+
+    def close(self) -> None:
+        self._file.close()
+
+    def __enter__(self) -> "CompactSnapshot":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    # --- Strings ---
+
+    def string(self, i: int) -> str:
+        return bytes(self._str_blob[self._str_offsets[i]:self._str_offsets[i + 1]]).decode("utf-8")
+
+    def string_index(self, value: str) -> Optional[int]:
+        """Index of `value` in the sorted string table, or None."""
+        lo, hi = 0, self.string_count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.string(mid) < value:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self.string_count and self.string(lo) == value:
+            return lo
+        return None
+
+    # --- Manifest ---
+
+    @property
+    def snapshot_id(self) -> str:
+        return self.meta["manifest"].get("snapshot", {}).get("snapshot_id", "")
+
+    def manifest_header(self) -> Dict[str, Any]:
+        """Manifest fields other than `files` (a fresh copy)."""
+        return json.loads(json.dumps(self.meta["manifest"]))
+
+    def file_stable_id(self, i: int) -> str:
+        return self.string(self._file_strs[i * 4 + 1])
+
+    def file_path(self, i: int) -> str:
+        return self.string(self._file_strs[i * 4])
+
+    def file_language(self, i: int) -> str:
+        return self.string(self._file_strs[i * 4 + 3])
+
+    def file_size(self, i: int) -> int:
+        return self._file_sizes[i]
+
+    def file_sha256_bytes(self, i: int) -> bytes:
+        return bytes(self._file_shas[i * _SHA_WIDTH:(i + 1) * _SHA_WIDTH])
+
+    def file_sha256(self, i: int) -> str:
+        override = self._sha_overrides.get(str(i))
+        if override is not None:
+            return override
+        return self._file_shas[i * _SHA_WIDTH:(i + 1) * _SHA_WIDTH].hex()
+
+    def file_imports(self, i: int) -> List[str]:
+        refs = self._import_refs[self._import_offsets[i]:self._import_offsets[i + 1]]
+        return [self.string(r) for r in refs]
+
+    def file_symbols(self, i: int) -> List[str]:
+        refs = self._symbol_refs[self._symbol_offsets[i]:self._symbol_offsets[i + 1]]
+        return [self.string(r) for r in refs]
+
+    def file_has_symbol(self, i: int, string_idx: int) -> bool:
+        return string_idx in self._symbol_refs[self._symbol_offsets[i]:self._symbol_offsets[i + 1]].tolist()
+
+    def file_entry(self, i: int) -> Dict[str, Any]:
+        """The file's manifest.json record, as a plain dict."""
+        base = i * 4
+        return {
+            "path": self.string(self._file_strs[base]),
+            "stable_id": self.string(self._file_strs[base + 1]),
+            "module_path": self.string(self._file_strs[base + 2]),
+            "sha256": self.file_sha256(i),
+            "size_bytes": self._file_sizes[i],
+            "language": self.string(self._file_strs[base + 3]),
+            "imports": self.file_imports(i),
+            "symbols": self.file_symbols(i),
+        }
+
+    def find_file(self, stable_id: str) -> Optional[int]:
+        """File index for `stable_id`, or None (binary search, no decoding beyond probes)."""
+        target = self.string_index(stable_id)
+        if target is None:
+            return None
+        order, strs = self._file_by_id, self._file_strs
+        lo, hi = 0, self.file_count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if strs[order[mid] * 4 + 1] < target:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self.file_count and strs[order[lo] * 4 + 1] == target:
+            return order[lo]
+        return None
+
+    def string_range(self, prefix: str) -> Tuple[int, int]:
+        """[lo, hi) range of string indexes that start with `prefix`."""
+        lo, hi = 0, self.string_count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.string(mid) < prefix:
+                lo = mid + 1
+            else:
+                hi = mid
+        start, hi = lo, self.string_count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.string(mid).startswith(prefix):
+                lo = mid + 1
+            else:
+                hi = mid
+        return start, lo
+
+    def files_with_path_prefix(self, prefix: str) -> Iterator[int]:
+        """File indexes whose path starts with `prefix`, in path order."""
+        lo, hi = self.string_range(prefix)
+        if lo == hi:
+            return
+        order, strs = self._file_by_path, self._file_strs
+        left, right = 0, self.file_count
+        while left < right:
+            mid = (left + right) // 2
+            if strs[order[mid] * 4] < lo:
+                left = mid + 1
+            else:
+                right = mid
+        for k in range(left, self.file_count):
+            i = order[k]
+            if strs[i * 4] >= hi:
+                break
+            yield i
+
+    def files_by_stable_id(self) -> Iterator[Tuple[str, int]]:
+        """(stable_id, file index) in stable_id order."""
+        for i in self._file_by_id:
+            yield self.string(self._file_strs[i * 4 + 1]), i
+
+    # --- Graph ---
+
+    @property
+    def has_graph(self) -> bool:
+        return self.meta.get("graph") is not None
+
+    @property
+    def cycles(self) -> List[List[str]]:
+        graph = self.meta.get("graph") or {}
+        return graph.get("cycles", [])
+
+    def node_id(self, n: int) -> str:
+        return self.string(self._node_strs[n * 2])
+
+    def node_type(self, n: int) -> str:
+        return self.string(self._node_strs[n * 2 + 1])
+
+    def find_node(self, node_id: str) -> Optional[int]:
+        target = self.string_index(node_id)
+        if target is None:
+            return None
+        order, strs = self._node_by_id, self._node_strs
+        lo, hi = 0, self.node_count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if strs[order[mid] * 2] < target:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self.node_count and strs[order[lo] * 2] == target:
+            return order[lo]
+        return None
+
+    def edge(self, e: int) -> Tuple[int, int, str]:
+        """(source node, target node, relation) for edge index `e`."""
+        base = e * 3
+        return self._edges[base], self._edges[base + 1], self.string(self._edges[base + 2])
+
+    def out_edges(self, n: int) -> List[int]:
+        return self._out_edges[self._out_offsets[n]:self._out_offsets[n + 1]].tolist()
+
+    def in_edges(self, n: int) -> List[int]:
+        return self._in_edges[self._in_offsets[n]:self._in_offsets[n + 1]].tolist()
+
+    def neighbors(self, n: int, direction: str = "both") -> List[int]:
+        """
+        Undirected neighbor node indexes in edge order (an edge's target for
+        outgoing edges, its source for incoming), matching an adjacency list
+        built by walking graph.json edges front to back. `direction`
+        "upstream" keeps only outgoing edges, "downstream" only incoming.
+        """
+        edges = self._edges
+        if direction == "upstream":
+            return [edges[e * 3 + 1] for e in self.out_edges(n)]
+        if direction == "downstream":
+            return [edges[e * 3] for e in self.in_edges(n)]
+        outgoing = ((e, edges[e * 3 + 1]) for e in self.out_edges(n))
+        incoming = ((e, edges[e * 3]) for e in self.in_edges(n))
+        return [other for _, other in heapq.merge(outgoing, incoming, key=lambda pair: pair[0])]
+
+    def iter_edges(self) -> Iterator[Tuple[str, str, str]]:
+        """(source id, target id, relation) for every edge, in graph.json order."""
+        ids: Dict[int, str] = {}
+        edges = self._edges
+        for e in range(self.edge_count):
+            base = e * 3
+            src, tgt = edges[base], edges[base + 1]
+            if src not in ids:
+                ids[src] = self.node_id(src)
+            if tgt not in ids:
+                ids[tgt] = self.node_id(tgt)
+            yield ids[src], ids[tgt], self.string(edges[base + 2])
@@ -0,0 +1,113 @@
+import os
+import tempfile
+from typing import Any, Dict, Iterator, List, Optional
+
+from src.snapshot.compact_snapshot import CompactSnapshot, CompactSnapshotWriter, COMPACT_FILENAME
+from src.snapshot.object_store import StoredSnapshot
+
+
+class LazySnapshot:
+    """
+    Point access to one snapshot without parsing it as a whole.
+
+    Backed by the snapshot's compact index (snapshot.rrc). Snapshots written
+    without one get it built from their JSON (or object pool) on first access and saved next
+    to it, so later opens are lazy too. Only the pages holding the records a
+    caller touches are ever read.
+    """
+
+    def __init__(self, snapshot_dir: str):
+        self.snapshot_dir = snapshot_dir
+        self._compact: Optional[CompactSnapshot] = None
+        self._temp_path: Optional[str] = None
+
+    @property
+    def compact(self) -> CompactSnapshot:
+        """The underlying CompactSnapshot (opened, or built, on first use)."""
+        if self._compact is None:
+            self._compact = self._open()
+        return self._compact
+
+    def _open(self) -> CompactSnapshot:
+        if CompactSnapshot.exists(self.snapshot_dir):
+            return CompactSnapshot.open(self.snapshot_dir)
+
+        manifest = StoredSnapshot.load_artifact(self.snapshot_dir, "manifest")
+        if manifest is None:
+            raise FileNotFoundError(f"manifest.json not found in {self.snapshot_dir}")
+        graph = StoredSnapshot.load_artifact(self.snapshot_dir, "graph")
+
+        path = os.path.join(self.snapshot_dir, COMPACT_FILENAME)
+        try:
+            CompactSnapshotWriter.write(path, manifest, graph)
+        except OSError:
+            # Read-only snapshot dir: keep a private index for this handle only
+            fd, path = tempfile.mkstemp(suffix=".rrc")
+            os.close(fd)
+            self._temp_path = path
+            CompactSnapshotWriter.write(path, manifest, graph)
+        return CompactSnapshot(path)
+
+    def close(self) -> None:
+        if self._compact is not None:
+            self._compact.close()
+            self._compact = None
+        if self._temp_path is not None:
+            try:
+                os.remove(self._temp_path)
+            except OSError:
+                pass
+            self._temp_path = None
+
+    def __enter__(self) -> "LazySnapshot":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    @property
+    def file_count(self) -> int:
+        return self.compact.file_count
+
+    @property
+    def has_graph(self) -> bool:
+        return self.compact.has_graph
+
+    def manifest_header(self) -> Dict[str, Any]:
+        """Manifest fields other than `files`."""
+        return self.compact.manifest_header()
+
+    def get_file(self, stable_id: str) -> Optional[Dict[str, Any]]:
+        """The manifest record for `stable_id`, or None."""
+        i = self.compact.find_file(stable_id.lower())
+        return self.compact.file_entry(i) if i is not None else None
+
+    def iter_files(self, prefix: str = "") -> Iterator[Dict[str, Any]]:
+        """Manifest records whose path starts with `prefix`, in path order."""
+        compact = self.compact
+        prefix = prefix.replace("\\", "/").lower()
+        for i in compact.files_with_path_prefix(prefix):
+            yield compact.file_entry(i)
+
+    def edges_from(self, node_id: str) -> List[Dict[str, str]]:
+        """graph.json edges whose source is `node_id`, in graph order."""
+        return self._edges(node_id, outgoing=True)
+
+    def edges_to(self, node_id: str) -> List[Dict[str, str]]:
+        """graph.json edges whose target is `node_id`, in graph order."""
+        return self._edges(node_id, outgoing=False)
+
+    def _edges(self, node_id: str, outgoing: bool) -> List[Dict[str, str]]:
+        compact = self.compact
+        node = compact.find_node(node_id)
+        if node is None:
+            return []
+        edges = []
+        for e in (compact.out_edges(node) if outgoing else compact.in_edges(node)):
+            source, target, relation = compact.edge(e)
+            edges.append({
+                "source": compact.node_id(source),
+                "target": compact.node_id(target),
+                "relation": relation,
+            })
+        return edges
@@ -0,0 +1,393 @@
+import os
+import json
+import zlib
+import hashlib
+import tempfile
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+ROOT_FILENAME = "root.json"
+OBJECTS_DIRNAME = ".objects"
+
+# Artifacts a stored snapshot stands in for, by name
+ARTIFACTS = ("manifest", "structure", "graph", "symbols")
+
+# Marks an artifact that is rebuilt from the file entries on load
+DERIVED = "derived"
+
+
+class ObjectStore:
+    """
+    Content-addressed pool of JSON objects shared by the snapshots of one
+    output root (`{output_root}/.objects/ab/cdef...`).
+
+    An object's key is the sha256 of its canonical JSON (sorted keys, no
+    whitespace); the file holds that JSON zlib-compressed. Objects are
+    immutable and only written when absent, so writing the same content
+    twice costs one stat.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.objects_written = 0
+        self.bytes_written = 0
+        # Canonical JSON bytes of every put, stored or already present
+        self.bytes_referenced = 0
+
+    @staticmethod
+    def canonical(obj: Any) -> bytes:
+        return json.dumps(obj, sort_keys=True, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+    def _object_path(self, key: str) -> str:
+        return os.path.join(self.path, key[:2], key[2:])
+
+    def has(self, key: str) -> bool:
+        return os.path.isfile(self._object_path(key))
+
+    def put(self, obj: Any) -> str:
+        """Stores `obj` unless an identical object exists; returns its key."""
+        data = self.canonical(obj)
+        key = hashlib.sha256(data).hexdigest()
+        self.bytes_referenced += len(data)
+        path = self._object_path(key)
+        if os.path.isfile(path):
+            return key
+
+        payload = zlib.compress(data, 6)
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(payload)
+            os.chmod(tmp_path, 0o644)
+            # Concurrent writers of the same key write the same bytes
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+        self.objects_written += 1
+        self.bytes_written += len(payload)
+        return key
+
+    def get(self, key: str) -> Any:
+        try:
+            with open(self._object_path(key), "rb") as f:
+                payload = f.read()
+        except FileNotFoundError:
+            raise FileNotFoundError(f"Snapshot object missing from {self.path}: {key}")
+        return json.loads(zlib.decompress(payload).decode("utf-8"))
+
+
+class MemoryObjectStore(ObjectStore):
+    """ObjectStore kept in memory, for computing keys (Merkle hashes) without a pool."""
+
+    def __init__(self):
+        super().__init__("")
+        self.objects: Dict[str, Any] = {}
+
+    def has(self, key: str) -> bool:
+        return key in self.objects
+
+    def put(self, obj: Any) -> str:
+        data = self.canonical(obj)
+        key = hashlib.sha256(data).hexdigest()
+        self.bytes_referenced += len(data)
+        if key not in self.objects:
+            self.objects[key] = obj
+            self.objects_written += 1
+        return key
+
+    def get(self, key: str) -> Any:
+        return self.objects[key]
+
+
+class StoredSnapshot:
+    """
+    A snapshot kept in the object pool instead of as JSON files.
+
+    The snapshot directory holds only root.json: the manifest header, the
+    graph and structure headers, and the key of a tree object. Trees mirror
+    the module directories of structure.json (like git trees): each level
+    maps a path segment to a subtree and references the module record of
+    its own directory. A module record holds that module's manifest
+    entries, the graph edges leaving them and their unresolved imports.
+
+    Snapshots of a repo that changed in one file therefore share every
+    object except that file's module record and the trees above it, so a
+    write costs O(changed) bytes. Node lists, structure.json and
+    symbols.json are rebuilt from the file entries where they are exactly
+    derivable (checked at write time) and stored verbatim otherwise.
+    """
+
+    SCHEMA_VERSION = "1.0"
+
+    def __init__(self, snapshot_dir: str, root: Optional[Dict[str, Any]] = None):
+        self.snapshot_dir = snapshot_dir
+        if root is None:
+            with open(os.path.join(snapshot_dir, ROOT_FILENAME), "r", encoding="utf-8") as f:
+                root = json.load(f)
+        self.root = root
+        self.store = ObjectStore(os.path.normpath(os.path.join(snapshot_dir, root["objects"])))
+        self._modules: Optional[List[Tuple[str, Dict[str, Any]]]] = None
+        self._graph_meta: Optional[Dict[str, Any]] = None
+
+    @staticmethod
+    def exists(snapshot_dir: str) -> bool:
+        return os.path.isfile(os.path.join(snapshot_dir, ROOT_FILENAME))
+
+    @staticmethod
+    def open(snapshot_dir: str) -> "StoredSnapshot":
+        return StoredSnapshot(snapshot_dir)
+
+    # --- Writing ---
+
+    @staticmethod
+    def write(
+        snapshot_dir: str,
+        manifest: Dict[str, Any],
+        structure: Dict[str, Any],
+        graph: Optional[Dict[str, Any]],
+        symbols: Optional[Dict[str, List[str]]] = None,
+    ) -> Dict[str, int]:
+        """
+        Stores the snapshot's artifacts (as their JSON dicts) in the pool of
+        the snapshot dir's output root and writes root.json.
+        Returns {"objects_written", "bytes_written"} for this snapshot.
+        """
+        files = manifest.get("files", [])
+        output_root = os.path.dirname(os.path.abspath(snapshot_dir))
+        store = ObjectStore(os.path.join(output_root, OBJECTS_DIRNAME))
+        tree_key, graph_key, edges_in_modules = StoredSnapshot._put_modules(store, files, graph)
+
+        root: Dict[str, Any] = {
+            "schema_version": StoredSnapshot.SCHEMA_VERSION,
+            "objects": os.path.join("..", OBJECTS_DIRNAME).replace("\\", "/"),
+            "manifest": {k: v for k, v in manifest.items() if k != "files"},
+            "tree": tree_key,
+            "graph": graph_key,
+            "edges_in_modules": edges_in_modules,
+            "structure": None,
+            "symbols": None,
+        }
+
+        structure_header = {
+            "schema_version": structure.get("schema_version"),
+            "repo": {k: v for k, v in structure.get("repo", {}).items() if k != "modules"},
+        }
+        if StoredSnapshot._structure(structure_header, files) == structure:
+            root["structure"] = {"header": structure_header, "modules": DERIVED}
+        else:
+            root["structure"] = {"header": None, "modules": store.put(structure)}
+
+        if symbols is not None:
+            if StoredSnapshot._symbols(files) == symbols:
+                root["symbols"] = DERIVED
+            else:
+                root["symbols"] = store.put(symbols)
+
+        root["json_bytes"] = store.bytes_referenced
+
+        path = os.path.join(snapshot_dir, ROOT_FILENAME)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(root, f, indent=2, sort_keys=True)
+        return {"objects_written": store.objects_written, "bytes_written": store.bytes_written}
+
+    @staticmethod
+    def _put_modules(
+        store: ObjectStore,
+        files: List[Dict[str, Any]],
+        graph: Optional[Dict[str, Any]]
+    ) -> Tuple[str, Optional[str], bool]:
+        """
+        Puts the module records, the trees above them and the graph meta.
+        Returns (root tree key, graph meta key or None, whether every edge
+        is in the module record of its source). The tree keys are the
+        snapshot's Merkle hashes.
+        """
+        paths = [entry["path"] for entry in files]
+        if paths != sorted(paths):
+            raise ValueError("Snapshot trees require manifest files sorted by path")
+
+        file_ids = {entry["stable_id"] for entry in files}
+        modules: Dict[str, Dict[str, List]] = {}
+        module_of: Dict[str, str] = {}
+        for entry in files:
+            module_path = entry.get("module_path", "")
+            module_of[entry["stable_id"]] = module_path
+            modules.setdefault(module_path, {"files": [], "edges": [], "unresolved": []})["files"].append(entry)
+
+        graph_key = None
+        edges_in_modules = True
+        if graph is not None:
+            meta: Dict[str, Any] = {
+                "header": {
+                    k: v for k, v in graph.items()
+                    if k not in ("nodes", "edges", "unresolved_references")
+                },
+                "nodes": None,
+                "edges": None,
+                "unresolved_references": None,
+            }
+
+            # File nodes follow from the manifest; only the others are kept
+            nodes = graph.get("nodes", [])
+            extra = [n for n in nodes if not (n.get("type") == "file" and n.get("id") in file_ids)]
+            if StoredSnapshot._nodes(files, extra) == nodes:
+                meta["extra_nodes"] = extra
+            else:
+                meta["nodes"] = nodes
+
+            # Edges and unresolved imports are split by the module of their
+            # source file and merged back in sorted order
+            for name, key_fn in (
+                ("edges", StoredSnapshot._edge_key),
+                ("unresolved_references", StoredSnapshot._unresolved_key),
+            ):
+                items = graph.get(name, [])
+                chunk = "edges" if name == "edges" else "unresolved"
+                keys = [key_fn(item) for item in items]
+                if keys == sorted(keys) and all(item.get("source") in module_of for item in items):
+                    for item in items:
+                        modules[module_of[item["source"]]][chunk].append(item)
+                else:
+                    meta[name] = items
+
+            edges_in_modules = meta["edges"] is None
+            graph_key = store.put(meta)
+
+        tree: Dict[str, Any] = {"dirs": {}, "module": None}
+        for module_path in sorted(modules):
+            node = tree
+            for segment in (module_path.split("/") if module_path else []):
+                node = node["dirs"].setdefault(segment, {"dirs": {}, "module": None})
+            node["module"] = store.put(modules[module_path])
+        return StoredSnapshot._put_tree(store, tree), graph_key, edges_in_modules
+
+    @staticmethod
+    def _put_tree(store: ObjectStore, node: Dict[str, Any]) -> str:
+        dirs = {name: StoredSnapshot._put_tree(store, child) for name, child in sorted(node["dirs"].items())}
+        return store.put({"dirs": dirs, "module": node["module"]})
+
+    # --- Derivations (must match GraphBuilder / StructureBuilder / the controller) ---
+
+    @staticmethod
+    def _edge_key(edge: Dict[str, Any]) -> Tuple:
+        return (edge.get("source"), edge.get("target"), edge.get("relation"))
+
+    @staticmethod
+    def _unresolved_key(ref: Dict[str, Any]) -> Tuple:
+        return (ref.get("source"), ref.get("import_ref"))
+
+    @staticmethod
+    def _nodes(files: List[Dict[str, Any]], extra: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        nodes = [{"id": entry["stable_id"], "type": "file", "metadata": None} for entry in files]
+        nodes.extend(extra)
+        nodes.sort(key=lambda n: n["id"])
+        return nodes
+
+    @staticmethod
+    def _structure(header: Dict[str, Any], files: List[Dict[str, Any]]) -> Dict[str, Any]:
+        modules: Dict[str, Dict[str, Any]] = {}
+        for entry in files:
+            module_path = entry.get("module_path", "")
+            if module_path not in modules:
+                modules[module_path] = {"stable_id": f"module:{module_path}", "path": module_path, "files": []}
+            modules[module_path]["files"].append(entry["stable_id"])
+        repo = dict(header["repo"])
+        repo["modules"] = [modules[k] for k in sorted(modules)]
+        return {"schema_version": header["schema_version"], "repo": repo}
+
+    @staticmethod
+    def _symbols(files: List[Dict[str, Any]]) -> Dict[str, List[str]]:
+        raw: Dict[str, List[str]] = {}
+        for entry in files:
+            for symbol in entry.get("symbols", []):
+                raw.setdefault(symbol, []).append(entry["stable_id"])
+        return {symbol: sorted(ids) for symbol, ids in sorted(raw.items())}
+
+    # --- Reading ---
+
+    def iter_tree(self, key: Optional[str] = None, prefix: str = "") -> Iterator[Tuple[str, str]]:
+        """(module path, module record key) for every module, in path order."""
+        if key is None:
+            key = self.root["tree"]
+        node = self.store.get(key)
+        if node["module"] is not None:
+            yield prefix, node["module"]
+        for name in sorted(node["dirs"]):
+            yield from self.iter_tree(node["dirs"][name], f"{prefix}/{name}" if prefix else name)
+
+    def modules(self) -> List[Tuple[str, Dict[str, Any]]]:
+        """(module path, module record) pairs, loaded once."""
+        if self._modules is None:
+            self._modules = [(path, self.store.get(key)) for path, key in self.iter_tree()]
+        return self._modules
+
+    def _files(self) -> List[Dict[str, Any]]:
+        files = [entry for _, record in self.modules() for entry in record["files"]]
+        files.sort(key=lambda entry: entry["path"])
+        return files
+
+    @property
+    def has_graph(self) -> bool:
+        return self.root["graph"] is not None
+
+    def manifest(self) -> Dict[str, Any]:
+        manifest = dict(self.root["manifest"])
+        manifest["files"] = self._files()
+        return manifest
+
+    def graph(self) -> Optional[Dict[str, Any]]:
+        if not self.has_graph:
+            return None
+        if self._graph_meta is None:
+            self._graph_meta = self.store.get(self.root["graph"])
+        meta = self._graph_meta
+
+        graph = dict(meta["header"])
+        if meta["nodes"] is not None:
+            graph["nodes"] = meta["nodes"]
+        else:
+            graph["nodes"] = self._nodes(self._files(), meta["extra_nodes"])
+        for name, chunk, key_fn in (
+            ("edges", "edges", self._edge_key),
+            ("unresolved_references", "unresolved", self._unresolved_key),
+        ):
+            if meta[name] is not None:
+                graph[name] = meta[name]
+            else:
+                items = [item for _, record in self.modules() for item in record[chunk]]
+                items.sort(key=key_fn)
+                graph[name] = items
+        return graph
+
+    def structure(self) -> Dict[str, Any]:
+        stored = self.root["structure"]
+        if stored["modules"] != DERIVED:
+            return self.store.get(stored["modules"])
+        return self._structure(stored["header"], self._files())
+
+    def symbols(self) -> Optional[Dict[str, List[str]]]:
+        stored = self.root["symbols"]
+        if stored is None:
+            return None
+        if stored == DERIVED:
+            return self._symbols(self._files())
+        return self.store.get(stored)
+
+    @staticmethod
+    def load_artifact(snapshot_dir: str, name: str) -> Optional[Any]:
+        """
+        One of ARTIFACTS as its JSON dict, from `{name}.json` or, for a stored
+        snapshot, reassembled from the pool. None if the snapshot has none.
+        """
+        path = os.path.join(snapshot_dir, f"{name}.json")
+        if os.path.isfile(path):
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        if not StoredSnapshot.exists(snapshot_dir):
+            return None
+        return getattr(StoredSnapshot(snapshot_dir), name)()
@@ -0,0 +1,111 @@
+import os
+import sys
+import mmap
+import struct
+import tempfile
+from array import array
+from typing import List, Sequence, Union
+
+_HEADER = struct.Struct("<8sII")   # magic, format version, section count
+_SECTION = struct.Struct("<QQ")    # offset, length
+
+
+def write_section_file(path: str, magic: bytes, version: int, sections: Sequence[Union[bytes, array]]) -> str:
+    """
+    Writes a little-endian, memory-mappable container: header, section
+    table, then each section 8-byte aligned so mapped views can be cast in
+    place. Arrays are stored as packed little-endian integers. The file is
+    replaced atomically.
+    """
+    payloads = []
+    for section in sections:
+        if isinstance(section, array):
+            if sys.byteorder != "little":
+                section = array(section.typecode, section)
+                section.byteswap()
+            section = section.tobytes()
+        payloads.append(section)
+
+    table_end = _HEADER.size + _SECTION.size * len(payloads)
+    offset = (table_end + 7) & ~7
+    entries = []
+    for payload in payloads:
+        entries.append((offset, len(payload)))
+        offset = (offset + len(payload) + 7) & ~7
+
+    # Unique temp name: concurrent builders of the same file must not interleave
+    fd, tmp_path = tempfile.mkstemp(prefix=os.path.basename(path) + ".", suffix=".tmp",
+                                    dir=os.path.dirname(path) or ".")
+    with os.fdopen(fd, "wb") as out:
+        out.write(_HEADER.pack(magic, version, len(payloads)))
+        for entry in entries:
+            out.write(_SECTION.pack(*entry))
+        for (start, _), payload in zip(entries, payloads):
+            out.write(b"\0" * (start - out.tell()))
+            out.write(payload)
+    os.chmod(tmp_path, 0o644)
+    os.replace(tmp_path, path)
+    return path
+
+
+class SectionFile:
+    """
+    Read side of write_section_file: maps the file and hands out zero-copy
+    views of its sections. close() releases every view it handed out, so
+    callers must not keep section views beyond the file's lifetime.
+    """
+
+    def __init__(self, path: str, magic: bytes, version: int, section_count: int):
+        self.path = path
+        self._file = open(path, "rb")
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (ValueError, OSError):
+            self._file.close()
+            self._map = None
+            raise ValueError(f"Unsupported or empty file: {path}")
+        self._buf = memoryview(self._map)
+        self._views: List[memoryview] = [self._buf]
+
+        try:
+            found_magic, found_version, count = _HEADER.unpack_from(self._buf, 0)
+            if found_magic != magic or found_version != version or count < section_count:
+                raise ValueError(f"Unsupported file format: {path}")
+            self._sections = [
+                _SECTION.unpack_from(self._buf, _HEADER.size + i * _SECTION.size)
+                for i in range(count)
+            ]
+        except (struct.error, ValueError):
+            self.close()
+            raise ValueError(f"Unsupported file format: {path}")
+
+    def raw(self, section: int) -> memoryview:
+        offset, length = self._sections[section]
+        if offset + length > len(self._buf):
+            raise ValueError(f"Truncated file: {self.path}")
+        view = self._buf[offset:offset + length]
+        self._views.append(view)
+        return view
+
+    def ints(self, section: int, typecode: str):
+        """Section as a sequence of unsigned ints ("I" = u32, "Q" = u64)."""
+        raw = self.raw(section)
+        if sys.byteorder == "little":
+            view = raw.cast(typecode)
+            self._views.append(view)
+            return view
+        # Non-native layout: decode into a private copy
+        values = array(typecode)
+        values.frombytes(bytes(raw))
+        values.byteswap()
+        return values
+
+    def close(self) -> None:
+        if self._map is None:
+            return
+        for view in reversed(self._views):
+            view.release()
+        self._views = []
+        self._map.close()
+        self._map = None
+        self._file.close()
@@ -0,0 +1,141 @@
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple, Any
+
+from src.analysis.context_slicer import ContextSlicer, SliceIndex
+from src.core.types import Manifest, GraphStructure
+from src.snapshot.object_store import StoredSnapshot, ROOT_FILENAME
+
+
+class CachedSnapshot:
+    """
+    One snapshot's parsed artifacts: the manifest and graph dicts, the slice
+    index (files map, bidirectional adjacency, symbol owners) and, on first
+    compare, the validated Pydantic models. Snapshots are immutable, so all
+    of it can be shared between requests; treat everything as read-only.
+    """
+
+    def __init__(self, snapshot_dir: str, signature: Tuple[Any, ...], size_bytes: int):
+        self.snapshot_dir = snapshot_dir
+        self.signature = signature
+        self.size_bytes = size_bytes
+
+        manifest = StoredSnapshot.load_artifact(snapshot_dir, "manifest")
+        if manifest is None:
+            raise FileNotFoundError(f"manifest.json not found in {snapshot_dir}")
+        self.manifest: Dict[str, Any] = manifest
+        self.graph: Optional[Dict[str, Any]] = StoredSnapshot.load_artifact(snapshot_dir, "graph")
+
+        self.slice_index: SliceIndex = ContextSlicer.build_index(self.manifest, self.graph or {}, snapshot_dir)
+        self._models: Optional[Tuple[Manifest, Optional[GraphStructure]]] = None
+        self._models_lock = threading.Lock()
+
+    @property
+    def has_graph(self) -> bool:
+        return self.graph is not None
+
+    def models(self) -> Tuple[Manifest, Optional[GraphStructure]]:
+        """Validated (Manifest, GraphStructure or None), built once."""
+        with self._models_lock:
+            if self._models is None:
+                self._models = (
+                    Manifest.model_validate(self.manifest),
+                    GraphStructure.model_validate(self.graph) if self.graph is not None else None
+                )
+            return self._models
+
+
+class SnapshotCache:
+    """
+    Process-wide LRU of parsed snapshots keyed by (output_root, resolved
+    snapshot dir), bounded by an approximate byte budget.
+
+    Entries are revalidated with one stat of manifest.json/graph.json (or the
+    root.json of a stored snapshot) per lookup, so a snapshot folder that is
+    deleted and recreated is reloaded. Parsed size is estimated from the JSON
+    size on disk (recorded in root.json for stored snapshots).
+    """
+
+    # Parsed dicts, the slice index and the Pydantic models together take
+    # roughly this many bytes of heap per byte of JSON
+    PARSED_BYTES_PER_JSON_BYTE = 8
+
+    DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Tuple[str, str], CachedSnapshot]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _signature(snapshot_dir: str) -> Tuple[Tuple[Any, ...], Optional[int]]:
+        """(stat signature, JSON bytes) of the files an entry is built from."""
+        if StoredSnapshot.exists(snapshot_dir) and not os.path.isfile(os.path.join(snapshot_dir, "manifest.json")):
+            # Objects are immutable; the size is read from root.json on a miss
+            st = os.stat(os.path.join(snapshot_dir, ROOT_FILENAME))
+            return ((st.st_size, st.st_mtime_ns, st.st_ino),), None
+        signature = []
+        total = 0
+        for name in ("manifest.json", "graph.json"):
+            try:
+                st = os.stat(os.path.join(snapshot_dir, name))
+            except FileNotFoundError:
+                if name == "manifest.json":
+                    raise
+                signature.append(None)
+                continue
+            signature.append((st.st_size, st.st_mtime_ns, st.st_ino))
+            total += st.st_size
+        return tuple(signature), total
+
+    def get(self, output_root: str, snapshot_dir: str) -> CachedSnapshot:
+        """
+        Returns the parsed snapshot, loading it on a miss.
+        Raises FileNotFoundError if manifest.json is missing.
+        """
+        key = (os.path.abspath(output_root), os.path.realpath(snapshot_dir))
+        signature, json_bytes = self._signature(key[1])
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.signature == signature:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+            self.misses += 1
+
+        # Parsed outside the lock; a concurrent miss on the same key only repeats work
+        if json_bytes is None:
+            json_bytes = StoredSnapshot.open(key[1]).root.get("json_bytes", 0)
+        entry = CachedSnapshot(key[1], signature, json_bytes * self.PARSED_BYTES_PER_JSON_BYTE)
+
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous.size_bytes
+            if entry.size_bytes <= self.max_bytes:
+                self._entries[key] = entry
+                self._bytes += entry.size_bytes
+                while self._bytes > self.max_bytes:
+                    _, evicted = self._entries.popitem(last=False)
+                    self._bytes -= evicted.size_bytes
+        return entry
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
@@ -2,6 +2,10 @@ import json
 import os
 from typing import Optional
 
+from src.snapshot.compact_snapshot import CompactSnapshot
+from src.snapshot.lazy_snapshot import LazySnapshot
+from src.snapshot.object_store import StoredSnapshot
+
 
 class SnapshotLoader:
     """
@@ -46,14 +50,55 @@ class SnapshotLoader:
 
         return snapshot_dir
 
+    def open_lazy(self, snapshot_id: Optional[str]) -> LazySnapshot:
+        """
+        Resolves `snapshot_id` like resolve_snapshot_dir and returns a
+        LazySnapshot for point lookups. The caller closes it.
+        """
+        return LazySnapshot(self.resolve_snapshot_dir(snapshot_id))
+
+    @staticmethod
+    def is_snapshot(snapshot_dir: str) -> bool:
+        """True for a snapshot dir with manifest.json or a stored-snapshot root.json."""
+        return os.path.isfile(os.path.join(snapshot_dir, "manifest.json")) or StoredSnapshot.exists(snapshot_dir)
+
+    @staticmethod
+    def has_graph(snapshot_dir: str) -> bool:
+        if os.path.isfile(os.path.join(snapshot_dir, "graph.json")):
+            return True
+        return StoredSnapshot.exists(snapshot_dir) and StoredSnapshot.open(snapshot_dir).has_graph
+
+    @staticmethod
+    def _load_required(snapshot_dir: str, name: str) -> dict:
+        data = StoredSnapshot.load_artifact(snapshot_dir, name)
+        if data is None:
+            raise FileNotFoundError(f"{name}.json not found in {snapshot_dir}")
+        return data
+
     @staticmethod
     def load_manifest(snapshot_dir: str) -> dict:
-        path = os.path.join(snapshot_dir, "manifest.json")
-        with open(path, "r", encoding="utf-8") as f:
-            return json.load(f)
+        """manifest.json, reassembled from the object pool for stored snapshots."""
+        return SnapshotLoader._load_required(snapshot_dir, "manifest")
 
     @staticmethod
     def load_structure(snapshot_dir: str) -> dict:
-        path = os.path.join(snapshot_dir, "structure.json")
-        with open(path, "r", encoding="utf-8") as f:
-            return json.load(f)
\ No newline at end of file
+        return SnapshotLoader._load_required(snapshot_dir, "structure")
+
+    @staticmethod
+    def load_graph(snapshot_dir: str) -> Optional[dict]:
+        """graph.json, or None for snapshots taken with skip_graph."""
+        return StoredSnapshot.load_artifact(snapshot_dir, "graph")
+
+    @staticmethod
+    def load_symbols(snapshot_dir: str) -> Optional[dict]:
+        return StoredSnapshot.load_artifact(snapshot_dir, "symbols")
+
+    @staticmethod
+    def load_compact(snapshot_dir: str) -> Optional[CompactSnapshot]:
+        """
+        Opens snapshot.rrc if the snapshot was written with the compact format,
+        else None. The caller owns the returned handle (close() or `with`).
+        """
+        if not CompactSnapshot.exists(snapshot_dir):
+            return None
+        return CompactSnapshot.open(snapshot_dir)
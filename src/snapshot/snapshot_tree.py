@@ -0,0 +1,129 @@
+import os
+import json
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from src.snapshot.object_store import MemoryObjectStore, StoredSnapshot
+
+MERKLE_FILENAME = "merkle.json"
+
+EMPTY_TREE: Dict[str, Any] = {"dirs": {}, "module": None}
+
+
+class SnapshotTree:
+    """
+    Merkle view of a snapshot, for diffing without reading unchanged parts.
+
+    Every module directory of structure.json has a hash: the key of its
+    module record (manifest entries, outgoing edges and unresolved imports
+    of its files) combined with the hashes of its subdirectories, up to one
+    root hash. These are the tree keys of the object pool, so stored
+    snapshots (root.json) are read directly from it; JSON snapshots record
+    the same trees in merkle.json and load their manifest and graph only
+    when a module record is needed.
+    """
+
+    def __init__(self, snapshot_dir: str):
+        self.snapshot_dir = snapshot_dir
+        self._stored: Optional[StoredSnapshot] = None
+        self._trees: Dict[str, Dict[str, Any]] = {}
+        self._modules: Optional[Dict[str, Dict[str, List]]] = None
+
+        if StoredSnapshot.exists(snapshot_dir):
+            self._stored = StoredSnapshot.open(snapshot_dir)
+            root = self._stored.root
+            self.snapshot_id: Optional[str] = root["manifest"].get("snapshot", {}).get("snapshot_id")
+            self.root: str = root["tree"]
+            self.has_graph: bool = root["graph"] is not None
+            self.edges_in_modules: bool = root.get("edges_in_modules", True)
+            if "edges_in_modules" not in root and self.has_graph:
+                # Written before the flag was recorded
+                self.edges_in_modules = self._stored.store.get(root["graph"])["edges"] is None
+        else:
+            with open(os.path.join(snapshot_dir, MERKLE_FILENAME), "r", encoding="utf-8") as f:
+                merkle = json.load(f)
+            self.snapshot_id = merkle["snapshot_id"]
+            self.root = merkle["root"]
+            self.has_graph = merkle["has_graph"]
+            self.edges_in_modules = merkle["edges_in_modules"]
+            self._trees = merkle["trees"]
+
+    @staticmethod
+    def exists(snapshot_dir: str) -> bool:
+        return StoredSnapshot.exists(snapshot_dir) or os.path.isfile(os.path.join(snapshot_dir, MERKLE_FILENAME))
+
+    @staticmethod
+    def open(snapshot_dir: str) -> Optional["SnapshotTree"]:
+        """The snapshot's tree, or None for snapshots written without one."""
+        if not SnapshotTree.exists(snapshot_dir):
+            return None
+        return SnapshotTree(snapshot_dir)
+
+    @staticmethod
+    def write_merkle(snapshot_dir: str, manifest: Dict[str, Any], graph: Optional[Dict[str, Any]]) -> Optional[str]:
+        """
+        Writes merkle.json for a JSON snapshot (manifest and graph as dicts).
+        Returns the root hash, or None (nothing written) if the manifest
+        files are not in path order.
+        """
+        store = MemoryObjectStore()
+        try:
+            root, graph_key, edges_in_modules = StoredSnapshot._put_modules(store, manifest.get("files", []), graph)
+        except ValueError:
+            return None
+
+        trees: Dict[str, Dict[str, Any]] = {}
+        pending = [root]
+        while pending:
+            key = pending.pop()
+            tree = store.get(key)
+            trees[key] = tree
+            pending.extend(tree["dirs"].values())
+
+        merkle = {
+            "schema_version": "1.0",
+            "snapshot_id": manifest.get("snapshot", {}).get("snapshot_id"),
+            "root": root,
+            "has_graph": graph_key is not None,
+            "edges_in_modules": edges_in_modules,
+            "trees": trees,
+        }
+        with open(os.path.join(snapshot_dir, MERKLE_FILENAME), "w", encoding="utf-8") as f:
+            json.dump(merkle, f, indent=2, sort_keys=True)
+        return root
+
+    def tree(self, key: Optional[str]) -> Dict[str, Any]:
+        if key is None:
+            return EMPTY_TREE
+        if self._stored is not None:
+            return self._stored.store.get(key)
+        return self._trees[key]
+
+    def module(self, path: str, key: Optional[str]) -> Dict[str, List]:
+        """Module record of `path` ({"files", "edges", ...}); empty for None."""
+        if key is None:
+            return {"files": [], "edges": []}
+        if self._stored is not None:
+            return self._stored.store.get(key)
+        return self._json_modules().get(path, {"files": [], "edges": []})
+
+    def _json_modules(self) -> Dict[str, Dict[str, List]]:
+        # Module records of a JSON snapshot, grouped on first use
+        if self._modules is None:
+            manifest = StoredSnapshot.load_artifact(self.snapshot_dir, "manifest") or {}
+            modules: Dict[str, Dict[str, List]] = {}
+            module_of: Dict[str, str] = {}
+            for entry in manifest.get("files", []):
+                module_path = entry.get("module_path", "")
+                module_of[entry["stable_id"]] = module_path
+                modules.setdefault(module_path, {"files": [], "edges": []})["files"].append(entry)
+            if self.has_graph and self.edges_in_modules:
+                graph = StoredSnapshot.load_artifact(self.snapshot_dir, "graph") or {}
+                for edge in graph.get("edges", []):
+                    modules[module_of[edge["source"]]]["edges"].append(edge)
+            self._modules = modules
+        return self._modules
+
+    def edges(self) -> Set[Tuple[str, str, str]]:
+        """Every graph edge as (source, target, relation)."""
+        graph = StoredSnapshot.load_artifact(self.snapshot_dir, "graph") or {}
+        return {(e["source"], e["target"], e["relation"]) for e in graph.get("edges", [])}
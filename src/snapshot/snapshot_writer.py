@@ -4,6 +4,10 @@ import datetime
 from typing import Optional, Dict, Union, List
 
 from src.core.types import Manifest, GraphStructure
+from src.snapshot.compact_snapshot import CompactSnapshotWriter, COMPACT_FILENAME
+from src.snapshot.symbol_index import SymbolIndex, SYMBOL_INDEX_FILENAME
+from src.snapshot.object_store import StoredSnapshot
+from src.snapshot.snapshot_tree import SnapshotTree
 
 class SnapshotWriter:
     def __init__(self, output_root: str):
@@ -15,19 +19,22 @@ class SnapshotWriter:
         structure: Dict,
         graph: Optional[GraphStructure],
         symbols: Optional[Dict[str, List[str]]] = None,
-        write_current_pointer: bool = True
+        write_current_pointer: bool = True,
+        compact: bool = False,
+        dedup: bool = False
     ) -> str:
         """
         Writes the snapshot to disk.
         Handles Pydantic serialization for manifest and graph.
+        With `compact`, also writes snapshot.rrc (see CompactSnapshotWriter).
+        With `dedup`, the JSON artifacts go to the output root's object pool
+        and the snapshot dir gets root.json instead (see StoredSnapshot);
+        symbols.idx is then built on first lookup.
         """
         
         # Generate ID (Timezone Aware to fix DeprecationWarning)
         timestamp = datetime.datetime.now(datetime.timezone.utc).strftime("%Y-%m-%dT%H-%M-%SZ")
-        snapshot_id = timestamp
-        
-        snapshot_dir = os.path.join(self.output_root, snapshot_id)
-        os.makedirs(snapshot_dir, exist_ok=True)
+        snapshot_id, snapshot_dir = self._claim_snapshot_dir(timestamp)
         
         # Update Manifest with Snapshot Info
         manifest.snapshot = {
@@ -36,23 +43,20 @@ class SnapshotWriter:
             "output_root": self.output_root.replace("\\", "/")
         }
 
-        # Write Manifest (Pydantic Dump)
-        with open(os.path.join(snapshot_dir, "manifest.json"), "w") as f:
-            f.write(manifest.model_dump_json(indent=2))
-            
-        # Write Structure (Dict Dump)
-        with open(os.path.join(snapshot_dir, "structure.json"), "w") as f:
-            json.dump(structure, f, indent=2)
-            
-        # Write Graph (Pydantic Dump)
-        if graph:
-            with open(os.path.join(snapshot_dir, "graph.json"), "w") as f:
-                f.write(graph.model_dump_json(indent=2))
-                
-        # Write Symbols Index
-        if symbols is not None:
-            with open(os.path.join(snapshot_dir, "symbols.json"), "w") as f:
-                json.dump(symbols, f, indent=2)
+        if dedup:
+            StoredSnapshot.write(
+                snapshot_dir,
+                manifest.model_dump(mode="json"),
+                structure,
+                graph.model_dump(mode="json") if graph else None,
+                symbols
+            )
+        else:
+            self._write_json(snapshot_dir, manifest, structure, graph, symbols)
+
+        # Write Compact Columnar Form (JSON files stay the export view)
+        if compact:
+            CompactSnapshotWriter.write(os.path.join(snapshot_dir, COMPACT_FILENAME), manifest, graph)
                 
         # Write Exports folder
         os.makedirs(os.path.join(snapshot_dir, "exports"), exist_ok=True)
@@ -67,4 +71,60 @@ class SnapshotWriter:
             with open(os.path.join(self.output_root, "current.json"), "w") as f:
                 json.dump(current_ptr, f, indent=2)
                 
-        return snapshot_id
\ No newline at end of file
+        return snapshot_id
+
+    def _write_json(
+        self,
+        snapshot_dir: str,
+        manifest: Manifest,
+        structure: Dict,
+        graph: Optional[GraphStructure],
+        symbols: Optional[Dict[str, List[str]]]
+    ) -> None:
+        """
+        Writes manifest.json, structure.json, graph.json and symbols.json
+        (+ symbols.idx), and merkle.json with the module hashes diffs use.
+        """
+        # Write Manifest (Pydantic Dump)
+        with open(os.path.join(snapshot_dir, "manifest.json"), "w") as f:
+            f.write(manifest.model_dump_json(indent=2))
+        
+        # Write Structure (Dict Dump)
+        with open(os.path.join(snapshot_dir, "structure.json"), "w") as f:
+            json.dump(structure, f, indent=2)
+        
+        # Write Graph (Pydantic Dump)
+        if graph:
+            with open(os.path.join(snapshot_dir, "graph.json"), "w") as f:
+                f.write(graph.model_dump_json(indent=2))
+            
+        # Write Symbols Index (JSON plus the mmap lookup index)
+        if symbols is not None:
+            with open(os.path.join(snapshot_dir, "symbols.json"), "w") as f:
+                json.dump(symbols, f, indent=2)
+            SymbolIndex.write(os.path.join(snapshot_dir, SYMBOL_INDEX_FILENAME), symbols)
+
+        # Write Merkle Hashes (stored snapshots keep them in the object pool)
+        SnapshotTree.write_merkle(
+            snapshot_dir,
+            manifest.model_dump(mode="json"),
+            graph.model_dump(mode="json") if graph else None
+        )
+
+    def _claim_snapshot_dir(self, timestamp: str):
+        """
+        Creates a fresh directory for this snapshot. IDs have one-second
+        granularity, so rapid successive writes (e.g. watch mode) get a
+        numeric suffix instead of overwriting each other.
+        """
+        os.makedirs(self.output_root, exist_ok=True)
+        snapshot_id = timestamp
+        suffix = 0
+        while True:
+            snapshot_dir = os.path.join(self.output_root, snapshot_id)
+            try:
+                os.mkdir(snapshot_dir)
+                return snapshot_id, snapshot_dir
+            except FileExistsError:
+                suffix += 1
+                snapshot_id = f"{timestamp}-{suffix:02d}"
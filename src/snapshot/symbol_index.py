@@ -0,0 +1,385 @@
+import os
+import json
+import heapq
+import tempfile
+import threading
+from array import array
+from collections import OrderedDict
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from src.snapshot.section_file import SectionFile, write_section_file
+from src.snapshot.object_store import StoredSnapshot
+
+
+SYMBOL_INDEX_FILENAME = "symbols.idx"
+
+_MAGIC = b"RRSYMI\x00\x01"
+_VERSION = 1
+
+(
+    _META,                # JSON: counts
+    _NAME_OFFSETS,        # u32[n_symbols + 1] into _NAME_BLOB
+    _NAME_BLOB,           # utf-8 symbol names, sorted (code point order)
+    _FOLDED_ORDER,        # u32[n_symbols]: symbol indexes ordered by (casefold(name), name)
+    _FILE_OFFSETS,        # u32[n_files + 1] into _FILE_BLOB
+    _FILE_BLOB,           # utf-8 stable ids, sorted
+    _POSTING_OFFSETS,     # u32[n_symbols + 1] into _POSTINGS
+    _POSTINGS,            # u32 file indexes, ascending per symbol
+    _TRIGRAM_OFFSETS,     # u32[n_trigrams + 1] into _TRIGRAM_BLOB
+    _TRIGRAM_BLOB,        # utf-8 trigrams of casefolded, ^$-padded names, sorted
+    _TRIGRAM_POSTING_OFFSETS,  # u32[n_trigrams + 1] into _TRIGRAM_POSTINGS
+    _TRIGRAM_POSTINGS,    # u32 symbol indexes, ascending per trigram
+    _TRIGRAM_COUNTS,      # u32[n_symbols]: distinct trigrams per symbol
+) = range(13)
+_SECTION_COUNT = 13
+
+
+def _trigrams(name: str) -> List[str]:
+    padded = f"^{name.casefold()}$"
+    return sorted({padded[i:i + 3] for i in range(len(padded) - 2)})
+
+
+def _string_table(strings: List[str]) -> Tuple[array, bytes]:
+    offsets = array("I", [0])
+    blob = bytearray()
+    for s in strings:
+        blob += s.encode("utf-8")
+        offsets.append(len(blob))
+    return offsets, bytes(blob)
+
+
+class SymbolIndex:
+    """
+    Memory-mapped symbol -> defining files index (`symbols.idx`), the binary
+    counterpart of symbols.json. Supports exact, case-insensitive prefix and
+    trigram-fuzzy lookup without loading the manifest.
+
+    Scores in search() results: exact 1.0, case-insensitive exact 0.95,
+    prefix 0.5-0.9 (closer in length scores higher), fuzzy up to 0.8 (trigram
+    Jaccard similarity, scaled).
+    """
+
+    # Open handles keyed by path, revalidated by stat signature (None for a
+    # private build of a missing file). Evicted handles are dropped, not
+    # closed: a request may still be reading them.
+    _handles: "OrderedDict[str, Tuple[Optional[Tuple[int, int, int]], SymbolIndex]]" = OrderedDict()
+    _handles_lock = threading.Lock()
+    MAX_OPEN_HANDLES = 32
+
+    MIN_FUZZY_SCORE = 0.3
+
+    def __init__(self, path: str):
+        self.path = path
+        self._temp_path: Optional[str] = None
+        self._file = SectionFile(path, _MAGIC, _VERSION, _SECTION_COUNT)
+        try:
+            meta = json.loads(bytes(self._file.raw(_META)).decode("utf-8"))
+        except ValueError:
+            self._file.close()
+            raise
+        self.symbol_count: int = meta["counts"]["symbols"]
+        self.file_count: int = meta["counts"]["files"]
+        self.trigram_count: int = meta["counts"]["trigrams"]
+
+        ints = self._file.ints
+        self._name_offsets = ints(_NAME_OFFSETS, "I")
+        self._name_blob = self._file.raw(_NAME_BLOB)
+        self._folded_order = ints(_FOLDED_ORDER, "I")
+        self._file_offsets = ints(_FILE_OFFSETS, "I")
+        self._file_blob = self._file.raw(_FILE_BLOB)
+        self._posting_offsets = ints(_POSTING_OFFSETS, "I")
+        self._postings = ints(_POSTINGS, "I")
+        self._trigram_offsets = ints(_TRIGRAM_OFFSETS, "I")
+        self._trigram_blob = self._file.raw(_TRIGRAM_BLOB)
+        self._trigram_posting_offsets = ints(_TRIGRAM_POSTING_OFFSETS, "I")
+        self._trigram_postings = ints(_TRIGRAM_POSTINGS, "I")
+        self._trigram_counts = ints(_TRIGRAM_COUNTS, "I")
+
+    # --- Writing ---
+
+    @staticmethod
+    def write(path: str, symbols: Dict[str, List[str]]) -> str:
+        """Writes the index for a symbols.json-shaped mapping {symbol: [stable_id, ...]}."""
+        names = sorted(symbols)
+        files = sorted({stable_id for ids in symbols.values() for stable_id in ids})
+        file_index = {stable_id: i for i, stable_id in enumerate(files)}
+
+        posting_offsets = array("I", [0])
+        postings = array("I")
+        trigram_postings: Dict[str, List[int]] = {}
+        trigram_counts = array("I")
+        for i, name in enumerate(names):
+            postings.extend(sorted(file_index[stable_id] for stable_id in set(symbols[name])))
+            posting_offsets.append(len(postings))
+            grams = _trigrams(name)
+            trigram_counts.append(len(grams))
+            for gram in grams:
+                trigram_postings.setdefault(gram, []).append(i)
+
+        trigrams = sorted(trigram_postings)
+        gram_offsets = array("I", [0])
+        gram_postings = array("I")
+        for gram in trigrams:
+            gram_postings.extend(trigram_postings[gram])
+            gram_offsets.append(len(gram_postings))
+
+        name_offsets, name_blob = _string_table(names)
+        file_offsets, file_blob = _string_table(files)
+        trigram_offsets, trigram_blob = _string_table(trigrams)
+        folded_order = array("I", sorted(range(len(names)), key=lambda i: (names[i].casefold(), names[i])))
+
+        meta = {"counts": {"symbols": len(names), "files": len(files), "trigrams": len(trigrams)}}
+
+        sections = [None] * _SECTION_COUNT
+        sections[_META] = json.dumps(meta).encode("utf-8")
+        sections[_NAME_OFFSETS] = name_offsets
+        sections[_NAME_BLOB] = name_blob
+        sections[_FOLDED_ORDER] = folded_order
+        sections[_FILE_OFFSETS] = file_offsets
+        sections[_FILE_BLOB] = file_blob
+        sections[_POSTING_OFFSETS] = posting_offsets
+        sections[_POSTINGS] = postings
+        sections[_TRIGRAM_OFFSETS] = trigram_offsets
+        sections[_TRIGRAM_BLOB] = trigram_blob
+        sections[_TRIGRAM_POSTING_OFFSETS] = gram_offsets
+        sections[_TRIGRAM_POSTINGS] = gram_postings
+        sections[_TRIGRAM_COUNTS] = trigram_counts
+        return write_section_file(path, _MAGIC, _VERSION, sections)
+
+    # --- Opening ---
+
+    @staticmethod
+    def exists(snapshot_dir: str) -> bool:
+        return os.path.isfile(os.path.join(snapshot_dir, SYMBOL_INDEX_FILENAME))
+
+    @staticmethod
+    def open(snapshot_dir: str) -> "SymbolIndex":
+        return SymbolIndex(os.path.join(snapshot_dir, SYMBOL_INDEX_FILENAME))
+
+    @staticmethod
+    def for_snapshot(snapshot_dir: str) -> "SymbolIndex":
+        """
+        Shared, already-open index for a snapshot. Snapshots written without
+        symbols.idx get it built from symbols.json (or the manifest) on first use
+        and saved next to it; in a read-only snapshot dir it is built into a
+        private temp file instead, which is reused until symbols.idx appears.
+        Returned handles are shared between callers; do not close them.
+        Raises FileNotFoundError if the snapshot has neither source.
+        """
+        path = os.path.join(os.path.realpath(snapshot_dir), SYMBOL_INDEX_FILENAME)
+        signature = SymbolIndex._signature(path)
+
+        with SymbolIndex._handles_lock:
+            cached = SymbolIndex._handles.get(path)
+            if cached is not None and cached[0] == signature:
+                SymbolIndex._handles.move_to_end(path)
+                return cached[1]
+
+        if signature is None:
+            symbols = SymbolIndex._load_symbols(snapshot_dir)
+            try:
+                SymbolIndex.write(path, symbols)
+                signature = SymbolIndex._signature(path)
+                index = SymbolIndex(path)
+            except OSError:
+                index = SymbolIndex._private(symbols)
+        else:
+            index = SymbolIndex(path)
+        with SymbolIndex._handles_lock:
+            SymbolIndex._handles[path] = (signature, index)
+            SymbolIndex._handles.move_to_end(path)
+            while len(SymbolIndex._handles) > SymbolIndex.MAX_OPEN_HANDLES:
+                SymbolIndex._handles.popitem(last=False)
+        return index
+
+    @staticmethod
+    def _signature(path: str) -> Optional[Tuple[int, int, int]]:
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return None
+        return (st.st_size, st.st_mtime_ns, st.st_ino)
+
+    @staticmethod
+    def _load_symbols(snapshot_dir: str) -> Dict[str, List[str]]:
+        symbols = StoredSnapshot.load_artifact(snapshot_dir, "symbols")
+        if symbols is None:
+            manifest = StoredSnapshot.load_artifact(snapshot_dir, "manifest")
+            if manifest is None:
+                raise FileNotFoundError(f"manifest.json not found in {snapshot_dir}")
+            symbols = {}
+            for entry in manifest.get("files", []):
+                for symbol in entry.get("symbols", []):
+                    symbols.setdefault(symbol, []).append(entry["stable_id"])
+        return symbols
+
+    @staticmethod
+    def _private(symbols: Dict[str, List[str]]) -> "SymbolIndex":
+        """An index in a temp file of its own, removed once it is mapped (or on close)."""
+        fd, temp_path = tempfile.mkstemp(suffix=".idx")
+        os.close(fd)
+        try:
+            SymbolIndex.write(temp_path, symbols)
+            index = SymbolIndex(temp_path)
+        except BaseException:
+            os.remove(temp_path)
+            raise
+        try:
+            os.remove(temp_path)
+        except OSError:
+            # Open files cannot be removed on Windows
+            index._temp_path = temp_path
+        return index
+
+    @staticmethod
+    def build(snapshot_dir: str) -> str:
+        """Writes symbols.idx for an existing snapshot from its symbols.json (or manifest.json)."""
+        symbols = SymbolIndex._load_symbols(snapshot_dir)
+        return SymbolIndex.write(os.path.join(snapshot_dir, SYMBOL_INDEX_FILENAME), symbols)
+
+    def close(self) -> None:
+        self._file.close()
+        if self._temp_path is not None:
+            try:
+                os.remove(self._temp_path)
+            except OSError:
+                pass
+            self._temp_path = None
+
+    def __enter__(self) -> "SymbolIndex":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    # --- Decoding ---
+
+    @staticmethod
+    def _decode(offsets, blob, i: int) -> str:
+        return bytes(blob[offsets[i]:offsets[i + 1]]).decode("utf-8")
+
+    def name(self, i: int) -> str:
+        return self._decode(self._name_offsets, self._name_blob, i)
+
+    def files(self, i: int) -> List[str]:
+        """Stable ids defining symbol `i`, sorted."""
+        refs = self._postings[self._posting_offsets[i]:self._posting_offsets[i + 1]].tolist()
+        return [self._decode(self._file_offsets, self._file_blob, r) for r in refs]
+
+    def _lower_bound(self, count: int, key, target) -> int:
+        lo, hi = 0, count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if key(mid) < target:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    # --- Lookup ---
+
+    def find(self, name: str) -> Optional[int]:
+        """Symbol index for an exact (case-sensitive) name, or None."""
+        i = self._lower_bound(self.symbol_count, self.name, name)
+        if i < self.symbol_count and self.name(i) == name:
+            return i
+        return None
+
+    def resolve(self, name: str) -> Optional[str]:
+        """First (sorted) stable id defining `name` exactly; what `symbol:` focus resolves to."""
+        i = self.find(name)
+        if i is None:
+            return None
+        files = self.files(i)
+        return files[0] if files else None
+
+    def exact(self, name: str) -> List[str]:
+        i = self.find(name)
+        return self.files(i) if i is not None else []
+
+    def prefix(self, prefix: str, limit: Optional[int] = None) -> Iterator[int]:
+        """Symbol indexes whose name starts with `prefix`, case-insensitively, in folded order."""
+        folded_prefix = prefix.casefold()
+        order = self._folded_order
+
+        def folded(k: int) -> str:
+            return self.name(order[k]).casefold()
+
+        k = self._lower_bound(self.symbol_count, folded, folded_prefix)
+        produced = 0
+        while k < self.symbol_count and (limit is None or produced < limit):
+            i = order[k]
+            if not self.name(i).casefold().startswith(folded_prefix):
+                break
+            yield i
+            produced += 1
+            k += 1
+
+    def _trigram_symbols(self, gram: str) -> List[int]:
+        decode = lambda t: self._decode(self._trigram_offsets, self._trigram_blob, t)
+        t = self._lower_bound(self.trigram_count, decode, gram)
+        if t >= self.trigram_count or decode(t) != gram:
+            return []
+        return self._trigram_postings[self._trigram_posting_offsets[t]:self._trigram_posting_offsets[t + 1]].tolist()
+
+    def fuzzy(self, query: str, limit: int = 20, min_score: Optional[float] = None) -> List[Tuple[float, int]]:
+        """
+        (similarity, symbol index) pairs ranked by trigram Jaccard similarity
+        to `query` (case-insensitive), best first.
+        """
+        grams = _trigrams(query)
+        if not grams:
+            return []
+        threshold = self.MIN_FUZZY_SCORE if min_score is None else min_score
+
+        shared: Dict[int, int] = {}
+        for gram in grams:
+            for i in self._trigram_symbols(gram):
+                shared[i] = shared.get(i, 0) + 1
+
+        scored = []
+        for i, hits in shared.items():
+            score = hits / (len(grams) + self._trigram_counts[i] - hits)
+            if score >= threshold:
+                scored.append((score, i))
+        best = heapq.nsmallest(limit, scored, key=lambda pair: (-pair[0], pair[1]))
+        return best
+
+    def search(self, query: str, limit: int = 20, mode: str = "auto") -> List[Dict[str, Any]]:
+        """
+        Ranked candidates for `query`. mode: "exact", "prefix" (exact plus
+        case-insensitive prefix), "fuzzy", or "auto" (all of them).
+        Each result: {"symbol", "files", "match", "score"}.
+        """
+        if mode not in ("auto", "exact", "prefix", "fuzzy"):
+            raise ValueError(f"Unknown symbol search mode: {mode}")
+
+        best: Dict[int, Tuple[float, str]] = {}
+
+        def offer(i: int, score: float, match: str) -> None:
+            if i not in best or best[i][0] < score:
+                best[i] = (score, match)
+
+        if mode in ("auto", "exact", "prefix"):
+            i = self.find(query)
+            if i is not None:
+                offer(i, 1.0, "exact")
+
+        if mode in ("auto", "prefix"):
+            folded_query = query.casefold()
+            for i in self.prefix(query, limit=max(limit * 4, limit)):
+                name = self.name(i)
+                if name.casefold() == folded_query:
+                    offer(i, 0.95, "exact_ci")
+                else:
+                    offer(i, 0.5 + 0.4 * len(query) / len(name), "prefix")
+
+        if mode in ("auto", "fuzzy"):
+            for similarity, i in self.fuzzy(query, limit=limit):
+                offer(i, round(0.8 * similarity, 4), "fuzzy")
+
+        ranked = sorted(best.items(), key=lambda item: (-item[1][0], self.name(item[0])))[:limit]
+        return [
+            {"symbol": self.name(i), "files": self.files(i), "match": match, "score": score}
+            for i, (score, match) in ranked
+        ]
@@ -0,0 +1,71 @@
+import unittest
+import tempfile
+import shutil
+import os
+import time
+from unittest.mock import patch
+from src.core.controller import run_snapshot
+from src.analysis.import_scanner import ImportScanner
+
+class TestAnalysisCacheSnapshot(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = os.path.realpath(tempfile.mkdtemp())
+        self.output_root = os.path.join(self.test_dir, "output")
+        self.repo_a = os.path.join(self.test_dir, "repo_a")
+        self.repo_b = os.path.join(self.test_dir, "repo_b")
+
+        for repo in (self.repo_a, self.repo_b):
+            self._create_file(repo, "src/main.py", "import utils\nclass App: pass\n")
+            self._create_file(repo, "web/app.ts", "import { x } from './lib';\n")
+        self._create_file(self.repo_b, "src/fork_only.py", "def forked(): pass\n")
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+
+    def _create_file(self, repo, path, content):
+        full_path = os.path.join(repo, path)
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+        with open(full_path, "w") as f:
+            f.write(content)
+
+    def _snapshot(self, repo, jobs=1, analysis_cache=True):
+        return run_snapshot(
+            repo_root=repo,
+            output_root=self.output_root,
+            depth=10,
+            ignore=[],
+            include_extensions=[],
+            include_readme=True,
+            write_current_pointer=False,
+            jobs=jobs,
+            analysis_cache=analysis_cache
+        )
+
+    def _files(self, snap_id):
+        with open(os.path.join(self.output_root, snap_id, "manifest.json"), "r") as f:
+            raw = f.read()
+        return raw[raw.index('"files"'):]
+
+    def test_identical_contents_parsed_once_across_repos(self):
+        self._snapshot(self.repo_a)
+        time.sleep(1.1)
+
+        with patch("src.core.controller.ImportScanner.scan_text", wraps=ImportScanner.scan_text) as spy:
+            snap_b = self._snapshot(self.repo_b)
+        # Only the fork-only file has unseen contents
+        self.assertEqual(spy.call_count, 1)
+
+        time.sleep(1.1)
+        uncached_b = self._snapshot(self.repo_b, analysis_cache=False)
+        self.assertEqual(self._files(snap_b), self._files(uncached_b))
+
+    def test_pool_workers_read_cache(self):
+        self._snapshot(self.repo_a)
+        time.sleep(1.1)
+        cached = self._snapshot(self.repo_a, jobs=2)
+        time.sleep(1.1)
+        uncached = self._snapshot(self.repo_a, analysis_cache=False)
+        self.assertEqual(self._files(cached), self._files(uncached))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -3,10 +3,13 @@ import tempfile
 import shutil
 import os
 import time
+import json
+from unittest.mock import patch
 from fastapi.testclient import TestClient
 
 # Must import the FastAPI app instance
-from src.api.server import app
+from src.api.server import app, snapshot_cache
+from src.snapshot.symbol_index import SymbolIndex
 
 class TestAPI(unittest.TestCase):
     def setUp(self):
@@ -31,6 +34,20 @@ class TestAPI(unittest.TestCase):
         with open(path, "w") as f:
             f.write(content)
 
+    def _run_snapshot_job(self, body):
+        """POSTs a snapshot job and polls it to completion; returns the final job state."""
+        response = self.client.post("/snapshots", json=body)
+        self.assertEqual(response.status_code, 202)
+        job_id = response.json()["job_id"]
+
+        deadline = time.time() + 30
+        while time.time() < deadline:
+            state = self.client.get(f"/jobs/{job_id}").json()
+            if state["status"] in ("succeeded", "failed", "cancelled"):
+                return state
+            time.sleep(0.05)
+        self.fail(f"Snapshot job {job_id} did not finish")
+
     def test_full_api_lifecycle(self):
         """
         Tests the entire lifecycle: Create Snapshot -> Slice Context -> Compare
@@ -40,13 +57,13 @@ class TestAPI(unittest.TestCase):
         self._create_file("utils.py", "def helper(): pass")
 
         # 2. Test POST /snapshots (v1)
-        response_v1 = self.client.post("/snapshots", json={
+        job_v1 = self._run_snapshot_job({
             "repo_root": self.repo_root,
             "output_root": self.output_root,
             "include_extensions": [".py"]
         })
-        self.assertEqual(response_v1.status_code, 200)
-        snap_v1_id = response_v1.json()["snapshot_id"]
+        self.assertEqual(job_v1["status"], "succeeded")
+        snap_v1_id = job_v1["snapshot_id"]
 
         # 3. Test POST /snapshots/{id}/slice
         slice_resp = self.client.post(f"/snapshots/{snap_v1_id}/slice", json={
@@ -71,12 +88,11 @@ class TestAPI(unittest.TestCase):
         time.sleep(1.1)
 
         # 5. Test POST /snapshots (v2)
-        response_v2 = self.client.post("/snapshots", json={
+        snap_v2_id = self._run_snapshot_job({
             "repo_root": self.repo_root,
             "output_root": self.output_root,
             "include_extensions": [".py"]
-        })
-        snap_v2_id = response_v2.json()["snapshot_id"]
+        })["snapshot_id"]
         
         # Verify IDs are actually different
         self.assertNotEqual(snap_v1_id, snap_v2_id, "Snapshots executed too fast, IDs collided.")
@@ -95,6 +111,49 @@ class TestAPI(unittest.TestCase):
         self.assertEqual(diff_report["files_removed"], 1)   # utils.py
         self.assertEqual(diff_report["files_modified"], 1)  # main.py
 
+        # Both snapshots have Merkle trees: the diff never parses them through the cache
+        with patch.object(snapshot_cache, "get", wraps=snapshot_cache.get) as cache_get:
+            self.client.post("/snapshots/compare", json={
+                "output_root": self.output_root, "base_id": snap_v1_id, "target_id": snap_v2_id
+            })
+        cache_get.assert_not_called()
+
+        # Without trees or compact files the cached models are the fallback
+        for snap_id in (snap_v1_id, snap_v2_id):
+            os.remove(os.path.join(self.output_root, snap_id, "merkle.json"))
+        with patch.object(snapshot_cache, "get", wraps=snapshot_cache.get) as cache_get:
+            fallback = self.client.post("/snapshots/compare", json={
+                "output_root": self.output_root, "base_id": snap_v1_id, "target_id": snap_v2_id
+            }).json()
+        self.assertEqual(cache_get.call_count, 2)
+        self.assertEqual(fallback, diff_report)
+
+        # 7. Test POST /snapshots/compare/stream (NDJSON, counts in the trailer)
+        stream_resp = self.client.post("/snapshots/compare/stream", json={
+            "output_root": self.output_root,
+            "base_id": snap_v1_id,
+            "target_id": snap_v2_id
+        })
+        self.assertEqual(stream_resp.status_code, 200)
+        self.assertTrue(stream_resp.headers["content-type"].startswith("application/x-ndjson"))
+        records = [json.loads(line) for line in stream_resp.text.splitlines()]
+        self.assertEqual(records[0], {"type": "header", "base_snapshot_id": snap_v1_id, "target_snapshot_id": snap_v2_id})
+        self.assertEqual(
+            sorted((r["stable_id"], r["status"]) for r in records if r["type"] == "file"),
+            [("file:config.py", "added"), ("file:main.py", "modified"), ("file:utils.py", "removed")]
+        )
+        summary = records[-1]
+        self.assertEqual(summary["type"], "summary")
+        for key in ("files_added", "files_removed", "files_modified", "edges_added", "edges_removed"):
+            self.assertEqual(summary[key], diff_report[key])
+
+        missing = self.client.post("/snapshots/compare/stream", json={
+            "output_root": self.output_root,
+            "base_id": "missing",
+            "target_id": snap_v2_id
+        })
+        self.assertEqual(missing.status_code, 400)
+
     def test_slice_with_token_limit(self):
         """
         Tests that setting max_tokens strictly limits the returned files.
@@ -105,12 +164,11 @@ class TestAPI(unittest.TestCase):
         self._create_file("b.py", "#" * 4000) 
 
         # Snapshot
-        resp = self.client.post("/snapshots", json={
+        snap_id = self._run_snapshot_job({
             "repo_root": self.repo_root,
             "output_root": self.output_root,
             "include_extensions": [".py"]
-        })
-        snap_id = resp.json()["snapshot_id"]
+        })["snapshot_id"]
 
         # Request slice with small limit (e.g. 50 tokens)
         # Should include A (focus, small) but EXCLUDE B (too big)
@@ -133,5 +191,143 @@ class TestAPI(unittest.TestCase):
         stats = data["sliced_manifest"]["stats"]
         self.assertTrue(stats["estimated_tokens"] < 100)
 
+    def test_repeated_slices_reuse_parsed_snapshot(self):
+        self._create_file("a.py", "import b\nclass Alpha: pass")
+        self._create_file("b.py", "x = 1")
+        snap_id = self._run_snapshot_job({
+            "repo_root": self.repo_root,
+            "output_root": self.output_root,
+            "include_extensions": [".py"]
+        })["snapshot_id"]
+
+        before = snapshot_cache.stats()
+        results = []
+        for focus in ("file:a.py", "symbol:Alpha", "file:a.py"):
+            resp = self.client.post(f"/snapshots/{snap_id}/slice", json={
+                "output_root": self.output_root,
+                "focus_id": focus,
+                "radius": 1
+            })
+            self.assertEqual(resp.status_code, 200)
+            results.append(sorted(f["stable_id"] for f in resp.json()["sliced_manifest"]["files"]))
+
+        after = snapshot_cache.stats()
+        self.assertEqual(after["misses"] - before["misses"], 1)
+        self.assertEqual(after["hits"] - before["hits"], 2)
+        self.assertEqual(results, [["file:a.py", "file:b.py"]] * 3)
+
+    def test_batch_slices_with_union(self):
+        self._create_file("a.py", "import b")
+        self._create_file("b.py", "x = 1")
+        self._create_file("c.py", "import d")
+        self._create_file("d.py", "y = 2")
+        snap_id = self._run_snapshot_job({
+            "repo_root": self.repo_root,
+            "output_root": self.output_root,
+            "include_extensions": [".py"]
+        })["snapshot_id"]
+
+        before = snapshot_cache.stats()
+        resp = self.client.post(f"/snapshots/{snap_id}/slices", json={
+            "output_root": self.output_root,
+            "union": True,
+            "slices": [
+                {"focus_id": "file:a.py"},
+                {"focus_id": "file:d.py", "direction": "upstream"},
+                {"focus_id": "file:missing.py"},
+            ]
+        })
+        self.assertEqual(resp.status_code, 200)
+        body = resp.json()
+        self.assertEqual(snapshot_cache.stats()["misses"] - before["misses"], 1)
+
+        files = [[f["stable_id"] for f in r["sliced_manifest"]["files"]] for r in body["slices"]]
+        self.assertEqual(files, [["file:a.py", "file:b.py"], ["file:d.py"], []])
+
+        # Each batch entry matches the single-slice endpoint
+        single = self.client.post(f"/snapshots/{snap_id}/slice", json={
+            "output_root": self.output_root, "focus_id": "file:a.py"
+        }).json()
+        self.assertEqual(single, body["slices"][0])
+
+        union = body["union"]
+        self.assertEqual([f["stable_id"] for f in union["files"]], ["file:a.py", "file:b.py", "file:d.py"])
+        self.assertEqual(union["telemetry"]["unresolved_ids"], ["file:missing.py"])
+
+        bad = self.client.post(f"/snapshots/{snap_id}/slices", json={
+            "output_root": self.output_root, "slices": [{"focus_id": "file:a.py", "direction": "sideways"}]
+        })
+        self.assertEqual(bad.status_code, 400)
+
+    def test_job_events_stream_and_snapshot_listing(self):
+        self._create_file("main.py", "import utils")
+        self._create_file("utils.py", "x = 1")
+        response = self.client.post("/snapshots", json={
+            "repo_root": self.repo_root,
+            "output_root": self.output_root
+        })
+        job_id = response.json()["job_id"]
+
+        events = []
+        with self.client.stream("GET", f"/jobs/{job_id}/events") as stream:
+            self.assertTrue(stream.headers["content-type"].startswith("text/event-stream"))
+            for line in stream.iter_lines():
+                if line.startswith("event: "):
+                    events.append(line[len("event: "):])
+        # The stream ends with the terminal state
+        self.assertEqual(events[-1], "succeeded")
+
+        state = self.client.get(f"/jobs/{job_id}").json()
+        self.assertEqual(state["phase"], "Building Graph & Structure")
+
+        listing = self.client.get("/snapshots", params={"output_root": self.output_root}).json()
+        self.assertEqual([s["snapshot_id"] for s in listing["snapshots"]], [state["snapshot_id"]])
+        self.assertTrue(listing["snapshots"][0]["current"])
+
+    def test_symbol_search_endpoint(self):
+        self._create_file("models.py", "class UserModel: pass\nclass UserRole: pass")
+        self._create_file("views.py", "import models\ndef user_view(): pass")
+        snap_id = self._run_snapshot_job({
+            "repo_root": self.repo_root,
+            "output_root": self.output_root
+        })["snapshot_id"]
+        self.assertTrue(os.path.isfile(os.path.join(self.output_root, snap_id, "symbols.idx")))
+
+        def search(q, **params):
+            resp = self.client.get(f"/snapshots/{snap_id}/symbols",
+                                   params=dict(output_root=self.output_root, q=q, **params))
+            self.assertEqual(resp.status_code, 200)
+            return resp.json()["results"]
+
+        exact = search("UserModel", mode="exact")
+        self.assertEqual(exact, [{"symbol": "UserModel", "files": ["file:models.py"], "match": "exact", "score": 1.0}])
+
+        # Case-insensitive prefix ranks every User* symbol
+        self.assertEqual({r["symbol"] for r in search("user", mode="prefix")}, {"UserModel", "UserRole", "user_view"})
+
+        # Typo still finds the symbol
+        self.assertEqual(search("UserModle")[0]["symbol"], "UserModel")
+
+        bad = self.client.get(f"/snapshots/{snap_id}/symbols",
+                              params={"output_root": self.output_root, "q": "x", "mode": "regex"})
+        self.assertEqual(bad.status_code, 400)
+        missing = self.client.get("/snapshots/nope/symbols", params={"output_root": self.output_root, "q": "x"})
+        self.assertEqual(missing.status_code, 404)
+
+        # A failed index build is a server error, not a missing snapshot
+        os.remove(os.path.join(self.output_root, snap_id, "symbols.idx"))
+        with patch.object(SymbolIndex, "write", side_effect=OSError(28, "No space left on device")):
+            failed = self.client.get(f"/snapshots/{snap_id}/symbols", params={"output_root": self.output_root, "q": "x"})
+        self.assertEqual(failed.status_code, 500)
+
+    def test_job_errors(self):
+        response = self.client.post("/snapshots", json={
+            "repo_root": os.path.join(self.test_dir, "missing"),
+            "output_root": self.output_root
+        })
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.client.get("/jobs/nope").status_code, 404)
+        self.assertEqual(self.client.delete("/jobs/nope").status_code, 404)
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -2,6 +2,10 @@ import unittest
 from unittest.mock import patch, MagicMock
 from src.cli.main import main
 import sys
+import io
+import json
+from src.analysis.snapshot_comparator import DiffStream
+from src.core.types import FileDiff, EdgeDiff, SnapshotDiffReport
 
 class TestCLIDiff(unittest.TestCase):
     
@@ -29,7 +33,59 @@ class TestCLIDiff(unittest.TestCase):
         with patch.object(sys, 'argv', ["repo-runner"] + test_args):
             main()
             
-            mock_compare.assert_called_once_with("./out", "2026-02-22T01", "current")
+            mock_compare.assert_called_once_with("./out", "2026-02-22T01", "current", True, None)
+
+    @patch('src.cli.main.run_compare_stream')
+    @patch('src.cli.main.ConfigLoader.load_config')
+    def test_diff_ndjson_streams_records(self, mock_config, mock_stream):
+        """--format ndjson writes a header, one record per diff and a summary trailer."""
+        mock_config.return_value.output_root = "./out"
+        mock_stream.return_value = DiffStream("base_snap", "target_snap", iter([
+            FileDiff(stable_id="file:a.py", status="added", new_sha256="aa"),
+            EdgeDiff(source="file:a.py", target="file:b.py", relation="imports", status="removed"),
+        ]))
+
+        test_args = ["diff", "--base", "base_snap", "--target", "current", "--format", "ndjson"]
+        with patch.object(sys, 'argv', ["repo-runner"] + test_args), \
+                patch('sys.stdout', new_callable=io.StringIO) as stdout:
+            main()
+
+        mock_stream.assert_called_once_with("./out", "base_snap", "current", True, None)
+        records = [json.loads(line) for line in stdout.getvalue().splitlines()]
+        self.assertEqual([r["type"] for r in records], ["header", "file", "edge", "summary"])
+        self.assertEqual(records[1]["stable_id"], "file:a.py")
+        self.assertEqual(records[3]["files_added"], 1)
+        self.assertEqual(records[3]["edges_removed"], 1)
+
+    @patch('src.cli.main.run_compare')
+    @patch('src.cli.main.ConfigLoader.load_config')
+    def test_diff_prints_renames(self, mock_config, mock_compare):
+        """Renamed files print as one line with both ids; rename flags reach the controller."""
+        mock_config.return_value.output_root = "./out"
+        mock_compare.return_value = SnapshotDiffReport(
+            base_snapshot_id="base_snap",
+            target_snapshot_id="target_snap",
+            files_renamed=1,
+            file_diffs=[FileDiff(
+                stable_id="file:src/new.py", status="renamed", old_stable_id="file:src/old.py",
+                old_sha256="aa", new_sha256="aa", similarity=1.0
+            )]
+        )
+
+        test_args = ["diff", "--base", "base_snap", "--target", "current", "--rename-similarity", "0.6"]
+        with patch.object(sys, 'argv', ["repo-runner"] + test_args), \
+                patch('sys.stdout', new_callable=io.StringIO) as stdout:
+            main()
+
+        mock_compare.assert_called_once_with("./out", "base_snap", "current", True, 0.6)
+        self.assertIn("[>] file:src/old.py -> file:src/new.py", stdout.getvalue())
+        self.assertIn(">1", stdout.getvalue())
+
+        mock_compare.reset_mock()
+        with patch.object(sys, 'argv', ["repo-runner", "diff", "--base", "a", "--target", "b", "--no-renames"]), \
+                patch('sys.stdout', new_callable=io.StringIO):
+            main()
+        mock_compare.assert_called_once_with("./out", "a", "b", False, None)
 
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
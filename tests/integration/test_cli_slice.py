@@ -17,7 +17,9 @@ class TestCLISlice(unittest.TestCase):
             "--repo-root", "./repo",
             "--focus", "file:src/app.py",
             "--radius", "2",
-            "--max-tokens", "5000"
+            "--max-tokens", "5000",
+            "--direction", "upstream",
+            "--strategy", "weighted"
         ]
         
         with patch.object(sys, 'argv', ["repo-runner"] + test_args):
@@ -28,10 +30,12 @@ class TestCLISlice(unittest.TestCase):
             mock_export.assert_called_once()
             _, kwargs = mock_export.call_args
             
-            self.assertEqual(kwargs["focus_id"], "file:src/app.py")
+            self.assertEqual(kwargs["focus_id"], "file:src/app.py") # single focus stays a string
             self.assertEqual(kwargs["radius"], 2)
             self.assertEqual(kwargs["max_tokens"], 5000)
             self.assertEqual(kwargs["repo_root"], "./repo")
+            self.assertEqual(kwargs["direction"], "upstream")
+            self.assertEqual(kwargs["strategy"], "weighted")
 
     @patch('src.cli.main.run_export_flatten')
     def test_slice_defaults(self, mock_export):
@@ -51,6 +55,25 @@ class TestCLISlice(unittest.TestCase):
             _, kwargs = mock_export.call_args
             self.assertEqual(kwargs["radius"], 1) # Default
             self.assertIsNone(kwargs["max_tokens"]) # Default None
+            self.assertEqual(kwargs["direction"], "both")
+            self.assertEqual(kwargs["strategy"], "bfs")
+
+    @patch('src.cli.main.run_export_flatten')
+    def test_repeated_focus_slices_together(self, mock_export):
+        test_args = [
+            "slice",
+            "--output-root", "./out",
+            "--repo-root", "./repo",
+            "--focus", "file:a.py",
+            "--focus", "symbol:Helper"
+        ]
+
+        with patch.object(sys, 'argv', ["repo-runner"] + test_args):
+            main()
+
+            _, kwargs = mock_export.call_args
+            self.assertEqual(kwargs["focus_id"], ["file:a.py", "symbol:Helper"])
+            self.assertEqual(kwargs["title"], "Context Slice: file:a.py, symbol:Helper")
 
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,162 @@
+import unittest
+import tempfile
+import shutil
+import os
+import time
+from unittest.mock import patch
+
+from src.analysis.context_slicer import ContextSlicer
+from src.core.controller import run_snapshot, run_compare, run_export_flatten
+from src.snapshot.compact_snapshot import COMPACT_FILENAME
+from src.snapshot.snapshot_loader import SnapshotLoader
+from src.snapshot.snapshot_tree import MERKLE_FILENAME
+
+
+class TestCompactSnapshot(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = os.path.realpath(tempfile.mkdtemp())
+        self.repo_root = os.path.join(self.test_dir, "repo")
+        self.output_root = os.path.join(self.test_dir, "output")
+
+        self._create_file("src/main.py", "import utils\nimport os\nclass App: pass\n")
+        self._create_file("src/utils.py", "import main\ndef helper(): pass\n")
+        self._create_file("web/app.ts", "import { x } from './lib';\nimport React from 'react';\n")
+        self._create_file("web/lib.ts", "export const x = 1;\n")
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+
+    def _create_file(self, path, content):
+        full_path = os.path.join(self.repo_root, path)
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+        with open(full_path, "w") as f:
+            f.write(content)
+
+    def _snapshot(self, compact=True):
+        return run_snapshot(
+            repo_root=self.repo_root,
+            output_root=self.output_root,
+            depth=10,
+            ignore=[],
+            include_extensions=[],
+            include_readme=True,
+            write_current_pointer=True,
+            compact_snapshot=compact
+        )
+
+    def _drop_compact(self, *snap_ids):
+        for snap_id in snap_ids:
+            os.remove(os.path.join(self.output_root, snap_id, COMPACT_FILENAME))
+
+    def test_compact_file_mirrors_json(self):
+        snap_id = self._snapshot()
+        snap_dir = os.path.join(self.output_root, snap_id)
+        manifest = SnapshotLoader.load_manifest(snap_dir)
+
+        with SnapshotLoader.load_compact(snap_dir) as compact:
+            self.assertEqual(compact.snapshot_id, snap_id)
+            self.assertEqual([compact.file_entry(i) for i in range(compact.file_count)], manifest["files"])
+            self.assertTrue(compact.has_graph)
+
+    def test_not_written_by_default(self):
+        snap_id = self._snapshot(compact=False)
+        self.assertIsNone(SnapshotLoader.load_compact(os.path.join(self.output_root, snap_id)))
+
+    def test_compare_uses_compact_with_identical_report(self):
+        base = self._snapshot()
+        time.sleep(1.1)
+        self._create_file("src/utils.py", "def helper(): return 1\n")
+        self._create_file("src/new.py", "import utils\n")
+        os.remove(os.path.join(self.repo_root, "web", "lib.ts"))
+        target = self._snapshot()
+
+        tree_report = run_compare(self.output_root, base, target)
+        # Merkle trees take precedence over the compact form
+        for snap_id in (base, target):
+            os.remove(os.path.join(self.output_root, snap_id, MERKLE_FILENAME))
+        compact_report = run_compare(self.output_root, base, target)
+        self._drop_compact(base, target)
+        json_report = run_compare(self.output_root, base, target)
+
+        self.assertEqual(compact_report, json_report)
+        self.assertEqual(tree_report, json_report)
+        self.assertEqual(compact_report.files_added, 1)
+        self.assertEqual(compact_report.files_removed, 1)
+        self.assertEqual(compact_report.files_modified, 1)
+
+    def test_focused_flatten_matches_json_slice(self):
+        snap_id = self._snapshot()
+        cases = {
+            "main": ("file:src/main.py", "both"),
+            "lib-up": ("file:web/lib.ts", "upstream"),
+            "lib-down": ("file:web/lib.ts", "downstream"),
+            "both-apps": (["file:src/main.py", "file:web/lib.ts"], "both"),
+        }
+
+        def export(name, focus_id, direction):
+            return run_export_flatten(
+                output_root=self.output_root,
+                repo_root=self.repo_root,
+                snapshot_id=snap_id,
+                output_path=os.path.join(self.test_dir, name),
+                tree_only=False,
+                include_readme=True,
+                scope="full",
+                title=None,
+                focus_id=focus_id,
+                radius=1,
+                direction=direction
+            )
+
+        from_compact = {}
+        for case, (focus_id, direction) in cases.items():
+            with open(export(f"compact-{case}.md", focus_id, direction), "r", encoding="utf-8") as f:
+                from_compact[case] = f.read()
+        # Without snapshot.rrc, the first slice builds it from the JSON
+        self._drop_compact(snap_id)
+        for case, (focus_id, direction) in cases.items():
+            with open(export(f"rebuilt-{case}.md", focus_id, direction), "r", encoding="utf-8") as f:
+                self.assertEqual(from_compact[case], f.read())
+        snap_dir = os.path.join(self.output_root, snap_id)
+        self.assertTrue(os.path.isfile(os.path.join(snap_dir, COMPACT_FILENAME)))
+
+        # Same slices as over the parsed JSON
+        manifest = SnapshotLoader.load_manifest(snap_dir)
+        graph = SnapshotLoader.load_graph(snap_dir)
+        with SnapshotLoader.load_compact(snap_dir) as compact:
+            for focus_id, direction in cases.values():
+                self.assertEqual(
+                    ContextSlicer.slice_compact(compact, focus_id=focus_id, radius=1, direction=direction),
+                    ContextSlicer.slice_manifest(manifest=manifest, graph=graph, focus_id=focus_id, radius=1, direction=direction)
+                )
+
+        self.assertIn("src/utils.py", from_compact["main"])
+        self.assertNotIn("web/lib.ts", from_compact["main"])
+        # lib.ts imports nothing; app.ts imports it
+        self.assertNotIn("web/app.ts", from_compact["lib-up"])
+        self.assertIn("web/app.ts", from_compact["lib-down"])
+        for path in ("src/utils.py", "web/app.ts"):
+            self.assertIn(path, from_compact["both-apps"])
+        self.assertIn("Context Slice: file:src/main.py, file:web/lib.ts", from_compact["both-apps"])
+
+    def test_focused_flatten_never_parses_the_manifest(self):
+        snap_id = self._snapshot(compact=False)
+        with patch.object(SnapshotLoader, "load_manifest") as load_manifest:
+            out = run_export_flatten(
+                output_root=self.output_root,
+                repo_root=self.repo_root,
+                snapshot_id=snap_id,
+                output_path=os.path.join(self.test_dir, "slice.md"),
+                tree_only=False,
+                include_readme=True,
+                scope="full",
+                title=None,
+                focus_id="symbol:App",
+                radius=1
+            )
+        load_manifest.assert_not_called()
+        with open(out, "r", encoding="utf-8") as f:
+            self.assertIn("src/utils.py", f.read())
+
+if __name__ == "__main__":
+    unittest.main()
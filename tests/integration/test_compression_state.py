@@ -101,4 +101,74 @@ def test_compression_state_lifecycle(temp_repo_root, create_file):
     assert final_bools.get("file:src/a.py") == 1 # Modified, so flipped back to 1
     assert final_bools.get("file:src/c.py") == 1 # Added, so 1
     assert "file:src/b.py" not in final_bools    # Deleted, must be removed to avoid ghost state
-    assert "file:src/b.py" not in final_master   # Deleted from master context as well
\ No newline at end of file
+    assert "file:src/b.py" not in final_master   # Deleted from master context as well
+
+def test_compression_state_rekeys_renamed_files(temp_repo_root, create_file):
+    """
+    A moved file keeps its summary under the new stable_id, with its header
+    rewritten to the new path, instead of being dropped and re-queued; a
+    near-rename keeps it but is queued again.
+    """
+    temp_repo_root = os.path.realpath(temp_repo_root)
+    output_root = os.path.join(temp_repo_root, "snapshots")
+    state_dir = os.path.join(temp_repo_root, "states")
+
+    def snapshot(snap_id):
+        with patch("src.core.controller.time.strftime", return_value=snap_id):
+            return run_snapshot(
+                repo_root=temp_repo_root,
+                output_root=output_root,
+                depth=10,
+                ignore=[],
+                include_extensions=[".py"],
+                include_readme=False,
+                write_current_pointer=True
+            )
+
+    create_file("src/a.py", "import os\nimport sys\ndef alpha(): pass\ndef beta(): pass\n")
+    create_file("src/b.py", "import json\ndef gamma(): pass\n")
+    create_file("src/c.py", "import re\ndef epsilon(): pass\n")
+    snap_1 = snapshot("snap_1")
+
+    master_path = os.path.join(state_dir, "master_compressed_context.json")
+    bool_path = os.path.join(state_dir, "file_changed_bool.json")
+    os.makedirs(state_dir)
+    with open(master_path, "w", encoding="utf-8") as f:
+        json.dump({
+            "file:src/a.py": "### `src/a.py`\n**Role:** COMPRESSED_A",
+            "file:src/b.py": "### `src/b.py`\n**Role:** COMPRESSED_B",
+            "file:src/c.py": "Free-form summary without a header",
+        }, f)
+    with open(bool_path, "w", encoding="utf-8") as f:
+        json.dump({"file:src/a.py": 0, "file:src/b.py": 0, "file:src/c.py": 0}, f)
+
+    # a.py moves unchanged; b.py moves with an extra function
+    os.makedirs(os.path.join(temp_repo_root, "lib"))
+    os.replace(os.path.join(temp_repo_root, "src/a.py"), os.path.join(temp_repo_root, "lib/a.py"))
+    os.replace(os.path.join(temp_repo_root, "src/c.py"), os.path.join(temp_repo_root, "lib/c.py"))
+    os.remove(os.path.join(temp_repo_root, "src/b.py"))
+    create_file("lib/b2.py", "import json\ndef gamma(): pass\ndef delta(): pass\n")
+    snap_2 = snapshot("snap_2")
+
+    stats = run_export_compression_state(
+        output_root=output_root,
+        base_id=snap_1,
+        target_id=snap_2,
+        state_dir=state_dir,
+        rename_similarity=0.3
+    )
+
+    with open(bool_path, "r", encoding="utf-8") as f:
+        final_bools = json.load(f)
+    with open(master_path, "r", encoding="utf-8") as f:
+        final_master = json.load(f)
+
+    # Summaries move with their files, headers pointing at the new path
+    assert final_master == {
+        "file:lib/a.py": "### `lib/a.py`\n**Role:** COMPRESSED_A",
+        "file:lib/b2.py": "### `lib/b2.py`\n**Role:** COMPRESSED_B",
+    }
+    assert final_master["file:lib/a.py"].splitlines()[0] == "### `lib/a.py`"
+    # c.py's summary header cannot be rewritten, so it is recompressed
+    assert final_bools == {"file:lib/a.py": 0, "file:lib/b2.py": 1, "file:lib/c.py": 1}
+    assert stats["pending_compression"] == 2
@@ -0,0 +1,113 @@
+import unittest
+import tempfile
+import shutil
+import os
+import json
+import time
+from fastapi.testclient import TestClient
+
+from src.api.server import app
+from src.core.controller import run_snapshot, run_compare, run_export_flatten
+from src.snapshot.object_store import OBJECTS_DIRNAME, ROOT_FILENAME
+from src.snapshot.snapshot_loader import SnapshotLoader
+
+
+class TestDedupSnapshot(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = os.path.realpath(tempfile.mkdtemp())
+        self.repo_root = os.path.join(self.test_dir, "repo")
+        self.output_root = os.path.join(self.test_dir, "output")
+
+        self._create_file("src/main.py", "import utils\nimport os\nclass App: pass\n")
+        self._create_file("src/utils.py", "def helper(): pass\n")
+        self._create_file("web/app.ts", "import { x } from './lib';\nimport React from 'react';\n")
+        self._create_file("web/lib.ts", "export const x = 1;\n")
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+
+    def _create_file(self, path, content):
+        full_path = os.path.join(self.repo_root, path)
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+        with open(full_path, "w") as f:
+            f.write(content)
+
+    def _snapshot(self, dedup=True):
+        return run_snapshot(
+            repo_root=self.repo_root,
+            output_root=self.output_root,
+            depth=10,
+            ignore=[],
+            include_extensions=[],
+            include_readme=True,
+            write_current_pointer=True,
+            dedup_snapshot=dedup
+        )
+
+    def _objects(self):
+        pool = os.path.join(self.output_root, OBJECTS_DIRNAME)
+        return {os.path.join(d, f) for d, _, files in os.walk(pool) for f in files}
+
+    def test_loader_reassembles_json_artifacts(self):
+        plain_dir = os.path.join(self.output_root, self._snapshot(dedup=False))
+        time.sleep(1.1)
+        stored_dir = os.path.join(self.output_root, self._snapshot())
+
+        self.assertFalse(os.path.exists(os.path.join(stored_dir, "manifest.json")))
+        self.assertTrue(os.path.isfile(os.path.join(stored_dir, ROOT_FILENAME)))
+
+        manifest_plain = SnapshotLoader.load_manifest(plain_dir)
+        manifest_stored = SnapshotLoader.load_manifest(stored_dir)
+        manifest_plain.pop("snapshot")
+        manifest_stored.pop("snapshot")
+        self.assertEqual(manifest_stored, manifest_plain)
+        self.assertEqual(SnapshotLoader.load_structure(stored_dir), SnapshotLoader.load_structure(plain_dir))
+        self.assertEqual(SnapshotLoader.load_graph(stored_dir), SnapshotLoader.load_graph(plain_dir))
+        with open(os.path.join(plain_dir, "symbols.json"), "r", encoding="utf-8") as f:
+            self.assertEqual(SnapshotLoader.load_symbols(stored_dir), json.load(f))
+
+    def test_one_changed_file_adds_only_its_module(self):
+        first = self._snapshot()
+        objects_before = self._objects()
+
+        time.sleep(1.1)
+        self._create_file("web/lib.ts", "export const x = 2;\n")
+        second = self._snapshot()
+        added = self._objects() - objects_before
+
+        # Module record of web, the web tree and the root tree
+        self.assertEqual(len(added), 3)
+
+        report = run_compare(self.output_root, first, second)
+        self.assertEqual(
+            [(d.stable_id, d.status) for d in report.file_diffs],
+            [("file:web/lib.ts", "modified")]
+        )
+
+    def test_slice_and_listing(self):
+        snap_id = self._snapshot()
+        out = os.path.join(self.test_dir, "slice.md")
+        run_export_flatten(
+            output_root=self.output_root,
+            repo_root=self.repo_root,
+            snapshot_id=snap_id,
+            output_path=out,
+            tree_only=False,
+            include_readme=True,
+            scope="full",
+            title=None,
+            focus_id="symbol:App",
+            radius=1
+        )
+        with open(out, "r", encoding="utf-8") as f:
+            content = f.read()
+        self.assertIn("src/main.py", content)
+        self.assertIn("src/utils.py", content)
+        self.assertNotIn("web/lib.ts", content)
+
+        listing = TestClient(app).get("/snapshots", params={"output_root": self.output_root}).json()
+        self.assertEqual(listing["snapshots"], [{"snapshot_id": snap_id, "current": True, "has_graph": True}])
+
+
+if __name__ == "__main__":
+    unittest.main()
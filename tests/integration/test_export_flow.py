@@ -2,7 +2,8 @@ import unittest
 import tempfile
 import shutil
 import os
-from src.core.controller import run_snapshot, run_export_flatten
+import json
+from src.core.controller import run_snapshot, run_export_flatten, run_export_flatten_sharded
 
 class TestExportFlow(unittest.TestCase):
     def setUp(self):
@@ -89,5 +90,46 @@ class TestExportFlow(unittest.TestCase):
         self.assertNotIn("app.js", content)
         self.assertNotIn("README.md", content.upper())
 
+
+    def test_export_sharded(self):
+        def export(out_dir, jobs):
+            return run_export_flatten_sharded(
+                output_root=self.output_root,
+                repo_root=self.repo_root,
+                snapshot_id=self.snap_id,
+                output_dir=os.path.join(self.test_dir, out_dir),
+                tree_only=False,
+                include_readme=True,
+                scope="full",
+                title="Sharded",
+                max_tokens_per_shard=200,
+                jobs=jobs
+            )
+
+        index_path = export("shards", 4)
+        with open(index_path, "r") as f:
+            index = json.load(f)
+
+        self.assertGreater(index["shard_count"], 1)
+        self.assertEqual(sorted(index["files"]), [
+            "file:readme.md", "file:src/api/routes.js", "file:src/api/server.js", "file:src/ui/app.js"
+        ])
+        # Module src/api stays in one shard
+        self.assertEqual(index["files"]["file:src/api/routes.js"], index["files"]["file:src/api/server.js"])
+
+        for shard in index["shards"]:
+            with open(os.path.join(self.test_dir, "shards", shard["file"]), "r") as f:
+                content = f.read()
+            self.assertIn(f"(shard ", content)
+            self.assertIn("## Tree", content)
+            self.assertIn(shard["first_path"], content)
+            self.assertLessEqual(shard["estimated_tokens"], 200)
+
+        # Rendering in parallel does not change the output
+        serial_dir = os.path.dirname(export("shards-serial", 1))
+        for name in os.listdir(serial_dir):
+            with open(os.path.join(serial_dir, name), "rb") as a, open(os.path.join(self.test_dir, "shards", name), "rb") as b:
+                self.assertEqual(a.read(), b.read())
+
 if __name__ == "__main__":
-    unittest.main()
\ No newline at end of file
+    unittest.main()
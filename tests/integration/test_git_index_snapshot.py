@@ -0,0 +1,99 @@
+import unittest
+import tempfile
+import shutil
+import subprocess
+import json
+import hashlib
+import os
+import time
+from unittest.mock import patch
+from src.core.controller import run_snapshot, _analyze_file
+
+@unittest.skipUnless(shutil.which("git"), "git executable not available")
+class TestGitIndexSnapshot(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = os.path.realpath(tempfile.mkdtemp())
+        self.repo_root = os.path.join(self.test_dir, "repo")
+        self.output_root = os.path.join(self.test_dir, "output")
+        os.makedirs(self.repo_root)
+
+        self._git("init", "-q")
+        self._git("config", "user.email", "test@example.com")
+        self._git("config", "user.name", "Test")
+        self._create_file("src/main.py", "import utils\n")
+        self._create_file("src/utils.py", "def helper(): pass\n")
+        self._create_file("web/app.ts", "import { x } from './lib';\n")
+        self._create_file("web/lib.ts", "export const x = 1;\n")
+        self._git("add", "-A")
+        self._git("commit", "-q", "-m", "initial")
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+
+    def _git(self, *args):
+        return subprocess.run(["git", *args], cwd=self.repo_root, check=True,
+                              capture_output=True, text=True).stdout.strip()
+
+    def _create_file(self, path, content):
+        full_path = os.path.join(self.repo_root, path)
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+        with open(full_path, "w") as f:
+            f.write(content)
+        old = time.time() - 3600
+        os.utime(full_path, (old, old))
+
+    def _snapshot(self, use_git_index=True, include_untracked=False):
+        return run_snapshot(
+            repo_root=self.repo_root,
+            output_root=self.output_root,
+            depth=10,
+            ignore=[".git"],
+            include_extensions=[],
+            include_readme=True,
+            write_current_pointer=False,
+            use_git_index=use_git_index,
+            include_untracked=include_untracked
+        )
+
+    def _manifest(self, snap_id):
+        with open(os.path.join(self.output_root, snap_id, "manifest.json"), "r") as f:
+            return json.load(f)
+
+    def test_matches_filesystem_scan(self):
+        git_id = self._snapshot()
+        time.sleep(1.1)
+        fs_id = self._snapshot(use_git_index=False)
+
+        git_manifest = self._manifest(git_id)
+        fs_manifest = self._manifest(fs_id)
+        self.assertEqual(git_manifest["files"], fs_manifest["files"])
+        self.assertEqual(git_manifest["inputs"]["git"]["commit"], self._git("rev-parse", "HEAD"))
+        self.assertTrue(git_manifest["inputs"]["git"]["is_repo"])
+
+    def test_untracked_files_opt_in(self):
+        self._create_file("scratch.py", "print('wip')\n")
+
+        tracked_only = self._manifest(self._snapshot())
+        self.assertNotIn("scratch.py", [f["path"] for f in tracked_only["files"]])
+
+        time.sleep(1.1)
+        with_untracked = self._manifest(self._snapshot(include_untracked=True))
+        self.assertIn("scratch.py", [f["path"] for f in with_untracked["files"]])
+
+    def test_clean_files_skip_analysis(self):
+        self._snapshot()
+        time.sleep(1.1)
+
+        self._create_file("src/utils.py", "def helper(): return 1\n")
+        with patch("src.core.controller._analyze_file", wraps=_analyze_file) as spy:
+            snap_id = self._snapshot()
+
+        analyzed = [os.path.relpath(c.args[0], self.repo_root).replace("\\", "/") for c in spy.call_args_list]
+        self.assertEqual(analyzed, ["src/utils.py"])
+
+        utils = next(f for f in self._manifest(snap_id)["files"] if f["path"] == "src/utils.py")
+        with open(os.path.join(self.repo_root, "src", "utils.py"), "rb") as f:
+            self.assertEqual(utils["sha256"], hashlib.sha256(f.read()).hexdigest())
+
+if __name__ == "__main__":
+    unittest.main()
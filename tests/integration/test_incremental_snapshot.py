@@ -0,0 +1,87 @@
+import unittest
+import tempfile
+import shutil
+import os
+import time
+from unittest.mock import patch
+from src.core.controller import run_snapshot, _analyze_file
+
+class TestIncrementalSnapshot(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = os.path.realpath(tempfile.mkdtemp())
+        self.repo_root = os.path.join(self.test_dir, "repo")
+        self.output_root = os.path.join(self.test_dir, "output")
+        os.makedirs(self.repo_root)
+
+        self._create_file("src/main.py", "import utils\nfrom .core import engine\n")
+        self._create_file("src/utils.py", "def helper(): pass\n")
+        self._create_file("src/core/engine.py", "class Engine: pass\n")
+        self._create_file("web/app.ts", "import { x } from './lib';\n")
+        self._create_file("web/lib.ts", "export const x = 1;\n")
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+
+    def _create_file(self, path, content):
+        full_path = os.path.join(self.repo_root, path)
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+        with open(full_path, "w") as f:
+            f.write(content)
+        # Age the file so it falls outside the cache's racy window
+        old = time.time() - 3600
+        os.utime(full_path, (old, old))
+
+    def _snapshot(self, incremental=True):
+        return run_snapshot(
+            repo_root=self.repo_root,
+            output_root=self.output_root,
+            depth=10,
+            ignore=[],
+            include_extensions=[],
+            include_readme=True,
+            write_current_pointer=False,
+            incremental=incremental
+        )
+
+    def _read(self, snap_id, name):
+        with open(os.path.join(self.output_root, snap_id, name), "r") as f:
+            return f.read()
+
+    def _manifest_files(self, snap_id):
+        raw = self._read(snap_id, "manifest.json")
+        return raw[raw.index('"files"'):]
+
+    def test_incremental_run_matches_full_run(self):
+        self._snapshot()
+        time.sleep(1.1)
+
+        with patch("src.core.controller._analyze_file", wraps=_analyze_file) as spy:
+            incremental_id = self._snapshot()
+        self.assertEqual(spy.call_count, 0, "Unchanged files should not be re-analyzed")
+
+        time.sleep(1.1)
+        full_id = self._snapshot(incremental=False)
+
+        self.assertEqual(self._manifest_files(incremental_id), self._manifest_files(full_id))
+        self.assertEqual(self._read(incremental_id, "graph.json"), self._read(full_id, "graph.json"))
+
+    def test_only_changed_files_are_reanalyzed(self):
+        self._snapshot()
+        self._create_file("src/utils.py", "def helper(): return 1\n")
+        self._create_file("src/new.py", "import os\n")
+        os.remove(os.path.join(self.repo_root, "web", "lib.ts"))
+        time.sleep(1.1)
+
+        with patch("src.core.controller._analyze_file", wraps=_analyze_file) as spy:
+            incremental_id = self._snapshot()
+
+        analyzed = sorted(os.path.relpath(c.args[0], self.repo_root).replace("\\", "/") for c in spy.call_args_list)
+        self.assertEqual(analyzed, ["src/new.py", "src/utils.py"])
+
+        time.sleep(1.1)
+        full_id = self._snapshot(incremental=False)
+        self.assertEqual(self._manifest_files(incremental_id), self._manifest_files(full_id))
+        self.assertEqual(self._read(incremental_id, "graph.json"), self._read(full_id, "graph.json"))
+
+if __name__ == "__main__":
+    unittest.main()
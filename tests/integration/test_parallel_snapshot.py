@@ -0,0 +1,65 @@
+import unittest
+import tempfile
+import shutil
+import os
+import time
+from src.core.controller import run_snapshot
+
+class TestParallelSnapshot(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = os.path.realpath(tempfile.mkdtemp())
+        self.repo_root = os.path.join(self.test_dir, "repo")
+        self.output_root = os.path.join(self.test_dir, "output")
+        os.makedirs(self.repo_root)
+
+        for i in range(40):
+            self._create_file(f"pkg/mod_{i:02d}.py", f"import pkg.mod_{(i + 1) % 40:02d}\nCONST_{i} = {i}\n")
+        self._create_file("web/app.ts", "import { x } from './lib';\n")
+        self._create_file("web/lib.ts", "export const x = 1;\n")
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+
+    def _create_file(self, path, content):
+        full_path = os.path.join(self.repo_root, path)
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+        with open(full_path, "w") as f:
+            f.write(content)
+
+    def _snapshot(self, jobs):
+        return run_snapshot(
+            repo_root=self.repo_root,
+            output_root=self.output_root,
+            depth=10,
+            ignore=[],
+            include_extensions=[],
+            include_readme=True,
+            write_current_pointer=False,
+            jobs=jobs
+        )
+
+    def _read(self, snap_id, name):
+        with open(os.path.join(self.output_root, snap_id, name), "r") as f:
+            raw = f.read()
+        # Drop the volatile snapshot header
+        return raw[raw.find('"inputs"'):] if name == "manifest.json" else raw
+
+    def test_parallel_output_matches_serial(self):
+        serial_id = self._snapshot(jobs=1)
+        time.sleep(1.1)
+        parallel_id = self._snapshot(jobs=4)
+
+        for name in ("manifest.json", "graph.json", "structure.json", "symbols.json"):
+            self.assertEqual(self._read(serial_id, name), self._read(parallel_id, name), name)
+
+    def test_parallel_collision_detection(self):
+        self._create_file("pkg/Mod_00.py", "x = 1")
+        if len(os.listdir(os.path.join(self.repo_root, "pkg"))) != 41:
+            return  # case-insensitive filesystem merged the files
+
+        with self.assertRaises(ValueError) as ctx:
+            self._snapshot(jobs=4)
+        self.assertIn("ID Collision Detected", str(ctx.exception))
+
+if __name__ == "__main__":
+    unittest.main()
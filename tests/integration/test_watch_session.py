@@ -0,0 +1,271 @@
+import unittest
+import tempfile
+import shutil
+import threading
+import json
+import os
+import time
+from unittest.mock import patch
+from src.analysis.import_scanner import ImportScanner
+from src.core.controller import run_snapshot
+from src.core.watch_session import WatchSession, run_watch
+from src.fingerprint.fingerprint_cache import FingerprintCache
+from src.scanner.change_watcher import ChangeWatcher, PollingWatcher, InotifyWatcher, collect_changes
+
+class TestWatchSession(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = os.path.realpath(tempfile.mkdtemp())
+        self.repo_root = os.path.join(self.test_dir, "repo")
+        self.output_root = os.path.join(self.test_dir, "output")
+        self.reference_root = os.path.join(self.test_dir, "reference")
+        os.makedirs(self.repo_root)
+
+        self._create_file("src/main.py", "import utils\nimport helpers\n")
+        self._create_file("src/utils.py", "def helper(): pass\n")
+        self._create_file("web/app.ts", "import { x } from './lib';\n")
+        self._create_file("web/lib.ts", "export const x = 1;\n")
+
+        self.session = WatchSession(
+            self.repo_root, self.output_root, depth=10, ignore=[],
+            include_extensions=[], include_readme=True
+        )
+        self.session.start()
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+
+    def _path(self, rel_path):
+        return os.path.join(self.repo_root, *rel_path.split("/"))
+
+    def _create_file(self, rel_path, content):
+        full_path = self._path(rel_path)
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+        with open(full_path, "w") as f:
+            f.write(content)
+
+    def _load(self, output_root, snap_id):
+        with open(os.path.join(output_root, snap_id, "manifest.json")) as f:
+            files = json.load(f)["files"]
+        with open(os.path.join(output_root, snap_id, "graph.json")) as f:
+            graph = json.load(f)
+        return files, graph
+
+    def assertMatchesFullRun(self, snap_id):
+        ref_id = run_snapshot(
+            repo_root=self.repo_root,
+            output_root=self.reference_root,
+            depth=10,
+            ignore=[],
+            include_extensions=[],
+            include_readme=True,
+            write_current_pointer=False
+        )
+        self.assertEqual(self._load(self.output_root, snap_id), self._load(self.reference_root, ref_id))
+
+    def test_modify_file(self):
+        self._create_file("src/utils.py", "def helper(): return 1\ndef other(): pass\n")
+        summary = self.session.apply_changes({self._path("src/utils.py")})
+
+        self.assertEqual((summary["added"], summary["removed"], summary["modified"]), (0, 0, 1))
+        self.assertNotEqual(summary["snapshot_id"], None)
+        self.assertMatchesFullRun(summary["snapshot_id"])
+
+    def test_add_file_resolves_pending_import(self):
+        self._create_file("src/helpers.py", "VALUE = 1\n")
+        summary = self.session.apply_changes({self._path("src/helpers.py")})
+
+        self.assertEqual(summary["added"], 1)
+        targets = {e.target for e in self.session.graph.edges if e.source == "file:src/main.py"}
+        self.assertIn("file:src/helpers.py", targets)
+        self.assertMatchesFullRun(summary["snapshot_id"])
+
+    def test_remove_directory(self):
+        shutil.rmtree(self._path("web"))
+        summary = self.session.apply_changes({self._path("web")})
+
+        self.assertEqual(summary["removed"], 2)
+        self.assertMatchesFullRun(summary["snapshot_id"])
+
+    def test_full_rescan(self):
+        self._create_file("docs/guide.md", "# Guide\n")
+        os.remove(self._path("src/utils.py"))
+        summary = self.session.apply_changes(None)
+
+        self.assertEqual((summary["added"], summary["removed"]), (1, 1))
+        self.assertMatchesFullRun(summary["snapshot_id"])
+
+    def test_unchanged_content_writes_nothing(self):
+        path = self._path("src/utils.py")
+        os.utime(path, None)
+        self.assertIsNone(self.session.apply_changes({path}))
+        self.assertIsNone(self.session.apply_changes({self._path("src/missing.py")}))
+
+    def test_current_pointer_follows_updates(self):
+        self._create_file("src/utils.py", "def changed(): pass\n")
+        summary = self.session.apply_changes({self._path("src/utils.py")})
+
+        with open(os.path.join(self.output_root, "current.json")) as f:
+            self.assertEqual(json.load(f)["current_snapshot_id"], summary["snapshot_id"])
+
+    def test_rapid_updates_get_distinct_snapshots(self):
+        ids = set()
+        for i in range(3):
+            self._create_file("src/utils.py", f"def v{i}(): pass\n")
+            ids.add(self.session.apply_changes({self._path("src/utils.py")})["snapshot_id"])
+        self.assertEqual(len(ids), 3)
+
+    def test_collision_leaves_state_untouched(self):
+        self._create_file("src/Utils.py", "def clash(): pass\n")
+        if os.path.samefile(self._path("src/Utils.py"), self._path("src/utils.py")):
+            self.skipTest("Case-insensitive filesystem")
+
+        before = dict(self.session.entries)
+        with self.assertRaises(ValueError):
+            self.session.apply_changes({self._path("src/Utils.py")})
+        self.assertEqual(self.session.entries, before)
+
+    def test_output_root_inside_repo_is_ignored(self):
+        inner_output = os.path.join(self.repo_root, "snapshots")
+        session = WatchSession(
+            self.repo_root, inner_output, depth=10, ignore=[],
+            include_extensions=[], include_readme=True
+        )
+        session.start()
+        written = os.path.join(inner_output, "probe.py")
+        with open(written, "w") as f:
+            f.write("x = 1\n")
+        self.assertIsNone(session.apply_changes({written}))
+
+    def test_updates_use_the_analysis_cache(self):
+        output_root = os.path.join(self.test_dir, "cached")
+        session = WatchSession(
+            self.repo_root, output_root, depth=10, ignore=[],
+            include_extensions=[], include_readme=True, analysis_cache=True
+        )
+        session.start()
+
+        # Same content as src/utils.py: served from the cache without parsing
+        self._create_file("src/copy.py", "def helper(): pass\n")
+        with patch.object(ImportScanner, "scan_text", side_effect=AssertionError("parsed")):
+            summary = session.apply_changes({self._path("src/copy.py")})
+        self.assertEqual(summary["added"], 1)
+        self.assertEqual(session.entries["file:src/copy.py"].symbols, session.entries["file:src/utils.py"].symbols)
+
+        # New content is parsed once and stored for later updates
+        self._create_file("src/fresh.py", "def fresh(): pass\n")
+        session.apply_changes({self._path("src/fresh.py")})
+        self._create_file("src/fresh_copy.py", "def fresh(): pass\n")
+        with patch.object(ImportScanner, "scan_text", side_effect=AssertionError("parsed")):
+            session.apply_changes({self._path("src/fresh_copy.py")})
+        self.assertEqual(session.entries["file:src/fresh_copy.py"].symbols, ["fresh"])
+
+    def test_scan_options_are_forwarded_or_rejected(self):
+        output_root = os.path.join(self.test_dir, "incremental")
+        session = WatchSession(
+            self.repo_root, output_root, depth=10, ignore=[],
+            include_extensions=[], include_readme=True, incremental=True
+        )
+        session.start()
+        self.assertEqual(session.entries, self.session.entries)
+        self.assertTrue(os.path.isfile(FingerprintCache(output_root).path))
+
+        with self.assertRaises(ValueError):
+            WatchSession(
+                self.repo_root, output_root, depth=10, ignore=[],
+                include_extensions=[], include_readme=True, use_git_index=True
+            )
+
+
+class TestChangeWatchers(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = os.path.realpath(tempfile.mkdtemp())
+        with open(os.path.join(self.test_dir, "a.py"), "w") as f:
+            f.write("a = 1\n")
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+
+    def test_watcher_base_requires_wait(self):
+        with self.assertRaises(TypeError):
+            ChangeWatcher()
+
+    def test_polling_detects_changes(self):
+        watcher = PollingWatcher(self.test_dir, depth=10, ignore_names=set(), interval=0.05)
+        self.assertEqual(watcher.wait(0.1), set())
+
+        new_file = os.path.join(self.test_dir, "b.py")
+        with open(new_file, "w") as f:
+            f.write("b = 1\n")
+        os.remove(os.path.join(self.test_dir, "a.py"))
+        self.assertEqual(watcher.wait(1.0), {new_file, os.path.join(self.test_dir, "a.py")})
+
+    @unittest.skipUnless(InotifyWatcher.available(), "inotify not available")
+    def test_inotify_reports_files_in_new_directories(self):
+        with InotifyWatcher(self.test_dir, depth=10, ignore_names={"ignored"}) as watcher:
+            nested = os.path.join(self.test_dir, "pkg", "sub")
+            os.makedirs(nested)
+            os.makedirs(os.path.join(self.test_dir, "ignored"))
+            with open(os.path.join(nested, "mod.py"), "w") as f:
+                f.write("x = 1\n")
+            with open(os.path.join(self.test_dir, "ignored", "skip.py"), "w") as f:
+                f.write("x = 1\n")
+
+            changed = collect_changes(watcher, debounce=0.1, max_delay=2.0, timeout=2.0)
+            self.assertIn(os.path.join(nested, "mod.py"), changed)
+            self.assertFalse(any("ignored" in p for p in changed))
+
+    def test_debounce_coalesces_burst(self):
+        watcher = PollingWatcher(self.test_dir, depth=10, ignore_names=set(), interval=0.02)
+
+        def burst():
+            for i in range(5):
+                with open(os.path.join(self.test_dir, f"burst_{i}.py"), "w") as f:
+                    f.write("x = 1\n")
+                time.sleep(0.03)
+
+        writer = threading.Thread(target=burst)
+        writer.start()
+        changed = collect_changes(watcher, debounce=0.2, max_delay=5.0, timeout=2.0)
+        writer.join()
+        self.assertEqual(len([p for p in changed if "burst_" in p]), 5)
+
+
+class TestRunWatch(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = os.path.realpath(tempfile.mkdtemp())
+        self.repo_root = os.path.join(self.test_dir, "repo")
+        self.output_root = os.path.join(self.test_dir, "output")
+        os.makedirs(self.repo_root)
+        with open(os.path.join(self.repo_root, "main.py"), "w") as f:
+            f.write("import os\n")
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+
+    def test_watch_loop_applies_edits(self):
+        updates = []
+        stop = threading.Event()
+
+        def on_update(summary):
+            updates.append(summary)
+            if len(updates) == 1:
+                with open(os.path.join(self.repo_root, "main.py"), "a") as f:
+                    f.write("import sys\n")
+            else:
+                stop.set()
+
+        worker = threading.Thread(target=run_watch, kwargs=dict(
+            repo_root=self.repo_root, output_root=self.output_root, depth=10, ignore=[],
+            include_extensions=[], include_readme=True, debounce_ms=50, backend="poll",
+            poll_interval=0.05, on_update=on_update, should_stop=stop.is_set
+        ))
+        worker.start()
+        worker.join(timeout=20)
+        stop.set()
+
+        self.assertFalse(worker.is_alive())
+        self.assertEqual(len(updates), 2)
+        self.assertEqual(updates[1]["modified"], 1)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+import unittest
+import tempfile
+import shutil
+import os
+from unittest.mock import patch
+from src.analysis.analysis_cache import AnalysisCache
+
+class TestAnalysisCache(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = os.path.realpath(tempfile.mkdtemp())
+
+    def tearDown(self):
+        AnalysisCache.reset_readers()
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+
+    def test_miss_without_store(self):
+        path = AnalysisCache.path_for(self.test_dir)
+        self.assertIsNone(AnalysisCache.lookup(path, "abc", "python"))
+
+    def test_round_trip(self):
+        cache = AnalysisCache(self.test_dir)
+        cache.record("abc", "python", ["os"], ["main"], hit=False)
+        cache.flush()
+
+        self.assertEqual(
+            AnalysisCache.lookup(cache.path, "abc", "python"),
+            {"imports": ["os"], "symbols": ["main"]}
+        )
+        # Same bytes under another language are a different key
+        self.assertIsNone(AnalysisCache.lookup(cache.path, "abc", "typescript"))
+
+    def test_store_created_after_first_lookup(self):
+        path = AnalysisCache.path_for(self.test_dir)
+        self.assertIsNone(AnalysisCache.lookup(path, "abc", "python"))
+
+        cache = AnalysisCache(self.test_dir)
+        cache.record("abc", "python", [], ["x"], hit=False)
+        cache.flush()
+        self.assertIsNotNone(AnalysisCache.lookup(path, "abc", "python"))
+
+    def test_analyzer_version_invalidates(self):
+        cache = AnalysisCache(self.test_dir)
+        cache.record("abc", "python", ["os"], [], hit=False)
+        cache.flush()
+
+        with patch.object(AnalysisCache, "ANALYZER_VERSION", "2"):
+            self.assertIsNone(AnalysisCache.lookup(cache.path, "abc", "python"))
+
+    def test_lru_eviction(self):
+        row_size = len("[]") * 2 + AnalysisCache._ROW_OVERHEAD
+        cache = AnalysisCache(self.test_dir, max_bytes=row_size * 2 + 10)
+
+        with patch("src.analysis.analysis_cache.time.time", return_value=100.0):
+            cache.record("old", "python", [], [], hit=False)
+            cache.flush()
+        with patch("src.analysis.analysis_cache.time.time", return_value=200.0):
+            cache.record("mid", "python", [], [], hit=False)
+            cache.flush()
+        with patch("src.analysis.analysis_cache.time.time", return_value=300.0):
+            # Touching "old" makes "mid" the least recently used
+            cache.record("old", "python", [], [], hit=True)
+            cache.record("new", "python", [], [], hit=False)
+            cache.flush()
+
+        self.assertIsNotNone(AnalysisCache.lookup(cache.path, "old", "python"))
+        self.assertIsNone(AnalysisCache.lookup(cache.path, "mid", "python"))
+        self.assertIsNotNone(AnalysisCache.lookup(cache.path, "new", "python"))
+        self.assertLessEqual(cache.stats()["bytes"], cache.max_bytes)
+
+    def test_corrupt_store_is_a_miss(self):
+        path = AnalysisCache.path_for(self.test_dir)
+        os.makedirs(os.path.dirname(path))
+        with open(path, "wb") as f:
+            f.write(b"not a database" * 100)
+
+        self.assertIsNone(AnalysisCache.lookup(path, "abc", "python"))
+        cache = AnalysisCache(self.test_dir)
+        cache.record("abc", "python", [], [], hit=False)
+        cache.flush()  # must not raise
+
+if __name__ == "__main__":
+    unittest.main()
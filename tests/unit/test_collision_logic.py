@@ -20,10 +20,10 @@ class TestCollisionLogic(unittest.TestCase):
         
         # Mock Scanner to return colliding paths
         mock_instance = mock_scanner_cls.return_value
-        mock_instance.scan.return_value = [
+        mock_instance.scan_iter.return_value = iter([
             "/repo/src/Utils.py", 
             "/repo/src/utils.py"
-        ]
+        ])
         
         # Helper to simulate relpath for our fake /repo structure
         def fake_relpath(path, start):
@@ -60,10 +60,10 @@ class TestCollisionLogic(unittest.TestCase):
     @patch("src.core.controller.ConfigLoader")
     def test_no_collision_on_distinct_files(self, mock_config_loader, mock_scanner_cls):
         mock_instance = mock_scanner_cls.return_value
-        mock_instance.scan.return_value = [
+        mock_instance.scan_iter.return_value = iter([
             "/repo/src/a.py", 
             "/repo/src/b.py"
-        ]
+        ])
         
         def fake_relpath(path, start):
             if path.startswith(start):
@@ -0,0 +1,180 @@
+import unittest
+import tempfile
+import shutil
+import os
+import hashlib
+
+from src.snapshot.compact_snapshot import CompactSnapshot, CompactSnapshotWriter, COMPACT_FILENAME
+from src.analysis.context_slicer import ContextSlicer
+from src.analysis.snapshot_comparator import SnapshotComparator
+from src.core.types import Manifest, GraphStructure
+
+
+def _sha(text):
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+def _manifest(snapshot_id, files):
+    return {
+        "schema_version": "1.0",
+        "tool": {"name": "repo-runner", "version": "0.2.0"},
+        "snapshot": {"snapshot_id": snapshot_id, "created_utc": snapshot_id, "output_root": "/out"},
+        "inputs": {"repo_root": "/repo", "roots": ["/repo"], "git": {"is_repo": False, "commit": None}},
+        "config": {
+            "depth": 5, "ignore_names": [], "include_extensions": [], "include_readme": True,
+            "tree_only": False, "skip_graph": False, "manual_override": False
+        },
+        "stats": {"file_count": len(files), "total_bytes": sum(f["size_bytes"] for f in files),
+                  "external_dependencies": ["react"]},
+        "files": files,
+    }
+
+
+def _file(path, content, size, imports=(), symbols=(), language="python"):
+    return {
+        "path": path,
+        "stable_id": f"file:{path}",
+        "module_path": os.path.dirname(path),
+        "sha256": _sha(content),
+        "size_bytes": size,
+        "language": language,
+        "imports": list(imports),
+        "symbols": list(symbols),
+    }
+
+
+def _edge(source, target):
+    return {"source": source, "target": target, "relation": "imports"}
+
+
+class TestCompactSnapshot(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        files = [
+            _file("src/a.py", "a", 40, imports=["b"], symbols=["HelperClass"]),
+            _file("src/b.py", "b", 40, imports=["a", "c"]),
+            _file("src/c.py", "c", 400, imports=["d"], symbols=["DataModel", "process"]),
+            _file("src/d.py", "d", 40, imports=["react"]),
+            _file("web/ui.tsx", "ui", 4000, imports=["react"], symbols=["App"], language="typescript"),
+        ]
+        self.manifest = _manifest("2026-01-01T00-00-00Z", files)
+        self.graph = {
+            "schema_version": "1.2",
+            "nodes": [{"id": f["stable_id"], "type": "file", "metadata": None} for f in files]
+                     + [{"id": "external:react", "type": "external", "metadata": None}],
+            "edges": [
+                _edge("file:src/a.py", "file:src/b.py"),
+                _edge("file:src/b.py", "file:src/a.py"),
+                _edge("file:src/b.py", "file:src/c.py"),
+                _edge("file:src/c.py", "file:src/d.py"),
+                _edge("file:src/d.py", "external:react"),
+                _edge("file:web/ui.tsx", "external:react"),
+            ],
+            "cycles": [["file:src/a.py", "file:src/b.py"]],
+            "has_cycles": True,
+            "components": [["file:src/a.py", "file:src/b.py"]],
+            "cycles_truncated": False,
+            "unresolved_references": [],
+        }
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+
+    def _write(self, name, manifest, graph):
+        snap_dir = os.path.join(self.test_dir, name)
+        os.makedirs(snap_dir)
+        CompactSnapshotWriter.write(os.path.join(snap_dir, COMPACT_FILENAME), manifest, graph)
+        return CompactSnapshot.open(snap_dir)
+
+    def test_file_records_round_trip(self):
+        with self._write("s1", self.manifest, self.graph) as snap:
+            self.assertEqual(snap.file_count, 5)
+            self.assertEqual(snap.snapshot_id, "2026-01-01T00-00-00Z")
+            self.assertEqual([snap.file_entry(i) for i in range(snap.file_count)], self.manifest["files"])
+
+            header = snap.manifest_header()
+            self.assertNotIn("files", header)
+            self.assertEqual(header["stats"], self.manifest["stats"])
+
+    def test_point_lookups(self):
+        with self._write("s1", self.manifest, self.graph) as snap:
+            self.assertEqual(snap.find_file("file:src/c.py"), 2)
+            self.assertEqual(snap.find_file("file:web/ui.tsx"), 4)
+            self.assertIsNone(snap.find_file("file:src/missing.py"))
+            # Interned strings that are not file IDs must not resolve
+            self.assertIsNone(snap.find_file("react"))
+
+            self.assertEqual(snap.node_type(snap.find_node("external:react")), "external")
+            self.assertIsNone(snap.find_node("external:vue"))
+
+    def test_adjacency_follows_edge_order(self):
+        with self._write("s1", self.manifest, self.graph) as snap:
+            b = snap.find_node("file:src/b.py")
+            self.assertEqual([snap.edge(e)[1] for e in snap.out_edges(b)],
+                             [snap.find_node("file:src/a.py"), snap.find_node("file:src/c.py")])
+            # a->b (incoming), b->a (outgoing), b->c (outgoing)
+            self.assertEqual([snap.node_id(n) for n in snap.neighbors(b)],
+                             ["file:src/a.py", "file:src/a.py", "file:src/c.py"])
+            self.assertEqual(list(snap.iter_edges()),
+                             [(e["source"], e["target"], e["relation"]) for e in self.graph["edges"]])
+
+    def test_accepts_pydantic_models_and_no_graph(self):
+        manifest = Manifest.model_validate(self.manifest)
+        with self._write("s1", manifest, None) as snap:
+            self.assertFalse(snap.has_graph)
+            self.assertEqual(snap.node_count, 0)
+            self.assertEqual(snap.file_entry(0), self.manifest["files"][0])
+
+    def test_non_hex_sha_kept_verbatim(self):
+        manifest = _manifest("s", [dict(_file("a.py", "a", 1), sha256="hash_a")])
+        with self._write("s1", manifest, None) as snap:
+            self.assertEqual(snap.file_sha256(0), "hash_a")
+
+    def test_rejects_foreign_file(self):
+        path = os.path.join(self.test_dir, COMPACT_FILENAME)
+        with open(path, "wb") as f:
+            f.write(b"not a snapshot at all, just bytes")
+        with self.assertRaises(ValueError):
+            CompactSnapshot(path)
+
+    def test_slice_matches_json_slice(self):
+        with self._write("s1", self.manifest, self.graph) as snap:
+            for focus, radius, budget in [
+                ("file:src/b.py", 1, None),
+                ("file:src/b.py", 2, 50),
+                ("file:src/d.py", 3, None),
+                ("file:web/ui.tsx", 2, 1000),
+                ("symbol:DataModel", 1, None),
+                ("symbol:Missing", 1, None),
+                ("file:src/missing.py", 1, None),
+            ]:
+                expected = ContextSlicer.slice_manifest(self.manifest, self.graph, focus, radius, budget)
+                actual = ContextSlicer.slice_compact(snap, focus, radius, budget)
+                self.assertEqual(actual, expected, (focus, radius, budget))
+
+    def test_compare_matches_model_compare(self):
+        files_b = [dict(f) for f in self.manifest["files"] if f["path"] != "src/d.py"]
+        files_b[0] = dict(files_b[0], sha256=_sha("a2"))
+        files_b.append(_file("src/e.py", "e", 10))
+        manifest_b = _manifest("2026-01-02T00-00-00Z", files_b)
+        graph_b = dict(self.graph)
+        graph_b["nodes"] = [n for n in self.graph["nodes"] if n["id"] != "file:src/d.py"] + [
+            {"id": "file:src/e.py", "type": "file", "metadata": None}
+        ]
+        graph_b["edges"] = [e for e in self.graph["edges"] if "file:src/d.py" not in (e["source"], e["target"])]
+        graph_b["edges"].append(_edge("file:src/e.py", "file:src/a.py"))
+
+        expected = SnapshotComparator.compare(
+            Manifest.model_validate(self.manifest), Manifest.model_validate(manifest_b),
+            GraphStructure.model_validate(self.graph), GraphStructure.model_validate(graph_b)
+        )
+        with self._write("a", self.manifest, self.graph) as snap_a, self._write("b", manifest_b, graph_b) as snap_b:
+            actual = SnapshotComparator.compare_compact(snap_a, snap_b)
+
+        self.assertEqual(actual, expected)
+        self.assertEqual((actual.files_added, actual.files_removed, actual.files_modified), (1, 1, 1))
+        self.assertEqual((actual.edges_added, actual.edges_removed), (1, 2))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,11 @@
 import unittest
-from src.analysis.context_slicer import ContextSlicer
+import os
+import shutil
+import tempfile
+from unittest.mock import patch
+from src.analysis.context_slicer import ContextSlicer, SliceIndex
 from src.core.types import FileEntry
+from src.snapshot.centrality_file import CENTRALITY_FILENAME
 
 class TestContextSlicer(unittest.TestCase):
     def setUp(self):
@@ -140,5 +145,99 @@ class TestContextSlicer(unittest.TestCase):
         self.assertEqual(len(sliced["files"]), 0)
         self.assertEqual(sliced["stats"]["file_count"], 0)
 
+    def test_multi_focus_slice(self):
+        """
+        Foci A and D, radius 1: A pulls in B, D pulls in C.
+        Both foci are kept even when the budget is smaller than either.
+        """
+        sliced = ContextSlicer.slice_manifest(
+            self.manifest,
+            self.graph,
+            ["file:d.py", "symbol:HelperClass", "file:missing.py"],
+            radius=1
+        )
+        files = [f["stable_id"] for f in sliced["files"]]
+        self.assertEqual(files, ["file:a.py", "file:b.py", "file:c.py", "file:d.py"])
+        self.assertEqual(sliced["telemetry"]["resolved_id"], ["file:d.py", "file:a.py"])
+        self.assertEqual(sliced["telemetry"]["unresolved_ids"], ["file:missing.py"])
+        self.assertEqual(sliced["stats"]["cycles_included"], 1)
+
+        budgeted = ContextSlicer.slice_manifest(
+            self.manifest, self.graph, ["file:c.py", "file:a.py"], radius=2, max_tokens=5
+        )
+        self.assertEqual([f["stable_id"] for f in budgeted["files"]], ["file:a.py", "file:c.py"])
+        self.assertEqual(budgeted["stats"]["estimated_tokens"], 110)
+
+        empty = ContextSlicer.slice_manifest(self.manifest, self.graph, ["symbol:Nope"], radius=1)
+        self.assertEqual(empty["files"], [])
+
+    def test_index_adjacency_is_sorted_and_deduplicated(self):
+        """B's neighbors are A (both directions, stored once) and C, in id order."""
+        index = ContextSlicer.build_index(self.manifest, self.graph)
+        b = index.node_index["file:b.py"]
+        neighbors = index.targets[index.offsets[b]:index.offsets[b + 1]].tolist()
+        self.assertEqual([index.node_ids[n] for n in neighbors], ["file:a.py", "file:c.py"])
+        self.assertEqual(index.count_cycles([index.node_index["file:a.py"], b]), 1)
+
+    def test_directional_slices(self):
+        """Upstream follows imports (B -> A, C -> D); downstream follows importers."""
+        def files(focus, radius, direction):
+            sliced = ContextSlicer.slice_manifest(self.manifest, self.graph, focus, radius, direction=direction)
+            return [f["stable_id"] for f in sliced["files"]]
+
+        self.assertEqual(files("file:c.py", 1, "upstream"), ["file:c.py", "file:d.py"])
+        self.assertEqual(files("file:c.py", 1, "downstream"), ["file:b.py", "file:c.py"])
+        self.assertEqual(files("file:c.py", 2, "downstream"), ["file:a.py", "file:b.py", "file:c.py"])
+        self.assertEqual(files("file:b.py", 2, "upstream"), ["file:a.py", "file:b.py", "file:c.py", "file:d.py"])
+
+        with self.assertRaises(ValueError):
+            ContextSlicer.slice_manifest(self.manifest, self.graph, "file:a.py", direction="sideways")
+
+    def test_weighted_strategy_prefers_value_per_token(self):
+        """
+        Focus F (10 tokens) imports hub H (90 tokens) and small S1, S2 (10 each).
+        Budget 100: BFS takes H first and fills up; weighted takes S1 + S2.
+        """
+        manifest = {"files": [
+            {"stable_id": "file:f.py", "size_bytes": 40},
+            {"stable_id": "file:h.py", "size_bytes": 360},
+            {"stable_id": "file:s1.py", "size_bytes": 40},
+            {"stable_id": "file:s2.py", "size_bytes": 40},
+        ]}
+        graph = {"nodes": [], "cycles": [], "edges": [
+            {"source": "file:f.py", "target": target, "relation": "imports"}
+            for target in ("file:h.py", "file:s1.py", "file:s2.py")
+        ]}
+
+        bfs = ContextSlicer.slice_manifest(manifest, graph, "file:f.py", 1, max_tokens=100)
+        self.assertEqual([f["stable_id"] for f in bfs["files"]], ["file:f.py", "file:h.py"])
+
+        weighted = ContextSlicer.slice_manifest(manifest, graph, "file:f.py", 1, max_tokens=100, strategy="weighted")
+        self.assertEqual([f["stable_id"] for f in weighted["files"]], ["file:f.py", "file:s1.py", "file:s2.py"])
+        self.assertEqual(weighted["stats"]["estimated_tokens"], 30)
+        self.assertEqual(weighted["telemetry"]["strategy"], "weighted")
+
+        # Without a budget both strategies select the same files
+        unbounded = ContextSlicer.slice_manifest(manifest, graph, "file:f.py", 1, strategy="weighted")
+        self.assertEqual(len(unbounded["files"]), 4)
+
+    def test_centrality_is_saved_next_to_the_snapshot(self):
+        snapshot_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, snapshot_dir, ignore_errors=True)
+        expected = ContextSlicer.build_index(self.manifest, self.graph).centrality
+
+        first = ContextSlicer.build_index(self.manifest, self.graph, snapshot_dir)
+        self.assertEqual(first.centrality, expected)
+        self.assertTrue(os.path.isfile(os.path.join(snapshot_dir, CENTRALITY_FILENAME)))
+
+        with patch.object(SliceIndex, "_pagerank", side_effect=AssertionError("recomputed")):
+            loaded = ContextSlicer.build_index(self.manifest, self.graph, snapshot_dir)
+            self.assertEqual(loaded.centrality, expected)
+
+        # A different graph does not pick up the stale file
+        graph = dict(self.graph, edges=self.graph["edges"][:2])
+        changed = ContextSlicer.build_index(self.manifest, graph, snapshot_dir)
+        self.assertEqual(changed.centrality, ContextSlicer.build_index(self.manifest, graph).centrality)
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
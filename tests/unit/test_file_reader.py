@@ -0,0 +1,69 @@
+import unittest
+import tempfile
+import shutil
+import os
+import hashlib
+from unittest.mock import patch
+from src.fingerprint.file_reader import FileReader
+
+class TestFileReader(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def _write(self, name, data: bytes) -> str:
+        path = os.path.join(self.test_dir, name)
+        with open(path, "wb") as f:
+            f.write(data)
+        return path
+
+    def test_hash_size_and_text_from_one_read(self):
+        data = "﻿import os\r\nprint('é')\r".encode("utf-8")
+        path = self._write("a.py", data)
+
+        with FileReader.read(path) as content:
+            self.assertEqual(content.size, len(data))
+            self.assertEqual(content.sha256, hashlib.sha256(data).hexdigest())
+            self.assertFalse(content.is_binary())
+            with open(path, "r", encoding="utf-8-sig", errors="ignore") as f:
+                self.assertEqual(content.text(encoding="utf-8-sig", errors="ignore"), f.read())
+
+    def test_limited_decode_matches_text_mode_read(self):
+        # CRLF pairs straddle the decode chunk boundary
+        data = ("x\r\n" * 50_000).encode("utf-8") + b"\xff\xfe tail"
+        path = self._write("big.js", data)
+
+        with FileReader.read(path) as content:
+            for limit in (1, 65_535, 100_000, 10_000_000):
+                with open(path, "r", encoding="utf-8-sig", errors="ignore") as f:
+                    self.assertEqual(content.text(encoding="utf-8-sig", errors="ignore", limit=limit), f.read(limit))
+
+    def test_binary_detection(self):
+        path = self._write("img.png", b"\x89PNG\x00\x00data")
+        with FileReader.read(path) as content:
+            self.assertTrue(content.is_binary())
+
+    def test_large_files_are_memory_mapped(self):
+        data = b"a" * 2048
+        path = self._write("large.txt", data)
+
+        with patch.object(FileReader, "MMAP_THRESHOLD", 1024):
+            with FileReader.read(path) as content:
+                self.assertEqual(type(content._data).__name__, "mmap")
+                self.assertEqual(content.sha256, hashlib.sha256(data).hexdigest())
+                self.assertEqual(content.text(), data.decode())
+
+    def test_empty_file(self):
+        path = self._write("empty.py", b"")
+        with FileReader.read(path) as content:
+            self.assertEqual(content.size, 0)
+            self.assertEqual(content.text(limit=10), "")
+
+    def test_missing_file_raises(self):
+        with self.assertRaises(OSError):
+            FileReader.read(os.path.join(self.test_dir, "ghost.txt"))
+
+if __name__ == "__main__":
+    unittest.main()
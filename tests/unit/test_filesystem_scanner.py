@@ -61,10 +61,10 @@ class TestFileSystemScanner(unittest.TestCase):
         # Ensure we didn't recurse infinitely
         self.assertLess(len(files), 10)
 
-    @patch('os.listdir')
-    def test_permission_error_handling(self, mock_listdir):
+    @patch('os.scandir')
+    def test_permission_error_handling(self, mock_scandir):
         # Simulate PermissionError on a subdirectory
-        mock_listdir.side_effect = PermissionError("Access Denied")
+        mock_scandir.side_effect = PermissionError("Access Denied")
         
         scanner = FileSystemScanner(depth=5, ignore_names=set())
         
@@ -73,5 +73,58 @@ class TestFileSystemScanner(unittest.TestCase):
         
         self.assertEqual(files, [])
 
+    def test_depth_limit(self):
+        self._touch("a/b/c/deep.txt")
+
+        shallow = FileSystemScanner(depth=1, ignore_names=set()).scan([self.test_dir])
+        rel = [os.path.relpath(p, self.test_dir).replace("\\", "/") for p in shallow]
+        self.assertIn("src/code.ts", rel)
+        self.assertNotIn("a/b/c/deep.txt", rel)
+
+        deep = FileSystemScanner(depth=3, ignore_names=set()).scan([self.test_dir])
+        self.assertTrue(any(p.endswith("deep.txt") for p in deep))
+
+    def test_deep_tree_does_not_hit_recursion_limit(self):
+        levels = 200
+        try:
+            os.makedirs(os.path.join(self.test_dir, *(["d"] * levels)))
+            self._touch(os.path.join(*(["d"] * levels), "leaf.txt"))
+        except OSError:
+            self.skipTest("Filesystem path length limit reached")
+
+        original_limit = sys.getrecursionlimit()
+        sys.setrecursionlimit(levels // 2)
+        try:
+            files = FileSystemScanner(depth=-1, ignore_names=set()).scan([self.test_dir])
+        finally:
+            sys.setrecursionlimit(original_limit)
+        self.assertTrue(any(p.endswith("leaf.txt") for p in files))
+
+    def test_output_sorted(self):
+        self._touch("a-c.txt")
+        self._touch("a/b.txt")
+        files = FileSystemScanner(depth=10, ignore_names=set()).scan([self.test_dir])
+        self.assertEqual(files, sorted(files))
+
+    def test_scan_iter_yields_per_directory_order(self):
+        self._touch("a-c.txt")
+        self._touch("a/b.txt")
+        scanner = FileSystemScanner(depth=10, ignore_names={".git", "dist"})
+
+        streamed = [os.path.relpath(p, self.test_dir).replace("\\", "/") for p in scanner.scan_iter([self.test_dir])]
+        self.assertEqual(streamed, ["a/b.txt", "a-c.txt", "ok.txt", "src/code.ts"])
+        self.assertEqual(sorted(scanner.scan_iter([self.test_dir])), scanner.scan([self.test_dir]))
+
+    def test_scan_iter_is_lazy(self):
+        for i in range(5):
+            self._touch(f"z{i}/file.txt")
+        scanner = FileSystemScanner(depth=10, ignore_names=set())
+
+        with patch("os.scandir", wraps=os.scandir) as spy:
+            first = next(scanner.scan_iter([self.test_dir]))
+            self.assertTrue(first.endswith("config"))
+            # Only the root and `.git` have been listed so far
+            self.assertEqual(spy.call_count, 2)
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,74 @@
+import unittest
+import tempfile
+import shutil
+import os
+import time
+from src.fingerprint.fingerprint_cache import FingerprintCache
+
+class TestFingerprintCache(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = os.path.realpath(tempfile.mkdtemp())
+        self.payload = {
+            "sha256": "abc",
+            "size_bytes": 4,
+            "language": "python",
+            "imports": ["os"],
+            "symbols": ["main"]
+        }
+        # Well outside the racy window of any cache written during the test
+        self.old_mtime_ns = time.time_ns() - 3600 * 1_000_000_000
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+
+    def _round_trip(self, signature, analyzed=True) -> FingerprintCache:
+        cache = FingerprintCache(self.test_dir)
+        cache.store("file:a.py", signature, self.payload, analyzed=analyzed)
+        cache.save()
+
+        reloaded = FingerprintCache(self.test_dir)
+        reloaded.load()
+        return reloaded
+
+    def test_hit_on_matching_signature(self):
+        sig = [4, self.old_mtime_ns, 42]
+        cache = self._round_trip(sig)
+        self.assertEqual(cache.lookup("file:a.py", sig, analyzed=True), self.payload)
+        self.assertEqual(cache.hits, 1)
+
+    def test_miss_on_changed_signature(self):
+        cache = self._round_trip([4, self.old_mtime_ns, 42])
+        self.assertIsNone(cache.lookup("file:a.py", [5, self.old_mtime_ns, 42], analyzed=True))
+        self.assertIsNone(cache.lookup("file:a.py", [4, self.old_mtime_ns + 1, 42], analyzed=True))
+        self.assertIsNone(cache.lookup("file:a.py", [4, self.old_mtime_ns, 43], analyzed=True))
+        self.assertIsNone(cache.lookup("file:b.py", [4, self.old_mtime_ns, 42], analyzed=True))
+
+    def test_racily_clean_entries_are_rehashed(self):
+        """A file modified right before the caching run cannot be trusted."""
+        sig = [4, time.time_ns(), 42]
+        cache = self._round_trip(sig)
+        self.assertIsNone(cache.lookup("file:a.py", sig, analyzed=True))
+
+    def test_skip_graph_entries_cannot_satisfy_analysis(self):
+        sig = [4, self.old_mtime_ns, 42]
+        cache = self._round_trip(sig, analyzed=False)
+        self.assertIsNone(cache.lookup("file:a.py", sig, analyzed=True))
+
+    def test_analyzed_entry_is_stripped_for_skip_graph(self):
+        sig = [4, self.old_mtime_ns, 42]
+        cache = self._round_trip(sig)
+        payload = cache.lookup("file:a.py", sig, analyzed=False)
+        self.assertEqual(payload["sha256"], "abc")
+        self.assertEqual(payload["imports"], [])
+        self.assertEqual(payload["symbols"], [])
+
+    def test_corrupt_cache_is_ignored(self):
+        os.makedirs(os.path.dirname(FingerprintCache(self.test_dir).path))
+        with open(FingerprintCache(self.test_dir).path, "w") as f:
+            f.write("{not json")
+        cache = FingerprintCache(self.test_dir)
+        cache.load()
+        self.assertIsNone(cache.lookup("file:a.py", [4, self.old_mtime_ns, 42], analyzed=True))
+
+if __name__ == "__main__":
+    unittest.main()
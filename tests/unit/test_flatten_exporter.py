@@ -1,5 +1,7 @@
 import unittest
 import os
+import shutil
+import tempfile
 from src.exporters.flatten_markdown_exporter import FlattenMarkdownExporter, FlattenOptions
 
 class TestFlattenExporter(unittest.TestCase):
@@ -49,5 +51,36 @@ class TestFlattenExporter(unittest.TestCase):
         self.assertIn("<<BINARY_OR_SKIPPED_FILE>>", placeholder)
         self.assertIn("binhash", placeholder)
 
+    def test_export_streams_preamble_and_footer(self):
+        """The written file is preamble + generate_content(); the footer counts only the body."""
+        repo = tempfile.mkdtemp()
+        try:
+            os.makedirs(os.path.join(repo, "src"))
+            with open(os.path.join(repo, "src", "index.ts"), "w") as f:
+                f.write("export const a = 1;\n")
+            with open(os.path.join(repo, "readme.md"), "w") as f:
+                f.write("# hi\n")
+
+            out_path = self.exporter.export(
+                repo_root=repo,
+                snapshot_dir=os.path.join(repo, "snap"),
+                manifest=self.manifest,
+                output_path=os.path.join(repo, "out.md"),
+                options=self.options,
+                title="Test Export",
+                preamble="TELEMETRY\n\n",
+            )
+            with open(out_path, "r", encoding="utf-8") as f:
+                written = f.read()
+
+            expected = self.exporter.generate_content(repo, self.manifest, self.options, "Test Export", "snap")
+            self.assertEqual(written, "TELEMETRY\n\n" + expected)
+            self.assertIn("export const a = 1;", written)
+
+            body = expected[:expected.index("\n---\n## Context Stats")]
+            self.assertIn(f"- **Total Characters:** {len(body):,}", expected)
+        finally:
+            shutil.rmtree(repo, ignore_errors=True)
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,101 @@
+import unittest
+import tempfile
+import shutil
+import subprocess
+import os
+import time
+from src.scanner.git_index import GitRepository, GitIndexScanner
+
+def _git_available() -> bool:
+    return shutil.which("git") is not None
+
+@unittest.skipUnless(_git_available(), "git executable not available")
+class TestGitIndex(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = os.path.realpath(tempfile.mkdtemp())
+        self._git("init", "-q")
+        self._git("config", "user.email", "test@example.com")
+        self._git("config", "user.name", "Test")
+
+        self._touch("src/main.py", "import utils\n")
+        self._touch("src/utils.py", "def helper(): pass\n")
+        self._touch("docs/deep/nested/guide.md", "# Guide\n")
+        self._touch("node_modules/pkg/index.js", "module.exports = {}\n")
+        self._git("add", "-A")
+        self._git("commit", "-q", "-m", "initial")
+        self._touch("scratch.py", "print('untracked')\n")
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+
+    def _git(self, *args):
+        return subprocess.run(["git", *args], cwd=self.test_dir, check=True,
+                              capture_output=True, text=True).stdout.strip()
+
+    def _touch(self, rel_path, content):
+        full = os.path.join(self.test_dir, rel_path)
+        os.makedirs(os.path.dirname(full), exist_ok=True)
+        with open(full, "w") as f:
+            f.write(content)
+        # Age the file so the index entry is not racily clean
+        old = time.time() - 3600
+        os.utime(full, (old, old))
+
+    def _rel(self, paths):
+        return [os.path.relpath(p, self.test_dir).replace("\\", "/") for p in paths]
+
+    def test_head_commit(self):
+        repo = GitRepository.find(self.test_dir)
+        self.assertEqual(repo.head_commit(), self._git("rev-parse", "HEAD"))
+
+    def test_head_commit_from_packed_refs(self):
+        self._git("pack-refs", "--all")
+        repo = GitRepository.find(self.test_dir)
+        self.assertEqual(repo.head_commit(), self._git("rev-parse", "HEAD"))
+
+    def test_not_a_repo(self):
+        self.assertIsNone(GitRepository.find(os.path.join(self.test_dir, "src")))
+
+    def test_index_versions(self):
+        ls_files = self._git("ls-files", "-s").splitlines()
+        expected = {line.split("\t")[1]: line.split(" ")[1] for line in ls_files}
+
+        for version in ("2", "3", "4"):
+            self._git("update-index", "--index-version", version)
+            entries = GitRepository.find(self.test_dir).read_index()
+            self.assertEqual({p: e.oid for p, e in entries.items()}, expected, f"index v{version}")
+
+    def test_scan_tracked_files(self):
+        scanner = GitIndexScanner(GitRepository.find(self.test_dir), depth=10, ignore_names={"node_modules"})
+        files = self._rel(scanner.scan_iter())
+        self.assertEqual(files, ["docs/deep/nested/guide.md", "src/main.py", "src/utils.py"])
+
+    def test_scan_depth_limit(self):
+        scanner = GitIndexScanner(GitRepository.find(self.test_dir), depth=1, ignore_names=set())
+        files = self._rel(scanner.scan_iter())
+        self.assertNotIn("docs/deep/nested/guide.md", files)
+        self.assertIn("src/main.py", files)
+
+    def test_scan_includes_untracked(self):
+        scanner = GitIndexScanner(GitRepository.find(self.test_dir), depth=10,
+                                  ignore_names={"node_modules"}, include_untracked=True)
+        files = self._rel(scanner.scan_iter())
+        self.assertIn("scratch.py", files)
+        self.assertEqual(len(files), len(set(files)))
+        self.assertFalse(any(f.startswith(".git/") for f in files))
+
+    def test_clean_oid(self):
+        scanner = GitIndexScanner(GitRepository.find(self.test_dir), depth=10, ignore_names=set())
+        files = {os.path.basename(p): p for p in scanner.scan_iter()}
+
+        main_py = files["main.py"]
+        oid = self._git("rev-parse", "HEAD:src/main.py")
+        self.assertEqual(scanner.clean_oid(main_py, os.stat(main_py)), oid)
+
+        # Modify without staging: stat no longer matches the index
+        with open(main_py, "a") as f:
+            f.write("# edit\n")
+        self.assertIsNone(scanner.clean_oid(main_py, os.stat(main_py)))
+
+if __name__ == "__main__":
+    unittest.main()
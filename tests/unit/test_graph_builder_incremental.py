@@ -0,0 +1,109 @@
+import unittest
+import random
+from src.analysis.graph_builder import GraphBuilder
+from src.core.types import FileEntry
+
+def _entry(path, imports, language=None):
+    if language is None:
+        language = "python" if path.endswith(".py") else "typescript"
+    module_path = path.rsplit("/", 1)[0] if "/" in path else "."
+    return FileEntry(
+        stable_id=f"file:{path}", path=path, module_path=module_path,
+        sha256="h", size_bytes=1, language=language, imports=imports
+    )
+
+class TestGraphBuilderIncremental(unittest.TestCase):
+    def setUp(self):
+        self.files = [
+            _entry("src/main.py", ["utils", "src.core", "requests"]),
+            _entry("src/utils.py", ["src.main"]),
+            _entry("src/core/__init__.py", [".engine"]),
+            _entry("web/app.ts", ["./lib", "./missing", "react"]),
+            _entry("web/lib.ts", []),
+        ]
+
+    def assertUpdateMatchesBuild(self, builder, previous, files, **changes):
+        patched = builder.update(previous, files, **changes)
+        self.assertEqual(patched, GraphBuilder().build(files))
+        return patched
+
+    def test_added_file_flips_unresolved_import(self):
+        builder = GraphBuilder()
+        previous = builder.build(self.files)
+        self.assertIn("./missing", [u.import_ref for u in previous.unresolved_references])
+
+        new = _entry("web/missing.ts", ["./app"])
+        graph = self.assertUpdateMatchesBuild(builder, previous, self.files + [new], added=[new])
+        self.assertNotIn("./missing", [u.import_ref for u in graph.unresolved_references])
+
+    def test_added_file_flips_external_to_internal(self):
+        builder = GraphBuilder()
+        previous = builder.build(self.files)
+
+        new = _entry("requests.py", [])
+        graph = self.assertUpdateMatchesBuild(builder, previous, self.files + [new], added=[new])
+        self.assertNotIn("external:requests", [n.id for n in graph.nodes])
+
+    def test_removed_file_breaks_cycle(self):
+        builder = GraphBuilder()
+        previous = builder.build(self.files)
+        self.assertTrue(previous.has_cycles)
+
+        removed = self.files[1]
+        files = [f for f in self.files if f is not removed]
+        graph = self.assertUpdateMatchesBuild(builder, previous, files, removed=[removed])
+        self.assertFalse(graph.has_cycles)
+
+    def test_modified_imports(self):
+        builder = GraphBuilder()
+        previous = builder.build(self.files)
+
+        changed = _entry("web/lib.ts", ["./app", "lodash/fp"])
+        files = [changed if f.stable_id == changed.stable_id else f for f in self.files]
+        self.assertUpdateMatchesBuild(builder, previous, files, modified=[changed])
+
+    def test_update_from_foreign_previous_graph(self):
+        # A graph built elsewhere (e.g. loaded from disk) forces an index rebuild
+        previous = GraphBuilder().build(self.files)
+        new = _entry("src/engine.py", ["src.utils"])
+        self.assertUpdateMatchesBuild(GraphBuilder(), previous, self.files + [new], added=[new])
+
+    def test_randomized_change_sequences(self):
+        self._run_randomized(GraphBuilder, seed=1234)
+
+    def test_randomized_change_sequences_with_enumeration(self):
+        self._run_randomized(lambda: GraphBuilder(enumerate_cycles=True, max_cycles=50), seed=99)
+
+    def _run_randomized(self, make_builder, seed):
+        rng = random.Random(seed)
+        paths = [f"pkg/m{i}.py" for i in range(12)] + [f"web/c{i}.ts" for i in range(8)]
+
+        def random_imports(path):
+            if path.endswith(".py"):
+                pool = [f"pkg.m{i}" for i in range(14)] + ["os", ".m1", "..web"]
+            else:
+                pool = [f"./c{i}" for i in range(10)] + ["react", "../pkg/m1"]
+            return rng.sample(pool, rng.randint(0, 4))
+
+        current = {p: _entry(p, random_imports(p)) for p in paths[:10]}
+        builder = make_builder()
+        graph = builder.build(sorted(current.values(), key=lambda f: f.path))
+
+        for _ in range(60):
+            added, removed, modified = [], [], []
+            for path in rng.sample(paths, 3):
+                if path not in current:
+                    current[path] = _entry(path, random_imports(path))
+                    added.append(current[path])
+                elif rng.random() < 0.5:
+                    removed.append(current.pop(path))
+                else:
+                    current[path] = _entry(path, random_imports(path))
+                    modified.append(current[path])
+
+            files = sorted(current.values(), key=lambda f: f.path)
+            graph = builder.update(graph, files, added=added, removed=removed, modified=modified)
+            self.assertEqual(graph, make_builder().build(files))
+
+if __name__ == "__main__":
+    unittest.main()
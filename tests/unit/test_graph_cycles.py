@@ -0,0 +1,102 @@
+import sys
+import unittest
+from itertools import permutations
+from src.analysis.graph_cycles import GraphCycles
+from src.analysis.graph_builder import GraphBuilder
+from src.core.types import FileEntry, GraphStructure, GraphNode, GraphEdge
+
+class TestGraphCycles(unittest.TestCase):
+    def test_tarjan_components(self):
+        adj = {"a": ["b"], "b": ["a", "c"], "c": ["d"], "d": ["c"], "e": ["e"], "f": []}
+        components = GraphCycles.cyclic_components(adj, sorted(adj))
+        self.assertEqual(components, [["a", "b"], ["c", "d"], ["e"]])
+
+    def test_long_chain_does_not_recurse(self):
+        n = sys.getrecursionlimit() * 5
+        adj = {f"n{i:06d}": [f"n{(i + 1) % n:06d}"] for i in range(n)}
+        components = GraphCycles.cyclic_components(adj, sorted(adj))
+        self.assertEqual(len(components), 1)
+        self.assertEqual(len(components[0]), n)
+
+        cycles = GraphCycles.representative_cycles(adj, components[0])
+        self.assertEqual(len(cycles), 1)
+        self.assertEqual(cycles[0][0], "n000000")
+
+    def test_johnson_complete_graph(self):
+        nodes = ["a", "b", "c", "d"]
+        adj = {v: [w for w in nodes if w != v] for v in nodes}
+        cycles, truncated = GraphCycles.elementary_cycles(adj, nodes)
+
+        # 6 two-cycles + 8 three-cycles + 6 four-cycles
+        self.assertEqual(len(cycles), 20)
+        self.assertFalse(truncated)
+        expected = set()
+        for k in range(2, 5):
+            for perm in permutations(nodes, k):
+                i = perm.index(min(perm))
+                expected.add(perm[i:] + perm[:i])
+        self.assertEqual({tuple(c) for c in cycles}, expected)
+
+    def test_johnson_cap(self):
+        nodes = ["a", "b", "c", "d"]
+        adj = {v: [w for w in nodes if w != v] for v in nodes}
+        cycles, truncated = GraphCycles.elementary_cycles(adj, nodes, limit=5)
+        self.assertEqual(len(cycles), 5)
+        self.assertTrue(truncated)
+
+    def test_johnson_self_loop(self):
+        cycles, _ = GraphCycles.elementary_cycles({"a": ["a", "b"], "b": ["a"]}, ["a", "b"])
+        self.assertEqual(cycles, [["a"], ["a", "b"]])
+
+
+class TestGraphBuilderCycles(unittest.TestCase):
+    def _files(self):
+        common = {"module_path": ".", "sha256": "abc", "size_bytes": 0, "language": "python"}
+        # Figure eight: a <-> b, b <-> c, plus an acyclic tail c -> d
+        return [
+            FileEntry(stable_id="file:a.py", path="a.py", imports=["b"], **common),
+            FileEntry(stable_id="file:b.py", path="b.py", imports=["a", "c"], **common),
+            FileEntry(stable_id="file:c.py", path="c.py", imports=["b", "d"], **common),
+            FileEntry(stable_id="file:d.py", path="d.py", imports=[], **common),
+        ]
+
+    def test_components_field(self):
+        graph = GraphBuilder().build(self._files())
+        self.assertEqual(graph.components, [["file:a.py", "file:b.py", "file:c.py"]])
+        self.assertTrue(graph.has_cycles)
+        self.assertFalse(graph.cycles_truncated)
+
+    def test_enumeration_is_opt_in(self):
+        default = GraphBuilder().build(self._files())
+        enumerated = GraphBuilder(enumerate_cycles=True).build(self._files())
+
+        self.assertEqual(enumerated.cycles, [["file:a.py", "file:b.py"], ["file:b.py", "file:c.py"]])
+        self.assertTrue(set(map(tuple, default.cycles)) <= set(map(tuple, enumerated.cycles)))
+
+    def test_enumeration_cap(self):
+        graph = GraphBuilder(enumerate_cycles=True, max_cycles=1).build(self._files())
+        self.assertEqual(len(graph.cycles), 1)
+        self.assertTrue(graph.cycles_truncated)
+        self.assertTrue(graph.has_cycles)
+
+    def test_cycle_lookup_uses_components(self):
+        graph = GraphBuilder().build(self._files())
+        cycle_nodes, is_cycle_edge = GraphCycles.cycle_lookup(graph)
+
+        self.assertEqual(cycle_nodes, {"file:a.py", "file:b.py", "file:c.py"})
+        self.assertTrue(is_cycle_edge("file:c.py", "file:b.py"))
+        self.assertFalse(is_cycle_edge("file:c.py", "file:d.py"))
+
+    def test_cycle_lookup_legacy_graph(self):
+        graph = GraphStructure(
+            nodes=[GraphNode(id="a", type="file"), GraphNode(id="b", type="file")],
+            edges=[GraphEdge(source="a", target="b"), GraphEdge(source="b", target="a")],
+            cycles=[["a", "b"]]
+        )
+        cycle_nodes, is_cycle_edge = GraphCycles.cycle_lookup(graph)
+        self.assertEqual(cycle_nodes, {"a", "b"})
+        self.assertTrue(is_cycle_edge("b", "a"))
+        self.assertFalse(is_cycle_edge("a", "a"))
+
+if __name__ == "__main__":
+    unittest.main()
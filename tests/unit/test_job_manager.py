@@ -0,0 +1,108 @@
+import unittest
+import threading
+import time
+
+from src.api.job_manager import Job, JobManager, JobQueueFull
+
+
+class BlockingRunner:
+    """Stand-in for run_snapshot that reports progress until released."""
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.started = threading.Event()
+        self.calls = []
+
+    def __call__(self, progress_callback, **params):
+        self.calls.append(params)
+        self.started.set()
+        step = 0
+        while not self.release.is_set():
+            step += 1
+            progress_callback("Scanning Filesystem", step, 0)
+            time.sleep(0.01)
+        if params.get("fail"):
+            raise ValueError("boom")
+        return f"snap-{params['name']}"
+
+
+class TestJobManager(unittest.TestCase):
+    def setUp(self):
+        self.runner = BlockingRunner()
+        self.manager = JobManager(self.runner, max_workers=1, max_pending=3)
+
+    def tearDown(self):
+        self.runner.release.set()
+        self.manager.shutdown()
+
+    def _wait(self, job, timeout=5.0):
+        deadline = time.time() + timeout
+        version = -1
+        while not job.done and time.time() < deadline:
+            version, _ = job.wait_for_change(version, timeout=0.1)
+        self.assertTrue(job.done, f"job still {job.status}")
+
+    def test_success_records_snapshot_and_progress(self):
+        job, coalesced = self.manager.submit("a", {"name": "a"})
+        self.assertFalse(coalesced)
+        self.assertTrue(self.runner.started.wait(5))
+        self.runner.release.set()
+        self._wait(job)
+
+        state = job.to_dict()
+        self.assertEqual(state["status"], Job.SUCCEEDED)
+        self.assertEqual(state["snapshot_id"], "snap-a")
+        self.assertEqual(state["phase"], "Scanning Filesystem")
+        self.assertGreater(state["current"], 0)
+
+    def test_identical_requests_coalesce_while_active(self):
+        first, _ = self.manager.submit("same", {"name": "x"})
+        second, coalesced = self.manager.submit("same", {"name": "x"})
+        self.assertIs(first, second)
+        self.assertTrue(coalesced)
+
+        self.runner.release.set()
+        self._wait(first)
+        self.assertEqual(len(self.runner.calls), 1)
+
+        # A finished job is not reused
+        third, coalesced = self.manager.submit("same", {"name": "x"})
+        self.assertIsNot(third, first)
+        self.assertFalse(coalesced)
+
+    def test_cancel_running_and_queued_jobs(self):
+        running, _ = self.manager.submit("a", {"name": "a"})
+        queued, _ = self.manager.submit("b", {"name": "b"})
+        self.assertTrue(self.runner.started.wait(5))
+
+        self.manager.cancel(queued.id)
+        self.assertEqual(queued.status, Job.CANCELLED)
+
+        self.manager.cancel(running.id)
+        self._wait(running)
+        self.assertEqual(running.status, Job.CANCELLED)
+        self.assertEqual([call["name"] for call in self.runner.calls], ["a"])
+
+        # Cancelled requests can be resubmitted as fresh jobs
+        again, coalesced = self.manager.submit("a", {"name": "a"})
+        self.assertFalse(coalesced)
+        self.runner.release.set()
+        self._wait(again)
+        self.assertEqual(again.status, Job.SUCCEEDED)
+
+    def test_failure_is_reported(self):
+        self.runner.release.set()
+        job, _ = self.manager.submit("f", {"name": "f", "fail": True})
+        self._wait(job)
+        self.assertEqual(job.status, Job.FAILED)
+        self.assertEqual(job.error, "boom")
+
+    def test_pending_limit(self):
+        for name in ("a", "b", "c"):
+            self.manager.submit(name, {"name": name})
+        with self.assertRaises(JobQueueFull):
+            self.manager.submit("d", {"name": "d"})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,115 @@
+import unittest
+import tempfile
+import shutil
+import os
+import json
+import stat
+
+from src.snapshot.lazy_snapshot import LazySnapshot
+from src.snapshot.snapshot_loader import SnapshotLoader
+from src.snapshot.compact_snapshot import COMPACT_FILENAME
+
+
+def _file(path, symbols=()):
+    return {
+        "path": path,
+        "stable_id": f"file:{path}",
+        "module_path": os.path.dirname(path),
+        "sha256": "0" * 63 + "1",
+        "size_bytes": 10,
+        "language": "python",
+        "imports": [],
+        "symbols": list(symbols),
+    }
+
+
+class TestLazySnapshot(unittest.TestCase):
+    def setUp(self):
+        self.output_root = tempfile.mkdtemp()
+        self.snapshot_id = "2026-01-01T00-00-00Z"
+        self.snap_dir = os.path.join(self.output_root, self.snapshot_id)
+        os.makedirs(self.snap_dir)
+
+        self.files = [
+            _file("lib/z.py"),
+            _file("src/api/routes.py", symbols=["router"]),
+            _file("src/api/server.py"),
+            _file("src/apiary.py"),
+            _file("src/core/types.py"),
+        ]
+        manifest = {
+            "schema_version": "1.0",
+            "tool": {"name": "repo-runner", "version": "0.2.0"},
+            "snapshot": {"snapshot_id": self.snapshot_id},
+            "inputs": {"repo_root": "/repo", "roots": ["/repo"], "git": {"is_repo": False}},
+            "config": {},
+            "stats": {"file_count": len(self.files), "total_bytes": 50},
+            "files": self.files,
+        }
+        graph = {
+            "nodes": [{"id": f["stable_id"], "type": "file"} for f in self.files]
+                     + [{"id": "external:fastapi", "type": "external"}],
+            "edges": [
+                {"source": "file:src/api/server.py", "target": "external:fastapi", "relation": "imports"},
+                {"source": "file:src/api/server.py", "target": "file:src/api/routes.py", "relation": "imports"},
+                {"source": "file:src/api/routes.py", "target": "file:src/core/types.py", "relation": "imports"},
+                {"source": "file:src/api/server.py", "target": "file:src/core/types.py", "relation": "imports"},
+            ],
+            "cycles": [],
+        }
+        with open(os.path.join(self.snap_dir, "manifest.json"), "w") as f:
+            json.dump(manifest, f)
+        with open(os.path.join(self.snap_dir, "graph.json"), "w") as f:
+            json.dump(graph, f)
+
+    def tearDown(self):
+        os.chmod(self.snap_dir, stat.S_IRWXU)
+        shutil.rmtree(self.output_root, ignore_errors=True)
+
+    def test_index_built_on_first_access_and_reused(self):
+        snapshot = LazySnapshot(self.snap_dir)
+        self.assertFalse(os.path.exists(os.path.join(self.snap_dir, COMPACT_FILENAME)))
+
+        with snapshot:
+            self.assertEqual(snapshot.get_file("file:src/apiary.py"), self.files[3])
+        self.assertTrue(os.path.exists(os.path.join(self.snap_dir, COMPACT_FILENAME)))
+
+        # Later opens read the saved index, not the JSON
+        os.remove(os.path.join(self.snap_dir, "manifest.json"))
+        with SnapshotLoader(self.output_root).open_lazy(self.snapshot_id) as again:
+            self.assertEqual(again.get_file("file:src/core/types.py"), self.files[4])
+            self.assertIsNone(again.get_file("file:src/missing.py"))
+
+    def test_iter_files_by_prefix(self):
+        with LazySnapshot(self.snap_dir) as snapshot:
+            paths = [f["path"] for f in snapshot.iter_files(prefix="src/api")]
+            self.assertEqual(paths, ["src/api/routes.py", "src/api/server.py", "src/apiary.py"])
+            self.assertEqual([f["path"] for f in snapshot.iter_files(prefix="src/api/")],
+                             ["src/api/routes.py", "src/api/server.py"])
+            self.assertEqual(len(list(snapshot.iter_files())), 5)
+            self.assertEqual(list(snapshot.iter_files(prefix="docs/")), [])
+
+    def test_edges_from_and_to(self):
+        with LazySnapshot(self.snap_dir) as snapshot:
+            self.assertEqual(
+                [e["target"] for e in snapshot.edges_from("file:src/api/server.py")],
+                ["external:fastapi", "file:src/api/routes.py", "file:src/core/types.py"]
+            )
+            self.assertEqual(
+                [e["source"] for e in snapshot.edges_to("file:src/core/types.py")],
+                ["file:src/api/routes.py", "file:src/api/server.py"]
+            )
+            self.assertEqual(snapshot.edges_to("external:fastapi")[0]["relation"], "imports")
+            self.assertEqual(snapshot.edges_from("file:lib/z.py"), [])
+            self.assertEqual(snapshot.edges_from("external:missing"), [])
+
+    @unittest.skipIf(hasattr(os, "geteuid") and os.geteuid() == 0, "root ignores directory permissions")
+    def test_read_only_snapshot_uses_private_index(self):
+        os.chmod(self.snap_dir, stat.S_IRUSR | stat.S_IXUSR)
+        with LazySnapshot(self.snap_dir) as snapshot:
+            self.assertEqual(snapshot.get_file("file:lib/z.py"), self.files[0])
+        self.assertFalse(os.path.exists(os.path.join(self.snap_dir, COMPACT_FILENAME)))
+
+
+if __name__ == "__main__":
+    unittest.main()
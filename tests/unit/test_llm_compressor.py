@@ -0,0 +1,251 @@
+import unittest
+import tempfile
+import shutil
+import os
+import io
+import json
+import hashlib
+import threading
+import importlib.util
+from concurrent.futures import as_completed
+from unittest.mock import patch
+
+_SCRIPT = os.path.join(os.path.dirname(__file__), "..", "..", "scripts", "llm_compressor.py")
+_spec = importlib.util.spec_from_file_location("llm_compressor", _SCRIPT)
+llm_compressor = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(llm_compressor)
+
+
+class _APIError(Exception):
+    def __init__(self, code):
+        super().__init__(f"HTTP {code}")
+        self.code = code
+
+
+class _Response:
+    def __init__(self, text):
+        self.text = text
+
+
+class StubClient:
+    """Stands in for genai.Client: client.models.generate_content(model=, contents=, config=)."""
+
+    def __init__(self, failures=None):
+        self.models = self
+        self.calls = []
+        self.failures = dict(failures or {})  # path -> errors to raise before succeeding
+        self._lock = threading.Lock()
+
+    def generate_content(self, model, contents, config):
+        path = contents.split("File Path: ", 1)[1].split("\n", 1)[0]
+        with self._lock:
+            self.calls.append(path)
+            pending = self.failures.get(path)
+            if pending:
+                raise pending.pop(0)
+        return _Response(f"  summary of {path}\n")
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class TestRateLimiting(unittest.TestCase):
+    def test_token_bucket_allows_a_minute_then_paces(self):
+        clock = FakeClock()
+        bucket = llm_compressor.TokenBucket(60, clock=clock, sleep=clock.sleep)
+        for _ in range(60):
+            bucket.acquire()
+        self.assertEqual(clock.sleeps, [])
+
+        bucket.acquire()
+        self.assertAlmostEqual(sum(clock.sleeps), 1.0)
+
+        # More than a minute's worth at once drains the bucket instead of blocking forever
+        bucket.acquire(1000)
+        self.assertAlmostEqual(clock.now, 61.0)
+
+    def test_rate_limiter_applies_both_limits(self):
+        clock = FakeClock()
+        limiter = llm_compressor.RateLimiter(120, 600, clock=clock, sleep=clock.sleep)
+        limiter.acquire(300)
+        limiter.acquire(300)
+        self.assertEqual(clock.sleeps, [])
+        limiter.acquire(300)  # tokens/min is the binding limit: 300 tokens refill in 30s
+        self.assertAlmostEqual(clock.now, 30.0)
+
+        unlimited = llm_compressor.RateLimiter(0, 0)
+        self.assertIsNone(unlimited.requests)
+        self.assertIsNone(unlimited.tokens)
+
+    def test_deprecated_delay_maps_to_rpm(self):
+        self.assertEqual(llm_compressor._requests_per_minute(None, None), 60.0)
+        self.assertEqual(llm_compressor._requests_per_minute(None, 2.0), 30.0)
+        self.assertEqual(llm_compressor._requests_per_minute(None, 0), 0)
+        self.assertEqual(llm_compressor._requests_per_minute(10.0, 2.0), 10.0)
+
+    def test_retries_with_jittered_backoff(self):
+        attempts = []
+
+        def flaky():
+            attempts.append(1)
+            if len(attempts) < 3:
+                raise _APIError(503)
+            return "ok"
+
+        sleeps = []
+        result = llm_compressor.call_with_retries(flaky, retries=4, base_delay=1.0, sleep=sleeps.append, rng=lambda: 0.5)
+        self.assertEqual(result, "ok")
+        self.assertEqual(sleeps, [0.5, 1.0])  # half of 1s, then of 2s
+
+        def bad_request():
+            attempts.append(1)
+            raise _APIError(400)
+
+        attempts.clear()
+        with self.assertRaises(_APIError):
+            llm_compressor.call_with_retries(bad_request, retries=4, sleep=sleeps.append)
+        self.assertEqual(len(attempts), 1)
+
+    def test_only_transient_errors_are_retried(self):
+        for exc, retried in [
+            (ConnectionResetError("reset"), True),
+            (TimeoutError("timed out"), True),
+            (_APIError(429), True),
+            (_APIError(404), False),
+            (ValueError("bad argument"), False),
+            (TypeError("SDK misuse"), False),
+        ]:
+            attempts = []
+
+            def fail():
+                attempts.append(1)
+                raise exc
+
+            with self.assertRaises(type(exc)):
+                llm_compressor.call_with_retries(fail, retries=2, sleep=lambda _: None)
+            self.assertEqual(len(attempts), 3 if retried else 1, exc)
+
+
+class TestRunCompression(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.repo_root = os.path.join(self.test_dir, "repo")
+        self.state_dir = os.path.join(self.test_dir, "state")
+        os.makedirs(self.state_dir)
+        self.bool_path = os.path.join(self.state_dir, "file_changed_bool.json")
+        self.master_path = os.path.join(self.state_dir, "master_compressed_context.json")
+
+        flags = {}
+        for i in range(6):
+            self._create_file(f"src/m{i}.py", f"def f{i}(): pass\n")
+            flags[f"file:src/m{i}.py"] = 1
+        flags["file:src/done.py"] = 0
+        flags["file:src/gone.py"] = 1
+        self._write_json(self.bool_path, flags)
+        self._write_json(self.master_path, {"file:src/done.py": "KEEP"})
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+
+    def _create_file(self, path, content):
+        full_path = os.path.join(self.repo_root, path)
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+        with open(full_path, "w", encoding="utf-8") as f:
+            f.write(content)
+
+    def _write_json(self, path, data):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+
+    def _read_json(self, path):
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def _run(self, client):
+        with patch("sys.stdout", new_callable=io.StringIO), \
+                patch.object(llm_compressor.time, "sleep"):
+            return llm_compressor.run_compression(
+                client, "stub-model", None, self.repo_root, self.state_dir, workers=4, retries=2
+            )
+
+    def test_worker_pool_compresses_pending_files(self):
+        client = StubClient(failures={
+            "src/m1.py": [_APIError(429)],                                     # recovers on retry
+            "src/m2.py": [_APIError(500), _APIError(500), _APIError(500)],     # exhausts retries
+        })
+        stats = self._run(client)
+
+        self.assertEqual(stats, {"total": 7, "succeeded": 5, "failed": 2, "recovered": 0})
+        master = self._read_json(self.master_path)
+        flags = self._read_json(self.bool_path)
+        self.assertEqual(master["file:src/m0.py"], "summary of src/m0.py")
+        self.assertEqual(master["file:src/done.py"], "KEEP")
+        self.assertNotIn("file:src/m2.py", master)
+        self.assertEqual(flags["file:src/m2.py"], 1)
+        self.assertEqual(flags["file:src/gone.py"], 1)
+        self.assertEqual(sum(1 for v in flags.values() if v == 0), 6)
+        self.assertFalse(os.path.exists(os.path.join(self.state_dir, llm_compressor.JOURNAL_FILENAME)))
+
+    def test_ctrl_c_journals_requests_in_flight(self):
+        release = threading.Event()
+
+        class BlockingClient(StubClient):
+            def generate_content(self, model, contents, config):
+                if "src/m0.py" not in contents:
+                    release.wait(5)
+                return super().generate_content(model, contents, config)
+
+        def interrupt_after_first(futures):
+            first = next(as_completed(futures))
+            yield first
+            # m1..m4 are in flight; m5 is still queued and gets cancelled
+            threading.Timer(0.2, release.set).start()
+            raise KeyboardInterrupt
+
+        client = BlockingClient()
+        with patch.object(llm_compressor, "as_completed", interrupt_after_first), \
+                self.assertRaises(KeyboardInterrupt):
+            self._run(client)
+
+        master = self._read_json(self.master_path)
+        flags = self._read_json(self.bool_path)
+        for i in range(5):
+            self.assertEqual(master[f"file:src/m{i}.py"], f"summary of src/m{i}.py")
+            self.assertEqual(flags[f"file:src/m{i}.py"], 0)
+        self.assertNotIn("src/m5.py", client.calls)
+        self.assertEqual(flags["file:src/m5.py"], 1)
+        self.assertFalse(os.path.exists(os.path.join(self.state_dir, llm_compressor.JOURNAL_FILENAME)))
+
+    def test_interrupted_journal_is_replayed(self):
+        journal = llm_compressor.CompressionJournal(self.state_dir)
+        sha = hashlib.sha256(b"def f0(): pass\n").hexdigest()
+        journal.append({"stable_id": "file:src/m0.py", "sha256": sha, "summary": "FROM JOURNAL"})
+        # m1.py changed after it was summarized: its record is stale
+        journal.append({"stable_id": "file:src/m1.py", "sha256": "0" * 64, "summary": "STALE"})
+        journal.close()
+        with open(journal.path, "a", encoding="utf-8") as f:
+            f.write('{"stable_id": "file:src/m2.py", "sha')  # torn last line
+
+        client = StubClient()
+        stats = self._run(client)
+
+        self.assertEqual(stats["recovered"], 1)
+        self.assertNotIn("src/m0.py", client.calls)
+        self.assertIn("src/m1.py", client.calls)
+        master = self._read_json(self.master_path)
+        self.assertEqual(master["file:src/m0.py"], "FROM JOURNAL")
+        self.assertEqual(master["file:src/m1.py"], "summary of src/m1.py")
+
+
+if __name__ == "__main__":
+    unittest.main()
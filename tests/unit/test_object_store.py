@@ -0,0 +1,168 @@
+import unittest
+import tempfile
+import shutil
+import os
+import copy
+
+from src.snapshot.object_store import ObjectStore, StoredSnapshot, OBJECTS_DIRNAME, DERIVED
+
+
+def _entry(path, module_path, symbols=(), sha="0" * 64):
+    return {
+        "path": path,
+        "stable_id": f"file:{path}",
+        "module_path": module_path,
+        "sha256": sha,
+        "size_bytes": 10,
+        "language": "python",
+        "imports": [],
+        "symbols": list(symbols),
+    }
+
+
+class TestObjectStore(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.output_root = os.path.join(self.test_dir, "output")
+
+        files = [
+            _entry("main.py", "", ["main"]),
+            _entry("src/app/a.py", "src/app", ["App", "Config"]),
+            _entry("src/app/b.py", "src/app", ["Config"]),
+            _entry("src/lib/c.py", "src/lib", ["helper"]),
+        ]
+        self.manifest = {
+            "schema_version": "1.0",
+            "snapshot": {"snapshot_id": "s1"},
+            "stats": {"file_count": 4},
+            "files": files,
+        }
+        self.structure = {
+            "schema_version": "1.0",
+            "repo": {
+                "stable_id": "repo:root",
+                "root": ".",
+                "modules": [
+                    {"stable_id": "module:", "path": "", "files": ["file:main.py"]},
+                    {"stable_id": "module:src/app", "path": "src/app", "files": ["file:src/app/a.py", "file:src/app/b.py"]},
+                    {"stable_id": "module:src/lib", "path": "src/lib", "files": ["file:src/lib/c.py"]},
+                ],
+            },
+        }
+        self.graph = {
+            "schema_version": "1.2",
+            "nodes": sorted([
+                {"id": f["stable_id"], "type": "file", "metadata": None} for f in files
+            ] + [{"id": "external:os", "type": "external", "metadata": None}], key=lambda n: n["id"]),
+            "edges": [
+                {"source": "file:main.py", "target": "file:src/app/a.py", "relation": "imports"},
+                {"source": "file:src/app/a.py", "target": "external:os", "relation": "imports"},
+                {"source": "file:src/app/a.py", "target": "file:src/lib/c.py", "relation": "imports"},
+                {"source": "file:src/lib/c.py", "target": "file:src/app/b.py", "relation": "imports"},
+            ],
+            "cycles": [],
+            "has_cycles": False,
+            "components": [],
+            "cycles_truncated": False,
+            "unresolved_references": [{"source": "file:src/app/b.py", "import_ref": "./missing"}],
+        }
+        self.symbols = {
+            "App": ["file:src/app/a.py"],
+            "Config": ["file:src/app/a.py", "file:src/app/b.py"],
+            "helper": ["file:src/lib/c.py"],
+            "main": ["file:main.py"],
+        }
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+
+    def _write(self, snapshot_id, manifest=None, structure=None, graph=None, symbols=None):
+        snapshot_dir = os.path.join(self.output_root, snapshot_id)
+        os.makedirs(snapshot_dir)
+        stats = StoredSnapshot.write(
+            snapshot_dir,
+            manifest or self.manifest,
+            structure or self.structure,
+            graph if graph is not None else self.graph,
+            symbols if symbols is not None else self.symbols,
+        )
+        return snapshot_dir, stats
+
+    def _assert_round_trip(self, snapshot_dir, manifest, structure, graph, symbols):
+        stored = StoredSnapshot.open(snapshot_dir)
+        self.assertEqual(stored.manifest(), manifest)
+        self.assertEqual(stored.structure(), structure)
+        self.assertEqual(stored.graph(), graph)
+        self.assertEqual(stored.symbols(), symbols)
+
+    def test_round_trip(self):
+        snapshot_dir, _ = self._write("s1")
+        self.assertEqual(sorted(os.listdir(snapshot_dir)), ["root.json"])
+        self._assert_round_trip(snapshot_dir, self.manifest, self.structure, self.graph, self.symbols)
+
+        # Derivable artifacts are not stored
+        root = StoredSnapshot.open(snapshot_dir).root
+        self.assertEqual(root["symbols"], DERIVED)
+        self.assertEqual(root["structure"]["modules"], DERIVED)
+        self.assertEqual(
+            [path for path, _ in StoredSnapshot.open(snapshot_dir).iter_tree()],
+            ["", "src/app", "src/lib"]
+        )
+
+    def test_unchanged_snapshot_writes_no_objects(self):
+        self._write("s1")
+        manifest = dict(self.manifest, snapshot={"snapshot_id": "s2"})
+        snapshot_dir, stats = self._write("s2", manifest=manifest)
+        self.assertEqual(stats["objects_written"], 0)
+        self.assertEqual(StoredSnapshot.load_artifact(snapshot_dir, "manifest"), manifest)
+
+    def test_one_changed_file_writes_its_module_path_only(self):
+        _, first = self._write("s1")
+
+        manifest = copy.deepcopy(self.manifest)
+        manifest["files"][1]["sha256"] = "1" * 64
+        snapshot_dir, stats = self._write("s2", manifest=manifest)
+
+        # Module record of src/app plus the trees src/app, src and the root
+        self.assertEqual(stats["objects_written"], 4)
+        self.assertLess(stats["bytes_written"], first["bytes_written"])
+        self._assert_round_trip(snapshot_dir, manifest, self.structure, self.graph, self.symbols)
+
+    def test_non_derivable_artifacts_are_stored_verbatim(self):
+        graph = copy.deepcopy(self.graph)
+        graph["edges"].reverse()
+        graph["nodes"][0]["metadata"] = {"note": "kept"}
+        symbols = {"Renamed": ["file:main.py"]}
+        structure = copy.deepcopy(self.structure)
+        structure["repo"]["modules"].reverse()
+
+        snapshot_dir, _ = self._write("s1", structure=structure, graph=graph, symbols=symbols)
+        self._assert_round_trip(snapshot_dir, self.manifest, structure, graph, symbols)
+
+    def test_missing_graph_and_symbols(self):
+        snapshot_dir = os.path.join(self.output_root, "s1")
+        os.makedirs(snapshot_dir)
+        StoredSnapshot.write(snapshot_dir, self.manifest, self.structure, None, None)
+        stored = StoredSnapshot.open(snapshot_dir)
+        self.assertFalse(stored.has_graph)
+        self.assertIsNone(stored.graph())
+        self.assertIsNone(stored.symbols())
+        self.assertIsNone(StoredSnapshot.load_artifact(os.path.join(self.output_root, "absent"), "manifest"))
+
+    def test_unsorted_files_rejected(self):
+        manifest = dict(self.manifest, files=list(reversed(self.manifest["files"])))
+        with self.assertRaises(ValueError):
+            self._write("s1", manifest=manifest)
+
+    def test_put_is_idempotent(self):
+        store = ObjectStore(os.path.join(self.output_root, OBJECTS_DIRNAME))
+        key = store.put({"b": 1, "a": [1, 2]})
+        self.assertEqual(store.put({"a": [1, 2], "b": 1}), key)
+        self.assertEqual(store.objects_written, 1)
+        self.assertEqual(store.get(key), {"a": [1, 2], "b": 1})
+        with self.assertRaises(FileNotFoundError):
+            store.get("0" * 64)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+import unittest
+
+from src.exporters.flatten_markdown_exporter import FlattenOptions
+from src.exporters.sharded_flatten_exporter import ShardedFlattenExporter
+
+
+def _entry(path, size):
+    return {"path": path, "stable_id": f"file:{path}", "size_bytes": size, "sha256": "x"}
+
+
+class TestShardedFlattenExporter(unittest.TestCase):
+    def setUp(self):
+        self.options = FlattenOptions(tree_only=False, include_readme=True, scope="full")
+        self.manifest = {"files": [
+            _entry("a/one.py", 2000),
+            _entry("a/two.py", 2000),
+            _entry("b/one.py", 3000),
+            _entry("c/big.py", 40000),
+            _entry("d/one.py", 800),
+            _entry("d/two.py", 800),
+        ]}
+        self.structure = {"repo": {"modules": [
+            {"path": "a", "files": ["file:a/one.py", "file:a/two.py"]},
+            {"path": "b", "files": ["file:b/one.py"]},
+            {"path": "c", "files": ["file:c/big.py"]},
+            {"path": "d", "files": ["file:d/one.py", "file:d/two.py"]},
+        ]}}
+
+    def _paths(self, shards):
+        return [[entry["path"] for entry in shard] for shard in shards]
+
+    def test_modules_stay_together(self):
+        exporter = ShardedFlattenExporter(max_tokens=1500)
+        shards = exporter.plan(self.manifest, self.options, self.structure)
+
+        # Best fit: d/ goes into the shard it fills most (b/'s), not a/'s
+        self.assertEqual(self._paths(shards), [
+            ["a/one.py", "a/two.py"],
+            ["b/one.py", "d/one.py", "d/two.py"],
+            ["c/big.py"],  # larger than any shard: alone
+        ])
+        capacity = exporter.max_tokens - exporter.SHARD_OVERHEAD_CHARS // 4
+        for shard in shards[:2]:
+            self.assertLessEqual(sum(exporter.estimate_tokens(e, self.options) for e in shard), capacity)
+
+    def test_oversized_module_is_split_in_path_order(self):
+        structure = {"repo": {"modules": [
+            {"path": "a", "files": [f"file:{e['path']}" for e in self.manifest["files"]]},
+        ]}}
+        shards = ShardedFlattenExporter(max_tokens=1200).plan(self.manifest, self.options, structure)
+        flat = [path for shard in self._paths(shards) for path in shard]
+        self.assertEqual(sorted(flat), sorted(e["path"] for e in self.manifest["files"]))
+        self.assertGreater(len(shards), 1)
+
+    def test_bin_packing_without_structure_is_deterministic(self):
+        exporter = ShardedFlattenExporter(max_tokens=1500)
+        shards = exporter.plan(self.manifest, self.options)
+        reversed_manifest = {"files": list(reversed(self.manifest["files"]))}
+        self.assertEqual(self._paths(shards), self._paths(exporter.plan(reversed_manifest, self.options)))
+        # b/one.py (750) and one a/ file (500) share a shard; the other a/ file joins d/
+        self.assertEqual(len(shards), 3)
+
+    def test_rejects_non_positive_budget(self):
+        with self.assertRaises(ValueError):
+            ShardedFlattenExporter(max_tokens=0)
+
+
+if __name__ == "__main__":
+    unittest.main()
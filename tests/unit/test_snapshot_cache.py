@@ -0,0 +1,128 @@
+import unittest
+import tempfile
+import shutil
+import os
+import json
+
+from src.snapshot.snapshot_cache import SnapshotCache
+from src.analysis.context_slicer import ContextSlicer
+
+
+class TestSnapshotCache(unittest.TestCase):
+    def setUp(self):
+        self.output_root = tempfile.mkdtemp()
+        self.manifest = {
+            "tool": {"name": "repo-runner", "version": "0.2.0"},
+            "snapshot": {"snapshot_id": "s1"},
+            "inputs": {"repo_root": "/repo", "roots": ["/repo"], "git": {"is_repo": False}},
+            "config": {
+                "depth": 5, "ignore_names": [], "include_extensions": [], "include_readme": True,
+                "tree_only": False, "skip_graph": False, "manual_override": False
+            },
+            "stats": {"file_count": 3, "total_bytes": 480},
+            "files": [
+                self._file("a.py", 40, ["Shared", "OnlyA"]),
+                self._file("b.py", 40, ["Shared"]),
+                self._file("c.py", 400, []),
+            ],
+        }
+        self.graph = {
+            "nodes": [],
+            "edges": [
+                {"source": "file:a.py", "target": "file:b.py", "relation": "imports"},
+                {"source": "file:b.py", "target": "file:c.py", "relation": "imports"},
+            ],
+            "cycles": [],
+        }
+        for name in ("s1", "s2", "s3"):
+            self._write(name, self.manifest, self.graph)
+
+    @staticmethod
+    def _file(path, size, symbols):
+        return {
+            "path": path, "stable_id": f"file:{path}", "module_path": "", "sha256": "x",
+            "size_bytes": size, "language": "python", "imports": [], "symbols": symbols
+        }
+
+    def tearDown(self):
+        shutil.rmtree(self.output_root, ignore_errors=True)
+
+    def _write(self, name, manifest, graph):
+        snap_dir = os.path.join(self.output_root, name)
+        os.makedirs(snap_dir, exist_ok=True)
+        with open(os.path.join(snap_dir, "manifest.json"), "w") as f:
+            json.dump(manifest, f)
+        if graph is not None:
+            with open(os.path.join(snap_dir, "graph.json"), "w") as f:
+                json.dump(graph, f)
+        return snap_dir
+
+    def test_hits_return_the_same_parsed_entry(self):
+        cache = SnapshotCache()
+        snap_dir = os.path.join(self.output_root, "s1")
+        first = cache.get(self.output_root, snap_dir)
+        second = cache.get(self.output_root, snap_dir + os.sep)
+
+        self.assertIs(first, second)
+        self.assertEqual(cache.stats()["hits"], 1)
+        self.assertEqual(cache.stats()["misses"], 1)
+        self.assertIs(first.models()[0], second.models()[0])
+
+    def test_lru_eviction_respects_byte_budget(self):
+        probe = SnapshotCache().get(self.output_root, os.path.join(self.output_root, "s1"))
+        cache = SnapshotCache(max_bytes=probe.size_bytes * 2)
+
+        for name in ("s1", "s2"):
+            cache.get(self.output_root, os.path.join(self.output_root, name))
+        cache.get(self.output_root, os.path.join(self.output_root, "s1"))  # s2 becomes LRU
+        cache.get(self.output_root, os.path.join(self.output_root, "s3"))
+
+        self.assertEqual(cache.stats()["entries"], 2)
+        self.assertLessEqual(cache.stats()["bytes"], cache.max_bytes)
+        hits = cache.hits
+        cache.get(self.output_root, os.path.join(self.output_root, "s1"))
+        self.assertEqual(cache.hits, hits + 1)
+        cache.get(self.output_root, os.path.join(self.output_root, "s2"))
+        self.assertEqual(cache.hits, hits + 1)
+
+    def test_oversized_entries_are_served_but_not_kept(self):
+        cache = SnapshotCache(max_bytes=1)
+        entry = cache.get(self.output_root, os.path.join(self.output_root, "s1"))
+        self.assertEqual(len(entry.manifest["files"]), 3)
+        self.assertEqual(cache.stats()["entries"], 0)
+
+    def test_recreated_snapshot_is_reloaded(self):
+        cache = SnapshotCache()
+        snap_dir = os.path.join(self.output_root, "s1")
+        cache.get(self.output_root, snap_dir)
+
+        manifest = dict(self.manifest, files=self.manifest["files"][:1])
+        os.remove(os.path.join(snap_dir, "graph.json"))
+        self._write("s1", manifest, None)
+
+        entry = cache.get(self.output_root, snap_dir)
+        self.assertEqual(len(entry.manifest["files"]), 1)
+        self.assertFalse(entry.has_graph)
+        self.assertIsNone(entry.models()[1])
+
+    def test_missing_manifest_raises(self):
+        with self.assertRaises(FileNotFoundError):
+            SnapshotCache().get(self.output_root, os.path.join(self.output_root, "nope"))
+
+    def test_indexed_slices_match_direct_slices(self):
+        entry = SnapshotCache().get(self.output_root, os.path.join(self.output_root, "s1"))
+        for focus, radius, budget in [
+            ("file:b.py", 1, None), ("file:a.py", 2, 50), ("symbol:Shared", 1, None),
+            ("symbol:Missing", 1, None), ("file:zzz.py", 1, None),
+        ]:
+            self.assertEqual(
+                ContextSlicer.slice_manifest(None, None, focus, radius, budget, index=entry.slice_index),
+                ContextSlicer.slice_manifest(self.manifest, self.graph, focus, radius, budget)
+            )
+        # First file in manifest order wins, as with the linear scan
+        sliced = ContextSlicer.slice_manifest(None, None, "symbol:Shared", 0, index=entry.slice_index)
+        self.assertEqual(sliced["telemetry"]["resolved_id"], "file:a.py")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,8 +1,9 @@
 import unittest
-from src.analysis.snapshot_comparator import SnapshotComparator
+import json
+from src.analysis.snapshot_comparator import SnapshotComparator, EMPTY_SHA256
 from src.core.types import (
     Manifest, ManifestInputs, ManifestConfig, ManifestStats, GitMetadata, 
-    FileEntry, GraphStructure, GraphNode, GraphEdge
+    FileEntry, GraphStructure, GraphNode, GraphEdge, FileDiff
 )
 
 class TestSnapshotComparator(unittest.TestCase):
@@ -90,5 +91,149 @@ class TestSnapshotComparator(unittest.TestCase):
         removed_edge = [e for e in report.edge_diffs if e.status == "removed"][0]
         self.assertEqual(removed_edge.target, "external:os")
 
+    def test_stream_yields_diffs_with_running_counts(self):
+        """stream() yields the same diffs as compare() lazily, files first, with counts in the trailer."""
+        files_a = [
+            FileEntry(stable_id="file:src/a.py", path="src/a.py", module_path="src", sha256="hash_a1", size_bytes=10),
+            FileEntry(stable_id="file:src/b.py", path="src/b.py", module_path="src", sha256="hash_b1", size_bytes=10),
+        ]
+        files_b = [
+            FileEntry(stable_id="file:src/a.py", path="src/a.py", module_path="src", sha256="hash_a2", size_bytes=10),
+            FileEntry(stable_id="file:src/c.py", path="src/c.py", module_path="src", sha256="hash_c1", size_bytes=10),
+        ]
+        graph_a = GraphStructure(nodes=[], edges=[GraphEdge(source="file:src/a.py", target="file:src/b.py")])
+        graph_b = GraphStructure(nodes=[], edges=[GraphEdge(source="file:src/c.py", target="file:src/a.py")])
+        manifest_a = self._create_manifest("v1", files_a)
+        manifest_b = self._create_manifest("v2", files_b)
+
+        stream = SnapshotComparator.stream(manifest_a, manifest_b, graph_a, graph_b)
+        diffs = iter(stream)
+        first = next(diffs)
+        self.assertEqual((first.stable_id, first.status), ("file:src/a.py", "modified"))
+        self.assertEqual(stream.counts["files_modified"], 1)
+        self.assertEqual(stream.counts["files_added"], 0)
+
+        rest = list(diffs)
+        self.assertEqual(
+            [d.status for d in rest],
+            ["removed", "added", "removed", "added"]  # b.py, c.py, then edges a->b, c->a
+        )
+
+        lines = list(SnapshotComparator.stream(manifest_a, manifest_b, graph_a, graph_b).ndjson())
+        records = [json.loads(line) for line in lines]
+        self.assertTrue(all(line.endswith("\n") for line in lines))
+        self.assertEqual(records[0], {"type": "header", "base_snapshot_id": "v1", "target_snapshot_id": "v2"})
+        self.assertEqual(records[-1], {
+            "type": "summary", "files_added": 1, "files_removed": 1, "files_modified": 1,
+            "files_renamed": 0, "edges_added": 1, "edges_removed": 1
+        })
+
+        report = SnapshotComparator.stream(manifest_a, manifest_b, graph_a, graph_b).report()
+        self.assertEqual(report, SnapshotComparator.compare(manifest_a, manifest_b, graph_a, graph_b))
+        self.assertEqual([(d.status, d.stable_id) for d in report.file_diffs], [
+            ("added", "file:src/c.py"), ("modified", "file:src/a.py"), ("removed", "file:src/b.py")
+        ])
+
+    def test_exact_renames(self):
+        """A removed and an added file with the same sha256 become one renamed diff."""
+        files_a = [
+            FileEntry(stable_id="file:src/a.py", path="src/a.py", module_path="src", sha256="hash_a", size_bytes=10),
+            FileEntry(stable_id="file:src/util.py", path="src/util.py", module_path="src", sha256="hash_same", size_bytes=10),
+            FileEntry(stable_id="file:web/util.py", path="web/util.py", module_path="web", sha256="hash_same", size_bytes=10),
+        ]
+        files_b = [
+            FileEntry(stable_id="file:lib/a.py", path="lib/a.py", module_path="lib", sha256="hash_a", size_bytes=10),
+            FileEntry(stable_id="file:lib/util.py", path="lib/util.py", module_path="lib", sha256="hash_same", size_bytes=10),
+            FileEntry(stable_id="file:lib/x.py", path="lib/x.py", module_path="lib", sha256="hash_same", size_bytes=10),
+        ]
+        manifest_a = self._create_manifest("v1", files_a)
+        manifest_b = self._create_manifest("v2", files_b)
+
+        report = SnapshotComparator.compare(manifest_a, manifest_b)
+        self.assertEqual(
+            [(d.status, d.old_stable_id, d.stable_id, d.similarity) for d in report.file_diffs],
+            [
+                ("renamed", "file:src/a.py", "file:lib/a.py", 1.0),
+                # Of two identical candidates, the one with the same file name wins
+                ("renamed", "file:src/util.py", "file:lib/util.py", 1.0),
+                ("renamed", "file:web/util.py", "file:lib/x.py", 1.0),
+            ]
+        )
+        self.assertEqual((report.files_renamed, report.files_added, report.files_removed), (3, 0, 0))
+
+        report = SnapshotComparator.compare(manifest_a, manifest_b, detect_renames=False)
+        self.assertEqual((report.files_renamed, report.files_added, report.files_removed), (0, 3, 3))
+
+    def test_exact_renames_stream_without_waiting_for_all_files(self):
+        """A rename is yielded as soon as its second file arrives; only unmatched files are held."""
+        consumed = []
+
+        def diffs():
+            for diff in [
+                FileDiff(stable_id="file:a/new.py", status="added", new_sha256="h1"),
+                FileDiff(stable_id="file:b/only.py", status="added", new_sha256="h2"),
+                FileDiff(stable_id="file:z/new.py", status="removed", old_sha256="h1"),
+                FileDiff(stable_id="file:z/gone.py", status="removed", old_sha256="h3"),
+            ]:
+                consumed.append(diff.stable_id)
+                yield diff
+
+        stream = SnapshotComparator._renames(diffs(), True, None, lambda _: None, lambda _: None)
+        first = next(stream)
+        self.assertEqual((first.status, first.old_stable_id, first.stable_id), ("renamed", "file:z/new.py", "file:a/new.py"))
+        self.assertEqual(len(consumed), 3)
+        self.assertEqual([(d.status, d.stable_id) for d in stream], [
+            ("removed", "file:z/gone.py"), ("added", "file:b/only.py")
+        ])
+
+    def test_exact_renames_prefer_names_regardless_of_walk_order(self):
+        """An identical file under another name is not paired before a same-name candidate is seen."""
+        diffs = [
+            FileDiff(stable_id="file:m0/foo.py", status="added", new_sha256="h1"),
+            FileDiff(stable_id="file:m1/util.py", status="removed", old_sha256="h1"),
+            FileDiff(stable_id="file:m2/util.py", status="added", new_sha256="h1"),
+        ]
+        for order in (diffs, diffs[::-1], [diffs[1], diffs[0], diffs[2]]):
+            result = list(SnapshotComparator._renames(iter(order), True, None, lambda _: None, lambda _: None))
+            self.assertEqual(
+                sorted((d.status, d.old_stable_id, d.stable_id) for d in result),
+                [("added", None, "file:m0/foo.py"), ("renamed", "file:m1/util.py", "file:m2/util.py")]
+            )
+
+    def test_empty_files_are_not_exact_renames(self):
+        files_a = [FileEntry(stable_id="file:a/__init__.py", path="a/__init__.py", module_path="a", sha256=EMPTY_SHA256, size_bytes=0)]
+        files_b = [FileEntry(stable_id="file:b/__init__.py", path="b/__init__.py", module_path="b", sha256=EMPTY_SHA256, size_bytes=0)]
+        report = SnapshotComparator.compare(self._create_manifest("v1", files_a), self._create_manifest("v2", files_b))
+        self.assertEqual((report.files_renamed, report.files_added, report.files_removed), (0, 1, 1))
+
+    def test_near_renames_need_similarity_threshold(self):
+        """Near-renames are scored on symbols, imports and size, only when a threshold is given."""
+        def entry(path, sha, symbols, imports, size=100):
+            return FileEntry(stable_id=f"file:{path}", path=path, module_path="src", sha256=sha,
+                             size_bytes=size, symbols=symbols, imports=imports)
+
+        files_a = [
+            entry("src/old.py", "h1", ["App", "run", "main"], ["os", "sys"]),
+            entry("src/other.py", "h2", ["Unrelated"], ["json"]),
+        ]
+        files_b = [
+            entry("src/new.py", "h3", ["App", "run", "main", "extra"], ["os", "sys"], size=110),
+            entry("src/new.ts", "h4", ["Unrelated"], ["json"]),  # different extension
+        ]
+        manifest_a = self._create_manifest("v1", files_a)
+        manifest_b = self._create_manifest("v2", files_b)
+
+        self.assertEqual(SnapshotComparator.compare(manifest_a, manifest_b).files_renamed, 0)
+
+        report = SnapshotComparator.compare(manifest_a, manifest_b, rename_similarity=0.6)
+        renamed = [d for d in report.file_diffs if d.status == "renamed"]
+        self.assertEqual([(d.old_stable_id, d.stable_id) for d in renamed], [("file:src/old.py", "file:src/new.py")])
+        self.assertEqual(renamed[0].similarity, round(5 / 6 * 100 / 110, 4))
+        self.assertEqual((report.files_added, report.files_removed), (1, 1))
+
+        self.assertEqual(SnapshotComparator.compare(manifest_a, manifest_b, rename_similarity=0.9).files_renamed, 0)
+        with self.assertRaises(ValueError):
+            SnapshotComparator.compare(manifest_a, manifest_b, rename_similarity=1.5)
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
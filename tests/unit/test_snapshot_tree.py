@@ -0,0 +1,181 @@
+import unittest
+import tempfile
+import shutil
+import os
+import json
+import copy
+from unittest.mock import patch
+
+from src.analysis.snapshot_comparator import SnapshotComparator
+from src.core.types import Manifest, GraphStructure
+from src.snapshot.object_store import ObjectStore, StoredSnapshot
+from src.snapshot.snapshot_tree import SnapshotTree, MERKLE_FILENAME
+
+
+def _entry(path, module_path, sha):
+    return {
+        "path": path,
+        "stable_id": f"file:{path}",
+        "module_path": module_path,
+        "sha256": sha,
+        "size_bytes": 10,
+        "language": "python",
+        "imports": [],
+        "symbols": [],
+    }
+
+
+class TestSnapshotTree(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.output_root = os.path.join(self.test_dir, "output")
+        files = [
+            _entry("main.py", "", "a" * 64),
+            _entry("src/app/a.py", "src/app", "b" * 64),
+            _entry("src/app/b.py", "src/app", "c" * 64),
+            _entry("src/lib/c.py", "src/lib", "d" * 64),
+            _entry("web/x.ts", "web", "e" * 64),
+        ]
+        self.manifest = {
+            "tool": {"name": "test"},
+            "snapshot": {"snapshot_id": "v1"},
+            "inputs": {"repo_root": "/repo", "roots": ["/repo"], "git": {"is_repo": False}},
+            "config": {
+                "depth": 5, "ignore_names": [], "include_extensions": [], "include_readme": True,
+                "tree_only": False, "skip_graph": False, "manual_override": False
+            },
+            "stats": {"file_count": 5, "total_bytes": 50},
+            "files": files,
+        }
+        self.graph = {
+            "schema_version": "1.2",
+            "nodes": [{"id": f["stable_id"], "type": "file", "metadata": None} for f in files],
+            "edges": [
+                {"source": "file:main.py", "target": "file:src/app/a.py", "relation": "imports"},
+                {"source": "file:src/app/a.py", "target": "file:src/lib/c.py", "relation": "imports"},
+            ],
+        }
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+
+    def _changed(self, snap_id):
+        manifest = copy.deepcopy(self.manifest)
+        manifest["snapshot"]["snapshot_id"] = snap_id
+        manifest["files"][1]["sha256"] = "f" * 64
+        manifest["files"].pop()  # web/x.ts removed
+        graph = copy.deepcopy(self.graph)
+        graph["nodes"].pop()
+        graph["edges"].append({"source": "file:src/app/a.py", "target": "file:src/app/b.py", "relation": "imports"})
+        return manifest, graph
+
+    def _json_snapshot(self, snap_id, manifest, graph):
+        snapshot_dir = os.path.join(self.output_root, snap_id)
+        os.makedirs(snapshot_dir)
+        for name, data in (("manifest", manifest), ("graph", graph)):
+            with open(os.path.join(snapshot_dir, f"{name}.json"), "w") as f:
+                json.dump(data, f)
+        SnapshotTree.write_merkle(snapshot_dir, manifest, graph)
+        return snapshot_dir
+
+    def _stored_snapshot(self, snap_id, manifest, graph):
+        snapshot_dir = os.path.join(self.output_root, snap_id)
+        os.makedirs(snapshot_dir)
+        StoredSnapshot.write(snapshot_dir, manifest, {"schema_version": "1.0", "repo": {}}, graph)
+        return snapshot_dir
+
+    def _expected(self, manifest_a, graph_a, manifest_b, graph_b):
+        return SnapshotComparator.compare(
+            Manifest.model_validate(manifest_a), Manifest.model_validate(manifest_b),
+            GraphStructure.model_validate(graph_a), GraphStructure.model_validate(graph_b)
+        )
+
+    def test_json_and_stored_trees_share_hashes(self):
+        json_dir = self._json_snapshot("v1", self.manifest, self.graph)
+        stored_dir = self._stored_snapshot("v1-stored", self.manifest, self.graph)
+        self.assertEqual(SnapshotTree.open(json_dir).root, SnapshotTree.open(stored_dir).root)
+        self.assertIsNone(SnapshotTree.open(os.path.join(self.output_root, "absent")))
+
+    def test_compare_trees_matches_compare(self):
+        manifest_b, graph_b = self._changed("v2")
+        expected = self._expected(self.manifest, self.graph, manifest_b, graph_b)
+
+        json_a = self._json_snapshot("v1", self.manifest, self.graph)
+        json_b = self._json_snapshot("v2", manifest_b, graph_b)
+        report = SnapshotComparator.compare_trees(SnapshotTree.open(json_a), SnapshotTree.open(json_b))
+        self.assertEqual(report, expected)
+        self.assertEqual((report.files_modified, report.files_removed, report.edges_added), (1, 1, 1))
+
+        stored_a = self._stored_snapshot("s1", self.manifest, self.graph)
+        stored_b = self._stored_snapshot("s2", manifest_b, graph_b)
+        report = SnapshotComparator.compare_trees(SnapshotTree.open(stored_a), SnapshotTree.open(stored_b))
+        self.assertEqual(report.model_dump(exclude={"base_snapshot_id", "target_snapshot_id"}),
+                         expected.model_dump(exclude={"base_snapshot_id", "target_snapshot_id"}))
+
+    def test_unchanged_compare_reads_nothing(self):
+        stored_a = self._stored_snapshot("s1", self.manifest, self.graph)
+        manifest = dict(self.manifest, snapshot={"snapshot_id": "v2"})
+        stored_b = self._stored_snapshot("s2", manifest, self.graph)
+        tree_a, tree_b = SnapshotTree.open(stored_a), SnapshotTree.open(stored_b)
+
+        with patch.object(ObjectStore, "get", wraps=tree_a._stored.store.get) as get:
+            report = SnapshotComparator.compare_trees(tree_a, tree_b)
+        self.assertEqual(get.call_count, 0)
+        self.assertEqual(report.file_diffs, [])
+        self.assertEqual(report.target_snapshot_id, "v2")
+
+        # JSON snapshots do not parse their manifest either
+        json_a = self._json_snapshot("v1", self.manifest, self.graph)
+        json_b = self._json_snapshot("v2", manifest, self.graph)
+        os.remove(os.path.join(json_a, "manifest.json"))
+        report = SnapshotComparator.compare_trees(SnapshotTree.open(json_a), SnapshotTree.open(json_b))
+        self.assertEqual(report.file_diffs, [])
+
+    def test_one_file_change_descends_one_path(self):
+        stored_a = self._stored_snapshot("s1", self.manifest, self.graph)
+        manifest = copy.deepcopy(self.manifest)
+        manifest["snapshot"]["snapshot_id"] = "v2"
+        manifest["files"][3]["sha256"] = "0" * 64  # src/lib/c.py
+        stored_b = self._stored_snapshot("s2", manifest, self.graph)
+
+        reads = []
+        original = ObjectStore.get
+
+        def counting_get(store, key):
+            reads.append(key)
+            return original(store, key)
+
+        with patch.object(ObjectStore, "get", counting_get):
+            report = SnapshotComparator.compare_trees(SnapshotTree.open(stored_a), SnapshotTree.open(stored_b))
+
+        # Per side: root, src, src/lib trees and the src/lib module record
+        self.assertEqual(len(reads), 8)
+        self.assertEqual([(d.stable_id, d.status) for d in report.file_diffs], [("file:src/lib/c.py", "modified")])
+
+    def test_renames_across_modules(self):
+        manifest_b = copy.deepcopy(self.manifest)
+        manifest_b["snapshot"]["snapshot_id"] = "v2"
+        moved = dict(manifest_b["files"].pop(), path="src/web/x.ts", stable_id="file:src/web/x.ts", module_path="src/web")
+        manifest_b["files"].insert(4, moved)
+        graph_b = copy.deepcopy(self.graph)
+        graph_b["nodes"][-1]["id"] = "file:src/web/x.ts"
+        expected = self._expected(self.manifest, self.graph, manifest_b, graph_b)
+        self.assertEqual(expected.files_renamed, 1)
+
+        report = SnapshotComparator.compare_trees(
+            SnapshotTree.open(self._stored_snapshot("s1", self.manifest, self.graph)),
+            SnapshotTree.open(self._stored_snapshot("s2", manifest_b, graph_b))
+        )
+        self.assertEqual(report.file_diffs, expected.file_diffs)
+        self.assertEqual(report.file_diffs[0].old_stable_id, "file:web/x.ts")
+
+    def test_write_merkle_requires_path_order(self):
+        snapshot_dir = os.path.join(self.output_root, "v1")
+        os.makedirs(snapshot_dir)
+        manifest = dict(self.manifest, files=list(reversed(self.manifest["files"])))
+        self.assertIsNone(SnapshotTree.write_merkle(snapshot_dir, manifest, self.graph))
+        self.assertFalse(os.path.exists(os.path.join(snapshot_dir, MERKLE_FILENAME)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,129 @@
+import unittest
+import tempfile
+import shutil
+import os
+import json
+from unittest.mock import patch
+
+from src.snapshot.symbol_index import SymbolIndex, SYMBOL_INDEX_FILENAME
+from src.analysis.context_slicer import ContextSlicer
+
+
+class TestSymbolIndex(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.symbols = {
+            "ContextSlicer": ["file:src/analysis/context_slicer.py"],
+            "contextual": ["file:src/b.py"],
+            "Config": ["file:src/z.py", "file:src/a.py"],
+            "GraphBuilder": ["file:src/analysis/graph_builder.py"],
+            "build_graph": ["file:src/analysis/graph_builder.py"],
+            "Ünïcode": ["file:src/u.py"],
+        }
+        SymbolIndex.write(os.path.join(self.test_dir, SYMBOL_INDEX_FILENAME), self.symbols)
+        self.index = SymbolIndex.open(self.test_dir)
+
+    def tearDown(self):
+        self.index.close()
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+
+    def test_exact_lookup(self):
+        self.assertEqual(self.index.symbol_count, 6)
+        self.assertEqual(self.index.exact("GraphBuilder"), ["file:src/analysis/graph_builder.py"])
+        self.assertEqual(self.index.exact("Ünïcode"), ["file:src/u.py"])
+        self.assertEqual(self.index.exact("graphbuilder"), [])
+        self.assertEqual(self.index.exact("Missing"), [])
+        # Postings are sorted; resolve() takes the first
+        self.assertEqual(self.index.exact("Config"), ["file:src/a.py", "file:src/z.py"])
+        self.assertEqual(self.index.resolve("Config"), "file:src/a.py")
+        self.assertIsNone(self.index.resolve("Missing"))
+
+    def test_prefix_is_case_insensitive(self):
+        names = [self.index.name(i) for i in self.index.prefix("con")]
+        self.assertEqual(names, ["Config", "ContextSlicer", "contextual"])
+        self.assertEqual(len(list(self.index.prefix("CON", limit=1))), 1)
+        self.assertEqual(list(self.index.prefix("zzz")), [])
+
+    def test_search_ranks_candidates(self):
+        results = self.index.search("context")
+        self.assertEqual([r["match"] for r in results[:2]], ["prefix", "prefix"])
+        # Closer length ranks first
+        self.assertEqual(results[0]["symbol"], "contextual")
+
+        results = self.index.search("config")
+        self.assertEqual(results[0]["symbol"], "Config")
+        self.assertEqual(results[0]["match"], "exact_ci")
+
+        results = self.index.search("GraphBuilder")
+        self.assertEqual(results[0], {
+            "symbol": "GraphBuilder", "files": ["file:src/analysis/graph_builder.py"],
+            "match": "exact", "score": 1.0
+        })
+
+    def test_fuzzy_tolerates_typos(self):
+        results = self.index.search("GrpahBuilder", mode="fuzzy")
+        self.assertEqual(results[0]["symbol"], "GraphBuilder")
+        self.assertEqual(results[0]["match"], "fuzzy")
+        self.assertLess(results[0]["score"], 0.8)
+        self.assertEqual(self.index.search("qqqq", mode="fuzzy"), [])
+        with self.assertRaises(ValueError):
+            self.index.search("x", mode="regex")
+
+    def test_build_from_manifest_and_shared_handles(self):
+        snap_dir = os.path.join(self.test_dir, "snap")
+        os.makedirs(snap_dir)
+        with open(os.path.join(snap_dir, "manifest.json"), "w") as f:
+            json.dump({"files": [
+                {"stable_id": "file:a.py", "symbols": ["Alpha", "Shared"]},
+                {"stable_id": "file:b.py", "symbols": ["Shared"]},
+            ]}, f)
+
+        index = SymbolIndex.for_snapshot(snap_dir)
+        self.assertTrue(SymbolIndex.exists(snap_dir))
+        self.assertIs(SymbolIndex.for_snapshot(snap_dir), index)
+        self.assertEqual(index.exact("Shared"), ["file:a.py", "file:b.py"])
+
+        # Rewritten index invalidates the shared handle
+        SymbolIndex.write(os.path.join(snap_dir, SYMBOL_INDEX_FILENAME), {"Beta": ["file:b.py"]})
+        fresh = SymbolIndex.for_snapshot(snap_dir)
+        self.assertIsNot(fresh, index)
+        self.assertEqual(fresh.exact("Beta"), ["file:b.py"])
+
+    def test_read_only_snapshot_gets_a_private_index(self):
+        snap_dir = os.path.join(self.test_dir, "readonly")
+        os.makedirs(snap_dir)
+        with open(os.path.join(snap_dir, "symbols.json"), "w") as f:
+            json.dump({"Alpha": ["file:a.py"]}, f)
+
+        write = SymbolIndex.write
+
+        def refuse_snapshot_dir(path, symbols):
+            if os.path.dirname(path) == os.path.realpath(snap_dir):
+                raise PermissionError(13, "Permission denied", path)
+            return write(path, symbols)
+
+        with patch.object(SymbolIndex, "write", side_effect=refuse_snapshot_dir):
+            index = SymbolIndex.for_snapshot(snap_dir)
+            self.assertIs(SymbolIndex.for_snapshot(snap_dir), index)
+        self.assertFalse(SymbolIndex.exists(snap_dir))
+        self.assertEqual(index.exact("Alpha"), ["file:a.py"])
+
+        # Once symbols.idx exists it replaces the private build
+        SymbolIndex.build(snap_dir)
+        self.assertIsNot(SymbolIndex.for_snapshot(snap_dir), index)
+
+    def test_slicer_resolves_symbols_through_index(self):
+        manifest = {"files": [
+            {"stable_id": "file:src/a.py", "path": "src/a.py", "size_bytes": 10, "language": "python", "symbols": []},
+            {"stable_id": "file:src/z.py", "path": "src/z.py", "size_bytes": 10, "language": "python", "symbols": ["Config"]},
+        ]}
+        graph = {"nodes": [], "edges": [], "cycles": []}
+        sliced = ContextSlicer.slice_manifest(manifest, graph, "symbol:Config", 0, symbol_index=self.index)
+        self.assertEqual(sliced["telemetry"]["resolved_id"], "file:src/a.py")
+
+        empty = ContextSlicer.slice_manifest(manifest, graph, "symbol:Nope", 0, symbol_index=self.index)
+        self.assertEqual(empty["files"], [])
+
+
+if __name__ == "__main__":
+    unittest.main()